@@ -1,7 +1,8 @@
 """应用配置项模块"""
 from PyQt6.QtCore import pyqtSignal
 
-from qfluentwidgets import (qconfig, QConfig, ConfigItem, BoolValidator)
+from qfluentwidgets import (qconfig, QConfig, ConfigItem, RangeConfigItem, OptionsConfigItem, BoolValidator,
+                            RangeValidator, OptionsValidator)
 
 
 class Config(QConfig):
@@ -15,8 +16,18 @@ class Config(QConfig):
     tableColumnWidth = ConfigItem('FileTableView', 'ColumnWidth', None)  # 文件列表列宽
     customJavaPath = ConfigItem('Environment', 'CustomJavaPath', '')  # Java路径选项
     useCustomJavaPath = ConfigItem('Environment', 'UseCustomJavaPath', False, BoolValidator())
-    isOpeningJavaPathCorrect = ConfigItem('Environment', 'IsOpeningJavaPathCorrect', True,
-                                          BoolValidator())  # 程序启动时Java路径是否正确
+    useJavaStorage = ConfigItem('Environment', 'UseJavaStorage', False, BoolValidator())  # 是否由Java后端读写数据文件
+    saveDelay = ConfigItem('Storage', 'SaveDelay', 500, RangeValidator(0, 10000))  # 合并保存的时间窗口（毫秒）
+    importInclude = ConfigItem('Import', 'Include', '*.bat;*.cmd')  # 导入文件夹时包含的文件名通配符
+    importExclude = ConfigItem('Import', 'Exclude', '')  # 导入文件夹时排除的文件名或相对路径通配符
+    searchContents = ConfigItem('Search', 'SearchContents', False, BoolValidator())  # 是否搜索脚本内容
+    fileRunner = OptionsConfigItem('Run', 'FileRunner', 'java', OptionsValidator(['java', 'python']))  # 运行文件的方式
+    maxConcurrentRuns = RangeConfigItem('Run', 'MaxConcurrentRuns', 4, RangeValidator(1, 16))  # 同时运行的文件数上限
+    shellPoolSize = RangeConfigItem('Run', 'ShellPoolSize', 2, RangeValidator(0, 8))  # 预热的cmd进程数，为0时不预热
+    shellPoolIdleTimeout = RangeConfigItem('Run', 'ShellPoolIdleTimeout', 300, RangeValidator(30, 3600))  # 空闲回收时间（秒）
+    resourceSampleInterval = RangeConfigItem('Run', 'ResourceSampleInterval', 1000, RangeValidator(0, 5000))  # 资源占用采样间隔（毫秒），为0时不采样
+    historyRetentionDays = RangeConfigItem('History', 'RetentionDays', 90, RangeValidator(7, 365))  # 运行记录保留天数
+    scheduleCatchUp = ConfigItem('Schedule', 'CatchUp', True, BoolValidator())  # 启动后补运行关闭期间错过的计划
 
     appVersion = ConfigItem('AppVersion', 'Version', '')  # 保存应用版本号
 
@@ -0,0 +1,352 @@
+"""快照加追加日志的数据存储模块"""
+import glob
+import json
+import os
+import threading
+import zlib
+
+from AppConfig.storage import storage, file_table_path, preset_path
+from Logs.log_recorder import logging
+
+
+class JournaledFile:
+    """
+    以“快照+追加日志”方式保存的JSON数组
+
+    * 快照即原有的JSON数据文件，始终是可直接导出的完整JSON数组
+    * 每次修改只向日志文件追加一行[操作名, 参数...]，写入量与数据总量无关
+    * 日志文件名包含快照内容的CRC32校验值，加载时只重放与当前快照匹配的日志，
+      因此导入数据或压缩中途退出都不会把日志重放到错误的快照上
+    * 日志超过阈值后由压缩操作将内存中的数据写成新快照并开始新的日志
+
+    压缩分为两步：beginCompact()在GUI线程中获取数据的浅拷贝，finishCompact()可在后台线程中完成序列化和写入。
+    为使浅拷贝足以作为一致的快照，操作函数不得原地修改已有元素，只能整体替换、追加或删除元素。
+
+    构造方法参数
+    ------------
+    * path: 快照文件路径
+    * operations: 操作表 {操作名: 函数(数据列表, *参数)}
+    * threshold: 触发压缩的日志条数
+    * key: 定位元素的键函数，设置后重放日志时先建立一次{键: 下标}索引，以关键字参数index传给操作函数，
+      由操作函数随数据一起更新，每条记录不再逐个查找元素；追加单个操作时index为None
+    """
+
+    def __init__(self, path: str, operations: dict, threshold: int = 500, key=None):
+        self.path = path
+        self.operations = operations
+        self.threshold = threshold
+        self.key = key
+        self.onThreshold = None  # 日志条数达到阈值时的回调函数
+
+        self.data = []  # 内存中的完整数据
+        self.crc = 0  # 当前快照的CRC32校验值
+        self.opCount = 0  # 当前日志中的操作条数
+        self.journals = []  # 正在追加写入的日志文件（压缩过程中新旧日志同时写入）
+        self.tail = None  # 压缩开始后追加的日志行
+        self.lock = threading.RLock()
+
+    def journalPath(self, crc: int) -> str:
+        """与指定快照对应的日志文件路径"""
+        return f'{self.path}.{crc:08x}.journal'
+
+    def load(self):
+        """
+        加载快照并重放对应的日志
+        :return: 加载后的数据，快照内容损坏时返回None
+        """
+        with self.lock:
+            self.__closeJournals()
+            self.tail = None
+            self.opCount = 0
+
+            if storage.backend is not None:  # 由Java后端读写时不使用日志
+                data = storage.read(self.path)
+                self.data = list(data) if data else []
+                return None if data is None else self.data
+
+            try:
+                with open(self.path, 'rb') as f:
+                    raw = f.read()
+            except FileNotFoundError:
+                raw = b''
+            except OSError as e:
+                logging.error(f'读取"{self.path}"失败：{e}')
+                self.data = []
+                return None
+
+            self.crc = zlib.crc32(raw)
+            try:
+                data = json.loads(raw.decode('utf-8')) if raw.strip() else []
+            except (UnicodeDecodeError, json.decoder.JSONDecodeError) as e:
+                logging.error(f'读取"{self.path}"失败：{e}')
+                self.data = []
+                return None
+
+            self.data = data
+            self.__replay()
+            self.__removeStaleJournals()
+            return self.data
+
+    def read(self):
+        """
+        只读地加载快照并重放对应的日志，不改变内存中的数据，也不截断或删除任何文件
+        （供其他进程在图形界面运行期间读取，如命令行）
+        :return: 加载后的数据，快照内容损坏时返回None
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                raw = f.read()
+        except FileNotFoundError:
+            raw = b''
+        except OSError as e:
+            logging.error(f'读取"{self.path}"失败：{e}')
+            return None
+
+        try:
+            data = json.loads(raw.decode('utf-8')) if raw.strip() else []
+        except (UnicodeDecodeError, json.decoder.JSONDecodeError) as e:
+            logging.error(f'读取"{self.path}"失败：{e}')
+            return None
+
+        self.__applyJournal(data, self.journalPath(zlib.crc32(raw)))
+        return data
+
+    def append(self, op: str, *args):
+        """
+        执行一个操作并追加至日志
+        :param op: 操作名
+        :param args: 操作参数（需可序列化为JSON）
+        """
+        with self.lock:
+            self.operations[op](self.data, *args)
+
+            if storage.backend is not None:
+                storage.write(self.path, list(self.data))
+                return
+
+            line = json.dumps([op, *args], ensure_ascii=False) + '\n'
+            try:
+                if not self.journals:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                    self.journals.append(open(self.journalPath(self.crc), 'a', encoding='utf-8'))
+                for journal in self.journals:
+                    journal.write(line)
+                    journal.flush()
+            except OSError as e:
+                logging.error(f'写入"{self.path}"的日志失败：{e}')
+
+            if self.tail is not None:
+                self.tail.append(line)
+            self.opCount += 1
+            thresholdReached = self.opCount >= self.threshold
+
+        if thresholdReached and self.onThreshold is not None:
+            self.onThreshold()
+
+    def beginCompact(self):
+        """
+        开始压缩：获取当前数据的浅拷贝
+        :return: 数据快照，已有压缩正在进行时返回None
+        """
+        with self.lock:
+            if self.tail is not None:
+                return None
+            self.tail = []
+            self.opCount = 0
+            return list(self.data)
+
+    def finishCompact(self, snapshot: list) -> bool:
+        """
+        完成压缩：写入新快照并切换至新日志（可在后台线程中调用）
+        :param snapshot: beginCompact()返回的数据快照
+        :return: 是否压缩成功
+        """
+        text = storage.dumps(snapshot)
+        newCrc = zlib.crc32(text.encode('utf-8'))
+
+        with self.lock:
+            # 新日志先写入压缩开始后的操作，此后新旧日志同时追加，保证任意时刻中断都不丢失操作
+            try:
+                newJournal = open(self.journalPath(newCrc), 'w', encoding='utf-8')
+                newJournal.writelines(self.tail)
+                newJournal.flush()
+            except OSError as e:
+                logging.error(f'创建"{self.path}"的新日志失败：{e}')
+                self.tail = None
+                return False
+            self.journals.append(newJournal)
+            self.tail = None
+
+        success = storage.writeText(self.path, text, snapshot)
+
+        with self.lock:
+            self.journals.remove(newJournal)
+            if success:
+                self.__closeJournals(delete=True)
+                self.journals = [newJournal]
+                self.crc = newCrc
+            else:
+                newJournal.close()
+                os.remove(newJournal.name)
+
+        return success
+
+    def compact(self, data: list = None) -> bool:
+        """
+        立即在当前线程中完成压缩
+        :param data: 替换内存数据的新数据（为空则使用当前数据）
+        :return: 是否压缩成功
+        """
+        with self.lock:
+            if data is not None:
+                self.data = list(data)
+            if storage.backend is not None:
+                return storage.write(self.path, list(self.data))
+
+            snapshot = self.beginCompact()
+            if snapshot is None:
+                return False
+            return self.finishCompact(snapshot)
+
+    def __replay(self):
+        """重放与当前快照对应的日志，丢弃末尾不完整的记录"""
+        path = self.journalPath(self.crc)
+        validSize, totalSize, self.opCount = self.__applyJournal(self.data, path)
+        if validSize < totalSize:
+            with open(path, 'r+b') as f:
+                f.truncate(validSize)
+
+    def __applyJournal(self, data: list, path: str) -> tuple:
+        """
+        将日志中的操作依次应用到数据上，遇到不完整的记录即停止
+        :param data: 数据列表
+        :param path: 日志文件路径
+        :return: (有效记录的字节数, 日志的字节数, 有效记录的条数)，日志不存在时均为0
+        """
+        try:
+            with open(path, 'rb') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return 0, 0, 0
+
+        validSize = 0
+        count = 0
+        index = None
+        if self.key is not None and lines:
+            index = {}
+            for i, item in enumerate(data):
+                index.setdefault(self.key(item), i)
+        for line in lines:
+            try:
+                op, *args = json.loads(line.decode('utf-8'))
+                if index is None:
+                    self.operations[op](data, *args)
+                else:
+                    self.operations[op](data, *args, index=index)
+            except (UnicodeDecodeError, json.decoder.JSONDecodeError, KeyError, ValueError, TypeError, IndexError):
+                logging.warning(f'"{path}"存在不完整的记录，已丢弃之后的内容')
+                break
+            validSize += len(line)
+            count += 1
+        return validSize, sum(len(line) for line in lines), count
+
+    def __removeStaleJournals(self):
+        """删除与当前快照不匹配的日志"""
+        current = os.path.abspath(self.journalPath(self.crc))
+        for path in glob.glob(glob.escape(self.path) + '.*.journal'):
+            if os.path.abspath(path) != current:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def __closeJournals(self, delete: bool = False):
+        """关闭正在写入的日志文件"""
+        for journal in self.journals:
+            journal.close()
+            if delete:
+                try:
+                    os.remove(journal.name)
+                except OSError:
+                    pass
+        self.journals = []
+
+
+def _indexOf(data: list, key):
+    """查找第一个满足条件的元素下标，未找到时返回None"""
+    for i, item in enumerate(data):
+        if key(item):
+            return i
+    return None
+
+
+def _rowPath(row: list) -> str:
+    """文件列表中行的键：文件路径"""
+    return row[2]
+
+
+def _pathIndex(data: list, index: dict, path: str):
+    """按文件路径查找行下标，有索引时直接查索引"""
+    if index is not None:
+        return index.get(path)
+    return _indexOf(data, lambda row: row[2] == path)
+
+
+def _addFiles(data: list, rows: list, index: dict = None):
+    start = len(data)
+    data.extend(list(row) for row in rows)
+    if index is not None:
+        for i in range(start, len(data)):
+            index.setdefault(data[i][2], i)
+
+
+def _removeFiles(data: list, paths: list, index: dict = None):
+    paths = set(paths)
+    data[:] = [row for row in data if row[2] not in paths]
+    if index is not None:  # 删除后其余行的下标改变，整体重建
+        index.clear()
+        for i, row in enumerate(data):
+            index.setdefault(row[2], i)
+
+
+def _setRemark(data: list, path: str, remark: str, index: dict = None):
+    i = _pathIndex(data, index, path)
+    if i is not None:
+        data[i] = [data[i][0], remark, *data[i][2:]]
+
+
+def _redirectFile(data: list, oldPath: str, newPath: str, newName: str, index: dict = None):
+    i = _pathIndex(data, index, oldPath)
+    if i is not None:
+        data[i] = [newName, data[i][1], newPath, *data[i][3:]]
+        if index is not None:
+            del index[oldPath]
+            index[newPath] = min(i, index.get(newPath, i))
+
+
+def _addPreset(data: list, preset: list):
+    data.append(preset)
+
+
+def _editPreset(data: list, index: int, preset: list):
+    data[index] = preset
+
+
+def _deletePreset(data: list, index: int):
+    data.pop(index)
+
+
+# 文件列表的每一行为[文件名,备注,文件路径,行ID]，以文件路径定位行
+fileTableJournal = JournaledFile(file_table_path, {
+    'add': _addFiles,
+    'remove': _removeFiles,
+    'remark': _setRemark,
+    'redirect': _redirectFile,
+}, key=_rowPath)
+
+# 预设的每一项为[标题,描述,样式,预设数据,计划数据]（旧版本没有计划数据），以下标定位预设
+presetJournal = JournaledFile(preset_path, {
+    'add': _addPreset,
+    'edit': _editPreset,
+    'delete': _deletePreset,
+})
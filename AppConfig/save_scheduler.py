@@ -0,0 +1,124 @@
+"""延迟合并写入的保存调度模块"""
+import threading
+import time
+
+from PyQt6.QtCore import QObject, QTimer
+
+from Logs.log_recorder import logging
+
+
+class SaveScheduler(QObject):
+    """
+    写后保存调度器
+
+    数据改变时只需调用markDirty()标记为“脏”，调度器会将时间窗口内的多次修改合并为一次保存：
+    快照在GUI线程中获取，序列化和写入文件则交给后台线程完成，界面不会因保存而卡顿。
+    连续不断的修改最多推迟maxDelay毫秒，避免数据长时间得不到保存。
+
+    构造方法参数
+    ------------
+    * snapshot: 在GUI线程中调用、返回待保存数据的函数（返回None表示无需保存）
+    * save: 在后台线程中调用、保存数据并返回是否成功的函数
+    * delay: 合并时间窗口（毫秒）
+    * maxDelay: 最长推迟时间（毫秒），为空则取delay的4倍
+    * parent: 父对象
+    """
+
+    def __init__(self, snapshot, save, delay: int = 500, maxDelay: int = None, parent=None):
+        super().__init__(parent)
+        self.snapshot = snapshot
+        self.save = save
+        self.delay = delay
+        self.maxDelay = maxDelay if maxDelay is not None else delay * 4
+        self.dirtySince = None  # 第一次标记为“脏”的时间
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.__commit)
+
+        # 后台写入线程只保留最新的一份待写入数据
+        self.pendingData = None
+        self.hasPending = False
+        self.writing = False
+        self.condition = threading.Condition()
+        self.writeLock = threading.Lock()  # 保证后台写入和同步写入不会同时进行
+        self.worker = threading.Thread(target=self.__writeLoop, daemon=True)
+        self.worker.start()
+
+    def setDelay(self, delay: int):
+        """
+        修改合并时间窗口
+        :param delay: 新的时间窗口（毫秒）
+        """
+        self.delay = delay
+        self.maxDelay = delay * 4
+
+    def markDirty(self):
+        """标记数据已改变，在时间窗口结束后保存"""
+        now = time.monotonic()
+        if self.dirtySince is None:
+            self.dirtySince = now
+
+        waited = (now - self.dirtySince) * 1000
+        if self.timer.isActive() and waited + self.delay > self.maxDelay:
+            return  # 已推迟过久，不再重新计时
+
+        self.timer.start(max(0, int(self.delay)))
+
+    def flush(self):
+        """立即在当前线程中完成保存（用于关闭程序前）"""
+        self.timer.stop()
+
+        with self.condition:
+            pending, data = self.hasPending, self.pendingData
+            self.hasPending = False
+            self.pendingData = None
+            while self.writing:  # 等待后台线程完成正在进行的写入
+                self.condition.wait()
+
+        if self.dirtySince is not None:  # 有更新的修改则重新获取快照
+            self.dirtySince = None
+            self.__write(self.snapshot())
+        elif pending:
+            self.__write(data)
+
+    def __commit(self):
+        """时间窗口结束：获取快照并交给后台线程写入"""
+        if self.dirtySince is None:
+            return
+
+        self.dirtySince = None
+        data = self.snapshot()
+        with self.condition:
+            self.pendingData = data
+            self.hasPending = True
+            self.condition.notify()
+
+    def __writeLoop(self):
+        """后台线程：写入最新的待写入数据"""
+        while True:
+            with self.condition:
+                while not self.hasPending:
+                    self.condition.wait()
+                data = self.pendingData
+                self.pendingData = None
+                self.hasPending = False
+                self.writing = True
+
+            try:
+                self.__write(data)
+            finally:
+                with self.condition:
+                    self.writing = False
+                    self.condition.notify_all()
+
+    def __write(self, data):
+        """保存数据"""
+        if data is None:
+            return
+
+        with self.writeLock:
+            if self.save(data):
+                logging.info('数据保存成功')
+            else:
+                logging.error('数据保存失败')
@@ -0,0 +1,157 @@
+"""本地数据持久化模块"""
+import json
+import os
+import shutil
+import tempfile
+import threading
+
+from Logs.log_recorder import logging
+
+file_table_path = './config/fileTableContents.json'  # 文件列表数据
+preset_path = './config/presets.json'  # 预设数据
+
+
+class Storage:
+    """
+    JSON数据的读写引擎
+
+    * 写入时先写入同目录下的临时文件再重命名，保证数据文件不会因写入中断而损坏
+    * 读取结果按文件的修改时间和大小缓存，文件未改变时直接返回缓存
+    * 可通过setBackend()改为使用Java后端（jsonReader/jsonWriter）读写，仅作为备用方案
+    """
+
+    def __init__(self):
+        self.cache = {}  # {绝对路径: ((修改时间, 文件大小), 数据)}
+        self.lock = threading.Lock()
+        self.backend = None  # Java后端连接器（为空则由Python读写）
+
+    def setBackend(self, backend):
+        """
+        设置备用的Java后端
+        :param backend: 提供request(target, data)方法的连接器，为None时恢复使用Python读写
+        """
+        self.backend = backend
+        self.invalidate()
+
+    @staticmethod
+    def __stamp(path: str):
+        """获取文件的修改时间和大小，文件不存在时返回None"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def read(self, path: str):
+        """
+        读取JSON数据
+        :param path: 数据文件路径
+        :return: 读取到的数据（文件不存在或为空时返回空列表，文件内容损坏时返回None）
+        注意：返回的对象与缓存共享，调用方不应修改
+        """
+        if self.backend is not None:
+            data = self.backend.request('jsonReader', [path])
+            return [] if data in (0, -1) else data
+
+        key = os.path.abspath(path)
+        stamp = self.__stamp(path)
+        if stamp is None:
+            return []
+
+        with self.lock:
+            cached = self.cache.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+            data = json.loads(content) if content.strip() else []
+        except (OSError, UnicodeDecodeError, json.decoder.JSONDecodeError) as e:
+            logging.error(f'读取"{path}"失败：{e}')
+            return None
+
+        with self.lock:
+            self.cache[key] = (stamp, data)
+        return data
+
+    @staticmethod
+    def dumps(data) -> str:
+        """将数据序列化为保存到文件的JSON文本"""
+        return json.dumps(data, ensure_ascii=False, indent=4)
+
+    def write(self, path: str, data) -> bool:
+        """
+        以原子方式写入JSON数据
+        :param path: 数据文件路径
+        :param data: 需要写入的数据
+        :return: 是否写入成功
+        注意：写入成功后data将作为缓存保留，调用方不应再修改
+        """
+        if self.backend is not None:
+            return bool(self.backend.request('jsonWriter', [path, data]))
+
+        try:
+            text = self.dumps(data)
+        except (TypeError, ValueError) as e:
+            logging.error(f'写入"{path}"失败：{e}')
+            return False
+
+        return self.writeText(path, text, data)
+
+    def writeText(self, path: str, text: str, data=None) -> bool:
+        """
+        以原子方式写入已序列化的JSON文本
+        :param path: 数据文件路径
+        :param text: 需要写入的文本
+        :param data: 文本对应的数据，不为空时作为读取缓存
+        :return: 是否写入成功
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            self.__backupIfCorrupted(path)
+
+            fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', suffix='.json', dir=directory)
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:  # 不转换换行符，保证文件内容与文本一致
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logging.error(f'写入"{path}"失败：{e}')
+            return False
+
+        stamp = self.__stamp(path)
+        with self.lock:
+            if stamp is not None and data is not None:
+                self.cache[os.path.abspath(path)] = (stamp, data)
+            else:
+                self.cache.pop(os.path.abspath(path), None)
+        return True
+
+    def invalidate(self, path: str = None):
+        """
+        清除缓存
+        :param path: 需要清除缓存的文件路径，为空则清除全部缓存
+        """
+        with self.lock:
+            if path is None:
+                self.cache.clear()
+            else:
+                self.cache.pop(os.path.abspath(path), None)
+
+    def __backupIfCorrupted(self, path: str):
+        """覆盖无法解析的数据文件前先将其备份为.bak文件，防止数据被意外清除"""
+        if not os.path.isfile(path) or self.read(path) is not None:
+            return
+
+        shutil.copyfile(path, path + '.bak')
+        logging.warning(f'"{path}"内容损坏，已备份至"{path}.bak"')
+
+
+storage = Storage()
@@ -0,0 +1,114 @@
+"""
+控制台输出接收性能测试
+
+在本机启动一个模拟Java文件运行进程的服务器，持续发送中英文混合的输出行，
+分别测量旧的接收方式（按行发送的文本，每次recv(1024)后解码并加锁放入队列）
+和StreamReceiver（按帧协议发送）的吞吐量（MB/s）。
+
+用法（在源码根目录运行）：python -m Benchmarks.console_throughput [发送的数据量(MB)]
+"""
+import os
+import socket
+import sys
+import threading
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Connector import FrameProtocol as Frame
+from Connector.StreamReceiver import StreamReceiver
+
+
+def makeBlock() -> bytes:
+    """生成一段模拟输出（中英文混合的日志行）"""
+    lines = [
+        f'[{i:06d}] 正在复制文件 C:\\Users\\测试\\Documents\\file_{i}.txt -> D:\\备份\\file_{i}.txt  100%\r\n'
+        for i in range(1000)
+    ]
+    return ''.join(lines).encode('utf-8')
+
+
+def makePayload(totalBytes: int) -> bytes:
+    """生成指定大小的旧格式模拟输出（按行发送，以进程退出消息结尾）"""
+    block = makeBlock()
+    payload = block * max(1, totalBytes // len(block))
+    return payload + '#进程已退出，代码：0\r\n'.encode('utf-8')
+
+
+def makeFramedPayload(totalBytes: int, frameSize: int = 24 * 1024) -> bytes:
+    """生成指定大小的帧格式模拟输出（与Java端一样按块分帧，以退出帧结尾）"""
+    block = makeBlock()
+    data = block * max(1, totalBytes // len(block))
+    frames = [Frame.encodeFrame(Frame.STDOUT, data[i:i + frameSize]) for i in range(0, len(data), frameSize)]
+    return b''.join(frames) + Frame.encodeExit(0)
+
+
+def serve(payload: bytes, ready: threading.Event, port: list):
+    """模拟服务器：接受一个连接并发送全部数据"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as server:
+        server.bind(('localhost', 0))
+        server.listen(1)
+        port.append(server.getsockname()[1])
+        ready.set()
+
+        conn, _ = server.accept()
+        with conn:
+            conn.sendall(payload)
+
+
+def connect(payload: bytes) -> socket.socket:
+    """启动模拟服务器并连接"""
+    ready = threading.Event()
+    port = []
+    threading.Thread(target=serve, args=(payload, ready, port), daemon=True).start()
+    ready.wait()
+    return socket.create_connection(('localhost', port[0]))
+
+
+def legacyReceive(sock: socket.socket) -> int:
+    """旧的接收方式"""
+    output_queue = deque()
+    mutex = threading.Lock()
+    received = 0
+    while True:
+        try:
+            data = sock.recv(1024).decode('utf-8')
+        except UnicodeDecodeError:  # 多字节字符被拆分时旧的方式会直接失败，此处按字节数继续统计
+            received += 1024
+            continue
+        with mutex:
+            output_queue.append(data)
+        if not data or data.startswith('#'):
+            break
+        received += len(data.encode('utf-8'))
+    return received
+
+
+def streamReceive(sock: socket.socket) -> int:
+    """StreamReceiver的接收方式"""
+    receiver = StreamReceiver()
+    while receiver.receiveFrom(sock) and receiver.exitCode is None:
+        pass
+    receiver.takeText()
+    return receiver.receivedBytes
+
+
+def measure(name: str, receive, payload: bytes):
+    """测量一种接收方式的吞吐量"""
+    with connect(payload) as sock:
+        start = time.perf_counter()
+        received = receive(sock)
+        elapsed = time.perf_counter() - start
+    print(f'{name:<16}{received / 1024 / 1024:>10.1f} MB{elapsed:>10.3f} s{received / 1024 / 1024 / elapsed:>10.1f} MB/s')
+
+
+def main():
+    size = int(float(sys.argv[1]) * 1024 * 1024) if len(sys.argv) > 1 else 64 * 1024 * 1024
+    print(f'{"接收方式":<12}{"数据量":>10}{"耗时":>11}{"吞吐量":>11}')
+    measure('recv(1024)', legacyReceive, makePayload(size))
+    measure('StreamReceiver', streamReceive, makeFramedPayload(size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Java后端异步请求模块"""
+from concurrent.futures import Future
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+
+
+class BackendCall(QObject):
+    """
+    在GUI线程中等待一次Java后端请求的应答
+
+    * 请求由BackendDaemon.submit()发出，应答在接收线程中交付给Future，调用线程不会被阻塞
+    * Future完成后经排队连接转到本对象所在的线程发出finished信号，可以连接任意可调用对象
+    * 超时和失败时finished携带None；调用cancel()后不再发出finished
+    * 结束或取消后自动调用deleteLater()
+
+    构造方法参数
+    ------------
+    * future: BackendDaemon.submit()返回的Future
+    * parent: 父对象
+    """
+
+    finished = pyqtSignal(object)  # 请求结束（应答数据，失败或超时时为None）
+    resolved = pyqtSignal()  # Future已完成（可能在其他线程中发出，仅供内部使用）
+
+    def __init__(self, future: Future, parent=None):
+        super().__init__(parent)
+        self.future = future
+        self.cancelled = False
+
+        # 即使Future已经完成，也要等调用方连接finished之后才交付结果，因此强制使用排队连接
+        self.resolved.connect(self.__deliver, Qt.ConnectionType.QueuedConnection)
+        future.add_done_callback(self.__onDone)
+
+    def cancel(self) -> bool:
+        """
+        放弃等待应答，即使应答已经到达、尚未交付，也不再发出finished
+        :return: 请求是否仍在等待应答
+        """
+        self.cancelled = True
+        return self.future.cancel()
+
+    def isFinished(self) -> bool:
+        """是否已得到应答或已取消"""
+        return self.future.done()
+
+    def __onDone(self, future: Future):
+        """Future完成（在完成Future的线程中调用）"""
+        try:
+            self.resolved.emit()
+        except RuntimeError:  # 本对象已随父对象销毁
+            pass
+
+    def __deliver(self):
+        """在本对象所在线程中交付结果"""
+        if not self.cancelled and not self.future.cancelled():
+            self.finished.emit(self.future.result())
+        self.deleteLater()
@@ -0,0 +1,342 @@
+"""常驻Java后端进程的连接模块"""
+import heapq
+import json
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ThreadPoolExecutor
+from itertools import count
+
+from AppConfig.config import cfg
+from Connector.JarConnector import JarConnector
+from Connector.ShellLauncher import noWindowFlag
+from Logs.log_recorder import logging
+
+daemon_jar_path = './backend/backendDaemon.jar'
+
+
+class BackendDaemon:
+    """
+    常驻Java后端进程的连接器
+
+    整个应用只启动一个Java进程，所有请求通过标准输入输出以带编号的JSON行进行多路复用；
+    健康检查线程定期探测进程状态，进程崩溃或无响应时自动重启。
+    若backendDaemon.jar不存在，则退回到每次调用启动一个.jar文件的旧方式（在线程池中进行）。
+    submit()立即返回Future，GUI线程应使用submit()并通过BackendCall接收应答；request()会阻塞至得到应答，只用于后台线程。
+    """
+
+    statsRequestId = -1  # 退出时统计请求的编号，不对应任何等待中的请求
+    deadlineCompactSize = 4096  # 超时时间堆达到该大小时清除已完成的请求
+
+    def __init__(self, request_timeout: float = 30.0, health_interval: float = 5.0, ping_timeout: float = 3.0):
+        self.request_timeout = request_timeout  # 单个请求的默认超时时间（秒）
+        self.health_interval = health_interval  # 健康检查间隔（秒）
+        self.ping_timeout = ping_timeout  # 健康检查的应答超时时间（秒）
+
+        self.java_process = None
+        self.pending = {}  # 等待应答的请求 {请求编号: Future}
+        self.ids = count(1)
+        self.lock = threading.RLock()  # 保护进程对象、等待队列和标准输入的互斥锁（Future的回调可能在持有锁时执行）
+        self.jar_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='JarConnector')  # 逐个启动.jar文件的线程池
+        self.stopEvent = threading.Event()
+        self.health_thread = None
+        self.deadlines = []  # 请求的超时时间堆 [(截止时间, 序号, 目标功能, Future)]，已完成的请求到期时直接丢弃
+        self.deadlineSeq = count()
+        self.deadlineCondition = threading.Condition()
+        self.timeout_thread = None  # 处理全部请求超时的线程（首次提交请求时启动）
+
+        # 预热进程池的设置改变后立即通知Java后端
+        cfg.shellPoolSize.valueChanged.connect(self.configureShellPool)
+        cfg.shellPoolIdleTimeout.valueChanged.connect(self.configureShellPool)
+
+    def available(self) -> bool:
+        """常驻进程的.jar文件是否存在"""
+        return os.path.isfile(daemon_jar_path)
+
+    def start(self):
+        """启动常驻进程和健康检查线程"""
+        if not self.available():
+            logging.warning(f'未找到"{daemon_jar_path}"，Java后端将按请求逐个启动')
+            return
+
+        self.stopEvent.clear()
+        with self.lock:
+            self.__spawn()
+
+        if self.health_thread is None or not self.health_thread.is_alive():
+            self.health_thread = threading.Thread(target=self.__healthCheck, daemon=True)
+            self.health_thread.start()
+
+    def stop(self):
+        """通知常驻进程退出并停止健康检查（不等待应答，不阻塞调用线程）"""
+        self.stopEvent.set()
+        with self.lock:
+            process = self.java_process
+            self.java_process = None
+            self.__failPending()
+
+        if process is not None and process.poll() is None:
+            try:
+                # 统计请求排在退出请求之前，Java后端处理完已收到的请求才退出，应答由接收线程交付并写入日志
+                process.stdin.write(json.dumps({'id': self.statsRequestId, 'target': 'shellPool', 'data': ['stats']}) + '\n')
+                process.stdin.write(json.dumps({'target': 'exit'}) + '\n')
+                process.stdin.close()
+            except OSError:
+                pass
+        logging.info('Java后端常驻进程已停止')
+
+    def restart(self):
+        """重启常驻进程（如Java路径改变后）"""
+        if not self.available():
+            return
+
+        logging.info('重启Java后端常驻进程……')
+        with self.lock:
+            self.__kill()
+            if not self.stopEvent.is_set():
+                self.__spawn()
+
+    def configureShellPool(self, *args):
+        """将预热进程池的设置发送给常驻进程（不等待应答）"""
+        if not self.available():
+            return
+
+        def onDone(future: Future):
+            stats = None if future.cancelled() else future.result()
+            if isinstance(stats, dict):
+                logging.info(f'预热进程池设置已更新：大小{stats["size"]}，当前空闲{stats["idle"]}个')
+
+        self.submit('shellPool', self.__shellPoolRequestData()).add_done_callback(onDone)
+
+    @staticmethod
+    def __shellPoolRequestData() -> list:
+        """预热进程池的设置请求数据"""
+        return ['configure', cfg.get(cfg.shellPoolSize), cfg.get(cfg.shellPoolIdleTimeout)]
+
+    def request(self, target: str, data: list, timeout: float = None):
+        """
+        向Java后端发送请求并等待应答（会阻塞调用线程，GUI线程请使用submit()）
+        :param target: 目标功能（与原.jar文件同名，如"fileAdder"）
+        :param data: 请求携带的数据列表
+        :param timeout: 超时时间（秒），为空则使用默认值
+        :return: 应答数据，失败时返回None
+        """
+        future = self.submit(target, data, timeout)
+        return None if future.cancelled() else future.result()
+
+    def submit(self, target: str, data: list, timeout: float = None) -> Future:
+        """
+        向Java后端发送请求，不等待应答
+        :param target: 目标功能（与原.jar文件同名，如"fileAdder"）
+        :param data: 请求携带的数据列表
+        :param timeout: 超时时间（秒），为空则使用默认值
+        :return: Future对象，结果为应答数据，失败或超时时为None；调用cancel()可放弃等待
+        """
+        if self.available():
+            request_id, future = self.__submit(target, data)
+            if future is None:
+                future = Future()
+                future.set_result(None)
+                return future
+        else:
+            request_id, future = None, Future()
+            self.jar_executor.submit(self.__runJar, target, data, future)
+
+        self.__watchTimeout(target, future, timeout if timeout is not None else self.request_timeout)
+        future.add_done_callback(lambda _: self.__forget(request_id))
+        return future
+
+    def __submit(self, target: str, data: list):
+        """
+        写入一个请求
+        :return: 请求编号和等待应答的Future对象，写入失败时Future为None
+        """
+        with self.lock:
+            if self.java_process is None or self.java_process.poll() is not None:
+                logging.warning('Java后端常驻进程未运行，尝试重新启动')
+                self.__spawn()
+                if self.java_process is None:
+                    return None, None
+
+            request_id = next(self.ids)
+            future = Future()
+            self.pending[request_id] = future
+            try:
+                self.java_process.stdin.write(json.dumps({'id': request_id, 'target': target, 'data': data}) + '\n')
+                self.java_process.stdin.flush()
+            except OSError:
+                self.pending.pop(request_id, None)
+                logging.error(f'向Java后端发送请求"{target}"失败')
+                return None, None
+
+        return request_id, future
+
+    @staticmethod
+    def __resolve(future: Future, result):
+        """交付应答，Future已超时或已取消时忽略"""
+        try:
+            future.set_result(result)
+        except InvalidStateError:
+            pass
+
+    def __expire(self, target: str, future: Future):
+        """请求超时（在超时线程中调用）"""
+        if not future.done():
+            logging.warning(f'Java后端请求"{target}"超时')
+            self.__resolve(future, None)
+
+    def __watchTimeout(self, target: str, future: Future, timeout: float):
+        """
+        将请求加入超时时间堆（全部请求共用一个超时线程，不为每个请求单独创建计时器线程）
+        :param target: 目标功能
+        :param future: 等待应答的Future
+        :param timeout: 超时时间（秒）
+        """
+        with self.deadlineCondition:
+            if len(self.deadlines) >= self.deadlineCompactSize:  # 大量请求已完成但尚未到期时清理
+                self.deadlines = [entry for entry in self.deadlines if not entry[3].done()]
+                heapq.heapify(self.deadlines)
+            heapq.heappush(self.deadlines, (time.monotonic() + timeout, next(self.deadlineSeq), target, future))
+            if self.timeout_thread is None:
+                self.timeout_thread = threading.Thread(target=self.__timeoutLoop, name='BackendTimeout', daemon=True)
+                self.timeout_thread.start()
+            elif self.deadlines[0][3] is future:
+                self.deadlineCondition.notify()  # 新请求最先到期，唤醒超时线程重新计算等待时间
+
+    def __timeoutLoop(self):
+        """超时线程：等待最早的截止时间，使到期仍未完成的请求以None结束"""
+        while True:
+            with self.deadlineCondition:
+                while not self.deadlines:
+                    self.deadlineCondition.wait()
+                deadline, _, target, future = self.deadlines[0]
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self.deadlineCondition.wait(remaining)
+                    continue
+                heapq.heappop(self.deadlines)
+            self.__expire(target, future)
+
+    def __forget(self, request_id):
+        """请求结束后移出等待队列（超时时间堆中的记录到期时丢弃）"""
+        if request_id is not None:
+            with self.lock:
+                self.pending.pop(request_id, None)
+
+    def __runJar(self, target: str, data: list, future: Future):
+        """在线程池中启动独立的.jar文件完成请求"""
+        if future.cancelled():
+            return
+        try:
+            result = self.__requestByJar(target, data)
+        except Exception as e:
+            logging.error(f'调用"{target}.jar"失败：{e}')
+            result = None
+        self.__resolve(future, result)
+
+    @staticmethod
+    def __requestByJar(target: str, data: list):
+        """未找到常驻进程时按旧方式启动独立的.jar文件完成请求"""
+        connector = JarConnector(f'./backend/{target}.jar')
+        connector.sendData(data)
+        return connector.receiveData()
+
+    def __spawn(self):
+        """启动Java进程（调用方需持有锁）"""
+        try:
+            process = subprocess.Popen(
+                [cfg.get(cfg.customJavaPath) if cfg.get(cfg.useCustomJavaPath) else "java", '-jar', daemon_jar_path],
+                creationflags=noWindowFlag,  # 不显示窗口
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True
+            )
+        except OSError as e:
+            logging.error(f'Java后端常驻进程启动失败：{e}')
+            self.java_process = None
+            return
+
+        self.java_process = process
+        threading.Thread(target=self.__receiveLoop, args=(process,), daemon=True).start()
+        logging.info(f'Java后端常驻进程已启动，PID：{process.pid}')
+
+        # 启动后立即开始预热进程池，编号0不对应任何等待中的请求，应答会被忽略
+        try:
+            process.stdin.write(json.dumps({'id': 0, 'target': 'shellPool', 'data': self.__shellPoolRequestData()}) + '\n')
+            process.stdin.flush()
+        except OSError:
+            logging.warning('向Java后端发送预热进程池设置失败')
+
+    def __kill(self):
+        """结束当前的Java进程并使等待中的请求失败（调用方需持有锁）"""
+        process = self.java_process
+        self.java_process = None
+        self.__failPending()
+
+        if process is not None and process.poll() is None:
+            process.kill()
+
+    def __failPending(self):
+        """使所有等待中的请求以None结束（调用方需持有锁）"""
+        futures = list(self.pending.values())
+        self.pending.clear()
+        for future in futures:
+            self.__resolve(future, None)
+
+    def __receiveLoop(self, process: subprocess.Popen):
+        """接收线程：读取应答并按编号交付给对应的请求"""
+        for line in process.stdout:
+            try:
+                response = json.loads(line)
+            except json.decoder.JSONDecodeError:
+                logging.warning('Java后端返回了无法解析的应答')
+                continue
+
+            if response.get('id') == self.statsRequestId:
+                self.__logShellPoolStats(response.get('data'))
+                continue
+
+            with self.lock:
+                future = self.pending.pop(response.get('id'), None)
+            if future is not None:
+                self.__resolve(future, response.get('data'))
+
+        # 标准输出关闭说明进程已退出
+        with self.lock:
+            if self.java_process is process:
+                self.__failPending()
+        logging.info(f'Java后端常驻进程已退出，PID：{process.pid}')
+
+    @staticmethod
+    def __logShellPoolStats(stats):
+        """记录退出前的预热进程池统计数据"""
+        if isinstance(stats, dict):
+            logging.info(f'预热进程池命中率：{stats["hitRate"]:.0%}（命中{stats["hits"]}次，未命中{stats["misses"]}次，'
+                         f'预热{stats["spawned"]}个，空闲回收{stats["reaped"]}个）')
+
+    def __healthCheck(self):
+        """健康检查线程：进程退出或连续两次无应答时自动重启"""
+        failures = 0
+        while not self.stopEvent.wait(self.health_interval):
+            with self.lock:
+                process = self.java_process
+            if process is None or process.poll() is not None:
+                logging.warning('Java后端常驻进程已退出，自动重启')
+                self.restart()
+                failures = 0
+                continue
+
+            if self.request('ping', [], self.ping_timeout) == 'pong':
+                failures = 0
+                continue
+
+            failures += 1
+            logging.warning(f'Java后端常驻进程无应答（{failures}次）')
+            if failures >= 2:
+                self.restart()
+                failures = 0
+
+
+backendDaemon = BackendDaemon()
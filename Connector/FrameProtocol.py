@@ -0,0 +1,62 @@
+"""
+与Java文件运行进程通信的帧协议模块
+
+每一帧由类型（1字节）、负载长度（4字节，大端）和负载组成，与Java端的FrameChannel一致。
+进程输出按块原样转发，控制信息（结束进程、退出代码、心跳）和资源占用采样使用单独的帧类型，不会与输出内容混淆。
+"""
+import struct
+
+STDOUT = 1  # 标准输出（UTF-8文本）
+STDERR = 2  # 标准错误（UTF-8文本）
+STDIN = 3  # 写入进程标准输入的内容（主进程 -> 文件运行进程）
+CONTROL = 4  # 控制消息（主进程发送"kill"结束进程，文件运行进程发送提示信息）
+EXIT = 5  # 进程退出代码（4字节有符号整数）
+HEARTBEAT = 6  # 心跳（无负载）
+RESOURCE = 7  # 进程树的资源占用采样（见RESOURCE_SAMPLE）
+
+HEADER = struct.Struct('>BI')  # 帧头：类型、负载长度
+EXIT_CODE = struct.Struct('>i')
+# 资源占用采样：运行时长（毫秒）、累计CPU时间（毫秒）、内存占用、累计读取和写入的字节数（8字节有符号整数），
+# 线程数、进程数（4字节有符号整数），无法获取的项为-1
+RESOURCE_SAMPLE = struct.Struct('>qqqqqii')
+MAX_PAYLOAD = 64 * 1024  # 单帧负载的最大长度
+
+HEARTBEAT_INTERVAL = 1.0  # Java端发送心跳的间隔（秒）
+HEARTBEAT_TIMEOUT = 5.0  # 超过该时间未收到任何帧则认为文件运行进程已失去响应（秒）
+
+KILL = b'kill'  # 结束进程的控制消息
+
+
+def encodeFrame(frameType: int, payload: bytes = b'') -> bytes:
+    """
+    编码一帧
+    :param frameType: 帧类型
+    :param payload: 负载
+    :return: 帧的字节数据
+    """
+    return HEADER.pack(frameType, len(payload)) + payload
+
+
+def encodeExit(exitCode: int) -> bytes:
+    """编码进程退出帧"""
+    return encodeFrame(EXIT, EXIT_CODE.pack(exitCode))
+
+
+def readFrame(stream):
+    """
+    从字节流中读取一帧（阻塞，只应由一个线程调用）
+    :param stream: 可读的二进制流（如socket.makefile('rb')）
+    :return: (帧类型, 负载)，流已结束时返回None
+    :raises ValueError: 帧长度错误
+    """
+    header = stream.read(HEADER.size)
+    if len(header) < HEADER.size:
+        return None
+
+    frameType, length = HEADER.unpack(header)
+    if length > MAX_PAYLOAD:
+        raise ValueError(f'帧长度错误：{length}')
+    payload = stream.read(length)
+    if len(payload) < length:
+        return None
+    return frameType, payload
@@ -3,6 +3,7 @@ import json
 import subprocess
 
 from AppConfig.config import cfg
+from Connector.ShellLauncher import noWindowFlag
 from Logs.log_recorder import logging
 
 
@@ -19,7 +20,7 @@ class JarConnector:
         # 启动Java进程
         self.java_process = subprocess.Popen(
             [self.custom_java_path if cfg.get(cfg.useCustomJavaPath) else "java", '-jar', self.target],
-            creationflags=subprocess.CREATE_NO_WINDOW,  # 关键参数，不显示窗口
+            creationflags=noWindowFlag,  # 关键参数，不显示窗口（其他系统上为0）
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
             stderr=subprocess.PIPE,
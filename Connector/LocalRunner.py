@@ -0,0 +1,257 @@
+"""内置文件运行器模块"""
+import codecs
+import os
+import signal
+import socket
+import subprocess
+import threading
+from concurrent.futures import Future
+
+from Connector import FrameProtocol as Frame
+from Connector.ResourceMonitor import ProcessTreeSampler, sampleUntil
+from Connector.ShellLauncher import prepareLaunch, launcherFor, isWindows, noWindowFlag
+from Logs.log_recorder import logging
+
+
+class LocalRunner:
+    """
+    纯Python实现的文件运行器，与Java后端的fileRunner行为一致，可作为参考实现
+
+    * 在本机回环地址上监听，应答[True, 端口]后等待主进程连接，连接后再启动进程
+    * 进程的标准输出和标准错误按检测到的编码转换为UTF-8，按帧协议分别转发，每秒发送一次心跳，进程退出后发送退出代码
+    * 接收主进程发送的输入内容和结束进程的控制消息，结束进程时一并结束其子进程
+    * 按设置的间隔采样进程树的CPU时间、内存占用、读写字节数和线程数，以资源帧发送
+    * 输出经过与Java后端相同的套接字、解帧和渲染流程，没有Java和cmd的环境（如Linux）也能运行和压测整个运行流程
+    * run()不经过套接字，直接在调用线程中运行文件至结束，供命令行使用
+    * 本模块不依赖PyQt
+    """
+
+    acceptTimeout = 10.0  # 等待主进程连接的超时时间（秒）
+    pumpBufferSize = 8192  # 每次读取进程输出的最大字节数
+    pumpJoinTimeout = 1.0  # 进程退出后等待剩余输出的时间（秒）
+
+    def __init__(self):
+        self.processes = set()  # 正在运行的进程
+        self.lock = threading.Lock()
+
+    def submit(self, filePath: str, sampleInterval: float = 0) -> Future:
+        """
+        开始监听并在后台等待连接，与BackendDaemon.submit('fileRunner', [filePath])的应答格式相同
+        :param filePath: 待运行的文件路径
+        :param sampleInterval: 资源占用的采样间隔（秒），为0时不采样
+        :return: 已完成的Future，结果为[True, 端口]，无法监听时为[False]
+        """
+        future = Future()
+        try:
+            server = socket.create_server(('127.0.0.1', 0), backlog=1)
+            server.settimeout(self.acceptTimeout)  # 主进程未能连接时不会永久阻塞
+        except OSError as e:
+            logging.error(f'内置文件运行器无法监听端口：{e}')
+            future.set_result([False])
+            return future
+
+        threading.Thread(target=self.__serve, args=(filePath, server, sampleInterval), daemon=True, name='LocalRunner').start()
+        future.set_result([True, server.getsockname()[1]])
+        return future
+
+    def startProcess(self, filePath: str, interactive: bool = False) -> tuple:
+        """
+        按文件类型启动进程运行文件（工作目录为文件所在目录）
+        :param filePath: 待运行的文件路径
+        :param interactive: 为真时进程继承当前的标准输入并留在当前进程组（终端的Ctrl+C同样发给进程），
+                            否则标准输入为管道，进程以新的会话启动
+        :return: (进程, 命令行和输出编码)
+        :raises OSError: 进程启动失败
+        """
+        launch = prepareLaunch(filePath)
+        process = subprocess.Popen(
+            launch.args,
+            cwd=os.path.dirname(os.path.abspath(filePath)),  # 设置工作目录
+            stdin=None if interactive else subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            creationflags=noWindowFlag,
+            start_new_session=not isWindows and not interactive  # 便于结束进程时一并结束子进程
+        )
+        logging.info(f'内置文件运行器已启动进程，PID：{process.pid}，命令行：{launch.args}，输出编码：{launch.encoding}')
+        with self.lock:
+            self.processes.add(process)
+        return process, launch
+
+    def run(self, filePath: str, emit) -> int:
+        """
+        运行文件直至进程退出（阻塞），输出不经过套接字，直接交给emit
+        :param filePath: 待运行的文件路径
+        :param emit: 接收输出的函数emit(帧类型, UTF-8字节)，在转发线程中调用，帧类型为STDOUT或STDERR
+        :return: 退出代码
+        :raises OSError: 进程启动失败
+        """
+        process, launch = self.startProcess(filePath, interactive=True)
+        try:
+            pumps = [
+                threading.Thread(target=self.pumpOutput, args=(process.stdout, launch.encoding,
+                                                               lambda data: emit(Frame.STDOUT, data)), daemon=True),
+                threading.Thread(target=self.pumpOutput, args=(process.stderr, launch.encoding,
+                                                               lambda data: emit(Frame.STDERR, data)), daemon=True),
+            ]
+            for pump in pumps:
+                pump.start()
+            exitCode = process.wait()
+            for pump in pumps:
+                pump.join(self.pumpJoinTimeout)
+            return exitCode
+        finally:
+            if process.poll() is None:  # 等待期间被中断（如Ctrl+C）
+                self.killProcess(process)
+            with self.lock:
+                self.processes.discard(process)
+
+    def shutdown(self):
+        """结束全部正在运行的进程"""
+        with self.lock:
+            processes = list(self.processes)
+        for process in processes:
+            self.killProcess(process)
+
+    @staticmethod
+    def killProcess(process: subprocess.Popen):
+        """
+        强制结束文件运行进程及其启动的子进程
+        :param process: 需要结束的进程
+        """
+        if process.poll() is not None:
+            return
+        try:
+            if isWindows:
+                subprocess.run(['taskkill', '/F', '/T', '/PID', str(process.pid)], creationflags=noWindowFlag,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            elif os.getpgid(process.pid) == process.pid:
+                os.killpg(process.pid, signal.SIGKILL)  # 进程以新的会话启动，进程组ID即其PID
+        except OSError:
+            pass
+        if process.poll() is None:
+            process.kill()
+
+    def __serve(self, filePath: str, server: socket.socket, sampleInterval: float):
+        """后台线程：等待连接，运行文件直至进程退出"""
+        try:
+            with server:
+                conn, _ = server.accept()
+        except OSError:  # 等待连接超时
+            logging.warning(f'内置文件运行器等待连接超时：{filePath}')
+            return
+
+        with conn:
+            sendLock = threading.Lock()
+
+            def send(frameType: int, payload: bytes = b'') -> bool:
+                """发送一帧，多个线程可同时调用，连接已断开时返回False"""
+                try:
+                    with sendLock:
+                        conn.sendall(Frame.encodeFrame(frameType, payload))
+                    return True
+                except OSError:
+                    return False
+
+            try:
+                process, launch = self.startProcess(filePath)
+            except OSError as e:
+                launcher = launcherFor(filePath)
+                logging.error(f'内置文件运行器无法启动{launcher.name}：{e}')
+                send(Frame.CONTROL, f'无法启动{launcher.name}：{e}'.encode('utf-8'))
+                return
+
+            # 标准输出和标准错误分别转发
+            pumps = [
+                threading.Thread(target=self.__pump, args=(process.stdout, Frame.STDOUT, launch.encoding, send),
+                                 daemon=True),
+                threading.Thread(target=self.__pump, args=(process.stderr, Frame.STDERR, launch.encoding, send),
+                                 daemon=True),
+            ]
+            for pump in pumps:
+                pump.start()
+
+            # 按间隔采样进程树的资源占用
+            stopSampling = threading.Event()
+            sampler = None
+            if sampleInterval > 0 and ProcessTreeSampler.available:
+                sampler = threading.Thread(target=sampleUntil, daemon=True,
+                                           args=(process.pid, sampleInterval, stopSampling,
+                                                 lambda payload: send(Frame.RESOURCE, payload)))
+                sampler.start()
+
+            # 从主进程读取输入内容并写入进程
+            threading.Thread(target=self.__receiveCommands, args=(conn, process, launch.encoding, send),
+                             daemon=True).start()
+
+            # 等待进程退出，期间定期发送心跳
+            while True:
+                try:
+                    exitCode = process.wait(Frame.HEARTBEAT_INTERVAL)
+                    break
+                except subprocess.TimeoutExpired:
+                    send(Frame.HEARTBEAT)
+
+            with self.lock:
+                self.processes.discard(process)
+            stopSampling.set()
+
+            # 等待剩余的输出发送完毕（子进程可能仍持有输出管道，因此限制等待时间）
+            for pump in pumps:
+                pump.join(self.pumpJoinTimeout)
+            if sampler is not None:
+                sampler.join(self.pumpJoinTimeout)  # 资源帧不会在退出帧之后发送
+            send(Frame.EXIT, Frame.EXIT_CODE.pack(exitCode))
+
+            # 命令线程持有的文件对象会使close()不关闭连接，因此先shutdown()，同时结束命令线程的读取
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def __pump(self, stream, frameType: int, encoding: str, send):
+        """转发线程：按帧发送进程输出，连接断开后继续读取，避免进程因管道写满而阻塞"""
+        try:
+            self.pumpOutput(stream, encoding, lambda data: send(frameType, data))
+        except (OSError, ValueError) as e:  # 读出内容时的异常处理
+            send(Frame.CONTROL, f'读取输出失败：{e}'.encode('utf-8'))
+
+    def pumpOutput(self, stream, encoding: str, emit):
+        """
+        读取进程的一个输出流直至结束：每次读取当前可用的全部内容并立即交出，不等待换行
+        UTF-8的输出原样交出，其他编码转换为UTF-8，多字节字符不会在两块之间被拆开
+        :param stream: 进程的标准输出或标准错误
+        :param encoding: 进程输出使用的编码
+        :param emit: 接收UTF-8字节的函数
+        :raises OSError: 读取失败
+        """
+        decoder = None if encoding == 'utf-8' else codecs.getincrementaldecoder(encoding)(errors='replace')
+        with stream:
+            while data := stream.read1(self.pumpBufferSize):
+                if decoder is not None:
+                    data = decoder.decode(data).encode('utf-8')
+                if data:
+                    emit(data)
+            if decoder is not None and (rest := decoder.decode(b'', final=True)):
+                emit(rest.encode('utf-8'))
+
+    def __receiveCommands(self, conn: socket.socket, process: subprocess.Popen, encoding: str, send):
+        """命令线程：输入内容按进程的编码写入进程，控制消息"kill"结束进程"""
+        try:
+            with conn.makefile('rb') as reader, process.stdin:
+                while (frame := Frame.readFrame(reader)) is not None:
+                    frameType, payload = frame
+                    if frameType == Frame.STDIN:
+                        if encoding != 'utf-8':
+                            payload = payload.decode('utf-8', errors='replace').encode(encoding, errors='replace')
+                        process.stdin.write(payload)
+                        process.stdin.flush()
+                    elif frameType == Frame.CONTROL and payload == Frame.KILL:
+                        self.killProcess(process)
+                        break
+        except (OSError, ValueError) as e:  # 写入命令时的异常处理
+            if process.poll() is None:
+                send(Frame.CONTROL, f'写入命令失败：{e}'.encode('utf-8'))
+
+
+localRunner = LocalRunner()
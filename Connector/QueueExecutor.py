@@ -0,0 +1,165 @@
+"""队列预设执行模块"""
+import os
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from Connector.QueuePlan import QueueMode, StepState, QueueSchedule, stateTexts, normalizeQueueData, dependencyGraph
+from Connector.RunManager import RunManager, Run, RunState
+from Logs.log_recorder import logging
+
+
+class QueueExecutor(QObject):
+    """
+    队列预设执行器
+
+    * 步骤的开始顺序由QueueSchedule决定（与命令行模式相同），可以开始的步骤提交给运行管理器
+      （运行管理器的全局上限同样有效）
+    * 步骤以退出代码判断成败，开启“失败时停止”后，任一步骤失败即不再开始新的步骤，已在运行的步骤继续运行至结束；
+      未开启时跳过失败步骤的后续步骤，其他步骤照常执行
+    * 记录每个步骤的等待时间和运行时间
+
+    构造方法参数
+    ------------
+    * runManager: 运行管理器
+    * queueData: 整理后的队列预设数据
+    * title: 队列名称（用于标签页标题和日志）
+    * parent: 父对象
+    * scheduled: 是否由运行计划触发（各步骤的运行按计划运行处理）
+    """
+
+    stepStarted = pyqtSignal(int)  # 步骤开始运行（步骤下标）
+    stepFinished = pyqtSignal(int)  # 步骤结束
+    finished = pyqtSignal(bool)  # 队列结束（是否全部成功）
+
+    def __init__(self, runManager: RunManager, queueData: dict, title: str, parent=None, scheduled: bool = False):
+        super().__init__(parent)
+        self.runManager = runManager
+        self.title = title
+        self.scheduled = scheduled
+        self.plan = QueueSchedule(queueData)  # 步骤的调度状态
+        self.steps = self.plan.steps
+        self.states = self.plan.states
+        self.runs = [None] * len(self.steps)  # 每个步骤对应的Run
+        self.done = False
+        self.startTime = None
+        self.endTime = None
+
+        self.runManager.runStarted.connect(self.__onRunStarted)
+        self.runManager.runFinished.connect(self.__onRunFinished)
+
+    def start(self):
+        """开始执行队列"""
+        logging.info(f'开始执行队列“{self.title}”，共{len(self.steps)}个步骤')
+        self.startTime = time.time()
+        self.__launch()
+
+    def cancel(self):
+        """取消队列：跳过未开始的步骤并结束正在运行的步骤"""
+        logging.info(f'取消执行队列“{self.title}”')
+        self.plan.stop()
+        for run in self.runs:
+            if run is not None and run.isActive():
+                self.runManager.kill(run)
+
+    def isRunning(self) -> bool:
+        """队列是否正在执行"""
+        return self.startTime is not None and not self.done
+
+    def succeeded(self) -> bool:
+        """是否全部步骤都已成功"""
+        return self.plan.succeeded()
+
+    def failedStep(self) -> int:
+        """第一个失败的步骤下标，没有失败时为-1"""
+        return self.plan.failedStep()
+
+    def stepTimes(self, index: int) -> tuple:
+        """
+        获取步骤的耗时
+        :param index: 步骤下标
+        :return: (等待时间, 运行时间)，单位为秒，未开始的部分为None
+        """
+        run = self.runs[index]
+        if run is None or run.startTime is None:
+            return None, None
+        end = run.endTime if run.endTime is not None else time.time()
+        return run.startTime - run.submitTime, end - run.startTime
+
+    def elapsed(self) -> float:
+        """队列总耗时（秒）"""
+        if self.startTime is None:
+            return 0.0
+        return (self.endTime if self.endTime is not None else time.time()) - self.startTime
+
+    def summary(self) -> str:
+        """各步骤的执行结果和耗时"""
+        lines = [f'队列“{self.title}”用时{self.elapsed():.2f}s']
+        for i, step in enumerate(self.steps):
+            line = f'{i + 1}. {os.path.basename(step["path"])}：{stateTexts[self.states[i]]}'
+            run = self.runs[i]
+            if run is not None and run.exitCode is not None:
+                line += f'（退出代码{run.exitCode}）'
+            wait, duration = self.stepTimes(i)
+            if duration is not None:
+                line += f'，等待{wait:.2f}s，运行{duration:.2f}s'
+            lines.append(line)
+        return '\n'.join(lines)
+
+    def __launch(self):
+        """在名额允许的范围内提交前置步骤已结束的步骤"""
+        while (index := self.plan.nextStep()) is not None:
+            path = self.steps[index]['path']
+            if not os.path.isfile(path):
+                logging.error(f'队列“{self.title}”第{index + 1}步的文件不存在：{path}')
+                self.__finishStep(index, False)  # 在循环中继续取出后续步骤，不递归调用__launch()
+                continue
+
+            # 运行启动失败时runFinished会在submit返回前发出，步骤已由nextStep()计入运行数，并通过tag识别步骤
+            self.runs[index] = self.runManager.submit(
+                path, f'{self.title} #{index + 1}：{os.path.basename(path)}', (self, index), self.scheduled)
+
+        self.__checkFinished()
+
+    def __complete(self, index: int, success: bool):
+        """步骤结束并开始后续步骤"""
+        self.__finishStep(index, success)
+        self.__launch()
+
+    def __finishStep(self, index: int, success: bool):
+        """记录步骤的结果"""
+        self.plan.complete(index, success)
+        self.stepFinished.emit(index)
+        if not success and self.plan.stopOnFailure:
+            logging.warning(f'队列“{self.title}”第{index + 1}步失败，停止执行')
+
+    def __checkFinished(self):
+        """没有正在运行和可以开始的步骤时结束队列"""
+        if self.done or not self.plan.isFinished():
+            return
+
+        self.done = True
+        self.endTime = time.time()
+        self.runManager.runStarted.disconnect(self.__onRunStarted)
+        self.runManager.runFinished.disconnect(self.__onRunFinished)
+        logging.info(self.summary())
+        self.finished.emit(self.succeeded())
+
+    def __stepIndex(self, run: Run) -> int:
+        """获取本队列提交的运行对应的步骤下标，不是本队列的运行时返回-1"""
+        if isinstance(run.tag, tuple) and run.tag[0] is self:
+            return run.tag[1]
+        return -1
+
+    def __onRunStarted(self, run: Run):
+        index = self.__stepIndex(run)
+        if index >= 0:
+            self.stepStarted.emit(index)
+
+    def __onRunFinished(self, run: Run):
+        index = self.__stepIndex(run)
+        if index < 0:
+            return
+
+        self.runs[index] = run
+        self.__complete(index, run.state == RunState.FINISHED and run.exitCode == 0)
@@ -0,0 +1,197 @@
+"""队列预设数据模块（不依赖PyQt，图形界面和命令行共用）"""
+from collections import deque
+from enum import Enum
+
+
+class QueueMode(Enum):
+    """队列执行方式"""
+    SEQUENTIAL = 'sequential'  # 顺序执行：上一个文件运行结束后再运行下一个
+    PARALLEL = 'parallel'  # 并行执行：同时运行多个文件，数量不超过上限
+    DAG = 'dag'  # 按依赖执行：文件在其前置步骤全部结束后运行
+
+
+class StepState:
+    """队列步骤状态"""
+    WAITING = 'waiting'  # 等待前置步骤或运行名额
+    RUNNING = 'running'  # 已提交运行
+    SUCCEEDED = 'succeeded'  # 退出代码为0
+    FAILED = 'failed'  # 退出代码不为0或未能运行
+    SKIPPED = 'skipped'  # 因失败停止或取消而未运行
+
+
+stateTexts = {
+    StepState.WAITING: '等待',
+    StepState.RUNNING: '运行中',
+    StepState.SUCCEEDED: '成功',
+    StepState.FAILED: '失败',
+    StepState.SKIPPED: '跳过',
+}
+
+
+def normalizeQueueData(data) -> dict:
+    """
+    将保存的队列预设数据整理为统一格式（旧版本只保存文件路径列表，按顺序执行）
+    :param data: 队列预设数据
+    :return: {'mode': 执行方式, 'limit': 同时运行上限, 'stopOnFailure': 失败时是否停止,
+              'steps': [{'path': 文件路径, 'after': [前置步骤的下标...], 'fileId': 文件列表中的行ID（可选）}, ...]}
+    """
+    if isinstance(data, list):
+        data = {'steps': [{'path': path} for path in data]}
+
+    steps = []
+    for step in data.get('steps', []):
+        normalized = {'path': step['path'], 'after': [int(i) for i in step.get('after', [])]}
+        if step.get('fileId') is not None:
+            normalized['fileId'] = int(step['fileId'])
+        steps.append(normalized)
+
+    return {
+        'mode': QueueMode(data.get('mode', QueueMode.SEQUENTIAL.value)).value,
+        'limit': max(1, int(data.get('limit', 2))),
+        'stopOnFailure': bool(data.get('stopOnFailure', True)),
+        'steps': steps,
+    }
+
+
+def dependencyGraph(queueData: dict) -> list:
+    """
+    根据执行方式生成每个步骤的前置步骤
+    :param queueData: 整理后的队列预设数据
+    :return: 每个步骤的前置步骤下标列表
+    :raises ValueError: 前置步骤不存在或存在循环依赖
+    """
+    mode = QueueMode(queueData['mode'])
+    count = len(queueData['steps'])
+
+    if mode == QueueMode.SEQUENTIAL:
+        return [[i - 1] if i else [] for i in range(count)]
+    elif mode == QueueMode.PARALLEL:
+        return [[] for _ in range(count)]
+
+    deps = []
+    for i, step in enumerate(queueData['steps']):
+        after = sorted(set(step['after']))
+        for j in after:
+            if not 0 <= j < count or j == i:
+                raise ValueError(f'第{i + 1}步的前置步骤{j + 1}无效')
+        deps.append(after)
+
+    # 拓扑排序检查循环依赖
+    remaining = [len(after) for after in deps]
+    dependents = [[] for _ in range(count)]
+    for i, after in enumerate(deps):
+        for j in after:
+            dependents[j].append(i)
+    ready = deque(i for i in range(count) if not remaining[i])
+    visited = 0
+    while ready:
+        i = ready.popleft()
+        visited += 1
+        for k in dependents[i]:
+            remaining[k] -= 1
+            if not remaining[k]:
+                ready.append(k)
+    if visited < count:
+        raise ValueError('步骤之间存在循环依赖')
+
+    return deps
+
+
+class QueueSchedule:
+    """
+    队列步骤的调度状态（只决定步骤的开始顺序，不负责运行文件，由QueueExecutor和命令行模式共用）
+
+    * 步骤在前置步骤全部结束后才能开始，同时运行的步骤数不超过队列的上限（顺序执行时为1）
+    * 开启“失败时停止”后，任一步骤失败即不再开始新的步骤，等待中的步骤全部跳过；
+      未开启时，按依赖执行的队列跳过失败步骤直接或间接的后续步骤，其他分支继续执行，
+      顺序执行的队列中步骤之间只是先后关系，失败后照常运行下一步
+    * 调用者反复调用nextStep()取出可以开始的步骤并运行，步骤结束后调用complete()，isFinished()为真时队列结束
+
+    构造方法参数
+    ------------
+    * queueData: 整理后的队列预设数据
+
+    :raises ValueError: 前置步骤无效或存在循环依赖
+    """
+
+    def __init__(self, queueData: dict):
+        self.steps = queueData['steps']
+        self.stopOnFailure = queueData['stopOnFailure']
+        self.mode = QueueMode(queueData['mode'])
+        self.limit = 1 if self.mode == QueueMode.SEQUENTIAL else queueData['limit']
+
+        deps = dependencyGraph(queueData)
+        self.dependents = [[] for _ in self.steps]  # 每个步骤的后续步骤
+        for i, after in enumerate(deps):
+            for j in after:
+                self.dependents[j].append(i)
+        self.remainingDeps = [len(after) for after in deps]  # 每个步骤尚未结束的前置步骤数
+
+        self.states = [StepState.WAITING] * len(self.steps)
+        self.ready = deque(i for i, after in enumerate(deps) if not after)  # 前置步骤已全部结束的步骤
+        self.runningCount = 0
+        self.stopped = False  # 是否已停止开始新的步骤
+
+    def nextStep(self):
+        """
+        取出下一个可以开始的步骤并标记为运行中
+        :return: 步骤下标，没有可以开始的步骤或运行数已达上限时为None
+        """
+        if not self.ready or self.runningCount >= self.limit or self.stopped:
+            return None
+
+        index = self.ready.popleft()
+        self.states[index] = StepState.RUNNING
+        self.runningCount += 1
+        return index
+
+    def complete(self, index: int, success: bool):
+        """
+        步骤结束（包括文件不存在等未能运行的情况）
+        :param index: 步骤下标
+        :param success: 是否成功
+        """
+        if self.states[index] == StepState.RUNNING:
+            self.runningCount -= 1
+        self.states[index] = StepState.SUCCEEDED if success else StepState.FAILED
+
+        if not success:
+            if self.stopOnFailure:
+                self.stop()
+            elif self.mode == QueueMode.DAG:  # 只有明确设置的前置步骤才要求成功
+                self.__skipDependents(index)
+                return
+
+        for dependent in self.dependents[index]:
+            self.remainingDeps[dependent] -= 1
+            if not self.remainingDeps[dependent] and self.states[dependent] == StepState.WAITING:
+                self.ready.append(dependent)
+
+    def stop(self):
+        """不再开始新的步骤，等待中的步骤全部跳过"""
+        self.stopped = True
+        self.ready.clear()
+        for i, state in enumerate(self.states):
+            if state == StepState.WAITING:
+                self.states[i] = StepState.SKIPPED
+
+    def __skipDependents(self, index: int):
+        """跳过步骤直接或间接的后续步骤"""
+        pending = list(self.dependents[index])
+        while pending:
+            dependent = pending.pop()
+            if self.states[dependent] == StepState.WAITING:
+                self.states[dependent] = StepState.SKIPPED
+                pending.extend(self.dependents[dependent])
+
+    def isFinished(self) -> bool:
+        """没有正在运行和可以开始的步骤"""
+        return not self.runningCount and (self.stopped or not self.ready)
+
+    def succeeded(self) -> bool:
+        """是否全部步骤都已成功"""
+        return all(state == StepState.SUCCEEDED for state in self.states)
+
+    def failedStep(self) -> int:
+        """第一个失败的步骤下标，没有失败时为-1"""
+        return next((i for i, state in enumerate(self.states) if state == StepState.FAILED), -1)
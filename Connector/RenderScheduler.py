@@ -0,0 +1,131 @@
+"""控制台输出的自适应刷新调度模块"""
+import time
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+
+class RenderScheduler(QObject):
+    """
+    控制台输出的自适应刷新调度器
+
+    * 输出量小、频率低时收到数据立即刷新，没有固定定时器带来的延迟
+    * 两次刷新间隔小于一帧时不立即刷新，而是合并到下一帧；若渲染耗时超过一帧，则按渲染耗时拉长帧间隔
+    * 每帧最多渲染maxChars个字符，剩余内容留到之后的帧，避免一次渲染大量文本导致界面卡顿
+    * 没有待显示的内容时停止定时器，空闲时不再周期性唤醒
+
+    notify()可在任意线程中调用，实际的刷新总在调度器所在的GUI线程中进行。
+
+    构造方法参数
+    ------------
+    * take: 取出待显示文本的函数 take(最大字符数) -> str
+    * render: 渲染文本的函数 render(文本)
+    * frameInterval: 最短帧间隔（毫秒）
+    * maxInterval: 最长帧间隔（毫秒）
+    * maxChars: 每帧最多渲染的字符数
+    * parent: 父对象
+    """
+
+    dataAvailable = pyqtSignal()  # 有新的数据（内部使用，把其他线程的通知转交给GUI线程）
+
+    def __init__(self, take, render, frameInterval: int = 16, maxInterval: int = 250, maxChars: int = 256 * 1024,
+                 parent=None):
+        super().__init__(parent)
+        self.take = take
+        self.render = render
+        self.frameInterval = frameInterval
+        self.maxInterval = maxInterval
+        self.maxChars = maxChars
+        self.interval = frameInterval  # 当前的帧间隔（毫秒）
+
+        self.lastFlush = 0.0  # 上一次刷新结束的时间
+        self.deadline = None  # 已计划的下一帧的时间
+        self.notifyPending = False  # 是否已有尚未处理的通知，避免每次接收都向事件队列投递信号
+
+        # 统计计数
+        self.frames = 0  # 刷新次数
+        self.immediateFrames = 0  # 收到数据后立即刷新的次数
+        self.coalescedFrames = 0  # 合并到已计划的帧中的通知次数
+        self.droppedFrames = 0  # 因渲染耗时过长而错过的帧数
+        self.deferredFrames = 0  # 因超过每帧字符数上限而顺延剩余内容的次数
+        self.renderedChars = 0  # 已渲染的字符数
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.flush)
+        self.dataAvailable.connect(self.__onDataAvailable)
+
+    def notify(self):
+        """通知有新的数据（线程安全）"""
+        if self.notifyPending:
+            self.coalescedFrames += 1
+            return
+        self.notifyPending = True
+        self.dataAvailable.emit()
+
+    def flush(self):
+        """立即渲染一帧"""
+        self.timer.stop()
+        self.notifyPending = False
+
+        start = time.monotonic()
+        if self.deadline is not None:  # 事件循环繁忙导致定时器延迟触发，期间错过的帧计为丢帧
+            late = (start - self.deadline) * 1000
+            if late > self.frameInterval:
+                self.droppedFrames += int(late // self.frameInterval)
+            self.deadline = None
+
+        text = self.take(self.maxChars)
+        if text:
+            self.render(text)
+            self.frames += 1
+            self.renderedChars += len(text)
+
+        end = time.monotonic()
+        self.lastFlush = end
+
+        # 渲染越慢，帧间隔越长，给事件循环留出处理用户操作的时间
+        cost = (end - start) * 1000
+        self.interval = int(min(self.maxInterval, max(self.frameInterval, cost * 2)))
+
+        if len(text) >= self.maxChars:  # 还有剩余内容，在下一帧继续
+            self.deferredFrames += 1
+            self.__schedule(self.interval)
+
+    def stats(self) -> dict:
+        """获取统计计数"""
+        return {
+            'frames': self.frames,
+            'immediateFrames': self.immediateFrames,
+            'coalescedFrames': self.coalescedFrames,
+            'droppedFrames': self.droppedFrames,
+            'deferredFrames': self.deferredFrames,
+            'renderedChars': self.renderedChars,
+            'interval': self.interval,
+        }
+
+    def resetStats(self):
+        """清空统计计数"""
+        self.frames = self.immediateFrames = self.coalescedFrames = 0
+        self.droppedFrames = self.deferredFrames = self.renderedChars = 0
+        self.interval = self.frameInterval
+        self.lastFlush = 0.0
+        self.deadline = None
+
+    def __onDataAvailable(self):
+        """在GUI线程中处理新数据的通知"""
+        if self.timer.isActive():
+            self.coalescedFrames += 1
+            return
+
+        elapsed = (time.monotonic() - self.lastFlush) * 1000
+        if elapsed >= self.interval:  # 距上一帧已足够久，立即刷新
+            self.immediateFrames += 1
+            self.flush()
+        else:  # 合并到下一帧
+            self.__schedule(self.interval - elapsed)
+
+    def __schedule(self, delay: float):
+        """计划在delay毫秒后刷新"""
+        delay = max(0, int(delay))
+        self.deadline = time.monotonic() + delay / 1000
+        self.timer.start(delay)
@@ -0,0 +1,341 @@
+"""
+进程资源占用的采样与统计模块（不依赖PyQt）
+
+文件运行器按固定间隔采样运行文件的进程树，每次采样编码为一个资源帧，与输出一起发送给主进程；
+主进程把收到的采样保存为有长度上限的时间序列，并统计整次运行的峰值和平均值。
+"""
+import os
+import sys
+import threading
+import time
+from collections import deque, namedtuple
+
+from Connector import FrameProtocol as Frame
+
+try:
+    import psutil
+except ImportError:  # 未安装psutil时在Linux上直接读取/proc，其他系统不采样
+    psutil = None
+
+isLinux = sys.platform.startswith('linux')
+minSampleInterval = 0.1  # 最短采样间隔（秒）
+
+
+def formatBytes(size: int) -> str:
+    """将字节数格式化为便于阅读的大小"""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f'{size:.0f}{unit}' if unit == 'B' else f'{size:.1f}{unit}'
+        size /= 1024
+    return f'{size:.1f}GB'
+
+
+class ResourceSample(namedtuple('ResourceSample',
+                                ('elapsed', 'cpuTime', 'rss', 'readBytes', 'writeBytes', 'threads', 'processes'))):
+    """
+    一次采样：运行时长和累计CPU时间（秒），内存占用（字节），累计读取和写入的字节数，线程数和进程数
+
+    无法获取的项为None（如Java后端在Windows上无法获取内存占用）
+    """
+
+    __slots__ = ()
+
+    def encode(self) -> bytes:
+        """编码为资源帧的负载"""
+        values = [round(self.elapsed * 1000), -1 if self.cpuTime is None else round(self.cpuTime * 1000)]
+        values += [-1 if value is None else value
+                   for value in (self.rss, self.readBytes, self.writeBytes, self.threads, self.processes)]
+        return Frame.RESOURCE_SAMPLE.pack(*values)
+
+    @classmethod
+    def decode(cls, payload) -> 'ResourceSample':
+        """
+        解码资源帧的负载
+        :raises struct.error: 负载长度错误
+        """
+        elapsed, cpuTime, *rest = Frame.RESOURCE_SAMPLE.unpack(payload)
+        return cls(elapsed / 1000, None if cpuTime < 0 else cpuTime / 1000,
+                   *(None if value < 0 else value for value in rest))
+
+
+class ProcessTreeSampler:
+    """
+    采样一个进程及其全部子孙进程的资源占用
+
+    * 每次采样按父进程ID找出当前的进程树，内存占用、线程数和进程数为当前值，CPU时间和读写字节数为累计值
+    * 已退出的子孙进程最后一次采样到的CPU时间和读写字节数计入累计值，累计值不会因子进程退出而减少；
+      Linux上子进程被回收后其CPU时间计入父进程的children_user/children_system，父进程仍在进程树中时不再重复计入
+    * 进程以(PID, 启动时间)区分，PID被重新分配给其他进程时不会混淆；已退出但尚未被回收的僵尸进程视为已退出
+    * 优先使用psutil，未安装时在Linux上读取/proc，都不可用时available为False
+    * Linux以外的系统无法统计两次采样之间启动并退出的短时进程
+
+    构造方法参数
+    ------------
+    * pid: 进程树的根进程
+    """
+
+    available = psutil is not None or isLinux
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.startTime = time.monotonic()
+        self.last = {}  # 上一次采样的进程 {(PID, 启动时间): (父进程PID, CPU时间, 读取字节数, 写入字节数)}
+        self.exitedCpuTime = 0.0  # 已退出进程的CPU时间
+        self.exitedReadBytes = 0
+        self.exitedWriteBytes = 0
+        self.cpuTime = 0.0  # 已交出的累计CPU时间
+
+        if psutil is None:
+            self.clockTicks = os.sysconf('SC_CLK_TCK')
+            self.pageSize = os.sysconf('SC_PAGE_SIZE')
+
+    def sample(self):
+        """
+        采样一次
+        :return: ResourceSample，根进程已退出时返回None
+        """
+        processes = self.__psutilProcesses() if psutil is not None else self.__procProcesses()
+        if processes is None:
+            return None
+
+        # 已退出的进程计入累计值
+        livePids = {pid for pid, _ in processes}
+        for key, (ppid, cpuTime, readBytes, writeBytes) in self.last.items():
+            if key in processes:
+                continue
+            if not (isLinux and ppid in livePids):
+                self.exitedCpuTime += cpuTime
+            self.exitedReadBytes += readBytes or 0
+            self.exitedWriteBytes += writeBytes or 0
+        self.last = {key: (values[0], values[1], values[3], values[4]) for key, values in processes.items()}
+
+        values = processes.values()
+        self.cpuTime = max(self.cpuTime, self.exitedCpuTime + sum(value[1] for value in values))
+        ioKnown = any(value[3] is not None for value in values)
+        return ResourceSample(
+            elapsed=time.monotonic() - self.startTime,
+            cpuTime=self.cpuTime,
+            rss=sum(value[2] for value in values),
+            readBytes=self.exitedReadBytes + sum(value[3] or 0 for value in values) if ioKnown else None,
+            writeBytes=self.exitedWriteBytes + sum(value[4] or 0 for value in values) if ioKnown else None,
+            threads=sum(value[5] for value in values),
+            processes=len(processes),
+        )
+
+    def __psutilProcesses(self):
+        """
+        使用psutil获取进程树
+        :return: {(PID, 启动时间): (父进程PID, CPU时间, 内存占用, 读取字节数, 写入字节数, 线程数)}，根进程已退出时返回None
+        """
+        try:
+            root = psutil.Process(self.pid)
+            tree = [root] + root.children(recursive=True)
+        except psutil.Error:
+            return None
+
+        processes = {}
+        for process in tree:
+            try:
+                with process.oneshot():
+                    if process.status() == psutil.STATUS_ZOMBIE:  # 已退出但尚未被回收
+                        if process is root:
+                            return None
+                        continue
+                    times = process.cpu_times()
+                    cpuTime = times.user + times.system
+                    if isLinux:
+                        cpuTime += times.children_user + times.children_system
+                    try:
+                        io = process.io_counters()
+                        readBytes, writeBytes = io.read_bytes, io.write_bytes
+                    except (psutil.AccessDenied, AttributeError):  # macOS没有io_counters()
+                        readBytes = writeBytes = None
+                    processes[(process.pid, process.create_time())] = (
+                        process.ppid(), cpuTime, process.memory_info().rss, readBytes, writeBytes,
+                        process.num_threads())
+            except psutil.Error:  # 采样期间退出的进程
+                continue
+        return processes if processes else None
+
+    def __procProcesses(self):
+        """读取/proc获取进程树，返回值与__psutilProcesses()相同"""
+        stats = {}  # PID -> /proc/<PID>/stat中进程名之后的字段
+        children = {}  # 父进程PID -> [子进程PID]
+        for name in os.listdir('/proc'):
+            if not name.isdigit():
+                continue
+            try:
+                with open(f'/proc/{name}/stat', 'rb') as f:
+                    fields = f.read().rsplit(b')', 1)[1].split()  # 进程名可能包含空格和括号
+            except (OSError, IndexError):
+                continue
+            pid = int(name)
+            stats[pid] = fields
+            children.setdefault(int(fields[1]), []).append(pid)
+        if self.pid not in stats or stats[self.pid][0] == b'Z':
+            return None
+
+        processes = {}
+        stack = [self.pid]
+        while stack:
+            pid = stack.pop()
+            stack.extend(children.get(pid, ()))
+            fields = stats[pid]
+            if fields[0] == b'Z':  # 已退出但尚未被回收
+                continue
+            # 字段（从第3个字段state开始计数）：ppid[1] utime[11] stime[12] cutime[13] cstime[14]
+            # num_threads[17] starttime[19] rss[21]
+            cpuTime = sum(int(fields[i]) for i in (11, 12, 13, 14)) / self.clockTicks
+            readBytes = writeBytes = None
+            try:
+                with open(f'/proc/{pid}/io', 'rb') as f:
+                    for line in f:
+                        key, _, value = line.partition(b':')
+                        if key == b'read_bytes':
+                            readBytes = int(value)
+                        elif key == b'write_bytes':
+                            writeBytes = int(value)
+            except (OSError, ValueError):  # 进程已退出或没有权限
+                pass
+            processes[(pid, int(fields[19]))] = (int(fields[1]), cpuTime, int(fields[21]) * self.pageSize,
+                                                 readBytes, writeBytes, int(fields[17]))
+        return processes
+
+
+def sampleUntil(pid: int, interval: float, stopEvent: threading.Event, emit):
+    """
+    按间隔采样进程树直至stopEvent被设置或根进程退出（阻塞，应在单独的线程中调用）
+    :param pid: 进程树的根进程
+    :param interval: 采样间隔（秒），小于minSampleInterval时按minSampleInterval计算
+    :param stopEvent: 停止采样的事件
+    :param emit: 接收资源帧负载的函数emit(负载) -> bool，返回False时停止采样（如连接已断开）
+    """
+    sampler = ProcessTreeSampler(pid)
+    interval = max(interval, minSampleInterval)
+    while not stopEvent.is_set():
+        sample = sampler.sample()
+        if sample is None or not emit(sample.encode()):
+            return
+        if stopEvent.wait(interval):
+            return
+
+
+class ResourceSeries:
+    """
+    一次运行的资源占用时间序列
+
+    * 只保留最近maxPoints个采样点，长时间运行时占用的内存也有上限；峰值和平均值在添加采样时累计，按整次运行计算
+    * CPU占用率由相邻两次采样的CPU时间差除以时间差得出，进程使用多个核心时可超过100%
+    * 接收线程添加采样，GUI线程读取，两者之间使用锁保护
+
+    构造方法参数
+    ------------
+    * maxPoints: 保留的采样点数
+    """
+
+    def __init__(self, maxPoints: int = 3600):
+        self.points = deque(maxlen=maxPoints)  # [(运行时长, CPU占用率, 内存占用)]，无法获取的项为None
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """清空全部采样"""
+        with self.lock:
+            self.points.clear()
+            self.version = 0  # 每添加一次采样加1，供界面判断是否需要重绘
+            self.latest = None  # 最近一次采样
+            self.peakCpu = None
+            self.peakRss = None
+            self.rssTotal = 0  # 内存占用之和（计算平均值）
+            self.rssCount = 0
+            self.peakThreads = None
+            self.peakProcesses = None
+
+    def add(self, sample: ResourceSample):
+        """
+        添加一次采样（线程安全）
+        :param sample: 采样
+        """
+        with self.lock:
+            cpu = None
+            previous = self.latest
+            if previous is not None and sample.cpuTime is not None and previous.cpuTime is not None \
+                    and sample.elapsed > previous.elapsed:
+                cpu = max(0.0, (sample.cpuTime - previous.cpuTime) / (sample.elapsed - previous.elapsed) * 100)
+                self.peakCpu = cpu if self.peakCpu is None else max(self.peakCpu, cpu)
+            if sample.rss is not None:
+                self.peakRss = sample.rss if self.peakRss is None else max(self.peakRss, sample.rss)
+                self.rssTotal += sample.rss
+                self.rssCount += 1
+            if sample.threads is not None:
+                self.peakThreads = sample.threads if self.peakThreads is None else max(self.peakThreads, sample.threads)
+            if sample.processes is not None:
+                self.peakProcesses = sample.processes if self.peakProcesses is None \
+                    else max(self.peakProcesses, sample.processes)
+
+            self.points.append((sample.elapsed, cpu, sample.rss))
+            self.latest = sample
+            self.version += 1
+
+    def snapshot(self) -> list:
+        """获取当前保留的采样点 [(运行时长, CPU占用率, 内存占用)]"""
+        with self.lock:
+            return list(self.points)
+
+    def summary(self):
+        """
+        整次运行的资源占用统计
+        :return: {'samples', 'duration', 'cpuTime', 'avgCpu', 'peakCpu', 'rss', 'avgRss', 'peakRss',
+                 'readBytes', 'writeBytes', 'threads', 'peakThreads', 'peakProcesses'}，
+                 无法获取的项为None，没有收到任何采样时返回None
+        """
+        with self.lock:
+            latest = self.latest
+            if latest is None:
+                return None
+            avgCpu = None
+            if latest.cpuTime is not None and latest.elapsed > 0:
+                avgCpu = latest.cpuTime / latest.elapsed * 100
+            return {
+                'samples': self.version,
+                'duration': latest.elapsed,
+                'cpuTime': latest.cpuTime,
+                'avgCpu': avgCpu,
+                'peakCpu': self.peakCpu,
+                'rss': latest.rss,
+                'avgRss': self.rssTotal // self.rssCount if self.rssCount else None,
+                'peakRss': self.peakRss,
+                'readBytes': latest.readBytes,
+                'writeBytes': latest.writeBytes,
+                'threads': latest.threads,
+                'peakThreads': self.peakThreads,
+                'peakProcesses': self.peakProcesses,
+            }
+
+
+def describeSummary(summary: dict) -> str:
+    """
+    资源占用统计的说明文本，无法获取的项不显示
+    :param summary: ResourceSeries.summary()的返回值
+    :return: 说明文本
+    """
+    parts = []
+    if summary['cpuTime'] is not None:
+        parts.append(f'CPU时间{summary["cpuTime"]:.2f}s')
+    if summary['avgCpu'] is not None:
+        parts.append(f'平均CPU {summary["avgCpu"]:.0f}%')
+    if summary['peakCpu'] is not None:
+        parts.append(f'峰值CPU {summary["peakCpu"]:.0f}%')
+    if summary['avgRss'] is not None:
+        parts.append(f'平均内存{formatBytes(summary["avgRss"])}')
+    if summary['peakRss'] is not None:
+        parts.append(f'峰值内存{formatBytes(summary["peakRss"])}')
+    if summary['readBytes'] is not None:
+        parts.append(f'读取{formatBytes(summary["readBytes"])}')
+    if summary['writeBytes'] is not None:
+        parts.append(f'写入{formatBytes(summary["writeBytes"])}')
+    if summary['peakThreads'] is not None:
+        parts.append(f'峰值线程数{summary["peakThreads"]}')
+    if summary['peakProcesses'] is not None:
+        parts.append(f'峰值进程数{summary["peakProcesses"]}')
+    return '，'.join(parts)
@@ -0,0 +1,259 @@
+"""文件并发运行管理模块"""
+import itertools
+import os
+import time
+from collections import deque
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from AppConfig.config import cfg
+from Connector.BackendCall import BackendCall
+from Connector.BackendDaemon import backendDaemon
+from Connector.LocalRunner import localRunner
+from Logs.log_recorder import logging
+
+
+class RunState:
+    """文件运行状态"""
+    QUEUED = 'queued'  # 等待空闲的运行名额
+    STARTING = 'starting'  # 已占用名额，等待Java后端应答
+    RUNNING = 'running'  # 正在运行
+    FINISHED = 'finished'  # 进程已退出
+    FAILED = 'failed'  # 启动失败
+    CANCELLED = 'cancelled'  # 排队时被取消
+
+
+class Run:
+    """一次文件运行"""
+
+    __slots__ = ('runId', 'filePath', 'title', 'tag', 'scheduled', 'state', 'port', 'client', 'exitCode', 'exitMessage',
+                 'submitTime', 'startTime', 'firstOutputTime', 'endTime', 'resources')
+
+    def __init__(self, runId: int, filePath: str, title: str = None, tag=None, scheduled: bool = False):
+        """
+        :param runId: 运行编号
+        :param filePath: 运行的文件路径
+        :param title: 显示的标题，为空则使用文件名
+        :param tag: 提交者附加的数据（如所属的队列和步骤），运行管理器不使用
+        :param scheduled: 是否由运行计划触发（结束后界面只保留有限数量的此类运行）
+        """
+        self.runId = runId
+        self.filePath = filePath
+        self.title = title if title else os.path.basename(filePath)
+        self.tag = tag
+        self.scheduled = scheduled
+        self.state = RunState.QUEUED
+        self.port = None  # Java文件运行进程监听的端口
+        self.client = None  # 连接至该进程控制台的SocketClient
+        self.exitCode = None  # 进程退出代码，进程未正常退出时为None
+        self.exitMessage = None  # 进程退出消息
+
+        # 时间戳（time.time()）
+        self.submitTime = time.time()
+        self.startTime = None
+        self.firstOutputTime = None  # 收到第一块输出的时间
+        self.endTime = None
+
+        self.resources = None  # 资源占用统计（ResourceSeries.summary()），没有采样时为None
+
+    def isActive(self) -> bool:
+        """是否占用运行名额（排队、启动中或正在运行）"""
+        return self.state in (RunState.QUEUED, RunState.STARTING, RunState.RUNNING)
+
+
+class RunManager(QObject):
+    """
+    文件并发运行管理器
+
+    * 每次运行使用独立的端口和SocketClient，互不干扰；端口由Java端在应答前绑定并随应答返回，
+      收到应答时对方已在监听，连接不会因端口冲突或时序问题失败
+    * 同时运行的文件数不超过配置的上限，超出的运行按提交顺序排队，有名额空出时自动开始
+    * 运行结束由SocketClient的runningChanged信号通知，该信号可能在接收线程中发出，
+      因此连接到本对象的方法，由Qt排队到GUI线程处理
+    * 文件由Java后端或内置运行器（LocalRunner）运行，两者的应答和帧协议相同
+    * 请求Java后端和连接控制台都不阻塞GUI线程：应答由BackendCall交付，连接在SocketClient的后台线程中进行
+
+    构造方法参数
+    ------------
+    * createClient: 为一次运行创建SocketClient的函数 createClient(Run) -> SocketClient
+    * parent: 父对象
+    """
+
+    runAdded = pyqtSignal(object)  # 提交了新的运行（Run）
+    runStarted = pyqtSignal(object)  # 运行开始
+    runFinished = pyqtSignal(object)  # 运行结束（包括启动失败和取消）
+    activeCountChanged = pyqtSignal(int)  # 正在运行的文件数改变
+
+    def __init__(self, createClient, parent=None):
+        super().__init__(parent)
+        self.createClient = createClient
+        self.runs = {}  # 运行编号 -> Run
+        self.pending = deque()  # 排队中的运行
+        self.active = {}  # 正在运行（包括启动中）的SocketClient -> Run
+        self.starting = {}  # 等待Java后端应答的Run -> BackendCall
+        self.__ids = itertools.count(1)
+
+        cfg.maxConcurrentRuns.valueChanged.connect(self.__schedule)  # 上限提高后立即开始排队中的运行
+
+    def maxConcurrent(self) -> int:
+        """同时运行的文件数上限"""
+        return cfg.get(cfg.maxConcurrentRuns)
+
+    def submit(self, filePath: str, title: str = None, tag=None, scheduled: bool = False) -> Run:
+        """
+        提交一次文件运行，有空闲名额时立即开始，否则排队
+        启动失败时runFinished信号可能在本方法返回前发出，需要识别自己提交的运行时请使用tag
+        :param filePath: 文件路径
+        :param title: 显示的标题
+        :param tag: 附加在Run对象上的数据
+        :param scheduled: 是否由运行计划触发
+        :return: 对应的Run对象
+        """
+        run = Run(next(self.__ids), filePath, title, tag, scheduled)
+        run.client = self.createClient(run)
+        run.client.runningChanged.connect(self.__onRunningChanged)
+        self.runs[run.runId] = run
+        self.pending.append(run)
+        logging.info(f'提交文件运行#{run.runId}：{filePath}')
+        self.runAdded.emit(run)
+
+        self.__schedule()
+        if run.state == RunState.QUEUED:
+            run.client.showMessage('【BFM】同时运行的文件数已达上限，等待其他文件运行结束……\n')
+        return run
+
+    def kill(self, run: Run):
+        """
+        结束一次运行，排队中的运行直接取消
+        :param run: 需要结束的运行
+        """
+        if run.state == RunState.QUEUED:
+            self.pending.remove(run)
+            run.state = RunState.CANCELLED
+            run.endTime = time.time()
+            logging.info(f'取消排队中的文件运行#{run.runId}')
+            self.runFinished.emit(run)
+        elif run.state == RunState.STARTING:
+            self.starting.pop(run).cancel()
+            self.active.pop(run.client, None)
+            run.state = RunState.CANCELLED
+            run.endTime = time.time()
+            run.client.showMessage('【BFM】已取消运行\n')
+            logging.info(f'取消启动中的文件运行#{run.runId}')
+            self.runFinished.emit(run)
+            self.activeCountChanged.emit(len(self.active))
+            self.__schedule()
+        elif run.state == RunState.RUNNING:
+            run.client.kill()
+
+    def killAll(self):
+        """取消所有排队中的运行并结束所有正在运行的文件"""
+        while self.pending:
+            self.kill(self.pending[0])
+        for run in list(self.active.values()):
+            self.kill(run)
+
+    def remove(self, run: Run) -> bool:
+        """
+        移除一次已结束的运行
+        :param run: 需要移除的运行
+        :return: 是否已移除（未结束的运行不能移除）
+        """
+        if run.isActive():
+            return False
+
+        self.runs.pop(run.runId, None)
+        run.client.deleteLater()
+        run.client = None
+        return True
+
+    def activeCount(self) -> int:
+        """正在运行的文件数"""
+        return len(self.active)
+
+    def hasActiveRuns(self) -> bool:
+        """是否有正在运行或排队中的文件"""
+        return bool(self.active or self.pending)
+
+    def __schedule(self, *args):
+        """在名额允许的范围内开始排队中的运行"""
+        while self.pending and len(self.active) < self.maxConcurrent():
+            self.__start(self.pending.popleft())
+
+    def __start(self, run: Run):
+        """
+        请求Java后端运行文件，应答到达后再连接至其控制台
+        :param run: 需要开始的运行
+        """
+        run.state = RunState.STARTING
+        self.active[run.client] = run
+        call = BackendCall(self.__requestRun(run.filePath), self)  # 应答为[是否成功, 监听的端口]
+        call.finished.connect(lambda ack: self.__onStartAcknowledged(run, ack))
+        self.starting[run] = call
+        self.activeCountChanged.emit(len(self.active))
+
+    @staticmethod
+    def __requestRun(filePath: str):
+        """
+        按设置交给Java后端或内置运行器运行文件
+        :param filePath: 文件路径
+        :return: 应答的Future
+        """
+        sampleInterval = cfg.get(cfg.resourceSampleInterval)  # 毫秒
+        if cfg.get(cfg.fileRunner) == 'python':
+            return localRunner.submit(filePath, sampleInterval / 1000)
+        return backendDaemon.submit('fileRunner', [filePath, 0, sampleInterval])  # 端口为0时由系统分配
+
+    def __onStartAcknowledged(self, run: Run, ack):
+        """
+        得到Java后端的应答
+        :param run: 启动中的运行
+        :param ack: 应答数据
+        """
+        if self.starting.pop(run, None) is None:  # 等待应答期间已被取消
+            return
+
+        if not ack or not ack[0] or len(ack) < 2:
+            self.active.pop(run.client, None)
+            run.state = RunState.FAILED
+            run.endTime = time.time()
+            if cfg.get(cfg.fileRunner) == 'python':
+                run.client.showMessage('【BFM】错误：内置运行器无法监听端口\n')
+                logging.error(f'文件运行#{run.runId}启动失败：内置运行器无法监听端口')
+            else:
+                run.client.showMessage('【BFM】错误：Java后端运行异常，请检查Java版本\n')
+                logging.error(f'文件运行#{run.runId}启动失败：Java后端运行异常')
+            self.runFinished.emit(run)
+            self.activeCountChanged.emit(len(self.active))
+            self.__schedule()
+            return
+
+        run.port = ack[1]
+        run.client.port = run.port
+        run.state = RunState.RUNNING
+        run.startTime = time.time()
+        run.client.setup_socket()  # 连接失败时由runningChanged信号通知
+        logging.info(f'文件运行#{run.runId}已开始，端口：{run.port}')
+        self.runStarted.emit(run)
+
+    def __onRunningChanged(self, running: bool):
+        """SocketClient运行状态改变（在GUI线程中处理）"""
+        if running:
+            return
+
+        run = self.active.pop(self.sender(), None)
+        if run is None:
+            return
+
+        run.endTime = time.time()
+        run.exitCode = run.client.receiver.exitCode
+        run.exitMessage = run.client.receiver.exitMessage
+        run.firstOutputTime = run.client.receiver.firstOutputTime
+        run.resources = run.client.receiver.resources.summary()
+        run.state = RunState.FINISHED if run.exitCode is not None else RunState.FAILED
+        logging.info(f'文件运行#{run.runId}已结束：{run.exitMessage}')
+        if run.firstOutputTime is not None:
+            logging.info(f'文件运行#{run.runId}首次输出用时：{(run.firstOutputTime - run.startTime) * 1000:.0f}ms')
+        self.runFinished.emit(run)
+        self.activeCountChanged.emit(len(self.active))
+        self.__schedule()
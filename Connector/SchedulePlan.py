@@ -0,0 +1,312 @@
+"""预设运行计划数据模块（不依赖PyQt，图形界面和命令行共用）"""
+import math
+import time
+import uuid
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+
+class TriggerType:
+    """触发方式"""
+    CRON = 'cron'  # 按cron表达式定时触发
+    INTERVAL = 'interval'  # 按固定间隔触发
+    FILE = 'file'  # 文件内容改变后触发
+    AFTER = 'after'  # 其他预设运行结束后触发
+
+
+class TriggerAction:
+    """触发后对预设执行的操作（只对开关预设有效，队列预设总是运行队列）"""
+    OPEN = 'open'  # 打开开关（运行开启文件）
+    CLOSE = 'close'  # 关闭开关（运行关闭文件）
+    TOGGLE = 'toggle'  # 切换开关状态
+
+
+class ChainCondition:
+    """前置预设的结束条件"""
+    ANY = 'any'  # 结束后（无论成败）
+    SUCCESS = 'success'  # 全部成功后
+    FAILURE = 'failure'  # 失败后
+
+
+timedTypes = (TriggerType.CRON, TriggerType.INTERVAL)  # 由定时器触发的方式
+
+actionTexts = {
+    TriggerAction.OPEN: '开启',
+    TriggerAction.CLOSE: '关闭',
+    TriggerAction.TOGGLE: '切换',
+}
+
+conditionTexts = {
+    ChainCondition.ANY: '结束后',
+    ChainCondition.SUCCESS: '成功后',
+    ChainCondition.FAILURE: '失败后',
+}
+
+_cronMacros = {
+    '@yearly': '0 0 1 1 *',
+    '@annually': '0 0 1 1 *',
+    '@monthly': '0 0 1 * *',
+    '@weekly': '0 0 * * 0',
+    '@daily': '0 0 * * *',
+    '@midnight': '0 0 * * *',
+    '@hourly': '0 * * * *',
+}
+_monthNames = {name: i + 1 for i, name in enumerate(
+    ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'))}
+_weekdayNames = {name: i for i, name in enumerate(('sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat'))}
+_cronSearchYears = 5  # 查找下次触发时间的最大范围（年），超出则认为表达式没有可触发的时间
+
+
+def newId() -> str:
+    """生成预设或触发的ID"""
+    return uuid.uuid4().hex[:8]
+
+
+class CronExpression:
+    """
+    cron表达式：分 时 日 月 周
+
+    * 每个字段支持*、数值、范围（1-5）、步长（*/15、8-18/2）和逗号分隔的列表，月和周可使用英文缩写（jan、mon）
+    * 周的0和7都表示星期日
+    * 日和周同时限定时满足其一即可（与常见的cron实现一致）
+    * 支持@yearly、@monthly、@weekly、@daily、@hourly等简写
+    * 时间按本地时间计算
+
+    构造方法参数
+    ------------
+    * text: cron表达式
+    """
+
+    __slots__ = ('text', 'minutes', 'hours', 'days', 'months', 'weekdays', 'dayRestricted', 'weekdayRestricted')
+
+    def __init__(self, text: str):
+        self.text = text.strip()
+        fields = _cronMacros.get(self.text.lower(), self.text).split()
+        if len(fields) != 5:
+            raise ValueError('cron表达式应包含5个字段：分 时 日 月 周')
+
+        self.minutes = self.__parseField(fields[0], 0, 59)
+        self.hours = self.__parseField(fields[1], 0, 23)
+        self.days = self.__parseField(fields[2], 1, 31)
+        self.months = self.__parseField(fields[3], 1, 12, _monthNames)
+        self.weekdays = frozenset(day % 7 for day in self.__parseField(fields[4], 0, 7, _weekdayNames))
+        self.dayRestricted = not fields[2].startswith('*')
+        self.weekdayRestricted = not fields[4].startswith('*')
+
+    def __str__(self):
+        return self.text
+
+    def matchesDay(self, day: datetime) -> bool:
+        """日期是否满足日和周字段"""
+        dayMatched = day.day in self.days
+        weekdayMatched = day.isoweekday() % 7 in self.weekdays
+        if self.dayRestricted and self.weekdayRestricted:
+            return dayMatched or weekdayMatched
+        return dayMatched and weekdayMatched
+
+    def next(self, after: float) -> float:
+        """
+        获取指定时间之后的第一个触发时间
+        :param after: 起始时间（time.time()）
+        :return: 触发时间（time.time()）
+        :raises ValueError: 表达式没有可触发的时间（如2月30日）
+        """
+        t = datetime.fromtimestamp(after).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t.year + _cronSearchYears
+        # 由大到小逐个字段跳过不满足的时间段
+        while t.year <= limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self.matchesDay(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t.timestamp()
+        raise ValueError(f'cron表达式“{self.text}”没有可运行的时间')
+
+    @staticmethod
+    def __parseField(text: str, low: int, high: int, names: dict = None) -> frozenset:
+        """
+        解析一个字段
+        :return: 字段允许的值
+        :raises ValueError: 字段格式错误或超出范围
+        """
+
+        def value(part: str) -> int:
+            if names and part.lower() in names:
+                return names[part.lower()]
+            return int(part)
+
+        values = set()
+        try:
+            for part in text.split(','):
+                step = 1
+                if '/' in part:
+                    part, stepText = part.split('/', 1)
+                    step = int(stepText)
+                if part == '*':
+                    start, end = low, high
+                elif '-' in part:
+                    startText, endText = part.split('-', 1)
+                    start, end = value(startText), value(endText)
+                else:
+                    start = value(part)
+                    end = high if step > 1 else start  # “5/15”表示从5开始每隔15
+                if step < 1 or not low <= start <= end <= high:
+                    raise ValueError
+                values.update(range(start, end + 1, step))
+        except ValueError:
+            raise ValueError(f'cron表达式的字段“{text}”无效，取值范围为{low}-{high}') from None
+        return frozenset(values)
+
+
+@lru_cache(maxsize=256)
+def parseCron(text: str) -> CronExpression:
+    """解析cron表达式（缓存解析结果）"""
+    return CronExpression(text)
+
+
+def normalizeTrigger(trigger: dict) -> dict:
+    """
+    检查并整理一个触发
+    :param trigger: 触发数据
+    :return: {'id': 触发ID, 'type': 触发方式, 'action': 开关预设的操作, 及各触发方式的参数}
+             cron: 'expr'；interval: 'seconds'；file: 'path'；after: 'preset'（前置预设ID）和'on'（结束条件）
+    :raises ValueError: 触发数据无效
+    """
+    triggerType = trigger.get('type')
+    action = trigger.get('action', TriggerAction.OPEN)
+    if action not in actionTexts:
+        raise ValueError(f'无效的操作：{action}')
+
+    normalized = {'id': str(trigger.get('id') or newId()), 'type': triggerType, 'action': action}
+    if triggerType == TriggerType.CRON:
+        normalized['expr'] = str(parseCron(str(trigger.get('expr', ''))))
+    elif triggerType == TriggerType.INTERVAL:
+        seconds = int(trigger.get('seconds', 0))
+        if seconds < 1:
+            raise ValueError('触发间隔应至少为1秒')
+        normalized['seconds'] = seconds
+    elif triggerType == TriggerType.FILE:
+        if not trigger.get('path'):
+            raise ValueError('请指定需要监视的文件')
+        normalized['path'] = str(trigger['path'])
+    elif triggerType == TriggerType.AFTER:
+        on = trigger.get('on', ChainCondition.ANY)
+        if not trigger.get('preset') or on not in conditionTexts:
+            raise ValueError('请指定前置预设和结束条件')
+        normalized['preset'] = str(trigger['preset'])
+        normalized['on'] = on
+    else:
+        raise ValueError(f'无效的触发方式：{triggerType}')
+    return normalized
+
+
+def normalizeSchedule(data) -> dict:
+    """
+    将保存的计划数据整理为统一格式（旧版本的预设没有计划数据，此时生成新的预设ID），无效的触发被丢弃
+    :param data: 计划数据
+    :return: {'id': 预设ID, 'enabled': 是否启用, 'triggers': [触发...]}
+    """
+    if not isinstance(data, dict):
+        data = {}
+
+    triggers = []
+    for trigger in data.get('triggers', []):
+        try:
+            triggers.append(normalizeTrigger(trigger))
+        except (ValueError, TypeError, AttributeError):
+            continue
+
+    return {
+        'id': str(data.get('id') or newId()),
+        'enabled': bool(data.get('enabled', True)),
+        'triggers': triggers,
+    }
+
+
+def nextFireTime(trigger: dict, now: float, previous: float = None):
+    """
+    计算定时触发的下次触发时间
+    :param trigger: 整理后的触发
+    :param now: 当前时间
+    :param previous: 上一次预定的触发时间，固定间隔的触发以其为基准，不会因触发延迟而逐渐推迟
+    :return: 下次触发时间，不是定时触发或cron表达式没有可运行的时间时为None
+    """
+    if trigger['type'] == TriggerType.CRON:
+        try:
+            return parseCron(trigger['expr']).next(now)
+        except ValueError:
+            return None
+    elif trigger['type'] == TriggerType.INTERVAL:
+        seconds = trigger['seconds']
+        if previous is None:
+            return now + seconds
+        # 跳过错过的间隔，只保留当前时间之后的第一个
+        return previous + max(1, math.floor((now - previous) / seconds) + 1) * seconds
+    return None
+
+
+def chainCreatesCycle(schedules: dict, presetId: str, sourceId: str) -> bool:
+    """
+    检查“预设presetId在预设sourceId结束后运行”是否会形成循环
+    :param schedules: {预设ID: 整理后的计划数据}
+    :param presetId: 设置触发的预设
+    :param sourceId: 前置预设
+    :return: 是否形成循环
+    """
+    dependents = {}  # 前置预设ID -> 在其结束后运行的预设ID
+    for pid, schedule in schedules.items():
+        for trigger in schedule['triggers']:
+            if trigger['type'] == TriggerType.AFTER:
+                dependents.setdefault(trigger['preset'], set()).add(pid)
+
+    # 从presetId出发能到达sourceId则形成循环
+    stack, visited = [presetId], set()
+    while stack:
+        current = stack.pop()
+        if current == sourceId:
+            return True
+        if current in visited:
+            continue
+        visited.add(current)
+        stack.extend(dependents.get(current, ()))
+    return False
+
+
+def formatInterval(seconds: int) -> str:
+    """将间隔秒数格式化为便于阅读的文本"""
+    for unit, size in (('天', 86400), ('小时', 3600), ('分钟', 60)):
+        if seconds % size == 0:
+            return f'{seconds // size}{unit}'
+    return f'{seconds}秒'
+
+
+def describeTrigger(trigger: dict, titles: dict = None) -> str:
+    """
+    触发的说明文本
+    :param trigger: 整理后的触发
+    :param titles: {预设ID: 预设标题}，用于显示前置预设的标题
+    :return: 说明文本
+    """
+    triggerType = trigger['type']
+    if triggerType == TriggerType.CRON:
+        return f'定时：{trigger["expr"]}'
+    elif triggerType == TriggerType.INTERVAL:
+        return f'每{formatInterval(trigger["seconds"])}'
+    elif triggerType == TriggerType.FILE:
+        return f'文件变化：{trigger["path"]}'
+    title = (titles or {}).get(trigger['preset'])
+    title = f'“{title}”' if title is not None else '（已删除的预设）'
+    return f'{title}{conditionTexts[trigger["on"]]}'
+
+
+def formatFireTime(timestamp: float) -> str:
+    """将触发时间格式化为便于阅读的文本（今年的时间省略年份）"""
+    local = time.localtime(timestamp)
+    if local.tm_year == time.localtime().tm_year:
+        return time.strftime('%m-%d %H:%M', local)
+    return time.strftime('%Y-%m-%d %H:%M', local)
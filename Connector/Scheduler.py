@@ -0,0 +1,217 @@
+"""预设计划运行模块"""
+import heapq
+import os
+import time
+
+from PyQt6.QtCore import QObject, QTimer, Qt, pyqtSignal
+
+from AppConfig.config import cfg
+from AppConfig.save_scheduler import SaveScheduler
+from AppConfig.storage import storage
+from Connector.SchedulePlan import TriggerType, ChainCondition, timedTypes, nextFireTime
+from FileMonitor.watcher import FileWatcher
+from Logs.log_recorder import logging
+
+schedule_state_path = './config/scheduleState.json'  # 各触发的下次和上次触发时间
+
+
+class Scheduler(QObject):
+    """
+    预设计划运行调度器
+
+    * 全部定时触发（cron表达式和固定间隔）共用一个按触发时间排序的堆和一个单次定时器，定时器只在堆顶的触发时间醒来，
+      计划再多，空闲时也没有额外开销；计划改变时不在堆中查找旧项，出堆时与当前的触发时间不一致的项直接丢弃
+    * 定时器最多休眠maxSleep毫秒就重新检查堆顶：定时器按单调时钟计时，系统休眠或调整时间后仍能及时触发
+    * 每个触发的下次触发时间保存在状态文件中，重启后继续使用；程序关闭期间错过的触发可在启动后补运行一次，
+      多次错过也只运行一次
+    * 文件变化触发共用一个文件监视器，按文件的修改时间和大小判断内容是否改变
+    * 预设运行结束后由调用方通知，按结束条件触发以其为前置的预设
+
+    构造方法参数
+    ------------
+    * statePath: 状态文件路径
+    * parent: 父对象
+    """
+
+    triggered = pyqtSignal(str, str)  # 需要运行预设（预设ID, 操作）
+    maxSleep = 60 * 1000  # 定时器最长休眠时间（毫秒）
+
+    def __init__(self, statePath: str = schedule_state_path, parent=None):
+        super().__init__(parent)
+        self.statePath = statePath
+        self.state = None  # {触发ID: {'next': 下次触发时间, 'last': 上次触发时间}}，首次设置计划时加载
+        self.triggers = {}  # 启用的触发 {触发ID: (预设ID, 触发)}
+        self.heap = []  # 定时触发 [(触发时间, 触发ID)]
+        self.fileTriggers = {}  # {文件路径: [触发ID...]}
+        self.fileStamps = {}  # {文件路径: (修改时间, 文件大小)}，文件不存在时为None
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.PreciseTimer)  # 长时间休眠时粗略定时器的误差可达数分钟
+        self.timer.timeout.connect(self.__onTimeout)
+
+        self.fileWatcher = FileWatcher(debounce=1000, watchFiles=True, parent=self)  # 合并编辑器保存时的多次写入
+        self.fileWatcher.filesChanged.connect(self.__onFilesChanged)
+
+        self.saveScheduler = SaveScheduler(self.__snapshot, lambda data: storage.write(self.statePath, data),
+                                           1000, parent=self)
+
+    def setSchedules(self, schedules: list):
+        """
+        替换全部计划，已有触发的下次触发时间保持不变
+        :param schedules: [(预设ID, 整理后的计划数据), ...]
+        """
+        if self.state is None:
+            self.__loadState()
+
+        now = time.time()
+        self.triggers = {trigger['id']: (presetId, trigger)
+                         for presetId, schedule in schedules if schedule['enabled']
+                         for trigger in schedule['triggers']}
+
+        # 定时触发
+        for triggerId in [triggerId for triggerId in self.state if triggerId not in self.triggers]:
+            del self.state[triggerId]
+        catchUp = cfg.get(cfg.scheduleCatchUp)
+        self.heap = []
+        for triggerId, (presetId, trigger) in self.triggers.items():
+            if trigger['type'] not in timedTypes:
+                continue
+            entry = self.state.setdefault(triggerId, {'next': None, 'last': None})
+            if entry['next'] is None:
+                entry['next'] = nextFireTime(trigger, now)
+            elif entry['next'] <= now and not catchUp:  # 不补运行错过的触发
+                entry['next'] = nextFireTime(trigger, now, entry['next'])
+            if entry['next'] is not None:
+                self.heap.append((entry['next'], triggerId))
+        heapq.heapify(self.heap)
+
+        # 文件变化触发
+        fileTriggers = {}
+        for triggerId, (presetId, trigger) in self.triggers.items():
+            if trigger['type'] == TriggerType.FILE:
+                fileTriggers.setdefault(os.path.abspath(trigger['path']), []).append(triggerId)
+        if fileTriggers.keys() != self.fileTriggers.keys():
+            self.fileStamps = {path: self.fileStamps[path] if path in self.fileStamps else self.__stamp(path)
+                               for path in fileTriggers}
+            self.fileWatcher.setPaths(list(fileTriggers))
+        self.fileTriggers = fileTriggers
+
+        self.saveScheduler.markDirty()
+        self.__arm()
+        logging.info(f'已设置{len(self.triggers)}个计划触发，其中{len(self.heap)}个定时触发')
+
+    def nextTime(self, triggerId: str):
+        """获取定时触发的下次触发时间，不是已启用的定时触发时为None"""
+        entry = self.state.get(triggerId) if self.state is not None and triggerId in self.triggers else None
+        return entry['next'] if entry else None
+
+    def lastTime(self, triggerId: str):
+        """获取触发的上次触发时间，从未触发时为None"""
+        entry = self.state.get(triggerId) if self.state is not None else None
+        return entry['last'] if entry else None
+
+    def notifyFinished(self, presetId: str, success: bool):
+        """
+        预设运行结束，触发以其为前置的预设
+        :param presetId: 结束运行的预设
+        :param success: 是否全部成功
+        """
+        condition = ChainCondition.SUCCESS if success else ChainCondition.FAILURE
+        for triggerId, (dependentId, trigger) in list(self.triggers.items()):
+            if trigger['type'] == TriggerType.AFTER and trigger['preset'] == presetId \
+                    and trigger['on'] in (ChainCondition.ANY, condition):
+                # 在下一次事件循环中运行，避免在前置预设的结束处理中嵌套运行其他预设
+                QTimer.singleShot(0, lambda triggerId=triggerId: self.__fire(triggerId))
+
+    def shutdown(self):
+        """停止调度并立即保存状态"""
+        self.timer.stop()
+        self.fileWatcher.shutdown()
+        if self.state is not None:
+            self.saveScheduler.flush()
+
+    def __loadState(self):
+        """加载状态文件"""
+        data = storage.read(self.statePath)
+        self.state = {}
+        if isinstance(data, dict):
+            for triggerId, entry in data.items():
+                if isinstance(entry, dict):
+                    self.state[triggerId] = {'next': entry.get('next'), 'last': entry.get('last')}
+        logging.info(f'已加载{len(self.state)}个计划触发的状态')
+
+    def __snapshot(self) -> dict:
+        """在GUI线程中获取需要保存的状态"""
+        return {triggerId: dict(entry) for triggerId, entry in self.state.items()}
+
+    def __arm(self):
+        """按堆顶的触发时间重新设置定时器"""
+        while self.heap and self.__isStale(*self.heap[0]):
+            heapq.heappop(self.heap)
+        if not self.heap:
+            self.timer.stop()
+            return
+
+        delay = (self.heap[0][0] - time.time()) * 1000
+        self.timer.start(int(min(max(delay, 0), self.maxSleep)))
+
+    def __isStale(self, fireTime: float, triggerId: str) -> bool:
+        """堆中的项是否已失效（触发已删除或触发时间已改变）"""
+        entry = self.state.get(triggerId)
+        return triggerId not in self.triggers or entry is None or entry['next'] != fireTime
+
+    def __onTimeout(self):
+        """执行已到时间的定时触发"""
+        now = time.time()
+        fired = False
+        while self.heap and self.heap[0][0] <= now:
+            fireTime, triggerId = heapq.heappop(self.heap)
+            if self.__isStale(fireTime, triggerId):
+                continue
+
+            entry = self.state[triggerId]
+            entry['next'] = nextFireTime(self.triggers[triggerId][1], now, fireTime)
+            if entry['next'] is not None:
+                heapq.heappush(self.heap, (entry['next'], triggerId))
+            self.__fire(triggerId)
+            fired = True
+
+        if fired:
+            self.saveScheduler.markDirty()
+        self.__arm()
+
+    def __onFilesChanged(self, paths: list):
+        """监视的文件所在目录或文件本身发生变化"""
+        for path in paths:
+            if path not in self.fileTriggers:
+                continue
+            stamp = self.__stamp(path)
+            if stamp == self.fileStamps.get(path):
+                continue  # 只有同目录的其他文件改变
+
+            self.fileStamps[path] = stamp
+            if stamp is None:
+                continue  # 文件被删除时不触发，恢复后再触发
+            for triggerId in self.fileTriggers[path]:
+                self.__fire(triggerId)
+
+    def __fire(self, triggerId: str):
+        """触发预设运行"""
+        if triggerId not in self.triggers:
+            return  # 等待期间计划已被删除
+
+        presetId, trigger = self.triggers[triggerId]
+        self.state.setdefault(triggerId, {'next': None, 'last': None})['last'] = time.time()
+        self.saveScheduler.markDirty()
+        logging.info(f'计划触发#{triggerId}（{trigger["type"]}）：运行预设{presetId}')
+        self.triggered.emit(presetId, trigger['action'])
+
+    @staticmethod
+    def __stamp(path: str):
+        """获取文件的修改时间和大小，文件不存在时返回None"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
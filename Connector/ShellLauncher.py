@@ -0,0 +1,169 @@
+"""
+文件运行方式模块
+
+按文件类型选择启动文件的命令行程序（cmd、PowerShell或sh/bash），并检测文件运行时输出使用的编码，
+与Java后端的ShellLauncher一致。本模块不依赖PyQt。
+"""
+import codecs
+import locale
+import os
+import re
+import shlex
+import subprocess
+
+isWindows = os.name == 'nt'
+noWindowFlag = getattr(subprocess, 'CREATE_NO_WINDOW', 0)  # 启动子进程时不显示窗口（只在Windows上有效）
+
+cmdSuffixes = ('.bat', '.cmd')
+powershellSuffixes = ('.ps1',)
+shSuffixes = ('.sh',)
+scriptSuffixes = cmdSuffixes + powershellSuffixes + shSuffixes  # 支持运行的文件类型
+
+_detectBytes = 64 * 1024  # 检测编码时读取的字节数
+_chcpPattern = re.compile(rb'^\s*@?chcp(?:\.com)?\s+(\d+)', re.IGNORECASE | re.MULTILINE)
+_psUtf8Pattern = re.compile(rb'\[Console\]::OutputEncoding\s*=\s*\[(?:System\.)?Text\.Encoding\]::UTF8',
+                            re.IGNORECASE)
+
+
+def consoleEncoding() -> str:
+    """
+    控制台程序默认的输出编码
+    Windows上为OEM代码页（简体中文系统为GBK），其他系统为区域设置的编码（通常为UTF-8）
+    """
+    if isWindows:
+        try:
+            import ctypes
+            return f'cp{ctypes.windll.kernel32.GetOEMCP()}'
+        except (ImportError, AttributeError, OSError):
+            return 'gbk'
+    return locale.getpreferredencoding(False) or 'utf-8'
+
+
+def normalizeEncoding(name: str, default: str) -> str:
+    """
+    将编码名称规范化为Python的编码名称
+    :param name: 编码名称或代码页（如"cp65001"）
+    :param default: 无法识别时使用的编码
+    :return: 编码名称
+    """
+    if name in ('cp65001', '65001'):
+        return 'utf-8'
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return default
+
+
+class Launcher:
+    """
+    一种运行文件的方式
+
+    构造方法参数
+    ------------
+    * name: 显示的名称
+    * command: 运行文件的命令行（不含文件路径的部分）
+    * encoding: 默认的输出编码
+    """
+
+    __slots__ = ('name', 'command', 'encoding')
+
+    def __init__(self, name: str, command: list, encoding: str):
+        self.name = name
+        self.command = command
+        self.encoding = encoding
+
+    def __repr__(self):
+        return f'Launcher({self.name!r}, {self.command!r}, {self.encoding!r})'
+
+
+class ScriptLaunch:
+    """一次运行使用的命令行和输出编码"""
+
+    __slots__ = ('launcher', 'args', 'encoding')
+
+    def __init__(self, launcher: Launcher, args: list, encoding: str):
+        self.launcher = launcher
+        self.args = args  # 完整的命令行
+        self.encoding = encoding  # 检测到的输出编码
+
+
+cmdLauncher = Launcher('cmd', ['cmd', '/c'], consoleEncoding())
+powershellLauncher = Launcher('PowerShell',
+                              ['powershell', '-NoProfile', '-ExecutionPolicy', 'Bypass', '-File'] if isWindows
+                              else ['pwsh', '-NoProfile', '-File'],
+                              consoleEncoding())
+shLauncher = Launcher('sh', ['sh'], consoleEncoding())
+
+
+def launcherFor(path: str) -> Launcher:
+    """
+    按文件类型选择运行方式，其他类型的文件在Windows上交给cmd，在其他系统上交给sh
+    :param path: 文件路径
+    :return: 运行方式
+    """
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix in cmdSuffixes:
+        return cmdLauncher
+    elif suffix in powershellSuffixes:
+        return powershellLauncher
+    elif suffix in shSuffixes:
+        return shLauncher
+    return cmdLauncher if isWindows else shLauncher
+
+
+def readHead(path: str) -> bytes:
+    """读取文件开头用于检测的部分，无法读取时返回空字节串"""
+    try:
+        with open(path, 'rb') as f:
+            return f.read(_detectBytes)
+    except OSError:
+        return b''
+
+
+def detectEncoding(launcher: Launcher, head: bytes) -> str:
+    """
+    检测文件运行时输出使用的编码
+    * cmd：文件中最后一次chcp设置的代码页
+    * PowerShell：文件中将[Console]::OutputEncoding设为UTF8或使用chcp 65001时为UTF-8
+    * 其他情况使用运行方式的默认编码
+    :param launcher: 运行方式
+    :param head: 文件开头的内容
+    :return: 编码名称
+    """
+    if launcher is cmdLauncher or launcher is powershellLauncher:
+        pages = _chcpPattern.findall(head)
+        if pages:
+            return normalizeEncoding(f'cp{int(pages[-1])}', launcher.encoding)
+        if launcher is powershellLauncher and _psUtf8Pattern.search(head):
+            return 'utf-8'
+    return launcher.encoding
+
+
+def shebangCommand(head: bytes) -> list:
+    """
+    解析文件第一行的解释器（如"#!/usr/bin/env bash"）
+    :param head: 文件开头的内容
+    :return: 解释器的命令行，没有时返回空列表
+    """
+    if not head.startswith(b'#!'):
+        return []
+    line = head[2:].split(b'\n', 1)[0].decode('utf-8', errors='replace').strip()
+    try:
+        return shlex.split(line)
+    except ValueError:
+        return []
+
+
+def prepareLaunch(path: str) -> ScriptLaunch:
+    """
+    生成运行文件的命令行，sh运行的文件优先使用第一行指定的解释器
+    :param path: 文件路径
+    :return: 命令行和输出编码（Python的编码名称）
+    """
+    path = os.path.abspath(path)
+    launcher = launcherFor(path)
+    head = readHead(path)
+    command = launcher.command
+    if launcher is shLauncher and not isWindows:
+        command = shebangCommand(head) or command
+    return ScriptLaunch(launcher, command + [path], normalizeEncoding(detectEncoding(launcher, head), 'utf-8'))
@@ -1,19 +1,23 @@
 import socket
 import threading
 import queue
-from collections import deque
+import time
 
-from PyQt6.QtCore import pyqtSignal, QObject, QMutex, QTimer, QMutexLocker
+from PyQt6.QtCore import pyqtSignal, QObject
 
-from qfluentwidgets import LineEdit, InfoBar, InfoBarPosition, PlainTextEdit
+from qfluentwidgets import LineEdit, InfoBar, InfoBarPosition
 
+from Connector import FrameProtocol as Frame
+from Connector.RenderScheduler import RenderScheduler
+from Connector.StreamReceiver import StreamReceiver
+from Interfaces.LogView import LogView
 from Logs.log_recorder import logging
 
 
 class SocketClient(QObject):
     runningChanged = pyqtSignal(bool)
 
-    def __init__(self, parent, userCommandControl: LineEdit, outputControl: PlainTextEdit, host='localhost', port=1918,
+    def __init__(self, parent, userCommandControl: LineEdit, outputControl: LogView, host='localhost', port=None,
                  *args, **kwargs):
         """
         连接至Java子进程控制台的构造方法
@@ -21,7 +25,7 @@ class SocketClient(QObject):
         :param userCommandControl:用户输入命令的控件
         :param outputControl:控制台内容输出控件
         :param host:目标IP地址
-        :param port:目标端口
+        :param port:目标端口（由Java后端的应答给出）
         """
         super().__init__(parent, *args, **kwargs)
         self.parent = parent
@@ -30,41 +34,43 @@ class SocketClient(QObject):
         self.host = host
         self.port = port
         self.command_queue = queue.Queue()
-        self.output_queue = deque()  # 输出内容的队列
-        self.mutex = QMutex()  # 互斥锁
-        self.timer = QTimer()  # 定时器，用于控制GUI更新频率
-        self.timer.timeout.connect(self.updateGUI)
+        self.receiver = StreamReceiver()  # 接收输出内容并按行切分，GUI线程按块取出
+        self.renderScheduler = RenderScheduler(self.receiver.takeText, self.updateGUI, parent=self)  # 控制GUI更新频率
         self.running = False
-        self.autoScroll = True
-        self.rcvTimeoutCount = 0  # 接收超时计数器
-        self.dataReceived = False
+        self.connecting = False
 
     def setup_socket(self):
-        """创建套接字并启动通信线程"""
+        """创建套接字并在后台线程中连接，连接成功后启动通信线程（不阻塞调用线程）"""
+        self.receiver.reset()
+        self.renderScheduler.resetStats()
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, len(self.receiver.buffer))  # 增大系统接收缓冲区
         self.sock.settimeout(3.0)
+        self.connecting = True
+        threading.Thread(target=self.__connect, daemon=True).start()
+
+    def __connect(self):
+        """连接线程：连接至文件运行进程，成功后启动发送线程并转为接收线程"""
         try:
             self.sock.connect((self.host, self.port))
-            self.outputControl.insertPlainText("【BFM】开始与Java文件运行进程通信\n")
+            self.sock.settimeout(0.5)  # 连接后超时只用于定期检查是否已停止通信
+            self.showMessage("【BFM】开始与Java文件运行进程通信\n")
             logging.info("【BFM】开始与Java文件运行进程通信")
             self.running = True
+            self.connecting = False
             self.runningChanged.emit(True)
         except ConnectionRefusedError:
-            self.outputControl.insertPlainText("【BFM】错误: 端口1918被占用，无法连接至服务器\n")
-            logging.error('【BFM】错误: 端口1918被占用，无法连接至服务器')
+            self.connecting = False
+            self.showMessage(f"【BFM】错误: 无法连接至文件运行进程（端口{self.port}）\n")
+            logging.error(f'【BFM】错误: 无法连接至文件运行进程（端口{self.port}）')
             self.on_close()
-        except socket.timeout:
-            self.outputControl.insertPlainText('【BFM】错误：连接子进程超时\n')
-            logging.warning('【BFM】错误：连接子进程超时')
+        except (socket.timeout, OSError) as e:
+            self.connecting = False
+            message = '连接子进程超时' if isinstance(e, socket.timeout) else f'连接子进程失败（{e}）'
+            self.showMessage(f'【BFM】错误：{message}\n')
+            logging.warning(f'【BFM】错误：{message}')
             self.on_close()
         else:
-            # 启动接收线程
-            self.receive_thread = threading.Thread(
-                target=self.receive_messages,
-                daemon=True
-            )
-            self.receive_thread.start()
-
             # 启动发送线程
             self.send_thread = threading.Thread(
                 target=self.process_command_queue,
@@ -72,39 +78,26 @@ class SocketClient(QObject):
             )
             self.send_thread.start()
 
-        cursor = self.outputControl.textCursor()
-        cursor.movePosition(cursor.MoveOperation.End)  # 将光标移动至末尾
-        self.outputControl.setTextCursor(cursor)
-
-        self.timer.start(100)  # 每100毫秒更新一次GUI
+            # 当前线程继续作为接收线程
+            self.receive_messages()
 
-    def send_command(self, custom_cmd: str = ''):
-        """将命令放入队列(由发送线程处理)"""
-        cursor = self.outputControl.textCursor()
-        cursor.movePosition(cursor.MoveOperation.End)  # 将光标移动至末尾
-        self.outputControl.setTextCursor(cursor)
-
-        if not custom_cmd:
-            cmd = self.userCommandControl.text()
-            logging.info(f'用户输入命令：{cmd}')
-        else:
-            cmd = custom_cmd
-            logging.info(f'尝试结束文件运行进程')
+    def send_command(self):
+        """将命令输入框中的命令放入队列(由发送线程处理)"""
+        cmd = self.userCommandControl.text()
+        logging.info(f'用户输入命令：{cmd}')
 
         if cmd and self.running:
-            with QMutexLocker(self.mutex):
-                self.output_queue.append(f">{cmd}\n")
-            self.command_queue.put(cmd)
+            self.showMessage(f">{cmd}\n")
+            self.command_queue.put(Frame.encodeFrame(Frame.STDIN, (cmd + '\n').encode('utf-8')))
             self.userCommandControl.setText('')  # 清空输入框的命令
 
-            if not custom_cmd:  # 只有获取的是命令输入框的内容才会显示消息条
-                InfoBar.success(
-                    "成功",
-                    '命令已发送',
-                    duration=1500,
-                    position=InfoBarPosition.TOP,
-                    parent=self.parent.parentWindow
-                )
+            InfoBar.success(
+                "成功",
+                '命令已发送',
+                duration=1500,
+                position=InfoBarPosition.TOP,
+                parent=self.parent.parentWindow
+            )
         elif not self.running:
             InfoBar.warning(
                 "提示",
@@ -123,96 +116,88 @@ class SocketClient(QObject):
                 parent=self.parent.parentWindow
             )
 
+    def kill(self):
+        """发送结束进程的控制消息（连接过程中调用时，连接成功后立即发送）"""
+        if self.running or self.connecting:
+            logging.info('尝试结束文件运行进程')
+            self.showMessage('【BFM】正在结束进程……\n')
+            self.command_queue.put(Frame.encodeFrame(Frame.CONTROL, Frame.KILL))
+
     def process_command_queue(self):
         """发送线程: 处理命令队列"""
         while self.running:
             try:
-                cmd = self.command_queue.get(timeout=0.1)
-                self.sock.sendall((cmd + '\n').encode('utf-8'))
+                frame = self.command_queue.get(timeout=0.1)
+                self.sock.sendall(frame)
             except queue.Empty:
                 continue
             except socket.timeout:
-                self.outputControl.insertPlainText('【BFM】发送超时\n')
+                self.showMessage('【BFM】发送超时\n')
                 logging.warning('【BFM】发送超时')
             except Exception as e:
-                self.outputControl.insertPlainText(f"【BFM】发送错误: {str(e)}\n")
+                self.showMessage(f"【BFM】发送错误: {str(e)}\n")
                 logging.error(f"【BFM】发送错误: {str(e)}")
                 self.on_close()
                 break
 
     def receive_messages(self):
-        """接收线程：将消息存放至队列"""
+        """接收线程：解帧并将输出存放至队列"""
         while self.running:
             try:
-                data = self.sock.recv(1024).decode('utf-8')  # 解码接收到的数据
-                with QMutexLocker(self.mutex):
-                    self.output_queue.append(data)  # 将数据放入队列
-                self.rcvTimeoutCount = 0  # 清空接收超时计数器
+                nbytes = self.receiver.receiveFrom(self.sock)  # 读取、解帧并解码
+                self.renderScheduler.notify()  # 由调度器决定何时更新GUI
 
                 # 自动检测并关闭进程
-                if not data:
+                if not nbytes:
+                    self.showMessage('【BFM】Java文件运行服务已关闭\n')
+                    logging.info('【BFM】Java文件运行服务已关闭')
                     self.on_close()
-                    self.updateGUI()  # 进程结束立刻更新一次GUI
                     break
-                elif data.startswith('#'):
-                    logging.info(data.rstrip('\n'))
+                elif self.receiver.exitCode is not None:
+                    logging.info(self.receiver.exitMessage)
                     self.on_close()
-                    self.updateGUI()  # 进程结束立刻更新一次GUI
                     break
-
-                if not self.dataReceived:
-                    self.sock.settimeout(0)  # 成功接收则取消超时
-                    self.dataReceived = True
             except ConnectionResetError:
-                self.outputControl.insertPlainText('【BFM】Java文件运行服务已关闭\n')
+                self.showMessage('【BFM】Java文件运行服务已关闭\n')
                 logging.info('【BFM】Java文件运行服务已关闭')
                 self.on_close()
                 break
-            except socket.timeout:
-                if self.rcvTimeoutCount <= 3:
-                    self.rcvTimeoutCount += 1
-                    self.outputControl.insertPlainText('【BFM】接收超时\n')
-                    logging.warning('【BFM】接收超时')
-                else:
-                    self.outputControl.insertPlainText('【BFM】超时次数过多，文件运行进程已终止\n')
-                    self.outputControl.insertPlainText(
-                        '【BFM】提示：使用netstat -ano | findstr \"1918\"以查询端口占用情况\n')
-                    logging.error('【BFM】超时次数过多，文件运行进程已终止，请检查1918端口占用情况')
+            except socket.timeout:  # 文件暂时没有输出（如等待用户输入），只要心跳正常就继续等待
+                if time.monotonic() - self.receiver.lastFrameTime > Frame.HEARTBEAT_TIMEOUT:
+                    self.showMessage('【BFM】文件运行进程失去响应，已断开连接\n')
+                    logging.error('【BFM】文件运行进程失去响应')
                     self.on_close()
                     break
             except socket.error as e:
                 if e.errno == 10035:  # 处理非阻塞错误
                     continue
             except Exception as e:
-                self.outputControl.insertPlainText(f'【BFM】接收错误：{str(e)}\n')
+                self.showMessage(f'【BFM】接收错误：{str(e)}\n')
                 logging.error(f'【BFM】接收错误：{str(e)}')
                 self.on_close()
                 break
 
-    def updateGUI(self):
-        """将输出内容队列中的内容合并后更新GUI"""
-        with QMutexLocker(self.mutex):
-            if not self.output_queue:
-                return
-            batch_text = ''.join(self.output_queue)
-            self.output_queue.clear()
-
-        self.outputControl.append(batch_text[:-2])  # 省去最后一个换行符
+    def updateGUI(self, batch_text: str):
+        """
+        将一帧的输出内容更新至GUI（由刷新调度器调用）
+        :param batch_text: 本帧需要显示的文本
+        """
+        self.outputControl.appendText(batch_text)  # 文本块可能在行中间断开，输出控件会在末尾续写
 
-        # 自动滚动到底部（通过强制使光标可见实现）
-        if self.autoScroll:
-            cursor = self.outputControl.textCursor()
-            cursor.movePosition(cursor.MoveOperation.End)  # 将光标移动至末尾
-            self.outputControl.setTextCursor(cursor)
-            self.outputControl.ensureCursorVisible()
+    def showMessage(self, text: str):
+        """
+        在控制台中显示一条本地消息（线程安全，与接收的内容按顺序显示）
+        :param text: 消息文本
+        """
+        self.receiver.append(text)
+        self.renderScheduler.notify()
 
     def on_close(self):
         """关闭应用时的清理工作"""
-        self.rcvTimeoutCount = 0  # 超时计数器归零
         self.running = False
-        self.dataReceived = False  # 重置消息接收状态
         self.runningChanged.emit(self.running)
-        self.timer.stop()  # 关闭定时器
+        self.renderScheduler.notify()  # 进程结束立刻更新一次GUI
         if hasattr(self, 'sock'):
             self.sock.close()
         logging.info('已切断与Java进程的通信')
+        logging.info(f'控制台刷新统计：{self.renderScheduler.stats()}')
@@ -0,0 +1,181 @@
+"""控制台输出的接收与解帧模块"""
+import codecs
+import time
+from collections import deque
+
+from Connector import FrameProtocol as Frame
+from Connector.ResourceMonitor import ResourceSample, ResourceSeries, describeSummary
+
+
+class StreamReceiver:
+    """
+    从套接字接收控制台输出
+
+    * 使用预先分配的缓冲区和recv_into()读取，每次最多读取缓冲区剩余空间大小的字节，不产生中间bytes对象
+    * 按帧协议解帧，不完整的帧留在缓冲区开头，等下一次读取补齐
+    * 标准输出和标准错误各使用一个增量解码器，多字节字符被拆分到两帧中也能正确拼接
+    * 输出不按行缓冲，不完整的行（如等待用户输入的提示、以\\r刷新的进度条）收到后立即交出
+    * 进程退出由退出帧通知，输出内容中的任何文本都不会被误认为控制消息
+    * 资源帧保存到resources时间序列中，进程退出时在输出末尾显示整次运行的资源占用统计
+    * 接收线程把每次得到的文本整块追加到队列，GUI线程整块取出，deque的追加和弹出是线程安全的，无需加锁
+
+    构造方法参数
+    ------------
+    * bufferSize: 接收缓冲区大小（字节）
+    * encoding: 输出内容的编码
+    """
+
+    def __init__(self, bufferSize: int = 256 * 1024, encoding: str = 'utf-8'):
+        self.buffer = bytearray(max(bufferSize, Frame.HEADER.size + Frame.MAX_PAYLOAD))
+        self.view = memoryview(self.buffer)
+        self.encoding = encoding
+        self.decoders = {}  # 帧类型 -> 增量解码器
+        self.filled = 0  # 缓冲区开头尚未组成完整帧的字节数
+        self.atLineStart = True  # 已交出的文本是否以换行符结尾
+        self.chunks = deque()  # 等待GUI线程取出的文本块
+        self.exitCode = None  # 收到的进程退出代码
+        self.exitMessage = None  # 进程退出消息
+        self.receivedBytes = 0  # 累计接收的字节数
+        self.lastFrameTime = 0.0  # 最近一次收到数据的时间（包括心跳）
+        self.firstOutputTime = None  # 收到第一块进程输出的时间（time.time()）
+        self.sink = None  # 另行接收全部文本的可调用对象（如运行日志），在产生文本的线程中调用，reset()不清除
+        self.resources = ResourceSeries()  # 进程树的资源占用采样
+        self.reset()
+
+    def reset(self):
+        """清空状态以接收新的输出"""
+        self.decoders = {
+            frameType: codecs.getincrementaldecoder(self.encoding)(errors='replace')
+            for frameType in (Frame.STDOUT, Frame.STDERR)
+        }
+        self.filled = 0
+        self.atLineStart = True
+        self.chunks.clear()
+        self.exitCode = None
+        self.exitMessage = None
+        self.receivedBytes = 0
+        self.lastFrameTime = time.monotonic()
+        self.firstOutputTime = None
+        self.resources.reset()
+
+    def receiveFrom(self, sock) -> int:
+        """
+        从套接字读取一次数据并处理
+        :param sock: 已连接的套接字
+        :return: 读取的字节数，为0表示连接已关闭
+        """
+        nbytes = sock.recv_into(self.view[self.filled:])
+        if nbytes == 0:
+            self.finish()
+        else:
+            self.__process(nbytes)
+        return nbytes
+
+    def feed(self, data: bytes):
+        """
+        处理一段字节（不经过套接字，用于测试和性能测量）
+        :param data: 按帧协议编码的字节数据
+        """
+        data = memoryview(data)
+        while data:
+            nbytes = min(len(data), len(self.buffer) - self.filled)
+            self.view[self.filled:self.filled + nbytes] = data[:nbytes]
+            self.__process(nbytes)
+            data = data[nbytes:]
+
+    def __process(self, nbytes: int):
+        """解析缓冲区中的完整帧"""
+        self.receivedBytes += nbytes
+        self.lastFrameTime = time.monotonic()
+        end = self.filled + nbytes
+        pos = 0
+        texts = []
+
+        while end - pos >= Frame.HEADER.size:
+            frameType, length = Frame.HEADER.unpack_from(self.buffer, pos)
+            start = pos + Frame.HEADER.size
+            if end - start < length:
+                break  # 不完整的帧
+
+            payload = self.view[start:start + length]
+            pos = start + length
+
+            decoder = self.decoders.get(frameType)
+            if decoder is not None:
+                if self.firstOutputTime is None:
+                    self.firstOutputTime = time.time()
+                texts.append(decoder.decode(payload))
+            elif frameType == Frame.EXIT:
+                self.__push(''.join(texts))
+                texts.clear()
+                self.exitCode = Frame.EXIT_CODE.unpack(payload)[0]
+                self.exitMessage = f'进程已退出，代码：{self.exitCode}'
+                self.__pushLine(f'【BFM】{self.exitMessage}')
+                if (summary := self.resources.summary()) is not None:
+                    self.__pushLine(f'【BFM】资源占用：{describeSummary(summary)}')
+            elif frameType == Frame.CONTROL:
+                self.__push(''.join(texts))
+                texts.clear()
+                self.__pushLine(f'【BFM】{bytes(payload).decode("utf-8", errors="replace")}')
+            elif frameType == Frame.RESOURCE and length == Frame.RESOURCE_SAMPLE.size:
+                self.resources.add(ResourceSample.decode(payload))
+            # 心跳帧只用于更新lastFrameTime
+
+        # 不完整的帧移到缓冲区开头
+        rest = end - pos
+        if rest and pos:
+            self.buffer[:rest] = self.buffer[pos:end]
+        self.filled = rest
+
+        self.__push(''.join(texts))
+
+    def finish(self):
+        """连接关闭：交出剩余的全部内容"""
+        self.__push(''.join(decoder.decode(b'', final=True) for decoder in self.decoders.values()))
+
+    def append(self, text: str):
+        """
+        追加一段本地生成的文本（如回显的命令），与接收的内容按顺序显示
+        :param text: 文本
+        """
+        if self.sink is not None:
+            self.sink(text)
+        self.chunks.append(text)
+
+    def takeText(self, limit: int = None) -> str:
+        """
+        取出等待显示的文本（由GUI线程调用）
+        :param limit: 最多取出的字符数，为空则全部取出
+        :return: 合并后的文本，没有新内容时为空字符串
+        """
+        chunks = []
+        size = 0
+        while self.chunks:
+            chunk = self.chunks.popleft()
+            if limit is not None and size + len(chunk) > limit:
+                # 超出上限的部分放回队首（接收线程只在队尾追加，两端操作互不影响）
+                cut = limit - size
+                self.chunks.appendleft(chunk[cut:])
+                chunks.append(chunk[:cut])
+                break
+            chunks.append(chunk)
+            size += len(chunk)
+        return ''.join(chunks)
+
+    def pendingChunks(self) -> int:
+        """等待取出的文本块数量"""
+        return len(self.chunks)
+
+    def __pushLine(self, line: str):
+        """交出单独占一行的消息"""
+        self.__push(('' if self.atLineStart else '\n') + line + '\n')
+
+    def __push(self, text: str):
+        """交出一段文本"""
+        if not text:
+            return
+
+        self.atLineStart = text.endswith('\n')
+        if self.sink is not None:
+            self.sink(text)
+        self.chunks.append(text)
@@ -0,0 +1,179 @@
+"""文件夹递归导入模块"""
+import fnmatch
+import os
+import re
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from FileMonitor.scanner import fileInfo, normalizePath
+from Logs.log_recorder import logging
+
+
+def compilePatterns(patterns: str):
+    """
+    将以分号分隔的通配符（如"*.bat;*.cmd"）合并编译为一个不区分大小写的正则表达式
+    :param patterns: 通配符文本
+    :return: 正则表达式的match方法，没有通配符时返回None
+    """
+    items = [item.strip() for item in patterns.replace(',', ';').split(';') if item.strip()]
+    if not items:
+        return None
+    return re.compile('|'.join(fnmatch.translate(item) for item in items), re.IGNORECASE).match
+
+
+class FolderImporter(QObject):
+    """
+    文件夹递归导入器
+
+    每个目录作为一个任务交给线程池，用os.scandir()遍历，遇到子目录时提交新的任务，多个目录同时遍历；
+    文件名匹配包含通配符、且文件名和相对路径都不匹配排除通配符的文件才会导入（排除通配符同样用于跳过子目录）；
+    已存在的路径和本次已发现的路径放在同一个集合中，重复判断只需一次哈希查找；
+    发现的文件由定时器分批交给GUI线程，不必等待整个目录树遍历完成。
+
+    构造方法参数
+    ------------
+    * maxWorkers: 遍历线程数
+    * interval: 向GUI线程提交结果的间隔（毫秒）
+    * parent: 父对象
+    """
+
+    filesFound = pyqtSignal(list)  # 一批新发现的文件 [(文件路径, [修改日期,文件类型,文件大小]), ...]
+    progressChanged = pyqtSignal(int, int)  # 已遍历的目录数，已发现的文件数
+    finished = pyqtSignal(int, bool)  # 导入结束（发现的文件数，是否被取消）
+
+    def __init__(self, maxWorkers: int = 8, interval: int = 100, parent=None):
+        super().__init__(parent)
+        self.executor = ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix='FolderImporter')
+        self.results = deque()  # 遍历线程发现的文件
+        self.lock = threading.Lock()
+        self.generation = 0  # 导入批次编号，取消后丢弃旧批次的结果
+        self.remaining = 0  # 本批次尚未遍历完成的目录数
+        self.scannedDirs = 0
+        self.foundFiles = 0
+        self.seen = set()  # 已存在和已发现的文件路径（规范化后）
+        self.root = ''
+        self.include = None
+        self.exclude = None
+        self.running = False
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.__deliver)
+
+    def start(self, root: str, include: str, exclude: str, existing: set):
+        """
+        开始导入
+        :param root: 需要导入的文件夹
+        :param include: 包含的文件名通配符，以分号分隔
+        :param exclude: 排除的文件名或相对路径通配符，以分号分隔
+        :param existing: 列表中已有文件的规范化路径集合（见normalizePath()），这些文件不会重复导入
+        """
+        with self.lock:
+            self.generation += 1
+            generation = self.generation
+            self.results.clear()
+            self.remaining = 1
+            self.scannedDirs = 0
+            self.foundFiles = 0
+            self.seen = set(existing)
+            self.root = root
+            self.include = compilePatterns(include)
+            self.exclude = compilePatterns(exclude)
+            self.running = True
+
+        logging.info(f'开始导入文件夹"{root}"，包含：{include}，排除：{exclude}')
+        self.executor.submit(self.__scanDirectory, generation, root)
+        self.timer.start()
+
+    def cancel(self):
+        """取消导入，已提交给GUI线程的文件保留"""
+        with self.lock:
+            if not self.running:
+                return
+            self.generation += 1
+            self.results.clear()
+            self.running = False
+            found = self.foundFiles
+
+        self.timer.stop()
+        logging.info(f'已取消导入文件夹"{self.root}"')
+        self.finished.emit(found, True)
+
+    def isRunning(self) -> bool:
+        """是否正在导入"""
+        return self.running
+
+    def shutdown(self):
+        """停止导入并结束线程池"""
+        self.timer.stop()
+        with self.lock:
+            self.generation += 1
+            self.results.clear()
+            self.running = False
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def __excluded(self, name: str, relativePath: str) -> bool:
+        """文件名或相对路径是否匹配排除通配符"""
+        return self.exclude is not None and bool(self.exclude(name) or self.exclude(relativePath))
+
+    def __scanDirectory(self, generation: int, directory: str):
+        """遍历线程：遍历一个目录，子目录提交为新的任务"""
+        if generation != self.generation:
+            return  # 已取消
+
+        found = []
+        subdirectories = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    relativePath = os.path.relpath(entry.path, self.root).replace(os.sep, '/')
+                    try:
+                        if entry.is_dir(follow_symlinks=False):  # 不跟随目录链接，避免循环
+                            if not self.__excluded(entry.name, relativePath):
+                                subdirectories.append(entry.path)
+                        elif entry.is_file() and (self.include is None or self.include(entry.name)) \
+                                and not self.__excluded(entry.name, relativePath):
+                            stat = entry.stat()
+                            found.append((entry.path.replace(os.sep, '/'), stat.st_mtime, stat.st_size))  # 与文件对话框的路径格式一致
+                    except OSError:
+                        pass
+        except OSError as e:
+            logging.warning(f'无法遍历目录"{directory}"：{e}')
+
+        with self.lock:
+            if generation != self.generation:
+                return
+
+            for path, mtime, size in found:
+                key = normalizePath(path)
+                if key not in self.seen:
+                    self.seen.add(key)
+                    self.results.append((path, fileInfo(path, True, mtime, size)))
+                    self.foundFiles += 1
+
+            self.scannedDirs += 1
+            self.remaining += len(subdirectories) - 1  # 先计入子目录再减去本目录，计数不会提前归零
+
+        for subdirectory in subdirectories:
+            self.executor.submit(self.__scanDirectory, generation, subdirectory)
+
+    def __deliver(self):
+        """在GUI线程中提交已发现的文件"""
+        with self.lock:
+            results = list(self.results)
+            self.results.clear()
+            done = self.running and self.remaining <= 0
+            scannedDirs, foundFiles = self.scannedDirs, self.foundFiles
+            if done:
+                self.running = False
+
+        if results:
+            self.filesFound.emit(results)
+        self.progressChanged.emit(scannedDirs, foundFiles)
+        if done:
+            self.timer.stop()
+            logging.info(f'文件夹"{self.root}"导入完成：遍历{scannedDirs}个目录，发现{foundFiles}个文件')
+            self.finished.emit(foundFiles, False)
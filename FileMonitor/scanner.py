@@ -0,0 +1,214 @@
+"""文件元数据并行扫描模块"""
+import os
+import stat as statModule
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from FileMonitor.stat_cache import statCache
+from Logs.log_recorder import logging
+
+
+def normalizePath(path: str) -> str:
+    """将路径转换为判断是否重复的键（绝对路径，Windows上不区分大小写和分隔符）"""
+    return os.path.normcase(os.path.abspath(path))
+
+
+def fileType(path: str) -> str:
+    """获取文件类型（后缀名），与Java后端的格式一致"""
+    return path[path.rfind('.') + 1:]
+
+
+def formatDate(mtime: float) -> str:
+    """将修改时间格式化为“年-月-日”"""
+    return time.strftime('%Y-%m-%d', time.localtime(mtime))
+
+
+def formatSize(size: int) -> str:
+    """格式化文件大小，与Java后端的格式一致"""
+    if size < 1024:
+        return f'{size}B'
+    elif size < 1024 * 1024:
+        return f'{size}KB'
+    elif size < 1024 * 1024 * 1024:
+        return f'{size}MB'
+    else:
+        return f'{size}GB'
+
+
+def fileInfo(path: str, exists: bool, mtime: float, size: int) -> list:
+    """
+    生成表格中显示的文件信息
+    :param path: 文件路径
+    :param exists: 文件是否存在
+    :param mtime: 修改时间
+    :param size: 文件大小
+    :return: [修改日期,文件类型,文件大小]
+    """
+    if not exists:
+        return ['未知', fileType(path), '未知']
+    return [formatDate(mtime), fileType(path), formatSize(size)]
+
+
+def scanDirectory(directory: str, paths: list) -> list:
+    """
+    获取同一目录下多个文件的元数据
+    :param directory: 目录路径
+    :param paths: 该目录下的文件路径列表
+    :return: [(文件路径, 是否存在, 修改时间, 文件大小), ...]
+    """
+    if len(paths) == 1:  # 单个文件直接获取，不必遍历整个目录
+        return [statFile(paths[0])]
+
+    # 同一目录下的多个文件只遍历一次目录，在Windows上目录项自带元数据，无需逐个访问文件
+    wanted = {os.path.basename(path): path for path in paths}
+    found = {}
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                path = wanted.get(entry.name)
+                if path is None:
+                    continue
+                try:
+                    if entry.is_file():
+                        stat = entry.stat()
+                        found[path] = (path, True, stat.st_mtime, stat.st_size)
+                except OSError:
+                    pass
+                if len(found) == len(wanted):
+                    break
+    except OSError:
+        pass
+
+    # 目录项中未找到的文件（如路径大小写与实际不一致）逐个确认
+    return [found[path] if path in found else statFile(path) for path in paths]
+
+
+def statFile(path: str) -> tuple:
+    """
+    获取单个文件的元数据
+    :param path: 文件路径
+    :return: (文件路径, 是否存在, 修改时间, 文件大小)
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return path, False, 0, 0
+    if not statModule.S_ISREG(stat.st_mode):
+        return path, False, 0, 0
+    return path, True, stat.st_mtime, stat.st_size
+
+
+class MetadataScanner(QObject):
+    """
+    文件元数据的并行扫描器
+
+    按所在目录将文件分组，由线程池中的多个线程同时扫描不同目录；
+    目录指纹与元数据缓存一致时直接使用缓存，只有改变过的目录才逐个访问其中的文件；
+    扫描结果由定时器分批交给GUI线程，界面无需等待全部文件扫描完成。
+
+    构造方法参数
+    ------------
+    * maxWorkers: 扫描线程数（网络路径的访问延迟较高，线程数可多于CPU核心数）
+    * interval: 向GUI线程提交结果的间隔（毫秒）
+    * parent: 父对象
+    """
+
+    infoReady = pyqtSignal(list)  # 一批扫描结果 [(文件路径, 是否存在, [修改日期,文件类型,文件大小]), ...]
+    finished = pyqtSignal()  # 本次扫描全部完成
+
+    def __init__(self, maxWorkers: int = 16, interval: int = 50, parent=None):
+        super().__init__(parent)
+        self.executor = ThreadPoolExecutor(max_workers=maxWorkers, thread_name_prefix='MetadataScanner')
+        self.results = deque()  # 扫描线程产生的结果
+        self.lock = threading.Lock()
+        self.generation = 0  # 扫描批次编号，开始新的扫描后丢弃旧批次的结果
+        self.remaining = 0  # 本批次尚未扫描完成的目录数
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.__deliver)
+
+    def scan(self, paths: list):
+        """
+        开始扫描（旧的扫描结果将被丢弃）
+        :param paths: 文件路径列表
+        """
+        groups = {}
+        for path in paths:
+            groups.setdefault(os.path.dirname(path), []).append(path)
+
+        with self.lock:
+            self.generation += 1
+            self.results.clear()
+            self.remaining = len(groups)
+            generation = self.generation
+        statCache.prune(paths)  # 不再管理的文件无需保留缓存
+
+        logging.info(f'开始扫描{len(paths)}个文件的元数据（{len(groups)}个目录）')
+        for directory, group in groups.items():
+            self.executor.submit(self.__scanGroup, generation, directory, group)
+        self.timer.start()
+
+    def refresh(self, paths: list):
+        """
+        重新扫描部分文件（不使用缓存，也不丢弃正在进行的扫描）
+        :param paths: 文件路径列表
+        """
+        groups = {}
+        for path in paths:
+            groups.setdefault(os.path.dirname(path), []).append(path)
+
+        with self.lock:
+            self.remaining += len(groups)
+            generation = self.generation
+
+        for directory, group in groups.items():
+            self.executor.submit(self.__scanGroup, generation, directory, group, True)
+        self.timer.start()
+
+    def shutdown(self):
+        """停止扫描并结束线程池"""
+        self.timer.stop()
+        with self.lock:
+            self.generation += 1
+            self.results.clear()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def __scanGroup(self, generation: int, directory: str, paths: list, force: bool = False):
+        """扫描线程：扫描一个目录下的文件（force为真时不使用缓存）"""
+        if generation != self.generation:
+            return  # 已开始新的扫描
+
+        try:
+            fingerprint = statCache.fingerprint(directory)
+            stats = None if force else statCache.lookup(directory, paths, fingerprint)
+            if stats is None:  # 目录已改变或尚无缓存
+                stats = scanDirectory(directory, paths) if fingerprint is not None \
+                    else [(path, False, 0, 0) for path in paths]
+                statCache.update(directory, fingerprint, stats)
+            results = [(path, exists, fileInfo(path, exists, mtime, size)) for path, exists, mtime, size in stats]
+        except Exception as e:
+            logging.error(f'扫描目录"{directory}"失败：{e}')
+            results = [(path, False, fileInfo(path, False, 0, 0)) for path in paths]
+
+        with self.lock:
+            if generation == self.generation:
+                self.results.extend(results)
+                self.remaining -= 1
+
+    def __deliver(self):
+        """在GUI线程中提交已扫描完成的结果"""
+        with self.lock:
+            results = list(self.results)
+            self.results.clear()
+            done = self.remaining <= 0
+
+        if results:
+            self.infoReady.emit(results)
+        if done:
+            self.timer.stop()
+            self.finished.emit()
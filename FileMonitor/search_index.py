@@ -0,0 +1,343 @@
+"""文件列表全文检索模块"""
+import bisect
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from Logs.log_recorder import logging
+
+# 连续的汉字、连续的数字或连续的其他文字各为一个词，其余字符（空格、标点、路径分隔符、下划线等）为分隔符
+_cjk = r'\u3400-\u9fff\uf900-\ufaff'  # 中日韩统一表意文字及兼容表意文字
+_wordPattern = re.compile(rf'[{_cjk}]+|\d+|[^\W\d_{_cjk}]+')
+_cjkPattern = re.compile(rf'[{_cjk}]')
+
+contentSuffixes = ('.bat', '.cmd', '.ps1', '.sh')  # 建立内容索引的文件类型
+
+
+def _cjkTokens(run: str) -> list:
+    """将连续的汉字拆分为相邻两字的词，并单独加入最后一个字，任意单字或相邻两字都能通过前缀匹配找到"""
+    if len(run) == 1:
+        return [run]
+    return [run[i:i + 2] for i in range(len(run) - 1)] + [run[-1]]
+
+
+def tokenize(text: str) -> set:
+    """
+    将文本拆分为建立索引的词（不区分大小写）
+    :param text: 文本
+    :return: 词的集合
+    """
+    tokens = set()
+    for word in _wordPattern.findall(text.lower()):
+        if _cjkPattern.match(word):
+            tokens.update(_cjkTokens(word))
+        else:
+            tokens.add(word)
+    return tokens
+
+
+def queryTokens(term: str) -> list:
+    """
+    将一个搜索词拆分为按顺序排列的词，最后一个词按前缀匹配，其余的词须完全匹配
+    :param term: 不含空格的搜索词
+    :return: 词的列表
+    """
+    tokens = []
+    for word in _wordPattern.findall(term.lower()):
+        if _cjkPattern.match(word):
+            tokens.extend(_cjkTokens(word)[:-1] if len(word) > 1 else [word])
+        else:
+            tokens.append(word)
+    return tokens
+
+
+class InvertedIndex:
+    """
+    倒排索引：词 -> 包含该词的文档ID集合
+
+    另外维护一个有序的词列表，前缀匹配时用二分查找定位以该前缀开头的词，不必遍历全部的词。
+    新增的词较少时直接插入有序列表，较多时（如首次加载）标记为过期，下一次查询时重新排序。
+    """
+
+    insertLimit = 256  # 一次新增的词超过该数量时不逐个插入，改为下一次查询时重新排序
+
+    def __init__(self):
+        self.postings = {}  # {词: 文档ID集合}
+        self.docs = {}  # {文档ID: 词的集合}
+        self.sortedTokens = []  # 有序的词列表（可能含有已没有文档的词）
+        self.sortedDirty = False
+
+    def __len__(self):
+        return len(self.docs)
+
+    def clear(self):
+        """清空索引"""
+        self.postings.clear()
+        self.docs.clear()
+        self.sortedTokens.clear()
+        self.sortedDirty = False
+
+    def set(self, docId, tokens):
+        """
+        设置文档包含的词，替换原有的词
+        :param docId: 文档ID
+        :param tokens: 词的集合
+        """
+        old = self.docs.get(docId, frozenset())
+        tokens = frozenset(tokens)
+        if old == tokens:
+            return
+
+        for token in old - tokens:
+            self.__discard(token, docId)
+
+        newTokens = []
+        for token in tokens - old:
+            ids = self.postings.get(token)
+            if ids is None:
+                ids = self.postings[token] = set()
+                newTokens.append(token)
+            ids.add(docId)
+
+        if tokens:
+            self.docs[docId] = tokens
+        else:
+            self.docs.pop(docId, None)
+        self.__addSorted(newTokens)
+
+    def remove(self, docId):
+        """
+        移除文档
+        :param docId: 文档ID
+        """
+        for token in self.docs.pop(docId, ()):
+            self.__discard(token, docId)
+
+    def exactMatch(self, token: str) -> set:
+        """包含该词的文档ID集合（不可修改）"""
+        return self.postings.get(token, frozenset())
+
+    def prefixMatch(self, prefix: str) -> set:
+        """
+        包含以该前缀开头的词的文档ID集合
+        :param prefix: 前缀
+        :return: 文档ID集合
+        """
+        if self.sortedDirty:
+            self.sortedTokens = sorted(self.postings)
+            self.sortedDirty = False
+
+        sets = []
+        tokens = self.sortedTokens
+        for i in range(bisect.bisect_left(tokens, prefix), len(tokens)):
+            token = tokens[i]
+            if not token.startswith(prefix):
+                break
+            ids = self.postings.get(token)
+            if ids:
+                sets.append(ids)
+
+        if len(sets) == 1:
+            return sets[0]
+        return set().union(*sets)
+
+    def __discard(self, token: str, docId):
+        """从词的文档集合中移除文档，集合为空时删除该词（有序列表中的词留到下次重新排序时清除）"""
+        ids = self.postings[token]
+        ids.discard(docId)
+        if not ids:
+            del self.postings[token]
+
+    def __addSorted(self, newTokens: list):
+        """将新增的词加入有序列表"""
+        if not newTokens or self.sortedDirty:
+            return
+        if len(newTokens) > self.insertLimit:
+            self.sortedDirty = True
+            return
+
+        tokens = self.sortedTokens
+        for token in newTokens:
+            i = bisect.bisect_left(tokens, token)
+            if i == len(tokens) or tokens[i] != token:
+                tokens.insert(i, token)
+
+
+class SearchIndex:
+    """
+    文件列表的检索索引
+
+    文件名、备注和路径放在元数据索引中，脚本内容放在单独的内容索引中，两者均以行ID为文档ID。
+    搜索文本按空格分为多个搜索词，每个搜索词须在元数据或内容中出现（前缀匹配），结果为各搜索词结果的交集。
+    """
+
+    def __init__(self):
+        self.meta = InvertedIndex()
+        self.content = InvertedIndex()
+        self.contentEnabled = False
+
+    def clear(self):
+        """清空索引"""
+        self.meta.clear()
+        self.content.clear()
+
+    def setDocument(self, docId, *texts: str):
+        """
+        设置文件的元数据
+        :param docId: 行ID
+        :param texts: 文件名、备注、路径等文本
+        """
+        self.meta.set(docId, tokenize(' '.join(texts)))
+
+    def setContent(self, docId, tokens):
+        """
+        设置文件内容的词（关闭内容索引时忽略）
+        :param docId: 行ID
+        :param tokens: 词的集合，文件不存在时为空
+        """
+        if self.contentEnabled:
+            self.content.set(docId, tokens)
+
+    def setContentEnabled(self, enabled: bool):
+        """开启或关闭内容索引，关闭时清空已有的内容索引"""
+        self.contentEnabled = enabled
+        if not enabled:
+            self.content.clear()
+
+    def remove(self, docId):
+        """移除文件"""
+        self.meta.remove(docId)
+        self.content.remove(docId)
+
+    def search(self, query: str):
+        """
+        搜索文件
+        :param query: 搜索文本
+        :return: 匹配的行ID集合，搜索文本中没有可搜索的词时返回None（不过滤）
+        """
+        result = None
+        for term in query.split():
+            tokens = queryTokens(term)
+            if not tokens:
+                continue
+
+            matched = self.__matchTerm(self.meta, tokens)
+            if self.contentEnabled and len(self.content):
+                matched = matched | self.__matchTerm(self.content, tokens)
+            result = matched if result is None else result & matched  # 结果只读，不必复制
+            if not result:
+                break
+        return result
+
+    @staticmethod
+    def __matchTerm(index: InvertedIndex, tokens: list) -> set:
+        """一个搜索词在索引中的匹配结果：前面的词完全匹配，最后一个词前缀匹配"""
+        sets = [index.exactMatch(token) for token in tokens[:-1]]
+        sets.append(index.prefixMatch(tokens[-1]))
+        sets.sort(key=len)  # 从最小的集合开始求交集
+        result = sets[0]
+        for ids in sets[1:]:
+            if not result:
+                break
+            result = result & ids
+        return result
+
+
+def readContent(path: str, maxBytes: int) -> str:
+    """
+    读取脚本内容（先按UTF-8解码，失败时按GBK解码）
+    :param path: 文件路径
+    :param maxBytes: 最多读取的字节数
+    :return: 文件内容
+    """
+    with open(path, 'rb') as f:
+        data = f.read(maxBytes)
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return data.decode('gbk', errors='replace')
+
+
+class ContentIndexer(QObject):
+    """
+    在后台读取脚本内容并拆分为词
+
+    每个文件记录上次读取时的修改时间和大小，刷新时只重新读取发生变化的文件，因此可以频繁地刷新全部文件；
+    结果通过信号分批交给GUI线程，由检索索引所在的线程更新索引。
+
+    构造方法参数
+    ------------
+    * maxBytes: 每个文件最多读取的字节数
+    * batchSize: 每批交付的文件数
+    * parent: 父对象
+    """
+
+    contentReady = pyqtSignal(list)  # 内容发生变化的文件 [(文件路径, 词的集合), ...]，文件不存在时为空集合
+
+    def __init__(self, maxBytes: int = 1024 * 1024, batchSize: int = 200, parent=None):
+        super().__init__(parent)
+        self.maxBytes = maxBytes
+        self.batchSize = batchSize
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='ContentIndexer')
+        self.stamps = {}  # {文件路径: (修改时间(纳秒), 文件大小)}
+        self.lock = threading.Lock()
+
+    def refresh(self, paths):
+        """
+        在后台检查文件是否改变，改变的文件重新读取
+        :param paths: 文件路径的可迭代对象
+        """
+        paths = [path for path in paths if path.lower().endswith(contentSuffixes)]
+        if paths:
+            self.executor.submit(self.__read, paths)
+
+    def forget(self, paths):
+        """
+        忘记文件上次读取的状态，下次刷新时一定重新读取（用于移除或重定向文件后）
+        :param paths: 文件路径的可迭代对象
+        """
+        with self.lock:
+            for path in paths:
+                self.stamps.pop(path, None)
+
+    def clear(self):
+        """忘记全部文件的状态"""
+        with self.lock:
+            self.stamps.clear()
+
+    def shutdown(self):
+        """停止读取"""
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def __read(self, paths: list):
+        """后台线程：读取发生变化的文件"""
+        batch = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+                stamp = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                stamp = None
+
+            with self.lock:
+                if path in self.stamps and self.stamps[path] == stamp:
+                    continue
+                self.stamps[path] = stamp
+
+            tokens = set()
+            if stamp is not None:
+                try:
+                    tokens = tokenize(readContent(path, self.maxBytes))
+                except OSError as e:
+                    logging.warning(f'无法读取文件内容"{path}"：{e}')
+
+            batch.append((path, tokens))
+            if len(batch) >= self.batchSize:
+                self.contentReady.emit(batch)
+                batch = []
+
+        if batch:
+            self.contentReady.emit(batch)
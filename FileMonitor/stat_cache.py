@@ -0,0 +1,155 @@
+"""文件元数据的持久化缓存模块"""
+import os
+import threading
+import time
+
+from AppConfig.storage import storage
+from Logs.log_recorder import logging
+
+stat_cache_path = './config/statCache.json'  # 元数据缓存文件
+
+
+class StatCache:
+    """
+    以目录修改时间为指纹的文件元数据缓存
+
+    目录中增加、删除或重命名文件都会改变目录的修改时间，因此目录的指纹（修改时间和inode）未变时，
+    其中文件的存在与否一定未变，可直接使用缓存而不必逐个访问文件，启动时只需访问各个目录一次。
+    原地修改文件内容不会改变目录的修改时间，这类变化由文件监视器负责更新。
+
+    刚修改过的目录可能在同一时间精度内再次改变，这样的目录不写入缓存，下次仍重新扫描。
+
+    由Java后端读写数据文件时，文件表由后端提供，本地目录的指纹无法反映其变化，此时缓存不加载、不查找也不写入。
+    """
+
+    racyInterval = 2.0  # 目录修改时间距今小于该秒数时不缓存（FAT文件系统的时间精度为2秒）
+
+    def __init__(self, path: str = stat_cache_path):
+        self.path = path
+        self.dirs = {}  # {目录路径: [修改时间(纳秒), inode]或None（目录不存在）}
+        self.files = {}  # {文件路径: [是否存在, 修改时间, 文件大小]}
+        self.lock = threading.Lock()
+        self.dirty = False
+
+    @staticmethod
+    def enabled() -> bool:
+        """是否使用缓存（由Java后端读写数据文件时不使用）"""
+        return storage.backend is None
+
+    @staticmethod
+    def fingerprint(directory: str):
+        """
+        获取目录的指纹
+        :param directory: 目录路径
+        :return: [修改时间(纳秒), inode]，目录不存在时返回None
+        """
+        try:
+            stat = os.stat(directory)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_ino]
+
+    def load(self):
+        """加载缓存文件"""
+        data = storage.read(self.path) if self.enabled() else None
+        with self.lock:
+            if isinstance(data, dict):
+                self.dirs = dict(data.get('dirs', {}))
+                self.files = dict(data.get('files', {}))
+            else:
+                self.dirs, self.files = {}, {}
+            self.dirty = False
+        logging.info(f'已加载{len(self.files)}条文件元数据缓存')
+
+    def save(self) -> bool:
+        """
+        保存缓存文件（未改变时不写入）
+        :return: 是否保存成功
+        """
+        with self.lock:
+            if not self.dirty or not self.enabled():
+                return True
+            data = {'dirs': dict(self.dirs), 'files': dict(self.files)}
+            self.dirty = False
+        return storage.write(self.path, data)
+
+    def lookup(self, directory: str, paths: list, fingerprint):
+        """
+        查找同一目录下多个文件的缓存
+        :param directory: 目录路径
+        :param paths: 该目录下的文件路径列表
+        :param fingerprint: 目录当前的指纹
+        :return: [(文件路径, 是否存在, 修改时间, 文件大小), ...]，目录已改变或缓存不全时返回None
+        """
+        if not self.enabled():
+            return None
+        with self.lock:
+            if directory not in self.dirs or self.dirs[directory] != fingerprint:
+                return None
+
+            results = []
+            for path in paths:
+                entry = self.files.get(path)
+                if entry is None:
+                    return None
+                results.append((path, *entry))
+            return results
+
+    def update(self, directory: str, fingerprint, results: list):
+        """
+        写入同一目录下多个文件的扫描结果
+        :param directory: 目录路径
+        :param fingerprint: 扫描前获取的目录指纹
+        :param results: [(文件路径, 是否存在, 修改时间, 文件大小), ...]
+        """
+        if not self.enabled():
+            return
+        racy = fingerprint is not None and time.time() - fingerprint[0] / 1e9 < self.racyInterval
+        with self.lock:
+            for path, *entry in results:
+                self.files[path] = entry
+            if racy:
+                self.dirs.pop(directory, None)
+            else:
+                self.dirs[directory] = fingerprint
+            self.dirty = True
+
+    def updateFile(self, path: str, exists: bool, mtime: float, size: int):
+        """
+        写入单个文件的最新元数据（不改变目录指纹）
+        :param path: 文件路径
+        :param exists: 是否存在
+        :param mtime: 修改时间
+        :param size: 文件大小
+        """
+        if not self.enabled():
+            return
+        with self.lock:
+            self.files[path] = [exists, mtime, size]
+            self.dirty = True
+
+    def invalidateDirectory(self, directory: str):
+        """
+        使目录的缓存失效，下次扫描时重新访问其中的文件
+        :param directory: 目录路径
+        """
+        with self.lock:
+            if self.dirs.pop(directory, None) is not None:
+                self.dirty = True
+
+    def prune(self, paths):
+        """
+        只保留指定文件及其所在目录的缓存
+        :param paths: 需要保留的文件路径
+        """
+        paths = set(paths)
+        directories = {os.path.dirname(path) for path in paths}
+        with self.lock:
+            files = {path: entry for path, entry in self.files.items() if path in paths}
+            dirs = {directory: fp for directory, fp in self.dirs.items() if directory in directories}
+            if len(files) != len(self.files) or len(dirs) != len(self.dirs):
+                self.files, self.dirs = files, dirs
+                self.dirty = True
+
+
+statCache = StatCache()
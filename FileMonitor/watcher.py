@@ -0,0 +1,209 @@
+"""文件变化监视模块"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from PyQt6.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+
+from FileMonitor.stat_cache import StatCache
+from Logs.log_recorder import logging
+
+
+class FileWatcher(QObject):
+    """
+    监视被管理文件所在目录的变化
+
+    * 只监视目录而不监视单个文件，同一目录下的多个文件共用一个监视项，按文件引用计数，最后一个文件移除后才取消监视
+    * 系统监视数量达到上限或目录不存在时，改为在后台线程中定时比较目录指纹（轮询）
+    * 同一目录在短时间内的多次变化合并为一次通知
+    * 开启watchFiles后同时监视文件本身，原地修改文件内容（不改变目录）也会通知，按所在目录合并
+
+    构造方法参数
+    ------------
+    * pollInterval: 轮询间隔（毫秒）
+    * debounce: 合并变化通知的时间窗口（毫秒）
+    * watchFiles: 是否同时监视文件本身
+    * parent: 父对象
+    """
+
+    filesChanged = pyqtSignal(list)  # 所在目录发生变化的文件路径列表
+    polled = pyqtSignal(list)  # 轮询线程发现变化的目录（内部使用）
+
+    def __init__(self, pollInterval: int = 5000, debounce: int = 200, watchFiles: bool = False, parent=None):
+        super().__init__(parent)
+        self.watchFiles = watchFiles
+        self.dirs = {}  # {目录路径: {文件路径: 引用计数}}
+        self.pollDirs = {}  # 轮询的目录 {目录路径: 上次的指纹}
+        self.changedDirs = set()  # 等待通知的目录
+
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.__onDirectoryChanged)
+        self.watcher.fileChanged.connect(self.__onFileChanged)
+
+        self.debounceTimer = QTimer(self)
+        self.debounceTimer.setSingleShot(True)
+        self.debounceTimer.setInterval(debounce)
+        self.debounceTimer.timeout.connect(self.__notify)
+
+        self.pollExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='FileWatcherPoll')
+        self.polling = False  # 是否有正在进行的轮询
+        self.polled.connect(self.__onPolled)
+        self.pollTimer = QTimer(self)
+        self.pollTimer.setInterval(pollInterval)
+        self.pollTimer.timeout.connect(self.__poll)
+
+    def setPaths(self, paths: list):
+        """
+        替换全部被监视的文件
+        :param paths: 文件路径列表
+        """
+        self.clear()
+        self.addPaths(paths)
+
+    def addPaths(self, paths: list):
+        """
+        增加被监视的文件
+        :param paths: 文件路径列表
+        """
+        newDirs = []
+        for path in paths:
+            directory = os.path.dirname(path)
+            files = self.dirs.get(directory)
+            if files is None:
+                files = self.dirs[directory] = {}
+                newDirs.append(directory)
+            if path not in files and self.watchFiles and os.path.isfile(path):
+                self.watcher.addPath(path)
+            files[path] = files.get(path, 0) + 1
+
+        if not newDirs:
+            return
+
+        existing = [directory for directory in newDirs if os.path.isdir(directory)]
+        failed = set(self.watcher.addPaths(existing)) if existing else set()
+        for directory in newDirs:
+            if directory in failed or directory not in existing:
+                self.__startPolling(directory)
+
+        if failed:
+            logging.warning(f'{len(failed)}个目录无法由系统监视，改为定时轮询')
+
+    def removePaths(self, paths: list):
+        """
+        减少被监视的文件
+        :param paths: 文件路径列表
+        """
+        removedDirs = []
+        for path in paths:
+            directory = os.path.dirname(path)
+            files = self.dirs.get(directory)
+            if files is None or path not in files:
+                continue
+
+            files[path] -= 1
+            if files[path] <= 0:
+                del files[path]
+                if self.watchFiles and path in self.watcher.files():
+                    self.watcher.removePath(path)
+            if not files:
+                del self.dirs[directory]
+                removedDirs.append(directory)
+
+        watched = set(self.watcher.directories())
+        unwatch = [directory for directory in removedDirs if directory in watched]
+        if unwatch:
+            self.watcher.removePaths(unwatch)
+        for directory in removedDirs:
+            self.pollDirs.pop(directory, None)
+            self.changedDirs.discard(directory)
+        if not self.pollDirs:
+            self.pollTimer.stop()
+
+    def clear(self):
+        """取消全部监视"""
+        paths = self.watcher.directories() + self.watcher.files()
+        if paths:
+            self.watcher.removePaths(paths)
+        self.dirs.clear()
+        self.pollDirs.clear()
+        self.changedDirs.clear()
+        self.pollTimer.stop()
+
+    def shutdown(self):
+        """停止监视并结束轮询线程"""
+        self.clear()
+        self.debounceTimer.stop()
+        self.pollExecutor.shutdown(wait=False, cancel_futures=True)
+
+    def __startPolling(self, directory: str):
+        """将目录改为轮询"""
+        self.pollDirs[directory] = StatCache.fingerprint(directory)
+        if not self.pollTimer.isActive():
+            self.pollTimer.start()
+
+    def __onDirectoryChanged(self, directory: str):
+        """系统通知目录发生变化"""
+        if directory not in self.dirs:
+            return
+
+        if not os.path.isdir(directory):  # 目录被删除或移动后系统不再监视，改为轮询以便发现其恢复
+            self.watcher.removePath(directory)
+            self.__startPolling(directory)
+        self.__markChanged(directory)
+
+    def __onFileChanged(self, path: str):
+        """系统通知文件发生变化（只在开启watchFiles时）"""
+        directory = os.path.dirname(path)
+        if path not in self.dirs.get(directory, ()):
+            return
+        self.__markChanged(directory)
+
+    def __markChanged(self, directory: str):
+        """记录发生变化的目录并重新开始计时"""
+        self.changedDirs.add(directory)
+        self.debounceTimer.start()
+
+    def __notify(self):
+        """通知发生变化的目录中的文件"""
+        paths = [path for directory in self.changedDirs for path in self.dirs.get(directory, ())]
+        self.changedDirs.clear()
+        if self.watchFiles:  # 以替换方式保存的文件不再被系统监视，重新加入
+            watchedFiles = set(self.watcher.files())
+            missing = [path for path in paths if path not in watchedFiles and os.path.isfile(path)]
+            if missing:
+                self.watcher.addPaths(missing)
+        if paths:
+            self.filesChanged.emit(paths)
+
+    def __poll(self):
+        """在后台线程中比较轮询目录的指纹"""
+        if self.polling or not self.pollDirs:
+            return
+
+        self.polling = True
+        self.pollExecutor.submit(self.__pollWorker, dict(self.pollDirs))
+
+    def __pollWorker(self, pollDirs: dict):
+        """轮询线程：找出指纹改变的目录"""
+        changed = []
+        try:
+            for directory, fingerprint in pollDirs.items():
+                current = StatCache.fingerprint(directory)
+                if current != fingerprint:
+                    changed.append((directory, current))
+        finally:
+            self.polled.emit(changed)
+
+    def __onPolled(self, changed: list):
+        """处理轮询结果"""
+        self.polling = False
+        for directory, fingerprint in changed:
+            if directory not in self.pollDirs:
+                continue  # 轮询期间已取消监视
+
+            self.pollDirs[directory] = fingerprint
+            if fingerprint is not None and self.watcher.addPath(directory):  # 目录恢复后重新交给系统监视
+                del self.pollDirs[directory]
+            self.__markChanged(directory)
+
+        if not self.pollDirs:
+            self.pollTimer.stop()
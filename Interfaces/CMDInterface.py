@@ -1,10 +1,16 @@
 """图形化控制台界面"""
-from PyQt6.QtCore import Qt
-from PyQt6.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout
+from collections import deque
 
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QStackedWidget
+
+from Connector.ResourceMonitor import describeSummary
+from Connector.RunManager import RunManager, Run, RunState
 from Connector.SocketClient import SocketClient
-from qfluentwidgets import BodyLabel, LineEdit, PlainTextEdit, PushButton, Dialog, InfoBar, InfoBarPosition, CheckBox, \
-    ToolTipFilter, ToolTipPosition, TextBrowser
+from Interfaces.LogView import LogView
+from Interfaces.ResourceChart import ResourceChart
+from qfluentwidgets import BodyLabel, LineEdit, PushButton, Dialog, InfoBar, InfoBarPosition, CheckBox, \
+    ToolTipFilter, ToolTipPosition, SearchLineEdit, TabBar, TabCloseButtonDisplayMode
 from qfluentwidgets import FluentIcon as FIF
 
 from Logs.log_recorder import logging
@@ -13,6 +19,8 @@ from Logs.log_recorder import logging
 class CMDInterface(QWidget):
     """图形化控制台界面类"""
 
+    maxScheduledRuns = 10  # 保留的已结束计划运行的标签页数，更早的自动关闭（运行记录中仍可查看）
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.parentWindow = parent
@@ -32,12 +40,22 @@ class CMDInterface(QWidget):
         # 加载其他控件
         self.initControls()
 
-        # 实例化连接子进程控制台的套接字客户端
-        self.socketClient = SocketClient(self, self.cmdInputLineEdit, self.outputControl)
+        # 管理同时运行的文件，每次运行各有一个套接字客户端和输出标签页
+        self.outputs = {}  # 运行编号 -> 显示该次运行输出的控件
+        self.finishedScheduledRuns = deque()  # 已结束的计划运行（按结束顺序）
+        self.runManager = RunManager(self.createClient, self)
+        self.runManager.runStarted.connect(self.__onRunStateChanged)
+        self.runManager.runFinished.connect(self.__onRunStateChanged)
+        self.runManager.activeCountChanged.connect(self.__onActiveCountChanged)
+
+        # 有文件运行时定期刷新资源占用图表（只在收到新的采样时重绘）
+        self.resourceTimer = QTimer(self)
+        self.resourceTimer.setInterval(500)
+        self.resourceTimer.timeout.connect(self.refreshResources)
 
         # 设置控件信号连接
-        self.sendCommandButton.clicked.connect(self.socketClient.send_command)
-        self.cmdInputLineEdit.returnPressed.connect(self.socketClient.send_command)
+        self.sendCommandButton.clicked.connect(self.sendCommand)
+        self.cmdInputLineEdit.returnPressed.connect(self.sendCommand)
 
     def initControls(self):
         """初始化控件"""
@@ -68,6 +86,14 @@ class CMDInterface(QWidget):
         self.mainLayout.addLayout(outputLayout)
         CMDOutputLabel = BodyLabel('控制台输出')
         outputLayout.addWidget(CMDOutputLabel, 0, Qt.AlignmentFlag.AlignLeft)
+        outputLayout.addStretch(1)
+
+        self.searchLineEdit = SearchLineEdit()  # 在控制台输出中查找
+        self.searchLineEdit.setPlaceholderText('查找输出内容')
+        self.searchLineEdit.setFixedWidth(240)
+        self.searchLineEdit.searchSignal.connect(self.findOutput)
+        self.searchLineEdit.returnPressed.connect(self.searchLineEdit.search)
+        outputLayout.addWidget(self.searchLineEdit, 0, Qt.AlignmentFlag.AlignRight)
 
         self.autoScrollCheckBox = CheckBox('自动滚动')  # 自动滚动复选框
         self.autoScrollCheckBox.setToolTip('输出内容更新时自动滚动至页面底部')
@@ -77,37 +103,127 @@ class CMDInterface(QWidget):
         self.autoScrollCheckBox.checkStateChanged.connect(self.setAutoScroll)
         outputLayout.addWidget(self.autoScrollCheckBox, 0, Qt.AlignmentFlag.AlignRight)
 
-        self.outputControl = TextBrowser()  # 显示控制台内容的控件
-        self.outputControl.setReadOnly(True)  # 设置为只读状态
-        self.outputControl.document().setMaximumBlockCount(1000)  # 限制最大行数
-        self.mainLayout.addWidget(self.outputControl, 1)
+        self.resourceCheckBox = CheckBox('资源占用')  # 显示资源占用图表复选框
+        self.resourceCheckBox.setToolTip('显示当前运行的CPU和内存占用图表及统计')
+        self.resourceCheckBox.installEventFilter(
+            ToolTipFilter(self.resourceCheckBox, position=ToolTipPosition.BOTTOM_RIGHT))
+        self.resourceCheckBox.setChecked(True)
+        self.resourceCheckBox.checkStateChanged.connect(self.setResourcesVisible)
+        outputLayout.addWidget(self.resourceCheckBox, 0, Qt.AlignmentFlag.AlignRight)
+
+        self.tabBar = TabBar()  # 每次运行一个标签页
+        self.tabBar.setAddButtonVisible(False)
+        self.tabBar.setScrollable(True)
+        self.tabBar.setCloseButtonDisplayMode(TabCloseButtonDisplayMode.ON_HOVER)
+        self.tabBar.currentChanged.connect(self.__onCurrentTabChanged)
+        self.tabBar.tabCloseRequested.connect(self.__onTabCloseRequested)
+        self.mainLayout.addWidget(self.tabBar)
+
+        """资源占用"""
+        self.resourceChart = ResourceChart()  # 当前运行的CPU和内存占用图表
+        self.resourceChart.setFixedHeight(110)
+        self.mainLayout.addWidget(self.resourceChart)
+        self.resourceLabel = BodyLabel()  # 当前运行的资源占用统计
+        self.resourceLabel.setWordWrap(True)
+        self.mainLayout.addWidget(self.resourceLabel)
+        self.setResourcesVisible()
+
+        self.outputStack = QStackedWidget()
+        self.idleOutput = LogView()  # 没有运行记录时显示的空白输出控件
+        self.outputStack.addWidget(self.idleOutput)
+        self.mainLayout.addWidget(self.outputStack, 1)
+
+    @property
+    def outputControl(self) -> LogView:
+        """当前标签页的输出控件"""
+        return self.outputStack.currentWidget()
+
+    def currentRun(self) -> Run:
+        """当前标签页对应的运行，没有标签页时为None"""
+        item = self.tabBar.currentTab()
+        return self.runManager.runs.get(int(item.routeKey())) if item else None
+
+    def createClient(self, run: Run) -> SocketClient:
+        """
+        为一次运行创建输出标签页和套接字客户端（由运行管理器调用）
+        :param run: 新的运行
+        :return: 连接至该次运行控制台的套接字客户端
+        """
+        outputControl = LogView()  # 显示控制台内容的控件（只绘制可见的行，不限制最大行数）
+        outputControl.setAutoScroll(self.autoScrollCheckBox.isChecked())
+        self.outputs[run.runId] = outputControl
+        self.outputStack.addWidget(outputControl)
+
+        self.tabBar.addTab(str(run.runId), run.title, FIF.HISTORY)
+        self.tabBar.setTabToolTip(self.tabBar.count() - 1, run.filePath)
+        self.tabBar.setCurrentTab(str(run.runId))
+        self.outputStack.setCurrentWidget(outputControl)
+
+        return SocketClient(self, self.cmdInputLineEdit, outputControl)
+
+    def runFile(self, filePath: str, title: str = None, scheduled: bool = False) -> Run:
+        """
+        运行文件，同时运行的文件数达到上限时排队
+        :param filePath: 文件路径
+        :param title: 标签页的标题，为空则使用文件名
+        :param scheduled: 是否由运行计划触发，此类运行结束后只保留最近maxScheduledRuns个标签页
+        :return: 对应的运行
+        """
+        logging.info(f'运行文件：{filePath}')
+        return self.runManager.submit(filePath, title, scheduled=scheduled)
+
+    def sendCommand(self):
+        """将命令输入框中的命令发送至当前标签页对应的进程"""
+        run = self.currentRun()
+        if run is None or run.state != RunState.RUNNING:
+            InfoBar.warning(
+                "提示",
+                '没有正在运行的文件',
+                duration=1500,
+                position=InfoBarPosition.TOP,
+                parent=self.parentWindow
+            )
+            logging.warning('没有正在运行的文件，无需发送命令')
+            return
+
+        run.client.send_command()
 
     def setAutoScroll(self):
         autoScroll = self.autoScrollCheckBox.isChecked()
         logging.info(f'切换自动滚动：{autoScroll}')
-        self.socketClient.autoScroll = autoScroll
+        for outputControl in self.outputs.values():
+            outputControl.setAutoScroll(autoScroll)
 
-    def startCommunication(self):
-        """启动与Java子进程的通信"""
-        logging.info('启动控制台通信')
-        self.clearOutput()
-        self.socketClient.setup_socket()
+    def findOutput(self, text: str):
+        """
+        在控制台输出中查找下一个包含指定文本的行
+        :param text: 需要查找的文本
+        """
+        if not text:
+            return
 
-        autoScroll = self.autoScrollCheckBox.isChecked()
-        self.socketClient.autoScroll = autoScroll
+        if not self.outputControl.findText(text):
+            InfoBar.warning(
+                "提示",
+                f'未找到“{text}”',
+                duration=1500,
+                position=InfoBarPosition.TOP,
+                parent=self.parentWindow
+            )
 
     def stopCommunicationAndKill(self, withMessageBox: bool = False):
         """
         结束与Java子进程的通信并结束进程
-        :param withMessageBox:是否弹出确认框
+        :param withMessageBox:是否弹出确认框（为真时只结束当前标签页的进程，否则结束全部进程）
         """
         if not withMessageBox:
-            self.socketClient.send_command('#kill#')
+            self.runManager.killAll()
         else:
-            if self.socketClient.running:
+            run = self.currentRun()
+            if run is not None and run.isActive():
                 w = Dialog('结束进程', '确认要结束进程吗？这可能导致进程无法正常关闭', self.parentWindow)
                 if w.exec():
-                    self.socketClient.send_command('#kill#')
+                    self.runManager.kill(run)
             else:
                 InfoBar.error(
                     "错误",
@@ -117,6 +233,120 @@ class CMDInterface(QWidget):
                     parent=self.parentWindow
                 )
 
+    def setResourcesVisible(self):
+        """按复选框显示或隐藏资源占用图表"""
+        visible = self.resourceCheckBox.isChecked()
+        self.resourceChart.setVisible(visible)
+        self.resourceLabel.setVisible(visible)
+        self.refreshResources()
+
+    def refreshResources(self):
+        """刷新当前运行的资源占用图表和统计"""
+        if not self.resourceCheckBox.isChecked():
+            return
+
+        run = self.currentRun()
+        series = run.client.receiver.resources if run is not None and run.client is not None else None
+        if series is not self.resourceChart.series:
+            self.resourceChart.setSeries(series)
+        else:
+            self.resourceChart.refresh()  # 没有新的采样时不重绘
+
+        summary = series.summary() if series is not None else None
+        if summary is not None:
+            text = f'整次运行：{describeSummary(summary)}'
+        elif run is not None and run.isActive():
+            text = '等待资源占用采样'
+        elif run is not None:
+            text = '没有资源占用数据（采样间隔为0，或当前系统无法采样）'
+        else:
+            text = ''
+        if text != self.resourceLabel.text():
+            self.resourceLabel.setText(text)
+
     def clearOutput(self):
         """清空命令输出的内容"""
         self.outputControl.clear()
+
+    def __onCurrentTabChanged(self, index: int):
+        """切换标签页时显示对应的输出"""
+        item = self.tabBar.tabItem(index) if index >= 0 else None
+        self.outputStack.setCurrentWidget(self.outputs[int(item.routeKey())] if item else self.idleOutput)
+        self.refreshResources()
+
+    def closeRun(self, run: Run) -> bool:
+        """
+        关闭已结束运行的标签页，释放其输出控件和溢出文件
+        :param run: 需要关闭的运行
+        :return: 是否已关闭（未结束的运行不能关闭）
+        """
+        if not self.runManager.remove(run):
+            return False
+
+        index = next(i for i in range(self.tabBar.count()) if self.tabBar.tabItem(i).routeKey() == str(run.runId))
+        self.tabBar.removeTab(index)
+        outputControl = self.outputs.pop(run.runId)
+        self.outputStack.removeWidget(outputControl)
+        outputControl.store.close()  # 释放溢出到临时文件的内容
+        outputControl.deleteLater()
+        self.__onCurrentTabChanged(self.tabBar.currentIndex())
+        return True
+
+    def __onTabCloseRequested(self, index: int):
+        """关闭已结束运行的标签页"""
+        run = self.runManager.runs[int(self.tabBar.tabItem(index).routeKey())]
+        if not self.closeRun(run):
+            InfoBar.warning(
+                "提示",
+                '请先结束该文件的运行',
+                duration=1500,
+                position=InfoBarPosition.TOP,
+                parent=self.parentWindow
+            )
+
+    def __onRunStateChanged(self, run: Run):
+        """运行开始或结束时更新标签页图标"""
+        item = self.tabBar.tab(str(run.runId))
+        if item is None:
+            return
+
+        icons = {RunState.RUNNING: FIF.PLAY, RunState.FINISHED: FIF.ACCEPT}
+        item.setIcon(icons.get(run.state, FIF.CANCEL))
+
+        if run.scheduled and not run.isActive():
+            self.__trimScheduledRuns(run)
+
+        if run.state == RunState.FAILED:
+            InfoBar.error(
+                "运行失败",
+                f'“{run.title}”未能正常运行，请前往控制台界面查看详情',
+                duration=1500,
+                position=InfoBarPosition.TOP,
+                parent=self.parentWindow
+            )
+
+    def __onActiveCountChanged(self, count: int):
+        """有文件运行时定期刷新资源占用，全部结束后停止"""
+        if count:
+            self.resourceTimer.start()
+        else:
+            self.resourceTimer.stop()
+            self.refreshResources()
+
+    def __trimScheduledRuns(self, run: Run):
+        """
+        计划运行结束：超出保留数量时自动关闭最早结束的计划运行（当前显示的标签页除外）
+        :param run: 刚结束的计划运行
+        """
+        self.finishedScheduledRuns.append(run)
+        current = self.currentRun()
+        kept = deque()
+        while self.finishedScheduledRuns and len(self.finishedScheduledRuns) + len(kept) > self.maxScheduledRuns:
+            oldest = self.finishedScheduledRuns.popleft()
+            if oldest.runId not in self.outputs:
+                continue  # 已被手动关闭
+            if oldest is current:
+                kept.append(oldest)
+                continue
+            self.closeRun(oldest)
+        self.finishedScheduledRuns.extendleft(reversed(kept))
@@ -0,0 +1,637 @@
+"""文件列表数据模型模块"""
+import bisect
+import os
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QAbstractProxyModel, QModelIndex, QTimer, pyqtSignal
+
+from FileMonitor.scanner import normalizePath
+from FileMonitor.search_index import SearchIndex
+
+
+class FileRecord:
+    """文件列表中的一行"""
+
+    __slots__ = ('name', 'remark', 'path', 'date', 'type', 'size', 'rowId')
+
+    def __init__(self, name: str, remark: str, path: str, date: str = '', type: str = '', size: str = '',
+                 rowId: int = None):
+        self.name = name  # 文件名
+        self.remark = remark  # 备注
+        self.path = path  # 文件路径
+        self.date = date  # 修改日期
+        self.type = type  # 文件类型
+        self.size = size  # 文件大小
+        self.rowId = rowId  # 行ID（加入数据模型时分配，随数据保存，重定向后不变）
+
+    def toRow(self) -> list:
+        """转换为保存到文件的行 [文件名,备注,文件路径,行ID]"""
+        return [self.name, self.remark, self.path, self.rowId]
+
+
+class FileTableModel(QAbstractTableModel):
+    """
+    文件列表的数据模型
+
+    每一行只保存一个FileRecord对象，表格视图按需读取数据，不再为每个单元格创建控件对象；
+    修改数据时只通知发生改变的单元格范围，不重置整个模型。
+
+    所有修改都经过本模型，因此由模型同时维护三个索引：行ID -> 行下标、规范化路径 -> 行ID、规范化目录 -> 行ID集合，
+    按路径查找行、判断文件是否已在列表中以及查询同一目录下的文件都无需遍历全部行。
+    每一行有一个不会改变的行ID，预设可以通过行ID引用文件，文件被重定向后仍能找到。
+    """
+
+    headers = ['文件名', '备注', '文件路径', '修改日期', '文件类型', '大小']
+    fields = FileRecord.__slots__  # 属性名，前len(headers)个与列下标一一对应
+    remarkColumn = 1
+
+    remarkEdited = pyqtSignal(int, str)  # 用户编辑了备注（行下标，新的备注）
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.records = []
+        self.idRows = {}  # 行ID -> 行下标
+        self.pathIds = {}  # 规范化路径 -> 行ID
+        self.dirIds = {}  # 规范化目录 -> 行ID集合
+        self.nextId = 1
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index: QModelIndex, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole, Qt.ItemDataRole.ToolTipRole):
+            return getattr(self.records[index.row()], self.fields[index.column()])
+        return None
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index: QModelIndex):
+        flags = super().flags(index)
+        if index.column() == self.remarkColumn:
+            flags |= Qt.ItemFlag.ItemIsEditable  # 只有备注列可编辑
+        return flags
+
+    def setData(self, index: QModelIndex, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.EditRole or index.column() != self.remarkColumn:
+            return False
+
+        record = self.records[index.row()]
+        if record.remark == value:
+            return False
+
+        record.remark = value
+        self.dataChanged.emit(index, index, [role])
+        self.remarkEdited.emit(index.row(), value)
+        return True
+
+    def record(self, row: int) -> FileRecord:
+        """获取指定行的记录"""
+        return self.records[row]
+
+    def rowOfId(self, rowId) -> int:
+        """
+        按行ID查找行
+        :param rowId: 行ID
+        :return: 行下标，没有该行时返回-1
+        """
+        return self.idRows.get(rowId, -1)
+
+    def rowOfPath(self, path: str) -> int:
+        """
+        按文件路径查找行（不区分路径的写法）
+        :param path: 文件路径
+        :return: 行下标，文件不在列表中时返回-1
+        """
+        rowId = self.pathIds.get(normalizePath(path))
+        return -1 if rowId is None else self.idRows[rowId]
+
+    def containsPath(self, path: str) -> bool:
+        """文件是否已在列表中"""
+        return normalizePath(path) in self.pathIds
+
+    def normalizedPaths(self):
+        """列表中全部文件的规范化路径（只读视图）"""
+        return self.pathIds.keys()
+
+    def rowsInDirectory(self, directory: str) -> list:
+        """
+        获取位于指定目录（不包括子目录）的全部行
+        :param directory: 目录路径
+        :return: 按顺序排列的行下标列表
+        """
+        return sorted(self.idRows[rowId] for rowId in self.dirIds.get(normalizePath(directory), ()))
+
+    def setRecords(self, records: list):
+        """
+        替换全部记录（仅用于加载数据），没有行ID或行ID重复的记录将分配新的行ID
+        :param records: FileRecord列表
+        """
+        self.beginResetModel()
+        self.records = records
+        self.idRows.clear()
+        self.pathIds.clear()
+        self.dirIds.clear()
+        self.nextId = max((record.rowId for record in records if isinstance(record.rowId, int)), default=0) + 1
+        for row, record in enumerate(records):
+            self.__index(record, row)
+        self.endResetModel()
+
+    def appendRecords(self, records: list):
+        """
+        在末尾追加记录
+        :param records: FileRecord列表
+        """
+        if not records:
+            return
+
+        first = len(self.records)
+        self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+        self.records.extend(records)
+        for row, record in enumerate(records, first):
+            self.__index(record, row)
+        self.endInsertRows()
+
+    def removeRecords(self, rows):
+        """
+        删除指定的多行，连续的行合并为一次删除
+        :param rows: 行下标的集合
+        """
+        rows = sorted(set(rows), reverse=True)
+        if not rows:
+            return
+
+        lowest = rows[-1]
+        while rows:
+            last = first = rows.pop(0)
+            while rows and rows[0] == first - 1:
+                first = rows.pop(0)
+
+            self.beginRemoveRows(QModelIndex(), first, last)
+            for record in self.records[first:last + 1]:
+                self.__unindex(record)
+            del self.records[first:last + 1]
+            self.endRemoveRows()
+
+        # 被删除的行之后的行下标均已改变
+        for row in range(lowest, len(self.records)):
+            self.idRows[self.records[row].rowId] = row
+
+    def updateRecord(self, row: int, **fields):
+        """
+        修改一行中的部分属性，只通知改变的列
+        :param row: 行下标
+        :param fields: 需要修改的属性 {属性名: 新的值}
+        """
+        record = self.records[row]
+        pathChanged = 'path' in fields and fields['path'] != record.path
+        if pathChanged:
+            self.__unindex(record)
+
+        columns = []
+        for field, value in fields.items():
+            setattr(record, field, value)
+            columns.append(self.fields.index(field))
+
+        if pathChanged:
+            self.__index(record, row)
+
+        if columns:
+            self.dataChanged.emit(self.index(row, min(columns)), self.index(row, max(columns)))
+
+    def updateInfos(self, rowInfos: dict):
+        """
+        批量修改修改日期、文件类型和大小三列，只通知包含这些行的最小范围
+        :param rowInfos: {行下标: [修改日期,文件类型,文件大小]}
+        """
+        if not rowInfos:
+            return
+
+        for row, info in rowInfos.items():
+            record = self.records[row]
+            record.date, record.type, record.size = info
+        self.notifyColumnsChanged(3, 5, min(rowInfos), max(rowInfos))
+
+    def notifyColumnsChanged(self, firstColumn: int, lastColumn: int, firstRow: int = 0, lastRow: int = None):
+        """
+        在直接修改记录后通知一段连续的单元格范围已改变
+        :param firstColumn: 起始列
+        :param lastColumn: 结束列
+        :param firstRow: 起始行
+        :param lastRow: 结束行（为空则到最后一行）
+        """
+        if lastRow is None:
+            lastRow = len(self.records) - 1
+        if lastRow < firstRow:
+            return
+
+        self.dataChanged.emit(self.index(firstRow, firstColumn), self.index(lastRow, lastColumn))
+
+    def __index(self, record: FileRecord, row: int):
+        """将一行加入索引，必要时分配行ID"""
+        if not isinstance(record.rowId, int) or record.rowId in self.idRows:
+            record.rowId = self.nextId
+        self.nextId = max(self.nextId, record.rowId + 1)
+
+        key = normalizePath(record.path)
+        self.idRows[record.rowId] = row
+        self.pathIds.setdefault(key, record.rowId)  # 重复的路径只索引第一行
+        self.dirIds.setdefault(os.path.dirname(key), set()).add(record.rowId)
+
+    def __unindex(self, record: FileRecord):
+        """将一行移出索引"""
+        key = normalizePath(record.path)
+        self.idRows.pop(record.rowId, None)
+        if self.pathIds.get(key) == record.rowId:
+            del self.pathIds[key]
+
+        directory = os.path.dirname(key)
+        rowIds = self.dirIds.get(directory)
+        if rowIds is not None:
+            rowIds.discard(record.rowId)
+            if not rowIds:
+                del self.dirIds[directory]
+
+
+class _SortKeys:
+    """按显示顺序排列的排序键的只读序列（用于二分查找插入位置，不必生成整个键列表）"""
+
+    def __init__(self, rows: list, key):
+        self.rows = rows
+        self.key = key
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        return self.key(self.rows[i])
+
+
+class FileProxyModel(QAbstractProxyModel):
+    """
+    过滤和排序文件列表的代理模型
+
+    QSortFilterProxyModel逐行调用filterAcceptsRow()判断是否显示、排序时逐次调用data()比较两行，
+    在Python中实现数据模型时每次都要调用Python函数，行数很多时每输入一个字或点击一次表头都要等待很久。
+    本模型自行维护检索索引，搜索文本改变时由索引直接得到匹配的行ID；排序时以记录的属性为键调用一次sorted()。
+    显示的行保存为数据模型中的行下标列表，代理模型中的第i行即为该列表中的第i个行下标。
+
+    索引随数据模型的信号同步更新：插入的行加入索引，删除的行移出索引，文件名、备注或路径改变的行重新索引；
+    其他列改变时只转发通知，改变的列是排序列且顺序被打乱时重新排序。
+    加载数据后由定时器在事件循环空闲时分批建立索引，不阻塞界面；尚未完成时开始搜索则立即完成剩余部分。
+
+    构造方法参数
+    ------------
+    * sourceModel: 文件列表的数据模型
+    * parent: 父对象
+    """
+
+    indexedColumns = (0, 1, 2)  # 建立索引的列（文件名、备注、文件路径）
+    resetLimit = 64  # 显示的行变化超过该数量时重置模型，而不是逐行通知
+    indexBatchSize = 1000  # 加载数据后每次建立索引的行数
+
+    def __init__(self, sourceModel: FileTableModel, parent=None):
+        super().__init__(parent)
+        self.searchIndex = SearchIndex()
+        self.unindexed = set()  # 尚未建立索引的行ID
+        self.indexTimer = QTimer(self)
+        self.indexTimer.setInterval(0)
+        self.indexTimer.timeout.connect(lambda: self.__indexPending(self.indexBatchSize))
+        self.query = ''
+        self.sortColumn = -1  # 排序列，为-1时按数据模型中的顺序显示
+        self.sortOrder = Qt.SortOrder.AscendingOrder
+        self.rows = []  # 显示的行在数据模型中的行下标（按显示顺序）
+        self.positions = None  # 数据模型中的行下标 -> 显示的行下标，显示的行改变后置为None，用到时重新生成
+        self.setSourceModel(sourceModel)
+
+        sourceModel.modelAboutToBeReset.connect(self.beginResetModel)
+        sourceModel.modelReset.connect(self.__onSourceReset)
+        sourceModel.rowsInserted.connect(self.__onRowsInserted)
+        sourceModel.rowsAboutToBeRemoved.connect(self.__onRowsAboutToBeRemoved)
+        sourceModel.rowsRemoved.connect(self.__onRowsRemoved)
+        sourceModel.dataChanged.connect(self.__onDataChanged)
+        self.beginResetModel()
+        self.__onSourceReset()
+
+    def setQuery(self, query: str) -> int:
+        """
+        设置搜索文本并重新过滤
+        :param query: 搜索文本，多个搜索词以空格分隔，为空时显示全部文件
+        :return: 显示的文件数
+        """
+        self.query = query.strip()
+        self.beginResetModel()
+        self.__setRows(self.__sorted(self.__matchedRows()))
+        self.endResetModel()
+        return len(self.rows)
+
+    def isFiltering(self) -> bool:
+        """是否正在按搜索文本过滤"""
+        return bool(self.query)
+
+    def setContentEnabled(self, enabled: bool):
+        """
+        开启或关闭脚本内容的搜索
+        :param enabled: 是否搜索脚本内容
+        """
+        self.searchIndex.setContentEnabled(enabled)
+        self.__refilter()
+
+    def setContents(self, contents: list):
+        """
+        更新脚本内容的索引
+        :param contents: [(文件路径, 词的集合), ...]
+        """
+        source = self.sourceModel()
+        for path, tokens in contents:
+            rowId = source.pathIds.get(normalizePath(path))
+            if rowId is not None:
+                self.searchIndex.setContent(rowId, tokens)
+        self.__refilter()
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder):
+        self.sortColumn = column
+        self.sortOrder = order
+        self.__resort()
+
+    def index(self, row: int, column: int, parent=QModelIndex()):
+        if parent.isValid() or not 0 <= row < len(self.rows) or not 0 <= column < self.columnCount():
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index: QModelIndex = None):
+        if index is None:  # QObject.parent()
+            return super().parent()
+        return QModelIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.sourceModel().columnCount()
+
+    def headerData(self, section: int, orientation: Qt.Orientation, role=Qt.ItemDataRole.DisplayRole):
+        return self.sourceModel().headerData(section, orientation, role)
+
+    def mapToSource(self, proxyIndex: QModelIndex) -> QModelIndex:
+        if not proxyIndex.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(self.rows[proxyIndex.row()], proxyIndex.column())
+
+    def mapFromSource(self, sourceIndex: QModelIndex) -> QModelIndex:
+        if not sourceIndex.isValid():
+            return QModelIndex()
+        row = self.__proxyRow(sourceIndex.row())
+        return QModelIndex() if row < 0 else self.createIndex(row, sourceIndex.column())
+
+    def __setRows(self, rows: list):
+        """替换显示的行"""
+        self.rows = rows
+        self.positions = None
+
+    def __proxyRow(self, sourceRow: int) -> int:
+        """数据模型中的行在本模型中的行下标，该行未显示时返回-1"""
+        if self.sortColumn < 0:  # 按数据模型中的顺序显示时行下标升序排列，直接二分查找
+            i = bisect.bisect_left(self.rows, sourceRow)
+            return i if i < len(self.rows) and self.rows[i] == sourceRow else -1
+
+        if self.positions is None:
+            self.positions = {sourceRow: i for i, sourceRow in enumerate(self.rows)}
+        return self.positions.get(sourceRow, -1)
+
+    def __sortKey(self):
+        """当前排序列的排序键函数（参数为数据模型中的行下标），不排序时返回None"""
+        if self.sortColumn < 0:
+            return None
+        records = self.sourceModel().records
+        field = FileTableModel.fields[self.sortColumn]
+        return lambda sourceRow: getattr(records[sourceRow], field)
+
+    def __sorted(self, rows: list) -> list:
+        """
+        按当前排序列排序
+        :param rows: 数据模型中的行下标（升序）
+        :return: 排序后的行下标，键相同的行保持数据模型中的顺序
+        """
+        key = self.__sortKey()
+        if key is None:
+            return rows
+
+        if self.sortOrder == Qt.SortOrder.AscendingOrder:
+            return sorted(rows, key=key)
+        return sorted(rows, key=key, reverse=True)
+
+    def __insertPosition(self, sourceRow: int) -> int:
+        """新显示的行应插入的位置"""
+        key = self.__sortKey()
+        if key is None:
+            return bisect.bisect_left(self.rows, sourceRow)
+
+        keys = _SortKeys(self.rows, key)
+        if self.sortOrder == Qt.SortOrder.AscendingOrder:
+            return bisect.bisect_right(keys, key(sourceRow))
+
+        # 降序时在键相同的行之后插入
+        lo, hi, value = 0, len(self.rows), key(sourceRow)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if keys[mid] < value:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def __resort(self):
+        """按当前排序列重新排序，保持选中的行和当前行"""
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        sourceIndexes = [self.mapToSource(index) for index in persistent]
+
+        self.__setRows(self.__sorted(sorted(self.rows)))
+
+        self.changePersistentIndexList(persistent, [self.mapFromSource(index) for index in sourceIndexes])
+        self.layoutChanged.emit()
+
+    def __indexRecord(self, record: FileRecord):
+        """将一行的文件名、备注和路径加入索引"""
+        self.unindexed.discard(record.rowId)
+        self.searchIndex.setDocument(record.rowId, record.name, record.remark, record.path)
+
+    def __indexPending(self, limit: int = None):
+        """
+        为尚未建立索引的行建立索引
+        :param limit: 本次最多处理的行数，为空时全部处理
+        """
+        source = self.sourceModel()
+        count = len(self.unindexed) if limit is None else min(limit, len(self.unindexed))
+        for _ in range(count):
+            rowId = self.unindexed.pop()
+            self.searchIndex.setDocument(rowId, *(getattr(source.record(source.idRows[rowId]), field)
+                                                  for field in ('name', 'remark', 'path')))
+        if not self.unindexed:
+            self.indexTimer.stop()
+
+    def __matchedIds(self):
+        """匹配搜索文本的行ID集合，不过滤时为None"""
+        if not self.query:
+            return None
+        if self.unindexed:
+            self.__indexPending()
+        return self.searchIndex.search(self.query)
+
+    def __matchedRows(self) -> list:
+        """匹配搜索文本的行在数据模型中的行下标（升序）"""
+        records = self.sourceModel().records
+        ids = self.__matchedIds()
+        if ids is None:
+            return list(range(len(records)))
+        if len(ids) < len(records) // 8:  # 匹配的行较少时按行ID查找再排序
+            idRows = self.sourceModel().idRows
+            return sorted(idRows[rowId] for rowId in ids if rowId in idRows)
+        return [row for row, record in enumerate(records) if record.rowId in ids]
+
+    def __refilter(self):
+        """索引改变后重新过滤，只通知显示与否发生变化的行"""
+        if not self.query:
+            return
+
+        matched = self.__matchedRows()
+        old, new = set(self.rows), set(matched)
+        if old == new:
+            return
+
+        removed, added = old - new, new - old
+        if len(removed) + len(added) > self.resetLimit:
+            self.beginResetModel()
+            self.__setRows(self.__sorted(matched))
+            self.endResetModel()
+            return
+
+        for row in sorted((self.__proxyRow(sourceRow) for sourceRow in removed), reverse=True):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.rows[row]
+            self.positions = None
+            self.endRemoveRows()
+        for sourceRow in sorted(added):
+            row = self.__insertPosition(sourceRow)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.rows.insert(row, sourceRow)
+            self.positions = None
+            self.endInsertRows()
+
+    def __onSourceReset(self):
+        """数据模型重置后重建索引（beginResetModel()已在modelAboutToBeReset时调用）"""
+        self.searchIndex.clear()
+        self.unindexed = set(self.sourceModel().idRows)
+        self.indexTimer.start()  # 在事件循环空闲时分批建立索引
+        self.__setRows(self.__sorted(self.__matchedRows()))
+        self.endResetModel()
+
+    def __onRowsInserted(self, parent: QModelIndex, first: int, last: int):
+        """数据模型插入了行"""
+        records = self.sourceModel().records
+        for sourceRow in range(first, last + 1):
+            self.__indexRecord(records[sourceRow])
+
+        # 插入位置之后的行下标整体后移，显示的行本身没有改变，不需要通知
+        count = last - first + 1
+        if first < len(records) - count:
+            self.__setRows([sourceRow + count if sourceRow >= first else sourceRow for sourceRow in self.rows])
+
+        ids = self.__matchedIds()
+        newRows = [sourceRow for sourceRow in range(first, last + 1) if ids is None or records[sourceRow].rowId in ids]
+        if not newRows:
+            return
+
+        if self.sortColumn < 0:  # 新的行在数据模型中是连续的，在本模型中也是连续的
+            row = bisect.bisect_left(self.rows, first)
+            self.beginInsertRows(QModelIndex(), row, row + len(newRows) - 1)
+            self.rows[row:row] = newRows
+            self.positions = None
+            self.endInsertRows()
+        elif len(newRows) > self.resetLimit:
+            self.beginResetModel()
+            self.__setRows(self.__sorted(sorted(self.rows + newRows)))
+            self.endResetModel()
+        else:
+            for sourceRow in newRows:
+                row = self.__insertPosition(sourceRow)
+                self.beginInsertRows(QModelIndex(), row, row)
+                self.rows.insert(row, sourceRow)
+                self.positions = None
+                self.endInsertRows()
+
+    def __onRowsAboutToBeRemoved(self, parent: QModelIndex, first: int, last: int):
+        """数据模型即将删除行（此时记录仍在数据模型中）"""
+        records = self.sourceModel().records
+        for sourceRow in range(first, last + 1):
+            self.unindexed.discard(records[sourceRow].rowId)
+            self.searchIndex.remove(records[sourceRow].rowId)
+
+        # 被删除的行在本模型中可能不连续（排序时），按连续的段从后往前删除
+        rows = [row for row, sourceRow in enumerate(self.rows) if first <= sourceRow <= last]
+        while rows:
+            end = start = rows.pop()
+            while rows and rows[-1] == start - 1:
+                start = rows.pop()
+            self.beginRemoveRows(QModelIndex(), start, end)
+            del self.rows[start:end + 1]
+            self.positions = None
+            self.endRemoveRows()
+
+    def __onRowsRemoved(self, parent: QModelIndex, first: int, last: int):
+        """数据模型删除行后，之后的行下标整体前移"""
+        count = last - first + 1
+        self.__setRows([sourceRow - count if sourceRow > last else sourceRow for sourceRow in self.rows])
+
+    def __onDataChanged(self, topLeft: QModelIndex, bottomRight: QModelIndex, roles=()):
+        """数据模型中的单元格改变"""
+        top, bottom = topLeft.row(), bottomRight.row()
+        left, right = topLeft.column(), bottomRight.column()
+        if left <= self.indexedColumns[-1] and right >= self.indexedColumns[0]:
+            records = self.sourceModel().records
+            for sourceRow in range(top, bottom + 1):
+                self.__indexRecord(records[sourceRow])
+            self.__refilter()  # 修改后可能不再匹配或开始匹配
+
+        if left <= self.sortColumn <= right and not self.__inOrder(top, bottom):
+            self.__resort()
+            return
+
+        if self.sortColumn < 0:  # 改变的行在本模型中也是连续的
+            lo, hi = bisect.bisect_left(self.rows, top), bisect.bisect_right(self.rows, bottom)
+            if hi > lo:
+                self.dataChanged.emit(self.index(lo, left), self.index(hi - 1, right), roles)
+        elif bottom - top < self.resetLimit:
+            for sourceRow in range(top, bottom + 1):
+                row = self.__proxyRow(sourceRow)
+                if row >= 0:
+                    self.dataChanged.emit(self.index(row, left), self.index(row, right), roles)
+        elif self.rows:
+            self.dataChanged.emit(self.index(0, left), self.index(len(self.rows) - 1, right), roles)
+
+    def __inOrder(self, top: int, bottom: int) -> bool:
+        """数据模型中的一段行改变后，它们在本模型中是否仍与相邻的行保持排序"""
+        key = self.__sortKey()
+        ascending = self.sortOrder == Qt.SortOrder.AscendingOrder
+        for sourceRow in range(top, bottom + 1):
+            row = self.__proxyRow(sourceRow)
+            if row < 0:
+                continue
+            value = key(sourceRow)
+            if row > 0:
+                previous = key(self.rows[row - 1])
+                if (previous > value) if ascending else (previous < value):
+                    return False
+            if row < len(self.rows) - 1:
+                following = key(self.rows[row + 1])
+                if (value > following) if ascending else (value < following):
+                    return False
+        return True
@@ -0,0 +1,221 @@
+"""运行记录界面"""
+import os
+import time
+
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtWidgets import QWidget, QHBoxLayout, QVBoxLayout, QHeaderView, QAbstractItemView, QTableWidgetItem, \
+    QSplitter
+
+from qfluentwidgets import BodyLabel, PushButton, SearchLineEdit, ComboBox, CheckBox, TableWidget, InfoBar, \
+    InfoBarPosition
+from qfluentwidgets import FluentIcon as FIF
+
+from Connector.ResourceMonitor import formatBytes
+from Interfaces.LogView import LogView
+from Logs.log_recorder import logging
+from Logs.run_history import runHistory
+
+stateTexts = {
+    'queued': '排队中',
+    'starting': '启动中',
+    'running': '运行中',
+    'finished': '已结束',
+    'failed': '启动失败',
+    'cancelled': '已取消',
+    'interrupted': '已中断',
+}
+
+
+# 时间范围选项：(显示文本, 起始时间的计算方法)
+timeRanges = [
+    ('全部时间', lambda: None),
+    ('今天', lambda: time.mktime(time.localtime()[:3] + (0, 0, 0, 0, 0, -1))),
+    ('最近7天', lambda: time.time() - 7 * 86400),
+    ('最近30天', lambda: time.time() - 30 * 86400),
+]
+
+
+class HistoryInterface(QWidget):
+    """运行记录界面类"""
+
+    columns = ['文件', '提交时间', '用时', '退出代码', '输出', '资源占用', '状态']
+    limit = 200  # 最多显示的记录数
+    keywordDelay = 300  # 停止输入筛选文本后多久开始查询（毫秒）
+    openPollInterval = 200  # 等待数据库打开时检查的间隔（毫秒）
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.parentWindow = parent
+        self.setObjectName("HistoryInterface")
+        self.script = None  # 只显示该文件的运行记录
+        self.records = []  # 表格中显示的记录
+
+        # 筛选文本按路径的任意位置匹配，无法使用索引，停止输入后再查询
+        self.keywordTimer = QTimer(self)
+        self.keywordTimer.setSingleShot(True)
+        self.keywordTimer.setInterval(self.keywordDelay)
+        self.keywordTimer.timeout.connect(self.refresh)
+
+        # 数据库在后台打开（包括启动时删除过期记录），打开前不在GUI线程中等待，而是定时检查
+        self.openTimer = QTimer(self)
+        self.openTimer.setSingleShot(True)
+        self.openTimer.setInterval(self.openPollInterval)
+        self.openTimer.timeout.connect(self.refresh)
+
+        self.mainLayout = QVBoxLayout(self)
+        self.mainLayout.setContentsMargins(5, 5, 5, 5)
+        self.mainLayout.setSpacing(10)
+
+        self.initControls()
+
+    def initControls(self):
+        """初始化控件"""
+
+        """筛选条件"""
+        filterLayout = QHBoxLayout()
+        self.mainLayout.addLayout(filterLayout)
+
+        self.keywordLineEdit = SearchLineEdit()  # 按文件路径筛选
+        self.keywordLineEdit.setPlaceholderText('筛选文件路径')
+        self.keywordLineEdit.textChanged.connect(self.__onKeywordChanged)
+        filterLayout.addWidget(self.keywordLineEdit, 1)
+
+        self.timeRangeComboBox = ComboBox()
+        self.timeRangeComboBox.addItems([text for text, _ in timeRanges])
+        self.timeRangeComboBox.currentIndexChanged.connect(self.refresh)
+        filterLayout.addWidget(self.timeRangeComboBox)
+
+        self.failedOnlyCheckBox = CheckBox('只显示未成功的运行')
+        self.failedOnlyCheckBox.checkStateChanged.connect(self.refresh)
+        filterLayout.addWidget(self.failedOnlyCheckBox)
+
+        refreshButton = PushButton(text='刷新', icon=FIF.SYNC)
+        refreshButton.clicked.connect(self.refresh)
+        filterLayout.addWidget(refreshButton)
+
+        self.summaryLabel = BodyLabel()
+        self.mainLayout.addWidget(self.summaryLabel)
+
+        """记录表格和日志"""
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        self.mainLayout.addWidget(splitter, 1)
+
+        self.runTable = TableWidget()
+        self.runTable.setColumnCount(len(self.columns))
+        self.runTable.setHorizontalHeaderLabels(self.columns)
+        self.runTable.verticalHeader().hide()
+        self.runTable.setBorderVisible(True)
+        self.runTable.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.runTable.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.runTable.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.runTable.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.runTable.itemSelectionChanged.connect(self.__onSelectionChanged)
+        splitter.addWidget(self.runTable)
+
+        self.logView = LogView()  # 显示选中运行的日志
+        self.logView.setAutoScroll(False)
+        splitter.addWidget(self.logView)
+        splitter.setSizes([300, 200])
+
+    def showRuns(self, script: str = None):
+        """
+        显示运行记录
+        :param script: 只显示该文件的运行记录，为空时显示全部文件
+        """
+        self.script = script
+        self.keywordLineEdit.blockSignals(True)
+        self.keywordLineEdit.clear()
+        self.keywordLineEdit.blockSignals(False)
+        self.keywordTimer.stop()
+        self.refresh()
+
+    def refresh(self):
+        """按筛选条件重新查询运行记录"""
+        self.keywordTimer.stop()
+        if not runHistory.isReady():
+            runHistory.start()
+            self.records = []
+            self.runTable.setRowCount(0)
+            self.summaryLabel.setText('正在打开运行记录……')
+            self.logView.clear()
+            self.openTimer.start()
+            return
+
+        since = timeRanges[self.timeRangeComboBox.currentIndex()][1]()
+        self.records = runHistory.query(self.script, self.keywordLineEdit.text().strip(),
+                                        self.failedOnlyCheckBox.isChecked(), since, self.limit)
+
+        self.runTable.setRowCount(len(self.records))
+        for row, record in enumerate(self.records):
+            for column, text in enumerate(self.__rowTexts(record)):
+                item = QTableWidgetItem(text)
+                if column == 0:
+                    item.setToolTip(record['script'])
+                self.runTable.setItem(row, column, item)
+
+        summary = f'共{len(self.records)}条记录' if len(self.records) < self.limit else f'最近{self.limit}条记录'
+        if self.script:
+            summary = f'“{os.path.basename(self.script)}”的运行记录，{summary}'
+        self.summaryLabel.setText(summary)
+        self.logView.clear()
+
+    def showEvent(self, e):
+        """切换到本界面时刷新，显示最新的运行"""
+        super().showEvent(e)
+        self.refresh()
+
+    def __onKeywordChanged(self):
+        """输入筛选文本后不再只显示单个文件，停止输入后再查询"""
+        self.script = None
+        self.keywordTimer.start()
+
+    def __onSelectionChanged(self):
+        """显示选中运行的日志"""
+        self.logView.clear()
+        rows = self.runTable.selectionModel().selectedRows()
+        if not rows:
+            return
+
+        record = self.records[rows[0].row()]
+        if not record['log']:
+            return
+        text = runHistory.readLog(record['log'])
+        if not text and record['bytes']:
+            InfoBar.warning(
+                '提示',
+                '日志文件不存在或已损坏',
+                position=InfoBarPosition.TOP,
+                duration=1500,
+                parent=self.parentWindow
+            )
+            logging.warning(f'无法读取运行记录#{record["id"]}的日志')
+            return
+        self.logView.appendText(text)
+
+    @staticmethod
+    def __rowTexts(record: dict) -> list:
+        """运行记录在表格中显示的文本"""
+        duration = ''
+        if record['start_time'] is not None and record['end_time'] is not None:
+            duration = f'{record["end_time"] - record["start_time"]:.2f}s'
+        return [
+            os.path.basename(record['script']),
+            time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record['submit_time'])),
+            duration,
+            '' if record['exit_code'] is None else str(record['exit_code']),
+            f'{record["lines"]}行 / {formatBytes(record["bytes"])}',
+            HistoryInterface.__resourceText(record),
+            stateTexts.get(record['state'], record['state']),
+        ]
+
+    @staticmethod
+    def __resourceText(record: dict) -> str:
+        """运行记录的资源占用文本（CPU时间、峰值CPU占用率和峰值内存），没有采样的运行为空"""
+        parts = []
+        if record['cpu_time'] is not None:
+            parts.append(f'CPU {record["cpu_time"]:.2f}s')
+        if record['peak_cpu'] is not None:
+            parts.append(f'峰值CPU {record["peak_cpu"]:.0f}%')
+        if record['peak_rss'] is not None:
+            parts.append(f'峰值内存{formatBytes(record["peak_rss"])}')
+        return ' / '.join(parts)
@@ -1,34 +1,78 @@
 """主页模块"""
 import os
 
-from PyQt6.QtCore import Qt, QPoint
-from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QHeaderView, QTableWidgetItem, QFileDialog, QTableWidget
+from PyQt6.QtCore import Qt, QPoint, QItemSelection, QItemSelectionModel, QModelIndex
+from PyQt6.QtGui import QShortcut, QKeySequence
+from PyQt6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QHeaderView, QFileDialog, QAbstractItemView
 
-from qfluentwidgets import PushButton, TableWidget, InfoBar, InfoBarPosition, Dialog, ToolTipFilter, ToolTipPosition, \
-    RoundMenu, Action
+from qfluentwidgets import PushButton, TableView, InfoBar, InfoBarPosition, Dialog, ToolTipFilter, ToolTipPosition, \
+    RoundMenu, Action, MessageBoxBase, SubtitleLabel, BodyLabel, LineEdit, StateToolTip, SearchLineEdit
 from qfluentwidgets import FluentIcon as FIF
 
 from AppConfig.config import cfg
-from Connector.JarConnector import JarConnector
+from AppConfig.journal import fileTableJournal
+from AppConfig.save_scheduler import SaveScheduler
+from Connector.BackendCall import BackendCall
+from Connector.BackendDaemon import backendDaemon
+from FileMonitor.folder_importer import FolderImporter
+from FileMonitor.scanner import MetadataScanner, normalizePath
+from FileMonitor.search_index import ContentIndexer
+from FileMonitor.stat_cache import statCache
+from FileMonitor.watcher import FileWatcher
+from Interfaces.FileTableModel import FileRecord, FileTableModel, FileProxyModel
 from Logs.log_recorder import logging
 
 
-class FileTabel(TableWidget):
-    """文件列表类"""
+class FileTabel(TableView):
+    """文件列表类（可编辑的列由数据模型决定）"""
 
     def __init__(self, parent=None):
         super().__init__(parent)
 
         self.setEditTriggers(
-            QTableWidget.EditTrigger.DoubleClicked |  # 双击
-            QTableWidget.EditTrigger.EditKeyPressed  # 按F2键
+            QAbstractItemView.EditTrigger.DoubleClicked |  # 双击
+            QAbstractItemView.EditTrigger.EditKeyPressed  # 按F2键
         )
 
-    def setItem(self, row, column, item):
-        if column != 1:
-            item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)  # 如果列下标不为1则不可编辑
 
-        super().setItem(row, column, item)
+class FolderImportDialog(MessageBoxBase):
+    """
+    导入文件夹的选项对话框
+
+    构造方法参数
+    ------------
+    * folder: 需要导入的文件夹
+    * parent: 需要遮罩的窗体（建议设置为主窗体）
+    """
+
+    def __init__(self, folder: str, parent=None):
+        super().__init__(parent)
+        self.widget.setMinimumWidth(450)
+        self.yesButton.setText('导入')
+        self.cancelButton.setText('取消')
+
+        self.viewLayout.addWidget(SubtitleLabel('导入文件夹'))
+        self.viewLayout.addWidget(BodyLabel(f'将递归导入“{folder}”及其子文件夹中的文件'))
+
+        self.viewLayout.addWidget(BodyLabel('包含的文件（以分号分隔）'))
+        self.includeLineEdit = LineEdit(self)
+        self.includeLineEdit.setText(cfg.get(cfg.importInclude))
+        self.includeLineEdit.setPlaceholderText('*.bat;*.cmd')
+        self.viewLayout.addWidget(self.includeLineEdit)
+
+        self.viewLayout.addWidget(BodyLabel('排除的文件或文件夹（以分号分隔，可使用相对路径，如old/*）'))
+        self.excludeLineEdit = LineEdit(self)
+        self.excludeLineEdit.setText(cfg.get(cfg.importExclude))
+        self.excludeLineEdit.setPlaceholderText('不排除')
+        self.viewLayout.addWidget(self.excludeLineEdit)
+
+    def include(self) -> str:
+        """包含的文件通配符"""
+        return self.includeLineEdit.text().strip()
+
+    def exclude(self) -> str:
+        """排除的文件通配符"""
+        return self.excludeLineEdit.text().strip()
 
 
 class HomeInterface(QWidget):
@@ -51,6 +95,42 @@ class HomeInterface(QWidget):
         self.__initControls()  # 初始化控件
         self.__initShortcuts()  # 初始化快捷键
 
+        # 修改以日志形式追加保存，日志过长时由保存调度器在后台压缩为新的快照
+        self.saveScheduler = SaveScheduler(fileTableJournal.beginCompact, fileTableJournal.finishCompact,
+                                           cfg.get(cfg.saveDelay), parent=self)
+        cfg.saveDelay.valueChanged.connect(self.saveScheduler.setDelay)
+        fileTableJournal.onThreshold = self.saveScheduler.markDirty
+
+        # 文件元数据在后台并行扫描，扫描结果逐批填入表格；目录未改变的文件直接使用上次保存的缓存
+        statCache.load()
+        self.metadataScanner = MetadataScanner(parent=self)
+        self.metadataScanner.infoReady.connect(self.onInfoReady)
+
+        # 监视文件所在目录，发生变化时只重新扫描该目录中的文件并更新对应的行
+        self.fileWatcher = FileWatcher(parent=self)
+        self.fileWatcher.filesChanged.connect(self.metadataScanner.refresh)
+
+        # 开启内容搜索时在后台读取脚本内容，只重新读取修改时间或大小改变的文件
+        self.contentIndexer = ContentIndexer(parent=self)
+        self.contentIndexer.contentReady.connect(self.proxyModel.setContents)
+        self.proxyModel.setContentEnabled(cfg.get(cfg.searchContents))
+        cfg.searchContents.valueChanged.connect(self.setContentSearchEnabled)
+        self.fileWatcher.filesChanged.connect(self.indexContents)
+        self.fileModel.modelReset.connect(self.__onFileModelReset)
+        self.fileModel.rowsInserted.connect(
+            lambda parent, first, last: self.indexContents(
+                [record.path for record in self.fileModel.records[first:last + 1]]))
+        self.fileModel.rowsAboutToBeRemoved.connect(
+            lambda parent, first, last: self.contentIndexer.forget(
+                [record.path for record in self.fileModel.records[first:last + 1]]))
+
+        # 递归导入文件夹，发现的文件分批加入表格
+        self.folderImporter = FolderImporter(parent=self)
+        self.folderImporter.filesFound.connect(self.__onFolderFilesFound)
+        self.folderImporter.progressChanged.connect(self.__onFolderImportProgress)
+        self.folderImporter.finished.connect(self.__onFolderImportFinished)
+        self.stateToolTip = None  # 显示导入进度的提示
+
         # 加载已保存的文件内容
         self.loadContents()
 
@@ -76,6 +156,12 @@ class HomeInterface(QWidget):
         self.btnLayout.addWidget(self.addButton)
         self.addButton.clicked.connect(self.addFileAction)
 
+        self.addFolderButton = PushButton(FIF.FOLDER_ADD, '添加文件夹')
+        self.addFolderButton.setToolTip('递归导入文件夹中的文件')
+        self.addFolderButton.installEventFilter(ToolTipFilter(self.addFolderButton, position=ToolTipPosition.BOTTOM))
+        self.btnLayout.addWidget(self.addFolderButton)
+        self.addFolderButton.clicked.connect(self.addFolderAction)
+
         self.removeButton = PushButton(FIF.DELETE.icon(color='red'), '删除文件')
         self.removeButton.setToolTip('将选中的文件移出表格\n            (Delete)')
         self.removeButton.installEventFilter(ToolTipFilter(self.removeButton, position=ToolTipPosition.BOTTOM))
@@ -88,20 +174,32 @@ class HomeInterface(QWidget):
         self.btnLayout.addWidget(self.openFolderButton)
         self.openFolderButton.clicked.connect(lambda: self.openFolderAction())
 
+        # 搜索框，输入时即时过滤文件列表
+        self.btnLayout.addStretch(1)
+        self.searchLineEdit = SearchLineEdit(self)
+        self.searchLineEdit.setPlaceholderText('搜索文件名、备注或路径')
+        self.searchLineEdit.setFixedWidth(280)
+        self.btnLayout.addWidget(self.searchLineEdit)
+        self.searchLineEdit.textChanged.connect(self.searchFiles)
+
+        # 文件数据模型，搜索过滤和排序通过代理模型完成，不改变数据模型中的行顺序
+        self.fileModel = FileTableModel(self)
+        self.fileModel.remarkEdited.connect(self.onRemarkEdited)  # 编辑备注后追加至日志
+        self.proxyModel = FileProxyModel(self.fileModel, self)
+
         # 文件表格视图
         self.fileTableView = FileTabel(self)
+        self.fileTableView.setModel(self.proxyModel)
         self.mainLayout.addWidget(self.fileTableView)
 
         self.fileTableView.setBorderVisible(True)  # 设置边界可见性
         self.fileTableView.setBorderRadius(5)  # 设置边界圆角弧度
-        self.fileTableView.setColumnCount(6)  # 设置列数
         self.fileTableView.verticalHeader().hide()  # 隐藏行序号
-        self.fileTableView.setHorizontalHeaderLabels(['文件名', '备注', '文件路径', '修改日期', '文件类型', '大小'])
+        self.fileTableView.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)  # 初始按添加顺序显示
         self.fileTableView.setSortingEnabled(True)  # 启用表头排序
 
         self.fileTableView.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)  # 将表格的上下文菜单策略设置为 自定义模式
         self.fileTableView.customContextMenuRequested.connect(self.showContextMenu)  # 绑定显示右键菜单的方法
-        self.fileTableView.itemChanged.connect(self.saveContents)  # 编辑内容后执行保存方法
 
         # 恢复软件关闭前的列宽
         columnWidthList = cfg.get(cfg.tableColumnWidth)
@@ -117,6 +215,41 @@ class HomeInterface(QWidget):
         """初始化快捷键"""
         self.runButton.setShortcut('F5')
         self.removeButton.setShortcut('delete')
+        QShortcut(QKeySequence('Ctrl+F'), self, activated=self.searchLineEdit.setFocus)
+
+    def sourceRow(self, viewRow: int) -> int:
+        """
+        将表格视图中的行下标转换为数据模型中的行下标
+        :param viewRow: 视图中的行下标
+        :return: 数据模型中的行下标
+        """
+        return self.proxyModel.mapToSource(self.proxyModel.index(viewRow, 0)).row()
+
+    def viewIndex(self, row: int, column: int = 0) -> QModelIndex:
+        """
+        将数据模型中的行和列转换为表格视图中的下标
+        :param row: 数据模型中的行下标
+        :param column: 列下标
+        :return: 视图中的下标，该行因搜索而未显示时无效
+        """
+        return self.proxyModel.mapFromSource(self.fileModel.index(row, column))
+
+    def selectedRows(self) -> list:
+        """
+        获取所有选中行在数据模型中的行下标
+        :return: 行下标列表（从小到大排序）
+        """
+        return sorted(self.proxyModel.mapToSource(index).row()
+                      for index in self.fileTableView.selectionModel().selectedRows())
+
+    def setRemark(self, row: int, remark: str):
+        """
+        修改备注并追加至日志
+        :param row: 数据模型中的行下标
+        :param remark: 新的备注
+        """
+        self.fileModel.updateRecord(row, remark=remark)
+        fileTableJournal.append('remark', self.fileModel.record(row).path, remark)
 
     def showContextMenu(self, pos: QPoint):
         """
@@ -131,6 +264,7 @@ class HomeInterface(QWidget):
         row = self.fileTableView.rowAt(pos.y())
         if row < 0:  # 若没有选中有效行则直接结束
             return
+        row = self.sourceRow(row)
 
         # 为菜单添加动作
         menu = RoundMenu()
@@ -144,6 +278,8 @@ class HomeInterface(QWidget):
         fileOperation_actions = [
             Action(FIF.DELETE.icon(color='red'), '删除文件', triggered=lambda: self.removeFileAction(row)),
             Action(FIF.FOLDER.icon(color='orange'), '打开文件夹', triggered=lambda: self.openFolderAction(row)),
+            Action(FIF.CHECKBOX, '选择同目录的文件', triggered=lambda: self.selectSameDirectory(row)),
+            Action(FIF.HISTORY, '查看运行记录', triggered=lambda: self.showRunHistory(row)),
         ]
         menu.addActions(fileOperation_actions)
 
@@ -166,35 +302,49 @@ class HomeInterface(QWidget):
         # 显示菜单
         menu.exec(global_pos)
 
+    def selectSameDirectory(self, row: int):
+        """
+        选中与指定行位于同一目录的全部文件
+        :param row: 数据模型中的行下标
+        """
+        rows = self.fileModel.rowsInDirectory(os.path.dirname(self.fileModel.record(row).path))
+        selection = QItemSelection()
+        for sourceRow in rows:
+            index = self.viewIndex(sourceRow)
+            if index.isValid():  # 跳过因搜索而未显示的行
+                selection.select(index, index)
+        self.fileTableView.selectionModel().select(
+            selection, QItemSelectionModel.SelectionFlag.ClearAndSelect | QItemSelectionModel.SelectionFlag.Rows)
+        logging.info(f'已选中同一目录中的{len(rows)}个文件')
+
+    def showRunHistory(self, row: int):
+        """
+        在运行记录界面显示指定文件的运行记录
+        :param row: 数据模型中的行下标
+        """
+        self.parentWindow.historyInterface.showRuns(self.fileModel.record(row).path)
+        self.parentWindow.switchTo(self.parentWindow.historyInterface)
+
+    def resolvePath(self, path: str, fileId: int = None) -> str:
+        """
+        获取预设引用的文件的当前路径
+        :param path: 预设中保存的路径
+        :param fileId: 预设中保存的行ID，文件被重定向后按行ID仍能找到新的路径
+        :return: 文件的当前路径，行ID无效时返回原路径
+        """
+        row = self.fileModel.rowOfId(fileId) if fileId is not None else -1
+        return self.fileModel.record(row).path if row >= 0 else path
+
     def runFileAction(self, row: int = None):
         """
         运行文件行为
-        :param row:选中的单个行下标（默认为空）
+        :param row:选中的单个行在数据模型中的下标（默认为空，此时运行所有选中的文件）
         """
 
         # 获取文件路径
         if row is None:
-            selectedRanges = self.fileTableView.selectedRanges()
-            if selectedRanges:
-
-                # 收集选中的行索引（从大到小排序）
-                selectedRowsIndex = []
-                for range_obj in selectedRanges:
-                    selectedRowsIndex.append(range(range_obj.bottomRow(), range_obj.topRow() + 1))
-
-                # 判断是否多选
-                if len(selectedRowsIndex) > 1:
-                    InfoBar.warning(
-                        "提示",
-                        "只能同时运行一个文件",
-                        duration=1500,
-                        position=InfoBarPosition.TOP,
-                        parent=self.parentWindow
-                    )
-                    return  # 多选时不运行文件
-                else:
-                    item = self.fileTableView.item(self.fileTableView.currentRow(), 2)  # 获取保存文件路径的元素
-            else:
+            rows = self.selectedRows()
+            if not rows:
                 InfoBar.warning(
                     '提示',
                     '请先选择一个文件',
@@ -204,67 +354,48 @@ class HomeInterface(QWidget):
                 )
                 return  # 未选择文件时结束方法调用
         else:
-            item = self.fileTableView.item(row, 2)
-
-        # 运行文件
-        if self.parentWindow.cmdInterface.socketClient.running:
-            InfoBar.error(
-                '运行失败',
-                '已有正在运行的文件',
-                position=InfoBarPosition.TOP,
-                duration=1500,
-                parent=self.parentWindow
-            )
-            logging.info('运行失败，已有正在运行的文件')
-            return
+            rows = [row]
 
         # 弹出确认对话框
-        w = Dialog('运行文件', '是否确认运行选中的文件')
+        w = Dialog('运行文件', '是否确认运行选中的文件' if len(rows) == 1 else f'是否确认运行选中的{len(rows)}个文件')
         if not w.exec():
             return  # 对话框选择取消不运行文件
 
         logging.info('运行文件中……')
-        filePath = item.text()
-
-        # 判断文件是否存在
-        if not os.path.isfile(filePath):
-            # 在备注中标记“（已失效）”
-            remark = self.fileTableView.item(self.fileTableView.currentRow(), 1).text()
-            if not remark.startswith('（已失效）'):
-                remark = f'（已失效）{remark}'
-                self.fileTableView.setItem(self.fileTableView.currentRow(), 1, QTableWidgetItem(remark))
-
+        filePaths = []
+        for row in rows:
+            record = self.fileModel.record(row)
+
+            # 判断文件是否存在
+            if not os.path.isfile(record.path):
+                statCache.invalidateDirectory(os.path.dirname(record.path))  # 缓存与实际不符，下次重新扫描该目录
+                # 在备注中标记“（已失效）”
+                if not record.remark.startswith('（已失效）'):
+                    self.setRemark(row, f'（已失效）{record.remark}')
+                logging.error(f'运行失败：文件不存在：{record.path}')
+                continue
+
+            # 在备注中删除“（已失效）”字样
+            if record.remark.startswith('（已失效）'):
+                self.setRemark(row, record.remark.removeprefix('（已失效）'))
+            filePaths.append(record.path)
+
+        if len(filePaths) < len(rows):
             self.fileTableView.clearSelection()  # 取消所有选择
 
             InfoBar.error(
                 '失败',
-                '所选的文件不存在',
+                '所选的文件不存在' if len(rows) == 1 else f'有{len(rows) - len(filePaths)}个文件不存在，已跳过',
                 position=InfoBarPosition.TOP,
                 duration=1500,
                 parent=self.parentWindow
             )
-            logging.error('运行失败：文件不存在')
-            return
-
-        # 在备注中删除“（已失效）”字样
-        remark = self.fileTableView.item(self.fileTableView.currentRow(), 1).text()
-        if remark.startswith('（已失效）'):
-            remark = remark.lstrip('（已失效）')
-            self.fileTableView.setItem(self.fileTableView.currentRow(), 1, QTableWidgetItem(remark))
+            if not filePaths:
+                return
 
-        running_cnt = JarConnector('./backend/fileRunner.jar')
-        running_cnt.sendData([filePath])
-        ack = running_cnt.receiveData()
-        if not ack:
-            InfoBar.error(
-                "运行失败",
-                "Java后端运行异常，请检查Java版本",
-                position=InfoBarPosition.TOP,
-                duration=1500,
-                parent=self.parentWindow
-            )
-            logging.error('运行失败：Java后端运行异常')
-            return  # 应答值为假不运行文件
+        # 提交至运行管理器，超出同时运行上限的文件排队等待
+        for filePath in filePaths:
+            self.parentWindow.cmdInterface.runFile(filePath)
 
         InfoBar.success(
             '开始运行',
@@ -273,50 +404,80 @@ class HomeInterface(QWidget):
             duration=1500,
             parent=self.parentWindow
         )
-        logging.info('文件已开始运行')
-        self.parentWindow.cmdInterface.startCommunication()  # 开始与子进程通信
+        logging.info(f'已提交{len(filePaths)}个文件运行')
 
     def editRemarkAction(self, row: int):
         """
         编辑文件备注
-        :param row:选中的单个行下标
+        :param row:选中的单个行在数据模型中的下标
         """
         logging.info('编辑备注')
-        self.fileTableView.editItem(self.fileTableView.item(row, 1))
+        self.fileTableView.edit(self.viewIndex(row, FileTableModel.remarkColumn))
 
     def redirectFile(self, row: int):
         """
         重定向文件
-        :param row:需要重定向的文件条目所在的行下标
+        :param row:需要重定向的文件条目在数据模型中的行下标
         """
-        old_path = self.fileTableView.item(row, 2).text()
+        old_path = self.fileModel.record(row).path
         filePath = QFileDialog.getOpenFileName(
             None,
             '添加文件',
             os.path.dirname(old_path),
-            '批处理和命令脚本 (*.bat *.cmd);;批处理文件 (*.bat);;命令脚本 (*.cmd)'
+            '脚本文件 (*.bat *.cmd *.ps1 *.sh);;批处理和命令脚本 (*.bat *.cmd);;PowerShell脚本 (*.ps1);;Shell脚本 (*.sh)'
         )[0]
         if not filePath:
             return
+        if self.fileModel.rowOfPath(filePath) not in (-1, row):
+            InfoBar.warning(
+                '提示',
+                '该文件已在列表中',
+                position=InfoBarPosition.TOP,
+                duration=1500,
+                parent=self.parentWindow
+            )
+            return
 
-        redirect_cnt = JarConnector('./backend/fileAdder.jar')
-        redirect_cnt.sendData([filePath])
-        fileInfos = redirect_cnt.receiveData()[0]
+        # 等待应答期间界面保持响应，应答到达后再更新对应的行
+        call = BackendCall(backendDaemon.submit('fileAdder', [filePath]), self)
+        call.finished.connect(lambda fileInfos: self.__onFileRedirected(old_path, filePath, fileInfos))
+
+    def __onFileRedirected(self, old_path: str, filePath: str, fileInfos: list):
+        """
+        得到重定向后的文件信息
+        :param old_path: 原文件路径
+        :param filePath: 新文件路径
+        :param fileInfos: Java后端返回的文件信息
+        """
+        row = self.fileModel.rowOfPath(old_path)
+        if row < 0:  # 等待期间该行已被删除
+            logging.warning(f'重定向文件失败：列表中已没有"{old_path}"')
+            return
+
+        if not fileInfos:
+            InfoBar.error(
+                '失败',
+                '无法获取文件信息',
+                position=InfoBarPosition.TOP,
+                duration=1500,
+                parent=self.parentWindow
+            )
+            logging.error('重定向文件失败：无法获取文件信息')
+            return
+        fileInfos = fileInfos[0]
 
-        self.fileTableView.blockSignals(True)
-        self.fileTableView.setItem(row, 0, QTableWidgetItem(fileInfos[0]))  # 文件名
-        self.fileTableView.setItem(row, 2, QTableWidgetItem(filePath))  # 路径
-        self.fileTableView.setItem(row, 3, QTableWidgetItem(fileInfos[1]))  # 修改日期
-        self.fileTableView.setItem(row, 4, QTableWidgetItem(fileInfos[2]))  # 文件类型
-        self.fileTableView.setItem(row, 5, QTableWidgetItem(fileInfos[3]))  # 文件大小
+        fileTableJournal.append('redirect', old_path, filePath, fileInfos[0])
+        self.fileWatcher.removePaths([old_path])
+        self.fileWatcher.addPaths([filePath])
+        self.fileModel.updateRecord(row, name=fileInfos[0], path=filePath, date=fileInfos[1], type=fileInfos[2],
+                                    size=fileInfos[3])
+        self.contentIndexer.forget([old_path, filePath])
+        self.indexContents([filePath])
 
         # 去除“已失效”标记
-        remark = self.fileTableView.item(row, 1).text()
+        remark = self.fileModel.record(row).remark
         if remark.startswith('（已失效）'):
-            remark = remark.lstrip('（已失效）')
-            self.fileTableView.setItem(row, 1, QTableWidgetItem(remark))
-
-        self.fileTableView.blockSignals(False)
+            self.setRemark(row, remark.removeprefix('（已失效）'))
 
         InfoBar.success(
             '成功',
@@ -326,8 +487,6 @@ class HomeInterface(QWidget):
             parent=self.parentWindow
         )
 
-        self.saveContents()
-
     def addFileAction(self):
         """添加文件行为"""
 
@@ -335,15 +494,43 @@ class HomeInterface(QWidget):
             None,
             '添加文件',
             '',
-            '批处理和命令脚本 (*.bat *.cmd);;批处理文件 (*.bat);;命令脚本 (*.cmd)'
+            '脚本文件 (*.bat *.cmd *.ps1 *.sh);;批处理和命令脚本 (*.bat *.cmd);;PowerShell脚本 (*.ps1);;Shell脚本 (*.sh)'
         )[0]
         if not files:
             return
 
+        # 去除已在列表中或重复选择的文件
+        keys = set()
+        newFiles = []
+        for file in files:
+            key = normalizePath(file)
+            if key not in keys and not self.fileModel.containsPath(file):
+                keys.add(key)
+                newFiles.append(file)
+        if len(newFiles) < len(files):
+            InfoBar.info(
+                '提示',
+                f'{len(files) - len(newFiles)}个文件已在列表中，不会重复添加',
+                duration=1500,
+                position=InfoBarPosition.TOP,
+                parent=self.parentWindow
+            )
+        if not newFiles:
+            return
+        files = newFiles
+
         logging.info('开始添加文件……')
-        fileAdd_cnt = JarConnector('./backend/fileAdder.jar')
-        fileAdd_cnt.sendData(files)
-        file_infos = fileAdd_cnt.receiveData()  # [[文件名,修改日期,后缀名,文件大小],...]
+        self.addButton.setEnabled(False)  # 等待应答期间不能重复添加
+        call = BackendCall(backendDaemon.submit('fileAdder', files), self)  # [[文件名,修改日期,后缀名,文件大小],...]
+        call.finished.connect(lambda file_infos: self.__onFilesAdded(files, file_infos))
+
+    def __onFilesAdded(self, files: list, file_infos: list):
+        """
+        得到新添加文件的信息
+        :param files: 添加的文件路径列表
+        :param file_infos: Java后端返回的文件信息
+        """
+        self.addButton.setEnabled(True)
         if file_infos is None or file_infos[0] is None:  # 判断是否接受None或者第一个元素是否为空
             InfoBar.error(
                 '失败',
@@ -355,45 +542,102 @@ class HomeInterface(QWidget):
             logging.error('无法添加文件')
             return
 
-        currentRowCount = self.fileTableView.rowCount()
-
-        self.fileTableView.setSortingEnabled(False)  # 暂时禁用排序防止插入的数据错位
-        self.fileTableView.blockSignals(True)
-        self.fileTableView.setRowCount(len(files) + currentRowCount)
-        for index, oneInfo in enumerate(file_infos):
-            self.fileTableView.setItem(currentRowCount + index, 0, QTableWidgetItem(oneInfo[0]))
-            self.fileTableView.setItem(currentRowCount + index, 1,
-                                       QTableWidgetItem(None))  # 即使没有获取信息也要填充防止获取内容时类型错误
-            self.fileTableView.setItem(currentRowCount + index, 2, QTableWidgetItem(files[index]))
-            self.fileTableView.setItem(currentRowCount + index, 3, QTableWidgetItem(oneInfo[1]))
-            self.fileTableView.setItem(currentRowCount + index, 4, QTableWidgetItem(oneInfo[2]))
-            self.fileTableView.setItem(currentRowCount + index, 5, QTableWidgetItem(oneInfo[3]))
-        self.fileTableView.setSortingEnabled(True)
-        self.fileTableView.blockSignals(False)
+        # 等待应答期间可能已通过其他方式添加了相同的文件
+        records = [FileRecord(oneInfo[0], '', files[index], oneInfo[1], oneInfo[2], oneInfo[3])
+                   for index, oneInfo in enumerate(file_infos) if not self.fileModel.containsPath(files[index])]
+        self.fileModel.appendRecords(records)  # 加入数据模型时分配行ID
+
+        if records:
+            fileTableJournal.append('add', [record.toRow() for record in records])
+            self.fileWatcher.addPaths([record.path for record in records])
 
         InfoBar.success(
             '成功',
-            f'已添加{len(file_infos)}个文件',
+            f'已添加{len(records)}个文件',
             duration=1500,
             position=InfoBarPosition.TOP,
             parent=self.parentWindow
         )
-        logging.info(f'成功添加{len(files)}个文件')
+        logging.info(f'成功添加{len(records)}个文件')
+
+    def addFolderAction(self):
+        """递归导入文件夹行为"""
+        folder = QFileDialog.getExistingDirectory(None, '添加文件夹', '')
+        if not folder:
+            return
+
+        w = FolderImportDialog(folder, self.parentWindow)
+        if not w.exec():
+            return
+        cfg.set(cfg.importInclude, w.include())
+        cfg.set(cfg.importExclude, w.exclude())
+
+        self.startFolderImport(folder, w.include(), w.exclude())
 
-        self.saveContents()
+    def startFolderImport(self, folder: str, include: str, exclude: str):
+        """
+        开始递归导入文件夹
+        :param folder: 需要导入的文件夹
+        :param include: 包含的文件名通配符，以分号分隔
+        :param exclude: 排除的文件名或相对路径通配符，以分号分隔
+        """
+        self.addFolderButton.setEnabled(False)  # 同一时间只进行一次导入
+        self.folderImporter.start(folder, include, exclude, self.fileModel.normalizedPaths())
+
+        self.stateToolTip = StateToolTip('正在导入文件夹', '已遍历0个目录，发现0个文件', self.parentWindow)
+        self.stateToolTip.closedSignal.connect(self.folderImporter.cancel)
+        self.stateToolTip.move(self.stateToolTip.getSuitablePos())
+        self.stateToolTip.show()
+
+    def __onFolderFilesFound(self, results: list):
+        """
+        将一批导入的文件加入表格
+        :param results: [(文件路径, [修改日期,文件类型,文件大小]), ...]
+        """
+        records = [FileRecord(os.path.basename(path), '', path, *info) for path, info in results
+                   if not self.fileModel.containsPath(path)]
+        if not records:
+            return
+        self.fileModel.appendRecords(records)
+        fileTableJournal.append('add', [record.toRow() for record in records])
+        self.fileWatcher.addPaths([record.path for record in records])
+
+    def __onFolderImportProgress(self, scannedDirs: int, foundFiles: int):
+        """更新导入进度"""
+        if self.stateToolTip is not None:
+            self.stateToolTip.setContent(f'已遍历{scannedDirs}个目录，发现{foundFiles}个文件')
+
+    def __onFolderImportFinished(self, foundFiles: int, cancelled: bool):
+        """
+        导入结束
+        :param foundFiles: 已导入的文件数
+        :param cancelled: 是否被用户取消
+        """
+        self.addFolderButton.setEnabled(True)
+        if self.stateToolTip is not None:
+            if not cancelled:
+                self.stateToolTip.setTitle('导入完成')
+                self.stateToolTip.setContent(f'共添加{foundFiles}个文件')
+                self.stateToolTip.setState(True)
+            self.stateToolTip = None
+
+        InfoBar.success(
+            '成功' if not cancelled else '已取消',
+            f'已添加{foundFiles}个文件',
+            duration=1500,
+            position=InfoBarPosition.TOP,
+            parent=self.parentWindow
+        )
 
     def removeFileAction(self, row: int = None):
         """
         删除文件行为
-        :param row:选中的单个行下标（默认为空）
+        :param row:选中的单个行在数据模型中的下标（默认为空）
         """
 
-        # 获取删除前的行数
-        currentRowCount = self.fileTableView.rowCount()
-
         if row is None:
-            selectedRanges = self.fileTableView.selectedRanges()
-            if not selectedRanges:
+            rowsToDelete = self.selectedRows()
+            if not rowsToDelete:
                 InfoBar.warning(
                     '提示',
                     '请选择至少一个文件',
@@ -407,18 +651,10 @@ class HomeInterface(QWidget):
             if not w.exec():
                 return
 
-            # 收集所有要删除的行索引（从大到小排序）
-            rowsToDelete = set()
-            for range_obj in selectedRanges:
-                rowsToDelete.update(range(range_obj.topRow(), range_obj.bottomRow() + 1))
-
-            # 从大到小删除（避免索引变化问题）
-            i = 0
-            for row in sorted(rowsToDelete, reverse=True):
-                self.fileTableView.removeRow(row)
-                i += 1
-
-            self.fileTableView.setRowCount(currentRowCount - i)  # 减少行数
+            removedPaths = [self.fileModel.record(row).path for row in rowsToDelete]
+            fileTableJournal.append('remove', removedPaths)
+            self.fileWatcher.removePaths(removedPaths)
+            self.fileModel.removeRecords(rowsToDelete)  # 连续的行合并为一次删除
             self.fileTableView.clearSelection()  # 取消所有选择
 
             InfoBar.success(
@@ -429,15 +665,15 @@ class HomeInterface(QWidget):
                 parent=self.parentWindow
             )
 
-            logging.info(f'已删除{i}个文件')
-            self.saveContents()
+            logging.info(f'已删除{len(rowsToDelete)}个文件')
         else:
             w = Dialog('删除文件', '确认从列表中删除选中的文件吗？（此操作不会删除硬盘上的文件）', self.parentWindow)
             if not w.exec():
                 return
 
-            self.fileTableView.removeRow(row)
-            self.fileTableView.setRowCount(currentRowCount - 1)  # 减少行数
+            fileTableJournal.append('remove', [self.fileModel.record(row).path])
+            self.fileWatcher.removePaths([self.fileModel.record(row).path])
+            self.fileModel.removeRecords([row])
             self.fileTableView.clearSelection()  # 取消所有选择
 
             InfoBar.success(
@@ -449,18 +685,17 @@ class HomeInterface(QWidget):
             )
 
             logging.info('已删除1个文件')
-            self.saveContents()
 
     def openFolderAction(self, row: int = None):
         """
         打开文件夹行为
-        :param row:选中的单个行下标（默认为空）
+        :param row:选中的单个行在数据模型中的下标（默认为空）
         """
 
         if row is None:
-            selectedRanges = self.fileTableView.selectedRanges()
+            selectedRowsIndex = self.selectedRows()
 
-            if not selectedRanges:  # 排除没有选择的情况
+            if not selectedRowsIndex:  # 排除没有选择的情况
                 InfoBar.warning(
                     '提示',
                     '请选择至少一个文件',
@@ -470,20 +705,12 @@ class HomeInterface(QWidget):
                 )
                 return
 
-            # 收集所有要删除的行索引（从大到小排序）
-            selectedRowsIndex = set()
-            for range_obj in selectedRanges:
-                selectedRowsIndex.update(range(range_obj.topRow(), range_obj.bottomRow() + 1))
-
-            dirToOpen = []
+            # 按目录分组，每个目录只检查一次是否存在
+            directories = {}
             for i in selectedRowsIndex:
-                item = self.fileTableView.item(i, 2)
-                filePath = item.text()
-                directory = os.path.dirname(filePath).replace('/', '\\')
-                if os.path.isdir(directory):
-                    dirToOpen.append(directory)
-
-            dirToOpen = set(dirToOpen)
+                directory = os.path.dirname(self.fileModel.record(i).path)
+                directories.setdefault(normalizePath(directory), directory)
+            dirToOpen = {directory.replace('/', '\\') for directory in directories.values() if os.path.isdir(directory)}
             if len(dirToOpen) > 3:
                 w = Dialog('打开文件夹', '一次性打开过多文件夹可能导致桌面混乱，确认继续吗？', self.parentWindow)
                 if w.exec():
@@ -503,8 +730,7 @@ class HomeInterface(QWidget):
                 logging.info('用户打开文件所在目录')
         else:
             # 获取目录路径
-            item = self.fileTableView.item(row, 2)
-            filePath = item.text()
+            filePath = self.fileModel.record(row).path
             directory = os.path.dirname(filePath).replace('/', '\\')
 
             if not os.path.isdir(directory):
@@ -520,127 +746,130 @@ class HomeInterface(QWidget):
             os.startfile(directory)
             logging.info('用户打开文件所在目录')
 
+    def searchFiles(self, text: str):
+        """
+        按搜索文本过滤文件列表
+        :param text: 搜索文本，多个搜索词以空格分隔
+        """
+        starting = not self.proxyModel.isFiltering()
+        self.proxyModel.setQuery(text)
+        if starting and self.proxyModel.isFiltering():  # 开始新的搜索时检查脚本内容是否被原地修改
+            self.indexContents([record.path for record in self.fileModel.records])
+
+    def indexContents(self, paths: list):
+        """
+        开启内容搜索时在后台更新脚本内容的索引
+        :param paths: 文件路径列表
+        """
+        if cfg.get(cfg.searchContents):
+            self.contentIndexer.refresh(paths)
+
+    def setContentSearchEnabled(self, enabled: bool):
+        """
+        开启或关闭脚本内容的搜索
+        :param enabled: 是否搜索脚本内容
+        """
+        self.proxyModel.setContentEnabled(enabled)
+        self.contentIndexer.clear()
+        self.indexContents([record.path for record in self.fileModel.records])
+        logging.info(f'已{"开启" if enabled else "关闭"}脚本内容搜索')
+
+    def __onFileModelReset(self):
+        """数据模型重置后内容索引已清空，重新读取全部脚本内容"""
+        self.contentIndexer.clear()
+        self.indexContents([record.path for record in self.fileModel.records])
+
     def refreshFileTable(self):
         """刷新文件列表"""
-        self.fileTableView.blockSignals(True)
-        self.fileTableView.clear()
-        self.fileTableView.setHorizontalHeaderLabels(['文件名', '备注', '文件路径', '修改日期', '文件类型', '大小'])
-        self.fileTableView.blockSignals(False)
-
+        self.fileModel.setRecords([])
         self.loadContents()
 
-    def saveContents(self):
-        """将表格的内容保存至文件"""
-        logging.info('开始保存文件数据……')
-
-        if not cfg.get(cfg.isOpeningJavaPathCorrect):
-            logging.warning('由于程序启动时Java路径有误，故不保存文件信息')
-            return
+    def onRemarkEdited(self, row: int, remark: str):
+        """
+        用户编辑备注后将修改追加至日志
+        :param row: 数据模型中的行下标
+        :param remark: 新的备注
+        """
+        fileTableJournal.append('remark', self.fileModel.record(row).path, remark)
 
-        # 获取表格内容
-        allRows = []
-        for row in range(self.fileTableView.rowCount()):
-            oneRow = []
-            for column in range(self.fileTableView.columnCount()):
-                if column >= 3: continue  # 不记录修改日期、文件类型和文件大小
-                item = self.fileTableView.item(row, column)
-                try:
-                    oneRow.append(item.text())
-                except AttributeError:
-                    oneRow.append(None)
-            allRows.append(oneRow)
-
-        # 保存至文件
-        if not os.path.isdir('./config'):
-            os.mkdir('./config')
-
-        jsonWriter_cnt = JarConnector('./backend/jsonWriter.jar')
-        jsonWriter_cnt.sendData(['./config/fileTableContents.json', allRows])
-        flag = jsonWriter_cnt.receiveData()
-
-        if flag:
-            logging.info('文件数据保存成功')
-        else:
-            logging.error('文件数据保存失败')
+    def flushContents(self):
+        """立即完成尚未进行的日志压缩并保存元数据缓存"""
+        self.saveScheduler.flush()
+        statCache.save()
 
     def loadContents(self):
         """加载已保存的文件内容"""
         logging.info('开始读取已保存的文件信息……')
+        self.fileWatcher.clear()
 
-        jsonReader_cnt = JarConnector('./backend/jsonReader.jar')
-        jsonReader_cnt.sendData(['./config/fileTableContents.json'])
-        allRows = jsonReader_cnt.receiveData()
+        allRows = fileTableJournal.load()
         if allRows is None:
             InfoBar.error(
                 '错误',
-                '文件信息读取出错，请检查Java版本',
+                '文件信息读取出错，数据文件内容有误',
                 position=InfoBarPosition.TOP,
                 duration=1500,
                 parent=self.parentWindow
             )
-            cfg.set(cfg.isOpeningJavaPathCorrect, False)
             logging.error('文件信息读取失败')
             return
-        elif allRows == 0:
-            cfg.set(cfg.isOpeningJavaPathCorrect, True)
-            logging.warning('文件信息配置文件为空')
-            return
-        elif allRows == -1:
-            cfg.set(cfg.isOpeningJavaPathCorrect, True)
-            logging.warning('文件信息配置文件不存在')
+        elif not allRows:
+            logging.warning('文件信息配置文件为空或不存在')
             return
 
         logging.info('文件信息读取成功')
-        # 检测文件是否存在
-        for rowIndex, fileInfo in enumerate(allRows):
-            if not os.path.isfile(fileInfo[2]) and not allRows[rowIndex][1].startswith('（已失效）'):
-                allRows[rowIndex][1] = f'（已失效）{fileInfo[1]}'  # 如果文件不存在则在备注中标记
-
-        # 设置表格行数
-        self.fileTableView.setRowCount(len(allRows))
-
-        # 依次添加文件信息
-        self.fileTableView.blockSignals(True)  # 阻断信号防止加载过程中保存表格信息
-
-        if self.versionCompare(cfg.get(cfg.appVersion).lstrip('v'), '1.1.0') < 0:  # 若上一次启动的版本号低于1.1.0，则升级数据结构
-            allFilePath = []
-            for i, row in enumerate(allRows):
-                for j, column in enumerate(row):
-                    if j == 3 or j == 5: continue  # 不加载修改日期和文件大小
-                    if j == 2: allFilePath.append(column)  # 获取文件路径
-                    self.fileTableView.setItem(i, j, QTableWidgetItem(column))
-        else:  # 若以上判断均为否，则正常读取数据
-            allFilePath = []
-            for i, row in enumerate(allRows):
-                self.fileTableView.setItem(i, 0, QTableWidgetItem(row[0]))  # 文件名
-                self.fileTableView.setItem(i, 1, QTableWidgetItem(row[1]))  # 备注
-                self.fileTableView.setItem(i, 2, QTableWidgetItem(row[2]))  # 路径
-                allFilePath.append(row[2])
 
+        # 一次性构造所有记录，只重置一次模型
+        upgrade = self.versionCompare(cfg.get(cfg.appVersion).lstrip('v'), '1.1.0') < 0
+        if upgrade:  # 若上一次启动的版本号低于1.1.0，则升级数据结构
+            records = [FileRecord(row[0], row[1], row[2], type=row[4] if len(row) > 4 else '')  # 不加载修改日期和文件大小
+                       for row in allRows]
+        else:  # 若以上判断均为否，则正常读取数据
+            records = [FileRecord(row[0], row[1], row[2], rowId=row[3] if len(row) > 3 else None) for row in allRows]
+
+        # 旧版本允许重复添加同一文件，只保留第一行
+        keys = set()
+        uniqueRecords = []
+        for record in records:
+            key = normalizePath(record.path)
+            if key not in keys:
+                keys.add(key)
+                uniqueRecords.append(record)
+        if len(uniqueRecords) < len(records):
+            logging.warning(f'已移除{len(records) - len(uniqueRecords)}个重复的文件')
+
+        ids = [record.rowId for record in uniqueRecords]
+        self.fileModel.setRecords(uniqueRecords)  # 为没有行ID的记录分配行ID
+        records = uniqueRecords
+        if upgrade or len(records) < len(allRows) or ids != [record.rowId for record in records]:
+            fileTableJournal.compact([record.toRow() for record in records])  # 以新的数据结构保存快照
+        self.fileWatcher.setPaths([record.path for record in records])
+
+        # 修改日期和大小在后台扫描，同时检测文件是否存在
         logging.info('开始刷新文件修改日期和大小……')
-        getInfo_cnt = JarConnector('./backend/fileInfoGetter.jar')
-        getInfo_cnt.sendData(allFilePath)
-        allInfos = getInfo_cnt.receiveData()
-        if allInfos:
-            logging.info('文件修改日期和大小刷新成功')
-            for rowIndex, fileInfo in enumerate(allInfos):
-                self.fileTableView.setItem(rowIndex, 3, QTableWidgetItem(fileInfo[0]))
-                self.fileTableView.setItem(rowIndex, 4, QTableWidgetItem(fileInfo[1]))
-                self.fileTableView.setItem(rowIndex, 5, QTableWidgetItem(fileInfo[2]))
-        else:
-            logging.warning('文件修改日期和大小刷新失败')
-            for i in range(self.fileTableView.rowCount()):
-                self.fileTableView.setItem(i, 3, QTableWidgetItem('未知'))
-                self.fileTableView.setItem(i, 5, QTableWidgetItem('未知'))
-            InfoBar.warning(
-                '警告',
-                '软件的Java路径有误，无法获取修改日期和文件大小',
-                duration=-1,
-                position=InfoBarPosition.TOP,
-                parent=self.parentWindow
-            )
+        self.metadataScanner.scan([record.path for record in records])
 
-        self.fileTableView.blockSignals(False)
+    def onInfoReady(self, results: list):
+        """
+        将一批元数据扫描结果填入表格，并根据文件是否存在标记或去除备注中的“（已失效）”
+        :param results: [(文件路径, 是否存在, [修改日期,文件类型,文件大小]), ...]
+        """
+        rowInfos = {}
+        for path, exists, info in results:
+            row = self.fileModel.rowOfPath(path)
+            if row < 0:  # 扫描期间已被删除或重定向的文件没有对应的行
+                continue
+
+            record = self.fileModel.record(row)
+            if [record.date, record.type, record.size] != info:  # 只更新内容改变的行
+                rowInfos[row] = info
+
+            if not exists and not record.remark.startswith('（已失效）'):
+                self.setRemark(row, f'（已失效）{record.remark}')  # 如果文件不存在则在备注中标记
+            elif exists and record.remark.startswith('（已失效）'):
+                self.setRemark(row, record.remark.removeprefix('（已失效）'))  # 文件恢复后去除标记
+
+        self.fileModel.updateInfos(rowInfos)
 
     @staticmethod
     def versionCompare(dataVersion, targetVersion):
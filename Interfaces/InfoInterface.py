@@ -12,9 +12,12 @@ help_md = """\
 
 - 使用主页的“添加文件”按钮将你想要的文件添加至表格中（若出现“未知”字样，请检查Java版本）
 - 文件表格支持多选，多选的按键逻辑与Windows文件资源管理器一致
+- 点击“添加文件夹”按钮可以递归导入文件夹及其子文件夹中的文件，可设置包含和排除的文件（如“*.bat;*.cmd”），已在表格中的文件不会重复添加
+- 在主页右上角的搜索框中输入文字即可过滤表格（Ctrl+F），匹配文件名、备注和路径中以搜索词开头的词，多个搜索词以空格分隔；在设置中开启“搜索脚本内容”后还会匹配脚本中的内容
+- 右键菜单中的“选择同目录的文件”可以选中与该文件位于同一文件夹的全部文件，同一文件不能重复添加
 - 点击“删除文件”按钮即可将选中文件从表格中移除，支持多选
 - 点击“打开文件夹”按钮可以打开文件所在位置，支持同时打开多个文件夹
-- 单选状态下点击“运行文件”按钮可以运行选中的文件，此时文件的运行细节将会输出到“控制台”界面，用户也可通过该界面输入命令
+- 点击“运行文件”按钮可以运行选中的文件，支持多选，每个文件的运行细节将会输出到“控制台”界面的独立标签页，用户也可通过该界面输入命令
 
 ## 编辑单元格
 
@@ -31,18 +34,26 @@ help_md = """\
 
 ## 文件运行
 
-- 只能同时运行一个文件，且文件运行时会占用端口号1918，请确保该端口号没有被其他应用占用
+- 可以同时运行多个文件，同时运行的文件数上限可在设置界面修改，超出上限的文件将排队等待
+- .bat和.cmd文件由cmd运行，.ps1文件由PowerShell运行，.sh文件由sh运行（优先使用第一行#!指定的解释器）；文件中使用chcp切换代码页时会按对应的编码读取输出
+- 运行方式可在设置界面修改：“内置运行器”由本软件直接启动进程，无需Java，也可在Linux上运行
+- 每个文件运行时由系统自动分配空闲的通信端口（仅限本机连接），无需担心端口被其他应用占用
+- 后端会预先启动少量空闲的cmd进程，运行文件时可立即开始；预热进程数和空闲回收时间可在设置界面修改，设为0即关闭预热
 - 在主页选中文件并点击“运行文件”按钮后，“控制台”界面将监听文件运行的输出内容
 - 用户可以在“控制台”界面上方的文本框中输入命令，按下回车或者旁边的发送按钮即可发送命令
-- 如果想要强制结束运行中的文件，可以按下输入框旁的“结束进程”按钮，或者发送“#kill#”命令（除非迫不得已，否则不推荐强制结束进程）
+- 命令将发送至当前标签页中运行的文件；如果想要强制结束运行中的文件，可以按下输入框旁的“结束进程”按钮（除非迫不得已，否则不推荐强制结束进程）
 - 文件运行结束或者进程被杀死将会显示退出代码，0为正常退出
-- 文件运行时的输出内容最多保存1000行，且在下次运行文件时自动清空
+- 文件运行时的输出内容不限制行数，可使用“查找输出内容”搜索；关闭已结束运行的标签页即可清除其输出内容
+- 运行期间按设置的间隔采样文件及其子进程的CPU、内存、读写量和线程数，在“控制台”界面以图表显示，结束时输出整次运行的平均值和峰值，并记入运行记录以便比较各次运行；Java后端在Windows上只能采样CPU时间，使用内置运行器并安装psutil可获得完整数据
+- 每次运行的输出都会压缩保存，可在“运行记录”界面按文件、时间或是否成功查看以往的运行及其输出；在主页右键菜单中选择“查看运行记录”可只显示该文件的记录，保留天数可在设置界面修改
 
 ## 文件预设
 
 - 前往“文件预设”界面可添加自定义文件预设以便更加便捷地管理文件
 - 文件预设具有多种样式，具体样式介绍可以前往“文件预设”界面查看
-- 文件预设功能仅提供更加便捷的管理文件方式，并不能实现同时运行多个文件的功能
+- 预设运行的文件同样会在“控制台”界面以独立标签页显示
+- 预设可设置运行计划，按cron表达式定时、按固定间隔、在文件内容改变后或在其他预设结束后自动运行，下次运行时间在重启后保留
+- 不打开软件也能运行文件或预设：在软件目录中执行`python -m bfm run <文件路径或预设标题>`，输出直接显示在命令行中，命令以脚本的退出代码结束，适合计划任务调用；开关预设默认运行开启文件，加上`--off`运行关闭文件，`python -m bfm list`列出全部预设
 """
 
 updateLog_md = """\
@@ -0,0 +1,419 @@
+"""虚拟化的控制台输出显示模块"""
+import mmap
+import tempfile
+from array import array
+from bisect import bisect_right
+from collections import deque
+
+from PyQt6.QtCore import Qt, QPoint
+from PyQt6.QtGui import QPainter, QColor, QKeySequence
+from PyQt6.QtWidgets import QAbstractScrollArea, QApplication
+
+from qfluentwidgets import RoundMenu, Action, isDarkTheme, themeColor, setCustomStyleSheet, setFont
+from qfluentwidgets import FluentIcon as FIF
+from qfluentwidgets.components.widgets.scroll_bar import SmoothScrollDelegate
+
+
+class LogStore:
+    """
+    控制台输出的行存储
+
+    * 最近的capacity行保存在内存中的环形缓冲区里
+    * 更早的行按UTF-8编码追加到临时文件（溢出文件），通过内存映射读取，占用的内存不随行数增长
+    * 溢出文件每blockSize行记录一次起始偏移量，读取某一行时从所在块的起点向后查找换行符即可定位
+
+    构造方法参数
+    ------------
+    * capacity: 内存中保留的行数
+    """
+
+    blockSize = 64  # 每隔多少行记录一次溢出文件中的偏移量
+
+    def __init__(self, capacity: int = 20000):
+        self.capacity = capacity
+        self.ring = deque()  # 最近的行
+        self.lineOpen = False  # 最后一行是否尚未结束（没有收到换行符）
+        self.pendingReturn = False  # 未结束的行是否以回车符结尾（之后续写的内容将覆盖该行）
+
+        self.spillFile = None  # 溢出文件（首次溢出时创建，关闭后自动删除）
+        self.spilledCount = 0  # 已溢出的行数
+        self.spillSize = 0  # 溢出文件的字节数
+        self.blockOffsets = array('Q')  # 每块第一行在溢出文件中的偏移量
+        self.pendingSpill = []  # 等待写入溢出文件的行
+        self.mapped = None  # 溢出文件的内存映射
+        self.mappedSize = 0
+
+    def __len__(self):
+        return self.spilledCount + len(self.pendingSpill) + len(self.ring)
+
+    def append(self, text: str):
+        """
+        追加文本（可以从行的中间开始或结束）
+        :param text: 文本
+        """
+        parts = text.split('\n')
+        last = parts.pop()  # 最后一个换行符之后的内容，为空表示文本以换行符结尾
+        for part in parts:
+            self.__appendLine(part, True)
+        if last:
+            self.__appendLine(last, False)
+        self.__writeSpill()
+
+    def clear(self):
+        """清空全部内容"""
+        self.ring.clear()
+        self.lineOpen = self.pendingReturn = False
+        self.pendingSpill.clear()
+        self.spilledCount = self.spillSize = 0
+        self.blockOffsets = array('Q')
+        self.__unmap()
+        if self.spillFile is not None:
+            self.spillFile.close()  # 临时文件关闭后自动删除
+            self.spillFile = None
+
+    def close(self):
+        """释放溢出文件"""
+        self.clear()
+
+    def lines(self, first: int, last: int) -> list:
+        """
+        读取连续的多行
+        :param first: 起始行号
+        :param last: 结束行号（不包含）
+        :return: 各行文本的列表
+        """
+        first = max(0, first)
+        last = min(len(self), last)
+        if first >= last:
+            return []
+
+        result = []
+        if first < self.spilledCount:
+            result.extend(self.__readSpilled(first, min(last, self.spilledCount)))
+        ringFirst = max(first, self.spilledCount) - self.spilledCount
+        for i in range(ringFirst, last - self.spilledCount):
+            result.append(self.ring[i])
+        return result
+
+    def find(self, needle: str, start: int, forward: bool = True) -> int:
+        """
+        查找包含指定文本的行（区分大小写）
+        :param needle: 需要查找的文本
+        :param start: 开始查找的行号（包含该行）
+        :param forward: 是否向后查找
+        :return: 行号，未找到时返回-1
+        """
+        if not needle or '\n' in needle:
+            return -1
+
+        if forward:
+            start = max(0, start)
+            if start < self.spilledCount:
+                found = self.__findSpilled(needle, start, forward)
+                if found >= 0:
+                    return found
+            for i in range(max(start - self.spilledCount, 0), len(self.ring)):
+                if needle in self.ring[i]:
+                    return self.spilledCount + i
+            return -1
+
+        start = min(start, len(self) - 1)
+        for i in range(start - self.spilledCount, -1, -1):
+            if needle in self.ring[i]:
+                return self.spilledCount + i
+        if self.spilledCount:
+            return self.__findSpilled(needle, min(start, self.spilledCount - 1), forward)
+        return -1
+
+    @staticmethod
+    def __clean(line: str) -> str:
+        """去除行中的回车符，回车之后的内容覆盖之前的内容（如进度显示）"""
+        if '\r' in line:
+            line = line.rstrip('\r')
+            line = line[line.rfind('\r') + 1:]
+        return line
+
+    def __appendLine(self, part: str, closing: bool):
+        """追加一行或续写未结束的行"""
+        if self.lineOpen and self.ring:
+            prefix = '\r' if self.pendingReturn else ''  # 输出可能在回车符之后被分成两块
+            self.ring[-1] = self.__clean(self.ring[-1] + prefix + part)
+        else:
+            if len(self.ring) >= self.capacity:
+                self.pendingSpill.append(self.ring.popleft())
+            self.ring.append(self.__clean(part))
+        self.lineOpen = not closing
+        self.pendingReturn = self.lineOpen and part.endswith('\r')
+
+    def __writeSpill(self):
+        """将被挤出环形缓冲区的行写入溢出文件"""
+        if not self.pendingSpill:
+            return
+        if self.spillFile is None:
+            self.spillFile = tempfile.TemporaryFile(prefix='bfm-console-')
+
+        chunks = []
+        for line in self.pendingSpill:
+            if self.spilledCount % self.blockSize == 0:
+                self.blockOffsets.append(self.spillSize)
+            data = line.encode('utf-8') + b'\n'
+            chunks.append(data)
+            self.spillSize += len(data)
+            self.spilledCount += 1
+        self.pendingSpill.clear()
+
+        self.spillFile.seek(0, 2)
+        self.spillFile.write(b''.join(chunks))
+
+    def __map(self):
+        """确保内存映射覆盖整个溢出文件"""
+        if self.mappedSize == self.spillSize:
+            return self.mapped
+
+        self.__unmap()
+        self.spillFile.flush()
+        self.mapped = mmap.mmap(self.spillFile.fileno(), 0, access=mmap.ACCESS_READ)
+        self.mappedSize = self.spillSize
+        return self.mapped
+
+    def __unmap(self):
+        """关闭内存映射"""
+        if self.mapped is not None:
+            self.mapped.close()
+            self.mapped = None
+            self.mappedSize = 0
+
+    def __lineOffset(self, index: int) -> int:
+        """获取溢出文件中某一行的起始偏移量"""
+        mapped = self.__map()
+        pos = self.blockOffsets[index // self.blockSize]
+        for _ in range(index % self.blockSize):
+            pos = mapped.find(b'\n', pos) + 1
+        return pos
+
+    def __readSpilled(self, first: int, last: int) -> list:
+        """读取溢出文件中的连续多行"""
+        mapped = self.__map()
+        pos = self.__lineOffset(first)
+        result = []
+        for _ in range(first, last):
+            end = mapped.find(b'\n', pos)
+            result.append(mapped[pos:end].decode('utf-8', errors='replace'))
+            pos = end + 1
+        return result
+
+    def __lineAtOffset(self, offset: int) -> int:
+        """获取溢出文件中某个偏移量所在的行号"""
+        mapped = self.__map()
+        block = bisect_right(self.blockOffsets, offset) - 1
+        blockStart = self.blockOffsets[block]
+        return block * self.blockSize + mapped[blockStart:offset].count(b'\n')
+
+    def __findSpilled(self, needle: str, start: int, forward: bool) -> int:
+        """在溢出文件中查找（直接在映射的字节上搜索，不逐行解码）"""
+        mapped = self.__map()
+        data = needle.encode('utf-8')
+        if forward:
+            offset = mapped.find(data, self.__lineOffset(start))
+        else:
+            end = self.spillSize if start + 1 >= self.spilledCount else self.__lineOffset(start + 1)
+            offset = mapped.rfind(data, 0, end)
+        return -1 if offset < 0 else self.__lineAtOffset(offset)
+
+
+class LogView(QAbstractScrollArea):
+    """
+    虚拟化的控制台输出显示控件
+
+    内容保存在LogStore中，绘制时只读取并绘制可见的行，追加内容的开销与已有的行数无关，
+    因此可以保留长时间运行产生的全部输出，而不必像QTextDocument那样限制最大行数。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store = LogStore()
+        self.autoScroll = True
+        self.padding = 8
+        self.maxLineWidth = 0  # 已绘制过的最长行的宽度，用于水平滚动条
+        self.selection = None  # 选中的行范围 (起始行, 结束行)
+        self.anchor = None  # 鼠标选择的起始行
+        self.matchLine = -1  # 查找结果所在的行
+
+        self.scrollDelegate = SmoothScrollDelegate(self)
+        setFont(self)
+        setCustomStyleSheet(
+            self,
+            'LogView{background-color: rgba(255, 255, 255, 0.7); border: 1px solid rgba(0, 0, 0, 13); '
+            'border-bottom: 1px solid rgba(0, 0, 0, 100); border-radius: 5px;}',
+            'LogView{background-color: rgba(255, 255, 255, 0.0605); border: 1px solid rgba(255, 255, 255, 0.08); '
+            'border-bottom: 1px solid rgba(255, 255, 255, 0.5442); border-radius: 5px;}'
+        )
+        self.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
+        self.viewport().setCursor(Qt.CursorShape.IBeamCursor)
+
+    def lineHeight(self) -> int:
+        return self.fontMetrics().lineSpacing()
+
+    def lineCount(self) -> int:
+        return len(self.store)
+
+    def appendText(self, text: str):
+        """
+        在末尾追加文本
+        :param text: 文本（可以不以换行符结尾，之后追加的内容将续写在同一行）
+        """
+        if not text:
+            return
+
+        self.store.append(text)
+        self.__updateScrollRange()
+        if self.autoScroll:
+            self.verticalScrollBar().setValue(self.verticalScrollBar().maximum())
+        self.viewport().update()
+
+    def clear(self):
+        """清空全部内容"""
+        self.store.clear()
+        self.maxLineWidth = 0
+        self.selection = self.anchor = None
+        self.matchLine = -1
+        self.__updateScrollRange()
+        self.viewport().update()
+
+    def setAutoScroll(self, autoScroll: bool):
+        self.autoScroll = autoScroll
+
+    def findText(self, text: str, forward: bool = True) -> bool:
+        """
+        从上一个查找结果开始查找下一个包含指定文本的行，到达末尾后从头开始
+        :param text: 需要查找的文本
+        :param forward: 是否向后查找
+        :return: 是否找到
+        """
+        if forward:
+            line = self.store.find(text, self.matchLine + 1, True)
+            if line < 0:
+                line = self.store.find(text, 0, True)
+        else:
+            start = self.matchLine - 1 if self.matchLine >= 0 else self.lineCount() - 1
+            line = self.store.find(text, start, False)
+            if line < 0:
+                line = self.store.find(text, self.lineCount() - 1, False)
+
+        self.matchLine = line
+        if line >= 0:
+            self.scrollToLine(line)
+        self.viewport().update()
+        return line >= 0
+
+    def scrollToLine(self, line: int):
+        """将指定行滚动至可见区域中间"""
+        value = line * self.lineHeight() - (self.viewport().height() - self.lineHeight()) // 2
+        self.verticalScrollBar().setValue(max(0, value))
+
+    def selectedText(self) -> str:
+        """获取选中的行"""
+        if self.selection is None:
+            return ''
+        first, last = self.selection
+        return '\n'.join(self.store.lines(first, last + 1))
+
+    def copy(self):
+        """复制选中的行"""
+        text = self.selectedText()
+        if text:
+            QApplication.clipboard().setText(text)
+
+    def selectAll(self):
+        if self.lineCount():
+            self.selection = (0, self.lineCount() - 1)
+            self.viewport().update()
+
+    def lineAt(self, pos: QPoint) -> int:
+        """获取指定位置所在的行号"""
+        line = (self.verticalScrollBar().value() + pos.y() - self.padding) // self.lineHeight()
+        return min(max(0, line), max(0, self.lineCount() - 1))
+
+    def paintEvent(self, e):
+        painter = QPainter(self.viewport())
+        lineHeight = self.lineHeight()
+        ascent = self.fontMetrics().ascent()
+        scrollY = self.verticalScrollBar().value()
+        scrollX = self.horizontalScrollBar().value()
+        width = self.viewport().width()
+
+        first = max(0, (scrollY - self.padding) // lineHeight)
+        count = self.viewport().height() // lineHeight + 2
+        lines = self.store.lines(first, first + count)
+
+        textColor = QColor(255, 255, 255) if isDarkTheme() else QColor(0, 0, 0)
+        selectColor = QColor(themeColor())
+        selectColor.setAlpha(70)
+        matchColor = QColor(themeColor())
+        matchColor.setAlpha(140)
+
+        painter.setPen(textColor)
+        maxWidth = self.maxLineWidth
+        for i, line in enumerate(lines):
+            index = first + i
+            y = self.padding + index * lineHeight - scrollY
+            if self.selection is not None and self.selection[0] <= index <= self.selection[1]:
+                painter.fillRect(0, y, width, lineHeight, selectColor)
+            if index == self.matchLine:
+                painter.fillRect(0, y, width, lineHeight, matchColor)
+            painter.drawText(self.padding - scrollX, y + ascent, line)
+            maxWidth = max(maxWidth, self.fontMetrics().horizontalAdvance(line))
+
+        if maxWidth != self.maxLineWidth:
+            self.maxLineWidth = maxWidth
+            self.__updateScrollRange()
+
+    def resizeEvent(self, e):
+        super().resizeEvent(e)
+        self.__updateScrollRange()
+
+    def mousePressEvent(self, e):
+        super().mousePressEvent(e)
+        if e.button() == Qt.MouseButton.LeftButton and self.lineCount():
+            self.anchor = self.lineAt(e.position().toPoint())
+            self.selection = (self.anchor, self.anchor)
+            self.viewport().update()
+
+    def mouseMoveEvent(self, e):
+        super().mouseMoveEvent(e)
+        if self.anchor is not None and e.buttons() & Qt.MouseButton.LeftButton:
+            line = self.lineAt(e.position().toPoint())
+            self.selection = (min(self.anchor, line), max(self.anchor, line))
+            self.viewport().update()
+
+    def mouseReleaseEvent(self, e):
+        super().mouseReleaseEvent(e)
+        self.anchor = None
+
+    def keyPressEvent(self, e):
+        if e.matches(QKeySequence.StandardKey.Copy):
+            self.copy()
+        elif e.matches(QKeySequence.StandardKey.SelectAll):
+            self.selectAll()
+        else:
+            super().keyPressEvent(e)
+
+    def contextMenuEvent(self, e):
+        menu = RoundMenu(parent=self)
+        copyAction = Action(FIF.COPY, '复制', triggered=self.copy)
+        copyAction.setEnabled(self.selection is not None)
+        menu.addActions([copyAction, Action(FIF.ALIGNMENT, '全选', triggered=self.selectAll)])
+        menu.exec(e.globalPos())
+
+    def __updateScrollRange(self):
+        """根据行数和可见区域大小更新滚动条范围（滚动条以像素为单位，便于平滑滚动）"""
+        lineHeight = self.lineHeight()
+        contentHeight = self.lineCount() * lineHeight + self.padding * 2
+        vbar = self.verticalScrollBar()
+        vbar.setRange(0, max(0, contentHeight - self.viewport().height()))
+        vbar.setPageStep(self.viewport().height())
+        vbar.setSingleStep(lineHeight)
+
+        hbar = self.horizontalScrollBar()
+        hbar.setRange(0, max(0, self.maxLineWidth + self.padding * 2 - self.viewport().width()))
+        hbar.setPageStep(self.viewport().width())
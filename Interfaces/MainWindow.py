@@ -4,17 +4,22 @@ from PyQt6.QtGui import QIcon
 from PyQt6.QtWidgets import QApplication
 
 from AppConfig.config import cfg
+from AppConfig.storage import storage
+from Connector.BackendDaemon import backendDaemon
+from Connector.LocalRunner import localRunner
 from Interfaces.HomeInterface import HomeInterface
 from Interfaces.PresetInterface import PresetInterface
 from Interfaces.SettingInterface import SettingInterface
 from Interfaces.InfoInterface import InfoInterface
 from Interfaces.CMDInterface import CMDInterface
+from Interfaces.HistoryInterface import HistoryInterface
 
 from qfluentwidgets import FluentWindow, NavigationItemPosition, SplashScreen, Dialog
 from qfluentwidgets import FluentIcon as FIF
 
 from Interfaces import version
 from Logs.log_recorder import logging
+from Logs.run_history import runHistory
 
 
 class MainWindow(FluentWindow):
@@ -23,6 +28,10 @@ class MainWindow(FluentWindow):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.initWindow()
+        backendDaemon.start()  # 启动常驻Java后端，供各子界面使用
+        if cfg.get(cfg.useJavaStorage):
+            storage.setBackend(backendDaemon)  # 由Java后端读写数据文件（备用方案）
+        runHistory.start(cfg.get(cfg.historyRetentionDays))  # 在后台打开运行记录数据库
         self.initSubInterfaces()
         self.initNavigation()
 
@@ -30,15 +39,18 @@ class MainWindow(FluentWindow):
         self.splashScreen.finish()
 
         # 文件运行状态改变时修改标题
-        self.cmdInterface.socketClient.runningChanged.connect(self.changeTitle)
+        self.cmdInterface.runManager.activeCountChanged.connect(self.changeTitle)
 
-    def changeTitle(self, isRunning: bool = False):
+        # 记录每一次运行的输出和结果
+        runHistory.attach(self.cmdInterface.runManager)
+
+    def changeTitle(self, runningCount: int = 0):
         """
         根据文件运行状态修改标题
-        :param isRunning: 文件是否运行
+        :param runningCount: 正在运行的文件数
         """
-        if isRunning:
-            self.setWindowTitle(f'BatchFileManager-v{version}（正在运行）')
+        if runningCount:
+            self.setWindowTitle(f'BatchFileManager-v{version}（正在运行{runningCount}个文件）')
         else:
             self.setWindowTitle(f'BatchFileManager-v{version}')
 
@@ -49,6 +61,7 @@ class MainWindow(FluentWindow):
         self.infoInterface = InfoInterface(self)
         self.cmdInterface = CMDInterface(self)
         self.presetInterface = PresetInterface(self)
+        self.historyInterface = HistoryInterface(self)
 
     def initNavigation(self):
         """初始化导航栏"""
@@ -58,6 +71,7 @@ class MainWindow(FluentWindow):
         self.addSubInterface(self.homeInterface, FIF.HOME, '主页')
         self.addSubInterface(self.cmdInterface, FIF.COMMAND_PROMPT, '控制台')
         self.addSubInterface(self.presetInterface, FIF.EMOJI_TAB_SYMBOLS, '文件预设')
+        self.addSubInterface(self.historyInterface, FIF.HISTORY, '运行记录')
 
         # 添加导航栏底部按钮
         self.addSubInterface(self.settingInterface, FIF.SETTING, '设置', NavigationItemPosition.BOTTOM)
@@ -89,7 +103,7 @@ class MainWindow(FluentWindow):
         cfg.set(cfg.appVersion, version)  # 更新应用版本号
 
         # 检测是否有程序正在运行并弹出对话框
-        if self.cmdInterface.socketClient.running:
+        if self.cmdInterface.runManager.hasActiveRuns():
             w = Dialog('文件正在运行', '当前有文件正在运行，关闭应用将强制结束进程，确认继续吗？')
             if not w.exec():
                 event.ignore()
@@ -99,8 +113,16 @@ class MainWindow(FluentWindow):
         fileTableWidth = [self.homeInterface.fileTableView.columnWidth(i) for i in range(5)]
         cfg.set(cfg.tableColumnWidth, fileTableWidth)
 
-        self.homeInterface.saveContents()  # 保存表格内容
+        self.homeInterface.metadataScanner.shutdown()  # 停止扫描文件元数据
+        self.homeInterface.folderImporter.shutdown()  # 停止导入文件夹
+        self.homeInterface.fileWatcher.shutdown()  # 停止监视文件变化
+        self.homeInterface.contentIndexer.shutdown()  # 停止读取脚本内容
+        self.homeInterface.flushContents()  # 立即保存尚未写入的表格内容
+        self.presetInterface.scheduler.shutdown()  # 停止计划运行并保存下次运行时间
         self.presetInterface.savePreset()  # 保存预设卡片
         self.cmdInterface.stopCommunicationAndKill()  # 切断与子进程的连接
+        localRunner.shutdown()  # 结束内置运行器启动的进程
+        runHistory.close()  # 写入尚未保存的运行记录
+        backendDaemon.stop()  # 关闭常驻Java后端
 
         super().closeEvent(event)
@@ -1,6 +1,6 @@
 """文件预设界面模块"""
-import json
 import os
+import time
 from enum import Enum
 
 from PyQt6.QtCore import Qt, pyqtSignal
@@ -9,12 +9,18 @@ from PyQt6.QtWidgets import QWidget, QHBoxLayout, QFrame, QVBoxLayout, QListWidg
 
 from qfluentwidgets import CardWidget, BodyLabel, CaptionLabel, SwitchButton, PushButton, InfoBar, InfoBarPosition, \
     CommandBar, Action, SmoothScrollArea, Theme, isDarkTheme, MessageBoxBase, ListWidget, ComboBox, LineEdit, \
-    ToolButton, ToolTipFilter, ToolTipPosition, SubtitleLabel, TextBrowser, Dialog
+    ToolButton, ToolTipFilter, ToolTipPosition, SubtitleLabel, TextBrowser, Dialog, CompactSpinBox, CheckBox
 from qfluentwidgets import FluentIcon as FIF
 
-from Connector.JarConnector import JarConnector
+from Connector.QueueExecutor import QueueExecutor, QueueMode, normalizeQueueData, dependencyGraph
+from Connector.RunManager import RunState
+from Connector.SchedulePlan import TriggerType, TriggerAction, actionTexts, conditionTexts, \
+    normalizeTrigger, normalizeSchedule, nextFireTime, chainCreatesCycle, describeTrigger, formatFireTime
+from Connector.Scheduler import Scheduler
 from Logs.log_recorder import logging
 from AppConfig.config import cfg
+from AppConfig.journal import fileTableJournal, presetJournal
+from FileMonitor.scanner import normalizePath
 
 style_introduction = """\
 ## 开关
@@ -24,8 +30,23 @@ style_introduction = """\
 
 ## 队列
 
-- 功能：按照新建预设时从上到下的顺序依次运行文件
-- 文件说明：需要一个或多个文件，运行该队列时将会按照顺序依次执行文件
+- 功能：按照设定的执行方式运行多个文件，运行中再次点击按钮可停止队列
+- 文件说明：需要一个或多个文件，支持以下执行方式
+    - 顺序执行：按照从上到下的顺序依次运行，上一个文件结束后才运行下一个
+    - 并行执行：同时运行多个文件，同时运行的数量不超过设定的上限
+    - 按依赖执行：为每个步骤设置前置步骤，文件在其前置步骤全部结束后立即运行
+- 退出代码不为0视为失败，勾选“失败时停止”后任一文件失败即不再运行新的文件
+- 队列结束后可在日志中查看每个文件的等待时间和运行时间
+
+## 运行计划
+
+选中预设后点击“运行计划”，可让预设在以下情况自动运行（开关预设可选择开启、关闭或切换）：
+
+- 定时：按cron表达式运行，五个字段依次为“分 时 日 月 周”，如“0 8 * * 1-5”表示工作日8:00，“*/30 * * * *”表示每30分钟，也可使用@daily、@hourly等简写
+- 固定间隔：每隔一段时间运行一次
+- 文件变化：指定的文件内容改变后运行
+- 其他预设结束后：其他预设运行结束（或成功、失败）后运行，可以串联多个预设
+- 下次运行时间会被保存，重启软件后继续按原计划运行；软件关闭期间错过的计划默认在启动后补运行一次，可在设置界面修改
 """
 
 
@@ -85,6 +106,8 @@ class PresetCard(CardWidget):
         self.index = index
         self.parentInterface = parent
         self.isCurrentCard = None
+        self.schedule = normalizeSchedule(None)  # 运行计划，其中的ID作为预设的固定ID
+        self.scheduledRun = False  # 正在按运行计划运行（提交的运行结束后不长期保留标签页）
         self.setFixedHeight(73)
 
         if not isinstance(style, PresetStyle): raise TypeError  # 样式种类错误则抛出异常
@@ -93,8 +116,11 @@ class PresetCard(CardWidget):
         if self.style == PresetStyle.SWITCH:
             self.openFile = None
             self.closeFile = None
+            self.openFileId = None  # 文件在文件列表中的行ID
+            self.closeFileId = None
         elif self.style == PresetStyle.QUEUE:
-            self.fileList = None
+            self.queueData = None
+            self.executor = None  # 正在执行的队列
 
         # 基本布局设置
         self.mainLayout = QHBoxLayout(self)
@@ -115,13 +141,15 @@ class PresetCard(CardWidget):
     def setFile(self, files: list):
         """
         设置卡片对应的文件
-        :param files: 传入的文件路径列表
+        :param files: 开关预设为[开启文件路径,关闭文件路径,开启文件行ID,关闭文件行ID]（行ID可省略），队列预设为队列数据
         """
         if self.style == PresetStyle.SWITCH:
             self.openFile = files[0]
             self.closeFile = files[1]
+            self.openFileId = files[2] if len(files) > 2 else None
+            self.closeFileId = files[3] if len(files) > 3 else None
         elif self.style == PresetStyle.QUEUE:
-            self.fileList = files
+            self.queueData = normalizeQueueData(files)
 
     def initControls(self):
         """初始化控件"""
@@ -160,129 +188,144 @@ class PresetCard(CardWidget):
             self.mainLayout.addWidget(self.runButton, 0, Qt.AlignmentFlag.AlignRight)
             self.runButton.clicked.connect(self.__onButtonClicked)
 
+    @property
+    def presetId(self) -> str:
+        """预设的固定ID（不随卡片位置和标题改变）"""
+        return self.schedule['id']
+
+    def runScheduled(self, action: str):
+        """
+        按运行计划运行预设
+        :param action: 开关预设的操作（开启、关闭或切换）
+        """
+        self.scheduledRun = True  # 本次提交的运行由计划触发
+        try:
+            self.__runScheduled(action)
+        finally:
+            self.scheduledRun = False
+
+    def __runScheduled(self, action: str):
+        """按运行计划执行开关或队列预设的操作"""
+        if self.style == PresetStyle.SWITCH:
+            if action == TriggerAction.TOGGLE:
+                checked = not self.switchButton.isChecked()
+            else:
+                checked = action == TriggerAction.OPEN
+            if self.switchButton.isChecked() != checked:
+                self.switchButton.setChecked(checked)  # 发出checkedChanged信号，运行对应的文件
+            else:
+                self.__onButtonClicked(checked)
+        elif self.style == PresetStyle.QUEUE:
+            if self.executor is not None and self.executor.isRunning():
+                logging.warning(f'队列“{self.title}”正在执行，跳过本次计划运行')
+                return
+            self.__onButtonClicked()
+
+    def resolvePath(self, path: str, fileId: int = None) -> str:
+        """按行ID获取文件在文件列表中的当前路径（文件被重定向后仍能找到）"""
+        return self.parentInterface.parentWindow.homeInterface.resolvePath(path, fileId)
+
     def runFile(self, filePath: str):
         """
         运行文件方法
         :param filePath: 文件路径
-        :return: Java后端应答情况（文件是否正确运行）
+        :return: 文件是否已提交运行
         """
-        cmdInterface = self.parentInterface.parentWindow.cmdInterface
-        running_cnt = JarConnector('./backend/fileRunner.jar')
-        running_cnt.sendData([filePath])
-        ack = running_cnt.receiveData()
-
-        if ack:
-            logging.info('文件成功运行')
-            cmdInterface.startCommunication()
-            return True
-        else:
+        if not os.path.isfile(filePath):
+            logging.error(f'预设文件不存在：{filePath}')
+            self.parentInterface.onPresetFinished(self, False)
             return False
 
-    def __onButtonClicked(self, *args):
-        """用户点击按钮后执行的方法"""
         cmdInterface = self.parentInterface.parentWindow.cmdInterface
-        runningFlag = cmdInterface.socketClient.running
+        run = cmdInterface.runFile(filePath, f'{self.title}：{os.path.basename(filePath)}', self.scheduledRun)
+        self.parentInterface.watchRun(run, self)  # 运行结束后触发以本预设为前置的计划
+        logging.info('文件已提交运行')
+        return True
 
+    def __onButtonClicked(self, *args):
+        """用户点击按钮后执行的方法"""
         if self.style == PresetStyle.SWITCH:
             if args[0]:  # 判断开关状态
-                if runningFlag:
-                    InfoBar.error(
-                        "错误",
-                        '已有正在运行的文件',
-                        duration=1500,
-                        position=InfoBarPosition.TOP,
-                        parent=self.parentInterface.parentWindow
-                    )
-                    self.switchButton.blockSignals(True)
-                    self.switchButton.setChecked(False)
-                    self.switchButton.blockSignals(False)
-                else:
-                    logging.info('开关类预设：开')
-                    flag = self.runFile(self.openFile)
-                    if flag:
-                        InfoBar.success(
-                            '成功',
-                            '文件已成功运行',
-                            duration=1500,
-                            position=InfoBarPosition.TOP,
-                            parent=self.parentInterface.parentWindow
-                        )
-                    else:
-                        InfoBar.error(
-                            "运行失败",
-                            "请检查Java版本和预设文件",
-                            position=InfoBarPosition.TOP,
-                            duration=1500,
-                            parent=self.parentInterface.parentWindow
-                        )
-                        logging.error('运行失败：Java后端或预设文件异常')
-                        self.switchButton.blockSignals(True)
-                        self.switchButton.setChecked(False)
-                        self.switchButton.blockSignals(False)
+                logging.info('开关类预设：开')
+                filePath = self.resolvePath(self.openFile, self.openFileId)
             else:
-                if runningFlag:
-                    InfoBar.error(
-                        "错误",
-                        '已有正在运行的文件',
-                        duration=1500,
-                        position=InfoBarPosition.TOP,
-                        parent=self.parentInterface.parentWindow
-                    )
-                    self.switchButton.blockSignals(True)
-                    self.switchButton.setChecked(True)
-                    self.switchButton.blockSignals(False)
-                else:
-                    flag = self.runFile(self.closeFile)
-                    if flag:
-                        InfoBar.success(
-                            '成功',
-                            '文件已成功运行',
-                            duration=1500,
-                            position=InfoBarPosition.TOP,
-                            parent=self.parentInterface.parentWindow
-                        )
-                    else:
-                        InfoBar.error(
-                            "运行失败",
-                            "请检查Java版本和预设文件",
-                            position=InfoBarPosition.TOP,
-                            duration=1500,
-                            parent=self.parentInterface.parentWindow
-                        )
-                        logging.error('运行失败：Java后端或预设文件异常')
-                        self.switchButton.blockSignals(True)
-                        self.switchButton.setChecked(True)
-                        self.switchButton.blockSignals(False)
+                logging.info('开关类预设：关')
+                filePath = self.resolvePath(self.closeFile, self.closeFileId)
+
+            if self.runFile(filePath):
+                InfoBar.success(
+                    '成功',
+                    '文件已成功运行',
+                    duration=1500,
+                    position=InfoBarPosition.TOP,
+                    parent=self.parentInterface.parentWindow
+                )
+            else:
+                InfoBar.error(
+                    "运行失败",
+                    "请检查预设文件是否存在",
+                    position=InfoBarPosition.TOP,
+                    duration=1500,
+                    parent=self.parentInterface.parentWindow
+                )
+                logging.error('运行失败：预设文件异常')
+                self.switchButton.blockSignals(True)
+                self.switchButton.setChecked(not args[0])
+                self.switchButton.blockSignals(False)
         elif self.style == PresetStyle.QUEUE:
-            if runningFlag:  # 开始执行队列中的文件前检查是否有正在运行的文件
+            if self.executor is not None and self.executor.isRunning():
+                self.executor.cancel()
+                return
+
+            # 按行ID获取各步骤文件的当前路径
+            steps = [dict(step, path=self.resolvePath(step['path'], step.get('fileId')))
+                     for step in self.queueData['steps']]
+            try:
+                self.executor = QueueExecutor(self.parentInterface.parentWindow.cmdInterface.runManager,
+                                              dict(self.queueData, steps=steps), self.title, self,
+                                              self.scheduledRun)
+            except ValueError as e:
                 InfoBar.error(
-                    "错误",
-                    '已有正在运行的文件',
+                    '错误',
+                    str(e),
                     duration=1500,
                     position=InfoBarPosition.TOP,
                     parent=self.parentInterface.parentWindow
                 )
-            else:
-                for i, file in enumerate(self.fileList):
-                    if runningFlag: continue
-                    flag = self.runFile(file)
-                    if not flag:
-                        InfoBar.error(
-                            '错误',
-                            f'运行至第{i}个文件时出错，已终止文件运行',
-                            duration=1500,
-                            position=InfoBarPosition.TOP,
-                            parent=self.parentInterface.parentWindow
-                        )
-                        break
-                else:  # 循环正常结束时触发
-                    InfoBar.success(
-                        '完成',
-                        '队列中的文件已全部执行',
-                        duration=1500,
-                        position=InfoBarPosition.TOP,
-                        parent=self.parentInterface.parentWindow
-                    )
+                logging.error(f'队列预设数据有误：{e}')
+                return
+
+            self.executor.finished.connect(self.__onQueueFinished)
+            self.runButton.setText('停止队列')
+            self.executor.start()
+
+    def __onQueueFinished(self, success: bool):
+        """
+        队列执行结束
+        :param success: 是否全部成功
+        """
+        self.runButton.setText('运行文件')
+        executor = self.executor
+        self.executor = None
+        executor.deleteLater()  # 已结束的队列不再保留，控件销毁前由事件循环释放，下面仍可读取其结果
+        self.parentInterface.onPresetFinished(self, success)
+        if success:
+            InfoBar.success(
+                '完成',
+                f'队列中的文件已全部执行，用时{executor.elapsed():.1f}s',
+                duration=3000,
+                position=InfoBarPosition.TOP,
+                parent=self.parentInterface.parentWindow
+            )
+        else:
+            index = executor.failedStep()
+            InfoBar.error(
+                '队列未完成',
+                f'第{index + 1}个文件运行失败' if index >= 0 else '队列已停止',
+                duration=3000,
+                position=InfoBarPosition.TOP,
+                parent=self.parentInterface.parentWindow
+            )
 
     def getPresetData(self) -> list:
         """
@@ -295,9 +338,9 @@ class PresetCard(CardWidget):
             btn_stat = self.switchButton.isChecked()
             open_file = self.openFile
             close_file = self.closeFile
-            presetData = [btn_stat, open_file, close_file]
+            presetData = [btn_stat, open_file, close_file, self.openFileId, self.closeFileId]
         elif self.style == PresetStyle.QUEUE:
-            presetData = self.fileList
+            presetData = self.queueData
 
         return presetData
 
@@ -401,6 +444,7 @@ class PresetDataInputDialog(MessageBoxBase):
         self.parentWindow = parent
         self.presetData = presetData
         self.allFilePaths = []
+        self.fileIds = {}  # 文件列表中的规范化路径 -> 行ID
         self.inputControl = None  # 待填充已添加文件信息的控件
 
         self.widget.setFixedSize(650, 550)
@@ -541,6 +585,34 @@ class PresetDataInputDialog(MessageBoxBase):
             closeFileSelectButton.clicked.connect(lambda: self.__addFile(self.closeFilePathLineEdit))
 
         elif style == PresetStyle.QUEUE:
+            # 执行方式
+            modeLayout = QHBoxLayout()
+            self.mainLayout.addLayout(modeLayout)
+            modeLayout.addWidget(BodyLabel('执行方式'))
+            self.queueModeComboBox = ComboBox()
+            self.queueModeComboBox.addItems(['顺序执行', '并行执行', '按依赖执行'])
+            modeLayout.addWidget(self.queueModeComboBox)
+            modeLayout.addStretch(1)
+
+            optionLayout = QHBoxLayout()
+            self.mainLayout.addLayout(optionLayout)
+            optionLayout.addWidget(BodyLabel('同时运行'))
+            self.queueLimitSpinBox = CompactSpinBox()
+            self.queueLimitSpinBox.setRange(1, 16)
+            self.queueLimitSpinBox.setValue(2)
+            self.queueLimitSpinBox.setToolTip('并行执行和按依赖执行时同时运行的文件数上限')
+            self.queueLimitSpinBox.installEventFilter(
+                ToolTipFilter(self.queueLimitSpinBox, position=ToolTipPosition.TOP))
+            optionLayout.addWidget(self.queueLimitSpinBox)
+            optionLayout.addSpacing(20)
+            self.stopOnFailureCheckBox = CheckBox('失败时停止')
+            self.stopOnFailureCheckBox.setChecked(True)
+            self.stopOnFailureCheckBox.setToolTip('任一文件的退出代码不为0时不再运行新的文件')
+            self.stopOnFailureCheckBox.installEventFilter(
+                ToolTipFilter(self.stopOnFailureCheckBox, position=ToolTipPosition.TOP))
+            optionLayout.addWidget(self.stopOnFailureCheckBox)
+            optionLayout.addStretch(1)
+
             headerLayout = QHBoxLayout()
             self.mainLayout.addLayout(headerLayout)
 
@@ -556,23 +628,98 @@ class PresetDataInputDialog(MessageBoxBase):
             delBtn.setToolTip('移除文件')
             delBtn.installEventFilter(ToolTipFilter(delBtn, position=ToolTipPosition.TOP))
 
-            fileQueueList = ListWidget()
-            self.mainLayout.addWidget(fileQueueList)
+            self.queueListControl = ListWidget()
+            self.mainLayout.addWidget(self.queueListControl)
+
+            # 前置步骤（仅按依赖执行）
+            dependencyLayout = QHBoxLayout()
+            self.mainLayout.addLayout(dependencyLayout)
+            dependencyLayout.addWidget(BodyLabel('前置步骤'))
+            self.dependencyLineEdit = LineEdit()
+            self.dependencyLineEdit.setPlaceholderText('选中步骤后输入步骤序号，如：1,2')
+            dependencyLayout.addWidget(self.dependencyLineEdit)
+
+            addBtn.clicked.connect(lambda: self.__addFile(self.queueListControl))
+            delBtn.clicked.connect(lambda: self.__delFile(self.queueListControl))
+            self.queueModeComboBox.currentIndexChanged.connect(self.__onQueueModeChanged)
+            self.queueListControl.currentRowChanged.connect(self.__showDependencies)
+            self.dependencyLineEdit.editingFinished.connect(self.__applyDependencies)
+            self.setInputControl(self.queueListControl)
+            self.__onQueueModeChanged(self.queueModeComboBox.currentIndex())
+
+    def queueMode(self) -> QueueMode:
+        """当前选择的队列执行方式"""
+        return tuple(QueueMode)[self.queueModeComboBox.currentIndex()]
+
+    def __onQueueModeChanged(self, index: int):
+        """根据执行方式启用相应的控件"""
+        mode = tuple(QueueMode)[index]
+        self.queueLimitSpinBox.setEnabled(mode != QueueMode.SEQUENTIAL)
+        self.dependencyLineEdit.setEnabled(mode == QueueMode.DAG)
+        self.__refreshQueueItems()
+
+    def __appendQueueStep(self, filePath: str, after: list = None):
+        """
+        向文件队列末尾添加一个步骤
+        :param filePath: 文件路径
+        :param after: 前置步骤的下标列表
+        """
+        item = QListWidgetItem()
+        item.setData(Qt.ItemDataRole.UserRole, filePath)
+        item.setData(Qt.ItemDataRole.UserRole + 1, list(after or []))
+        item.setToolTip(filePath)
+        self.queueListControl.addItem(item)
+        self.__refreshQueueItems()
+
+    def __refreshQueueItems(self):
+        """刷新文件队列中各步骤的序号和前置步骤显示"""
+        showDependencies = self.queueMode() == QueueMode.DAG
+        for i in range(self.queueListControl.count()):
+            item = self.queueListControl.item(i)
+            text = f'{i + 1}. {os.path.basename(item.data(Qt.ItemDataRole.UserRole))}'
+            after = item.data(Qt.ItemDataRole.UserRole + 1)
+            if showDependencies and after:
+                text += f'（前置：{",".join(str(j + 1) for j in after)}）'
+            item.setText(text)
+
+    def __showDependencies(self, row: int):
+        """在输入框中显示选中步骤的前置步骤"""
+        item = self.queueListControl.item(row)
+        after = item.data(Qt.ItemDataRole.UserRole + 1) if item else []
+        self.dependencyLineEdit.setText(','.join(str(j + 1) for j in after))
+
+    def __applyDependencies(self):
+        """将输入框中的前置步骤应用到选中的步骤"""
+        row = self.queueListControl.currentRow()
+        if row < 0:
+            return
+
+        text = self.dependencyLineEdit.text().replace('，', ',')
+        try:
+            after = sorted({int(part) - 1 for part in text.split(',') if part.strip()})
+        except ValueError:
+            after = None
+        if after is None or any(not 0 <= j < self.queueListControl.count() or j == row for j in after):
+            InfoBar.error(
+                '错误',
+                '请输入其他步骤的序号，以逗号分隔',
+                position=InfoBarPosition.TOP,
+                duration=1500,
+                parent=self
+            )
+            self.__showDependencies(row)
+            return
 
-            addBtn.clicked.connect(lambda: self.__addFile(fileQueueList))
-            delBtn.clicked.connect(lambda: self.__delFile(fileQueueList))
-            self.setInputControl(fileQueueList)
+        self.queueListControl.item(row).setData(Qt.ItemDataRole.UserRole + 1, after)
+        self.__refreshQueueItems()
 
     def __showCollectedFiles(self):
         """右侧列表视图显示已保存的文件"""
 
-        # 读取JSON文件中的路径
-        try:
-            with open('./config/fileTableContents.json', 'r', encoding='utf-8') as f:
-                json_data = json.load(f)
-                self.allFilePaths = [fileInfo[2] for fileInfo in json_data]
-        except FileNotFoundError:
-            self.allFilePaths = []
+        # 读取文件列表中的路径和行ID
+        self.allFilePaths = [fileInfo[2] for fileInfo in fileTableJournal.data]
+        self.fileIds = {normalizePath(fileInfo[2]): fileInfo[3] for fileInfo in fileTableJournal.data
+                        if len(fileInfo) > 3}
 
         # 将路径中的文件名显示在列表视图中
         for file in self.allFilePaths:
@@ -591,8 +738,7 @@ class PresetDataInputDialog(MessageBoxBase):
                 self.inputControl.setFocus()
         elif self.style == PresetStyle.QUEUE:
             if isinstance(self.inputControl, ListWidget):
-                item = QListWidgetItem(filePath)
-                self.inputControl.addItem(item)
+                self.__appendQueueStep(filePath)
 
     def __setPresetData(self):
         """填充外部传递的预设信息"""
@@ -607,16 +753,18 @@ class PresetDataInputDialog(MessageBoxBase):
         self.contentLineEdit.setCursorPosition(0)
 
         if self.style == PresetStyle.SWITCH:
-            btn_stat, openFile, closeFile = self.presetData[2]
+            openFile, closeFile = self.presetData[2][1:3]
             self.openFilePathLineEdit.setText(openFile)
             self.openFilePathLineEdit.setCursorPosition(0)
             self.closeFilePathLineEdit.setText(closeFile)
             self.closeFilePathLineEdit.setCursorPosition(0)
         elif self.style == PresetStyle.QUEUE:
-            fileList = self.presetData[2]
-            for file in fileList:
-                item = QListWidgetItem(file)
-                self.fileListControl.addItem(item)
+            queueData = normalizeQueueData(self.presetData[2])
+            self.queueModeComboBox.setCurrentIndex(tuple(QueueMode).index(QueueMode(queueData['mode'])))
+            self.queueLimitSpinBox.setValue(queueData['limit'])
+            self.stopOnFailureCheckBox.setChecked(queueData['stopOnFailure'])
+            for step in queueData['steps']:
+                self.__appendQueueStep(step['path'], step['after'])
 
     def getPresetData(self) -> list:
         """
@@ -631,24 +779,48 @@ class PresetDataInputDialog(MessageBoxBase):
         if style == PresetStyle.SWITCH:
             openFile = self.openFilePathLineEdit.text()
             closeFile = self.closeFilePathLineEdit.text()
-            fileData = [openFile, closeFile]
+            fileData = [openFile, closeFile, self.fileId(openFile), self.fileId(closeFile)]
         elif style == PresetStyle.QUEUE:
-            fileData = []
-            for i in range(self.fileListControl.count()):
-                item = self.fileListControl.item(i)
-                filePath = item.text()
-                fileData.append(filePath)
+            fileData = self.queueData()
         else:
             fileData = []
 
         return [title, content, style, fileData]
 
+    def queueData(self) -> dict:
+        """获取输入的队列预设数据"""
+        mode = self.queueMode()
+        steps = []
+        for i in range(self.queueListControl.count()):
+            item = self.queueListControl.item(i)
+            after = item.data(Qt.ItemDataRole.UserRole + 1) if mode == QueueMode.DAG else []
+            path = item.data(Qt.ItemDataRole.UserRole)
+            step = {'path': path, 'after': after}
+            fileId = self.fileId(path)
+            if fileId is not None:
+                step['fileId'] = fileId
+            steps.append(step)
+
+        return {
+            'mode': mode.value,
+            'limit': self.queueLimitSpinBox.value(),
+            'stopOnFailure': self.stopOnFailureCheckBox.isChecked(),
+            'steps': steps,
+        }
+
+    def fileId(self, path: str):
+        """
+        获取文件在文件列表中的行ID
+        :param path: 文件路径
+        :return: 行ID，文件不在列表中时返回None
+        """
+        return self.fileIds.get(normalizePath(path)) if path else None
+
     def setInputControl(self, control):
         """设置填充已有文件的控件"""
         self.inputControl = control
 
-    @staticmethod
-    def __addFile(control):
+    def __addFile(self, control):
         """
         向指定控件添加文件路径
         :param control: 待填充文件路径的控件
@@ -663,7 +835,7 @@ class PresetDataInputDialog(MessageBoxBase):
             None,
             '添加文件',
             path,
-            '批处理和命令脚本 (*.bat *.cmd);;批处理文件 (*.bat);;命令脚本 (*.cmd)'
+            '脚本文件 (*.bat *.cmd *.ps1 *.sh);;批处理和命令脚本 (*.bat *.cmd);;PowerShell脚本 (*.ps1);;Shell脚本 (*.sh)'
         )[0]
         if not filePath:
             return
@@ -672,18 +844,25 @@ class PresetDataInputDialog(MessageBoxBase):
             control.setText(filePath)
             control.setCursorPosition(0)
         elif isinstance(control, ListWidget):
-            filename = os.path.basename(filePath)
-            item = QListWidgetItem(f'{filename}({filePath})')
-            control.addItem(item)
+            self.__appendQueueStep(filePath)
 
-    @staticmethod
-    def __delFile(control):
+    def __delFile(self, control):
         """
         将指定控件中指定的文件移除
         :param control: 需要移除文件的控件
         """
         if isinstance(control, ListWidget):
-            control.takeItem(control.currentRow())
+            row = control.currentRow()
+            if row < 0:
+                return
+            control.takeItem(row)
+
+            # 更新其余步骤的前置步骤下标
+            for i in range(control.count()):
+                item = control.item(i)
+                after = [j - (j > row) for j in item.data(Qt.ItemDataRole.UserRole + 1) if j != row]
+                item.setData(Qt.ItemDataRole.UserRole + 1, after)
+            self.__refreshQueueItems()
 
     def validate(self) -> bool:
         """重写验证方法"""
@@ -703,9 +882,15 @@ class PresetDataInputDialog(MessageBoxBase):
                 flag = False
                 warning_content = '请输入正确的关闭文件的路径'
         elif self.style == PresetStyle.QUEUE:
-            if not self.fileListControl.count():
+            if not self.queueListControl.count():
                 flag = False
                 warning_content = '请添加至少一个文件'
+            else:
+                try:
+                    dependencyGraph(self.queueData())
+                except ValueError as e:
+                    flag = False
+                    warning_content = str(e)
 
         if not flag:
             InfoBar.error(
@@ -718,6 +903,200 @@ class PresetDataInputDialog(MessageBoxBase):
         return flag
 
 
+class ScheduleInputDialog(MessageBoxBase):
+    """
+    运行计划编辑对话框
+
+    构造方法参数
+    ------------
+    * card: 编辑计划的预设卡片
+    * cards: 全部预设卡片（用于选择前置预设和检查循环）
+    * scheduler: 计划调度器（用于显示下次运行时间）
+    * parent: 待遮罩的对象（建议设置为主窗口）
+    """
+
+    typeTexts = {
+        TriggerType.CRON: '定时（cron表达式）',
+        TriggerType.INTERVAL: '固定间隔',
+        TriggerType.FILE: '文件变化',
+        TriggerType.AFTER: '其他预设结束后',
+    }
+
+    def __init__(self, card: PresetCard, cards: list, scheduler: Scheduler, parent=None):
+        super().__init__(parent)
+        self.card = card
+        self.scheduler = scheduler
+        self.otherCards = [other for other in cards if other is not card]
+        self.titles = {other.presetId: other.title for other in cards}
+        self.schedules = {other.presetId: other.schedule for other in cards}
+
+        self.widget.setFixedWidth(600)
+        self.yesButton.setText('确定')
+        self.cancelButton.setText('取消')
+
+        self.viewLayout.addWidget(SubtitleLabel(f'“{card.title}”的运行计划'))
+        self.enabledCheckBox = CheckBox('启用运行计划')
+        self.enabledCheckBox.setChecked(card.schedule['enabled'])
+        self.viewLayout.addWidget(self.enabledCheckBox)
+
+        # 已添加的触发
+        headerLayout = QHBoxLayout()
+        self.viewLayout.addLayout(headerLayout)
+        headerLayout.addWidget(BodyLabel('触发条件'), 0, Qt.AlignmentFlag.AlignLeft)
+        delBtn = ToolButton(FIF.DELETE.icon(color='red'))
+        headerLayout.addWidget(delBtn, 0, Qt.AlignmentFlag.AlignRight)
+        delBtn.setToolTip('移除选中的触发条件')
+        delBtn.installEventFilter(ToolTipFilter(delBtn, position=ToolTipPosition.TOP))
+        delBtn.clicked.connect(self.__removeTrigger)
+
+        self.triggerListControl = ListWidget()
+        self.triggerListControl.setFixedHeight(160)
+        self.viewLayout.addWidget(self.triggerListControl)
+
+        # 新的触发
+        addLayout = QHBoxLayout()
+        self.viewLayout.addLayout(addLayout)
+        self.typeComboBox = ComboBox()
+        self.typeComboBox.addItems(list(self.typeTexts.values()))
+        addLayout.addWidget(self.typeComboBox)
+
+        self.paramLineEdit = LineEdit()  # cron表达式或文件路径
+        addLayout.addWidget(self.paramLineEdit, 1)
+        self.fileSelectButton = ToolButton(FIF.FOLDER)
+        self.fileSelectButton.setToolTip('选择需要监视的文件')
+        self.fileSelectButton.installEventFilter(ToolTipFilter(self.fileSelectButton, position=ToolTipPosition.TOP))
+        self.fileSelectButton.clicked.connect(self.__selectFile)
+        addLayout.addWidget(self.fileSelectButton)
+
+        self.intervalSpinBox = CompactSpinBox()  # 间隔分钟数
+        self.intervalSpinBox.setRange(1, 525600)
+        self.intervalSpinBox.setValue(60)
+        self.intervalSpinBox.setSuffix(' 分钟')
+        addLayout.addWidget(self.intervalSpinBox)
+
+        self.presetComboBox = ComboBox()  # 前置预设
+        self.presetComboBox.addItems([other.title for other in self.otherCards])
+        addLayout.addWidget(self.presetComboBox, 1)
+        self.conditionComboBox = ComboBox()
+        self.conditionComboBox.addItems(list(conditionTexts.values()))
+        addLayout.addWidget(self.conditionComboBox)
+
+        actionLayout = QHBoxLayout()
+        self.viewLayout.addLayout(actionLayout)
+        self.actionComboBox = ComboBox()  # 开关预设的操作
+        self.actionComboBox.addItems([f'{text}开关' for text in actionTexts.values()])
+        if card.style == PresetStyle.SWITCH:
+            actionLayout.addWidget(BodyLabel('触发后'))
+            actionLayout.addWidget(self.actionComboBox)
+        else:
+            self.actionComboBox.hide()
+        actionLayout.addStretch(1)
+        addBtn = PushButton(FIF.ADD, '添加触发条件')
+        addBtn.clicked.connect(self.__addTrigger)
+        actionLayout.addWidget(addBtn)
+
+        hintLabel = CaptionLabel('cron表达式依次为“分 时 日 月 周”，如“0 8 * * 1-5”表示工作日8:00，也可使用@daily、@hourly等简写')
+        hintLabel.setWordWrap(True)
+        hintLabel.setTextColor("#606060", "#d2d2d2")
+        self.viewLayout.addWidget(hintLabel)
+
+        self.typeComboBox.currentIndexChanged.connect(self.__onTypeChanged)
+        self.__onTypeChanged(0)
+        for trigger in card.schedule['triggers']:
+            self.__appendTrigger(trigger)
+
+    def getSchedule(self) -> dict:
+        """获取编辑后的计划数据"""
+        triggers = [self.triggerListControl.item(i).data(Qt.ItemDataRole.UserRole)
+                    for i in range(self.triggerListControl.count())]
+        return {'id': self.card.presetId, 'enabled': self.enabledCheckBox.isChecked(), 'triggers': triggers}
+
+    def __onTypeChanged(self, index: int):
+        """根据触发方式显示相应的控件"""
+        triggerType = tuple(self.typeTexts)[index]
+        self.paramLineEdit.setVisible(triggerType in (TriggerType.CRON, TriggerType.FILE))
+        self.paramLineEdit.clear()
+        self.paramLineEdit.setPlaceholderText('如：0 8 * * 1-5' if triggerType == TriggerType.CRON
+                                              else '请输入需要监视的文件路径')
+        self.fileSelectButton.setVisible(triggerType == TriggerType.FILE)
+        self.intervalSpinBox.setVisible(triggerType == TriggerType.INTERVAL)
+        self.presetComboBox.setVisible(triggerType == TriggerType.AFTER)
+        self.conditionComboBox.setVisible(triggerType == TriggerType.AFTER)
+
+    def __selectFile(self):
+        """选择需要监视的文件"""
+        filePath = QFileDialog.getOpenFileName(None, '选择文件', self.paramLineEdit.text(), '所有文件 (*)')[0]
+        if filePath:
+            self.paramLineEdit.setText(filePath)
+            self.paramLineEdit.setCursorPosition(0)
+
+    def __addTrigger(self):
+        """按输入添加触发条件"""
+        triggerType = tuple(self.typeTexts)[self.typeComboBox.currentIndex()]
+        trigger = {'type': triggerType, 'action': tuple(actionTexts)[self.actionComboBox.currentIndex()]}
+        error = None
+        if triggerType == TriggerType.CRON:
+            trigger['expr'] = self.paramLineEdit.text()
+        elif triggerType == TriggerType.INTERVAL:
+            trigger['seconds'] = self.intervalSpinBox.value() * 60
+        elif triggerType == TriggerType.FILE:
+            trigger['path'] = self.paramLineEdit.text().strip()
+        elif triggerType == TriggerType.AFTER:
+            index = self.presetComboBox.currentIndex()
+            if index < 0:
+                error = '没有可选择的其他预设'
+            else:
+                sourceId = self.otherCards[index].presetId
+                trigger['preset'] = sourceId
+                trigger['on'] = tuple(conditionTexts)[self.conditionComboBox.currentIndex()]
+                schedules = dict(self.schedules, **{self.card.presetId: self.getSchedule()})
+                if chainCreatesCycle(schedules, self.card.presetId, sourceId):
+                    error = f'“{self.otherCards[index].title}”已在本预设之后运行，不能形成循环'
+
+        if error is None:
+            try:
+                trigger = normalizeTrigger(trigger)
+                if triggerType == TriggerType.CRON and nextFireTime(trigger, time.time()) is None:
+                    error = f'cron表达式“{trigger["expr"]}”没有可运行的时间'
+            except ValueError as e:
+                error = str(e)
+
+        if error is not None:
+            InfoBar.error(
+                '错误',
+                error,
+                position=InfoBarPosition.TOP,
+                duration=2000,
+                parent=self
+            )
+            return
+
+        self.__appendTrigger(trigger)
+        self.paramLineEdit.clear()
+
+    def __appendTrigger(self, trigger: dict):
+        """在列表中显示触发条件"""
+        text = describeTrigger(trigger, self.titles)
+        if self.card.style == PresetStyle.SWITCH:
+            text += f'，{actionTexts[trigger["action"]]}开关'
+        if trigger['type'] in (TriggerType.CRON, TriggerType.INTERVAL):
+            nextTime = self.scheduler.nextTime(trigger['id'])
+            if nextTime is None:
+                nextTime = nextFireTime(trigger, time.time())
+            if nextTime is not None:
+                text += f'（下次：{formatFireTime(nextTime)}）'
+
+        item = QListWidgetItem(text)
+        item.setData(Qt.ItemDataRole.UserRole, trigger)
+        self.triggerListControl.addItem(item)
+
+    def __removeTrigger(self):
+        """移除选中的触发条件"""
+        row = self.triggerListControl.currentRow()
+        if row >= 0:
+            self.triggerListControl.takeItem(row)
+
+
 class PresetInterface(QWidget):
     """文件预设界面类"""
 
@@ -728,6 +1107,12 @@ class PresetInterface(QWidget):
 
         self.cardList = []
         self.currentCardIndex = -1
+        self.watchedRuns = {}  # 开关预设提交的运行：运行编号 -> 预设卡片
+
+        # 按计划运行预设
+        self.scheduler = Scheduler(parent=self)
+        self.scheduler.triggered.connect(self.__onScheduleTriggered)
+        self.parentWindow.cmdInterface.runManager.runFinished.connect(self.__onRunFinished)
 
         # 基本布局设置
         self.mainLayout = QVBoxLayout(self)
@@ -737,6 +1122,7 @@ class PresetInterface(QWidget):
 
         self.initControls()  # 初始化控件
         self.loadPreset()  # 加载预设卡片
+        self.syncSchedules()  # 开始按计划运行预设
 
         cfg.presetDataChanged.connect(self.refreshPresetView)  # 将预设数据改变信号连接至刷新布局方法
 
@@ -755,7 +1141,8 @@ class PresetInterface(QWidget):
         self.commandBar.addActions([
             Action(FIF.ADD, '新建预设', triggered=self.addPreset),
             Action(FIF.DELETE.icon(color='red'), '删除预设', triggered=self.deletePreset),
-            Action(FIF.EDIT, '编辑预设', triggered=self.editPreset)
+            Action(FIF.EDIT, '编辑预设', triggered=self.editPreset),
+            Action(FIF.DATE_TIME, '运行计划', triggered=self.editSchedule)
         ])
 
         # 预设说明按钮
@@ -818,7 +1205,8 @@ class PresetInterface(QWidget):
             new_card = PresetCard(title, content, style, len(self.cardList), self)
             new_card.setFile(fileData)
             self.addNewCard(new_card)
-            self.savePreset()  # 操作结束即保存预设
+            presetJournal.append('add', self.cardData(new_card))  # 操作结束即保存预设
+            self.syncSchedules()
 
             logging.info('新的预设卡片已添加')
 
@@ -848,6 +1236,8 @@ class PresetInterface(QWidget):
         card = self.cardLayout.takeAt(card_index).widget()
         card.deleteLater()
         self.cardList.pop(card_index)
+        presetJournal.append('delete', card_index)  # 操作结束即保存预设
+        self.syncSchedules()
         InfoBar.success(
             '成功',
             '已删除选中的预设',
@@ -856,8 +1246,6 @@ class PresetInterface(QWidget):
             parent=self.parentWindow
         )
 
-        self.savePreset()  # 操作结束即保存预设
-
     def editPreset(self):
         """编辑预设"""
         if self.currentCardIndex == -1:
@@ -897,6 +1285,7 @@ class PresetInterface(QWidget):
         # 实例化新卡片
         new_card = PresetCard(title, content, style, self.currentCardIndex, self)
         new_card.setFile(fileData)
+        new_card.schedule = self.cardList[self.currentCardIndex].schedule  # 保留预设ID和运行计划
         new_card.clicked.connect(self.changeCurrentCard)
 
         # 删除旧卡片
@@ -907,10 +1296,71 @@ class PresetInterface(QWidget):
         self.cardLayout.insertWidget(self.currentCardIndex, new_card)
         self.cardList[self.currentCardIndex] = new_card
 
-        self.savePreset()  # 保存预设变更
+        presetJournal.append('edit', self.currentCardIndex, self.cardData(new_card))  # 保存预设变更
         self.changeCurrentCard(-1)  # 将当前卡片下标复位
+        self.syncSchedules()
         logging.info('成功应用新的预设信息')
 
+    def editSchedule(self):
+        """编辑当前预设的运行计划"""
+        if self.currentCardIndex == -1:
+            InfoBar.warning(
+                '提示',
+                '请选择一个预设卡片',
+                position=InfoBarPosition.TOP,
+                duration=1500,
+                parent=self.parentWindow
+            )
+            return
+
+        card = self.cardList[self.currentCardIndex]
+        w = ScheduleInputDialog(card, self.cardList, self.scheduler, self.parentWindow)
+        if not w.exec():
+            return
+
+        card.schedule = w.getSchedule()
+        presetJournal.append('edit', self.currentCardIndex, self.cardData(card))  # 保存预设变更
+        self.syncSchedules()
+        logging.info(f'预设“{card.title}”的运行计划已更新，共{len(card.schedule["triggers"])}个触发条件')
+
+    def syncSchedules(self):
+        """将全部预设的运行计划交给调度器"""
+        self.scheduler.setSchedules([(card.presetId, card.schedule) for card in self.cardList])
+
+    def watchRun(self, run, card: PresetCard):
+        """
+        记录开关预设提交的运行，运行结束后通知调度器
+        :param run: 提交的运行
+        :param card: 提交运行的预设卡片
+        """
+        if run.isActive():
+            self.watchedRuns[run.runId] = card
+        else:  # 启动失败时运行在submit返回前已结束
+            self.onPresetFinished(card, False)
+
+    def onPresetFinished(self, card: PresetCard, success: bool):
+        """
+        预设运行结束，运行以其为前置的预设
+        :param card: 结束运行的预设卡片
+        :param success: 是否全部成功
+        """
+        self.scheduler.notifyFinished(card.presetId, success)
+
+    def __onRunFinished(self, run):
+        """开关预设提交的运行结束"""
+        card = self.watchedRuns.pop(run.runId, None)
+        if card is not None:
+            self.onPresetFinished(card, run.state == RunState.FINISHED and run.exitCode == 0)
+
+    def __onScheduleTriggered(self, presetId: str, action: str):
+        """运行计划触发的预设"""
+        card = next((card for card in self.cardList if card.presetId == presetId), None)
+        if card is None:
+            logging.warning(f'计划触发的预设{presetId}不存在')
+            return
+        logging.info(f'按运行计划运行预设“{card.title}”')
+        card.runScheduled(action)
+
     def addNewCard(self, card: PresetCard):
         """
         添加新卡片到布局中
@@ -935,32 +1385,29 @@ class PresetInterface(QWidget):
         self.cardList.clear()
 
         self.loadPreset()
+        self.syncSchedules()
         logging.info('预设布局刷新成功')
 
     def loadPreset(self):
         """加载保存到文件的预设"""
         logging.info("加载预设中……")
-        jsonReader_cnt = JarConnector('./backend/jsonReader.jar')
-        jsonReader_cnt.sendData(['./config/presets.json'])
-        preset_json_data = jsonReader_cnt.receiveData()
+        preset_json_data = presetJournal.load()
         if preset_json_data is None:
             InfoBar.error(
                 '错误',
-                '预设加载出错，请检查Java版本',
+                '预设加载出错，数据文件内容有误',
                 position=InfoBarPosition.TOP,
                 duration=1500,
                 parent=self.parentWindow
             )
-            logging.error('预设加载出错，请检查Java版本')
-            return
-        elif preset_json_data == -1:
-            logging.warning('预设配置文件不存在')
+            logging.error('预设加载出错，数据文件内容有误')
             return
-        elif preset_json_data == 0:
-            logging.warning('预设配置文件为空')
+        elif not preset_json_data:
+            logging.warning('预设配置文件为空或不存在')
             return
 
         logging.info('预设加载成功')
+        missingIds = False
         for index, preset in enumerate(preset_json_data):
             title = preset[0]
             content = preset[1]
@@ -970,6 +1417,10 @@ class PresetInterface(QWidget):
                 style = None
             presetData = preset[3]
             new_card = PresetCard(title, content, style, index, self)
+            if len(preset) > 4 and isinstance(preset[4], dict) and preset[4].get('id'):
+                new_card.schedule = normalizeSchedule(preset[4])
+            else:
+                missingIds = True
 
             if style == PresetStyle.SWITCH:
                 btn_stat = presetData[0]
@@ -979,42 +1430,32 @@ class PresetInterface(QWidget):
                 new_card.switchButton.blockSignals(True)
                 new_card.switchButton.setChecked(btn_stat)
                 new_card.switchButton.blockSignals(False)
-                new_card.setFile([openFile, closeFile])
+                new_card.setFile([openFile, closeFile, *presetData[3:5]])
             elif style == PresetStyle.QUEUE:
-                fileList = presetData
-                new_card.setFile(fileList)
+                new_card.setFile(presetData)  # 兼容只保存文件路径列表的旧格式
 
             self.addNewCard(new_card)
         logging.info('预设加载成功')
 
-    def savePreset(self):
-        """将预设保存至文件"""
-        logging.info('保存预设中……')
+        if missingIds:  # 旧版本的预设没有固定ID，保存新生成的ID供运行计划引用
+            self.savePreset()
 
-        if not cfg.get(cfg.isOpeningJavaPathCorrect):
-            InfoBar.warning(
-                '警告',
-                '无法将预设信息保存至文件，请检查Java路径',
-                position=InfoBarPosition.TOP,
-                duration=1500,
-                parent=self.parentWindow
-            )
-            logging.warning('由于程序启动时Java路径有误，故不保存预设内容')
-            return
-
-        allPresets = []
-        for presetCard in self.cardList:
-            title = presetCard.title
-            content = presetCard.content
-            style = presetCard.getStyle().value
-            presetData = presetCard.getPresetData()
+    @staticmethod
+    def cardData(presetCard: PresetCard) -> list:
+        """
+        获取需要保存的卡片信息
+        :param presetCard: 预设卡片
+        :return: [标题,描述,样式,预设数据,计划数据]
+        """
+        return [presetCard.title, presetCard.content, presetCard.getStyle().value, presetCard.getPresetData(),
+                presetCard.schedule]
 
-            onePresetCardInfo = [title, content, style, presetData]
-            allPresets.append(onePresetCardInfo)
+    def savePreset(self):
+        """将全部预设（包括开关状态）保存为新的快照"""
+        logging.info('保存预设中……')
 
-        jsonWriter_cnt = JarConnector('./backend/jsonWriter.jar')
-        jsonWriter_cnt.sendData(['./config/presets.json', allPresets])
-        flag = jsonWriter_cnt.receiveData()
+        allPresets = [self.cardData(presetCard) for presetCard in self.cardList]
+        flag = presetJournal.compact(allPresets)
 
         if flag:
             logging.info('预设保存成功')
@@ -0,0 +1,138 @@
+"""资源占用图表模块"""
+from PyQt6.QtCore import Qt, QPointF, QRectF
+from PyQt6.QtGui import QPainter, QColor, QPen, QPainterPath
+from PyQt6.QtWidgets import QWidget
+
+from qfluentwidgets import isDarkTheme, themeColor, setFont
+
+from Connector.ResourceMonitor import ResourceSeries, formatBytes
+
+
+class ResourceChart(QWidget):
+    """
+    一次运行的CPU占用率和内存占用折线图
+
+    * 只在采样序列的版本改变时重绘，没有新采样时refresh()不产生任何绘制
+    * 采样点多于图表宽度时按像素列合并，每列取最大值，峰值不会因合并而消失
+    * CPU占用率的纵轴至少为100%，内存占用的纵轴按可见范围内的峰值缩放
+    """
+
+    memoryColor = QColor(232, 145, 45)  # 内存折线的颜色
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.series = None  # 显示的采样序列
+        self.version = -1  # 已绘制的序列版本
+        self.padding = 8
+        setFont(self, 12)
+        self.setMinimumHeight(90)
+
+    def setSeries(self, series: ResourceSeries):
+        """
+        显示另一次运行的采样序列
+        :param series: 采样序列，为None时清空图表
+        """
+        self.series = series
+        self.version = -1
+        self.refresh()
+
+    def refresh(self):
+        """有新的采样时重绘"""
+        version = self.series.version if self.series is not None else 0
+        if version != self.version:
+            self.version = version
+            self.update()
+
+    def paintEvent(self, e):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        dark = isDarkTheme()
+        textColor = QColor(255, 255, 255) if dark else QColor(0, 0, 0)
+        gridColor = QColor(255, 255, 255, 30) if dark else QColor(0, 0, 0, 25)
+
+        # 与控制台输出控件一致的背景
+        painter.setPen(QColor(255, 255, 255, 20) if dark else QColor(0, 0, 0, 13))
+        painter.setBrush(QColor(255, 255, 255, 15) if dark else QColor(255, 255, 255, 178))
+        painter.drawRoundedRect(QRectF(self.rect()).adjusted(0.5, 0.5, -0.5, -0.5), 5, 5)
+
+        lineHeight = self.fontMetrics().height()
+        plot = QRectF(self.rect()).adjusted(self.padding, self.padding + lineHeight + 4, -self.padding, -self.padding)
+        points = self.series.snapshot() if self.series is not None else []
+
+        # 网格线
+        painter.setPen(QPen(gridColor, 1, Qt.PenStyle.DashLine))
+        for i in range(3):
+            y = plot.top() + plot.height() * i / 2
+            painter.drawLine(QPointF(plot.left(), y), QPointF(plot.right(), y))
+
+        if len(points) < 2:
+            painter.setPen(textColor)
+            painter.drawText(self.rect().adjusted(self.padding, self.padding, -self.padding, -self.padding),
+                             Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop, '资源占用：等待采样')
+            return
+
+        columns = self.__merge(points, max(int(plot.width()), 1))
+        cpuPeak = max(100.0, max((cpu for _, cpu, _ in columns if cpu is not None), default=0.0))
+        rssPeak = max((rss for _, _, rss in columns if rss is not None), default=0) * 1.1
+        start, end = columns[0][0], columns[-1][0]
+        span = max(end - start, 1e-6)
+
+        def path(values, peak):
+            """按(运行时长, 值)生成折线，无法获取的值处断开"""
+            result = QPainterPath()
+            drawing = False
+            for elapsed, value in values:
+                if value is None or not peak:
+                    drawing = False
+                    continue
+                point = QPointF(plot.left() + (elapsed - start) / span * plot.width(),
+                                plot.bottom() - min(value / peak, 1.0) * plot.height())
+                if drawing:
+                    result.lineTo(point)
+                else:
+                    result.moveTo(point)
+                    drawing = True
+            return result
+
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.setPen(QPen(self.memoryColor, 1.5))
+        painter.drawPath(path([(elapsed, rss) for elapsed, _, rss in columns], rssPeak))
+        painter.setPen(QPen(themeColor(), 1.5))
+        painter.drawPath(path([(elapsed, cpu) for elapsed, cpu, _ in columns], cpuPeak))
+
+        # 图例：当前值和纵轴上限
+        _, cpu, rss = points[-1]
+        cpuText = f'CPU {cpu:.0f}%' if cpu is not None else 'CPU —'
+        rssText = f'内存 {formatBytes(rss)}' if rss is not None else '内存 —'
+        x = self.padding
+        for text, color in ((cpuText, themeColor()), (rssText, self.memoryColor)):
+            painter.setPen(color)
+            painter.drawText(QPointF(x, self.padding + self.fontMetrics().ascent()), text)
+            x += self.fontMetrics().horizontalAdvance(text) + 16
+        painter.setPen(textColor)
+        scaleText = f'纵轴：CPU {cpuPeak:.0f}%'
+        if rssPeak:
+            scaleText += f'，内存 {formatBytes(int(rssPeak))}'
+        scaleText += f'，最近{span:.0f}秒'
+        painter.drawText(self.rect().adjusted(self.padding, self.padding, -self.padding, -self.padding),
+                         Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignTop, scaleText)
+
+    @staticmethod
+    def __merge(points: list, width: int) -> list:
+        """
+        将采样点合并为不超过width列
+        :param points: [(运行时长, CPU占用率, 内存占用)]
+        :param width: 最多的列数
+        :return: 合并后的采样点，每列取最后的运行时长和最大的CPU占用率、内存占用
+        """
+        if len(points) <= width:
+            return points
+
+        size = -(-len(points) // width)  # 每列的采样点数（向上取整）
+        columns = []
+        for i in range(0, len(points), size):
+            group = points[i:i + size]
+            cpus = [cpu for _, cpu, _ in group if cpu is not None]
+            rsses = [rss for _, _, rss in group if rss is not None]
+            columns.append((group[-1][0], max(cpus) if cpus else None, max(rsses) if rsses else None))
+        return columns
@@ -10,9 +10,11 @@ from PyQt6.QtWidgets import QWidget, QVBoxLayout, QFileDialog, QHBoxLayout, QBut
 from qfluentwidgets import (ScrollArea, SettingCardGroup, OptionsSettingCard, QConfig, FluentIcon, RadioButton,
                             CustomColorSettingCard, ExpandLayout, LineEdit,
                             ToolButton, InfoBar, InfoBarPosition, ToolTipFilter, ToolTipPosition,
-                            SimpleExpandGroupSettingCard, BodyLabel, PushButton)
+                            SimpleExpandGroupSettingCard, BodyLabel, PushButton, RangeSettingCard, SwitchSettingCard)
 
 from AppConfig.config import cfg
+from AppConfig.journal import JournaledFile, fileTableJournal, presetJournal
+from Connector.BackendDaemon import backendDaemon
 from Logs.log_recorder import logging
 
 
@@ -98,6 +100,7 @@ class JavaPathCard(SimpleExpandGroupSettingCard):
         if os.path.isfile(path):
             cfg.set(cfg.customJavaPath, path)
             cfg.set(cfg.useCustomJavaPath, True)
+            backendDaemon.restart()  # 使用新的Java路径重启常驻后端
             self.card.setContent(path)
             InfoBar.success(
                 '成功',
@@ -109,6 +112,7 @@ class JavaPathCard(SimpleExpandGroupSettingCard):
             logging.info('Java路径验证通过')
         else:
             cfg.set(cfg.useCustomJavaPath, False)
+            backendDaemon.restart()
             self.card.setContent('自定义Java路径错误，已使用环境变量指示的Java路径代替')
             InfoBar.error(
                 '错误',
@@ -128,6 +132,7 @@ class JavaPathCard(SimpleExpandGroupSettingCard):
         if btn_id == 0:
             logging.info('更改Java路径：遵从环境变量')
             cfg.set(cfg.useCustomJavaPath, False)
+            backendDaemon.restart()
             self.card.setContent('由环境变量决定')
 
             self.pathLineEdit.setEnabled(False)
@@ -211,15 +216,17 @@ class BackupRecoveryCard(SimpleExpandGroupSettingCard):
     * icon: 卡片图标
     * title: 卡片标题
     * content: 卡片描述
-    * source: 被操作的文件路径
+    * journal: 被操作的数据（导出的是其快照文件）
     * defaultName: 导出的默认文件名
     * importSignal: 导入数据时触发的信号
     * parentWindow: 所属的父界面
     """
 
-    def __init__(self, icon: FluentIcon, title, content, source, defaultName, importSignal: pyqtSignal, parentWindow):
+    def __init__(self, icon: FluentIcon, title, content, journal: JournaledFile, defaultName, importSignal: pyqtSignal,
+                 parentWindow):
         super().__init__(icon, title, content, parentWindow)
-        self.source = source
+        self.journal = journal
+        self.source = journal.path
         self.defaultName = defaultName
         self.importSignal = importSignal
         self.parentWindow = parentWindow
@@ -272,6 +279,7 @@ class BackupRecoveryCard(SimpleExpandGroupSettingCard):
 
         logging.info(f'源"{self.source}"开始导出数据……')
         target_path = w.selectedFiles()[0]
+        self.journal.compact()  # 先将日志合并至快照，使导出的文件为完整的JSON数据
         try:
             shutil.copyfile(self.source, target_path)
             InfoBar.success(
@@ -330,8 +338,8 @@ class BackupRecoveryCard(SimpleExpandGroupSettingCard):
                 logging.error('导入失败：文件格式错误')
                 return
 
-        # 复制文件内容
-        shutil.copyfile(file_path, self.source)
+        # 以导入的内容作为新的快照（同时丢弃旧的日志）
+        self.journal.compact(content)
         self.importSignal.emit()
         InfoBar.success(
             '成功',
@@ -361,7 +369,7 @@ class FileBakRecCard(BackupRecoveryCard):
     * icon: 卡片图标
     * title: 卡片标题
     * content: 卡片描述
-    * source: 被操作的文件路径
+    * journal: 被操作的数据（导出的是其快照文件）
     * defaultName: 导出的默认文件名
     * importSignal: 导入数据时触发的信号
     * parentWindow: 所属的父界面
@@ -391,7 +399,7 @@ class PresetBakRecCard(BackupRecoveryCard):
     * icon: 卡片图标
     * title: 卡片标题
     * content: 卡片描述
-    * source: 被操作的文件路径
+    * journal: 被操作的数据（导出的是其快照文件）
     * defaultName: 导出的默认文件名
     * importSignal: 导入数据时触发的信号
     * parentWindow: 所属的父界面
@@ -479,15 +487,104 @@ class SettingInterface(QWidget):
         self.javaPathCard = JavaPathCard(parent=self)
         self.environmentGroup.addSettingCard(self.javaPathCard)
 
+        """文件运行组"""
+        self.runGroup = SettingCardGroup('文件运行', self.scrollWidget)
+        self.viewLayout.addWidget(self.runGroup)
+
+        # 修改运行文件的方式
+        self.fileRunnerCard = OptionsSettingCard(
+            cfg.fileRunner,
+            FluentIcon.DEVELOPER_TOOLS,
+            '运行方式',
+            '内置运行器由Python直接启动cmd、PowerShell或sh，无需Java，也可在Linux上运行',
+            texts=['Java后端', '内置运行器（Python）'],
+            parent=self.runGroup
+        )
+        self.runGroup.addSettingCard(self.fileRunnerCard)
+
+        # 修改同时运行的文件数上限
+        self.maxConcurrentRunsCard = RangeSettingCard(
+            cfg.maxConcurrentRuns,
+            FluentIcon.COMMAND_PROMPT,
+            '同时运行上限',
+            '超出上限的文件将排队等待其他文件运行结束',
+            parent=self.runGroup
+        )
+        self.runGroup.addSettingCard(self.maxConcurrentRunsCard)
+
+        # 修改预热的cmd进程数
+        self.shellPoolSizeCard = RangeSettingCard(
+            cfg.shellPoolSize,
+            FluentIcon.SPEED_HIGH,
+            '预热进程数',
+            '预先启动空闲的cmd进程，运行文件时无需等待进程启动，为0时不预热',
+            parent=self.runGroup
+        )
+        self.runGroup.addSettingCard(self.shellPoolSizeCard)
+
+        # 修改预热进程的空闲回收时间
+        self.shellPoolIdleTimeoutCard = RangeSettingCard(
+            cfg.shellPoolIdleTimeout,
+            FluentIcon.STOP_WATCH,
+            '预热进程回收时间（秒）',
+            '超过该时间没有运行文件时结束全部预热的进程，下次运行时重新预热',
+            parent=self.runGroup
+        )
+        self.runGroup.addSettingCard(self.shellPoolIdleTimeoutCard)
+
+        # 修改资源占用的采样间隔
+        self.resourceSampleIntervalCard = RangeSettingCard(
+            cfg.resourceSampleInterval,
+            FluentIcon.SPEED_MEDIUM,
+            '资源占用采样间隔（毫秒）',
+            '运行期间按该间隔采样CPU、内存和读写量，在控制台界面显示图表，为0时不采样，最短100毫秒',
+            parent=self.runGroup
+        )
+        self.runGroup.addSettingCard(self.resourceSampleIntervalCard)
+
+        # 修改运行记录的保留天数
+        self.historyRetentionCard = RangeSettingCard(
+            cfg.historyRetentionDays,
+            FluentIcon.HISTORY,
+            '运行记录保留天数',
+            '启动时删除超过该天数的运行记录和日志',
+            parent=self.runGroup
+        )
+        self.runGroup.addSettingCard(self.historyRetentionCard)
+
+        # 是否补运行错过的计划
+        self.scheduleCatchUpCard = SwitchSettingCard(
+            FluentIcon.DATE_TIME,
+            '补运行错过的计划',
+            '软件关闭期间错过的定时计划在启动后补运行一次',
+            cfg.scheduleCatchUp,
+            parent=self.runGroup
+        )
+        self.runGroup.addSettingCard(self.scheduleCatchUpCard)
+
+        """文件搜索组"""
+        self.searchGroup = SettingCardGroup('文件搜索', self.scrollWidget)
+        self.viewLayout.addWidget(self.searchGroup)
+
+        # 是否搜索脚本内容
+        self.searchContentsCard = SwitchSettingCard(
+            FluentIcon.SEARCH,
+            '搜索脚本内容',
+            '在后台读取脚本文件的内容，搜索时同时匹配脚本中的命令和注释',
+            cfg.searchContents,
+            parent=self.searchGroup
+        )
+        self.searchGroup.addSettingCard(self.searchContentsCard)
+
         """软件数据组"""
         self.softwareDataGroup = SettingCardGroup('软件数据', self.scrollWidget)
         self.viewLayout.addWidget(self.softwareDataGroup)
 
         self.fileDataCard = FileBakRecCard(FluentIcon.FOLDER, '文件数据', '备份或恢复保存的文件信息',
-                                           './config/fileTableContents.json', 'fileContents.json',
+                                           fileTableJournal, 'fileContents.json',
                                            cfg.fileDataChanged, self)
         self.softwareDataGroup.addSettingCard(self.fileDataCard)
 
         self.presetDataCard = PresetBakRecCard(FluentIcon.EMOJI_TAB_SYMBOLS, '预设数据', '备份或恢复文件预设',
-                                               './config/presets.json', 'presets.json', cfg.presetDataChanged, self)
+                                               presetJournal, 'presets.json', cfg.presetDataChanged, self)
         self.softwareDataGroup.addSettingCard(self.presetDataCard)
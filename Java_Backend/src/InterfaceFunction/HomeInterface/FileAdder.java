@@ -65,7 +65,7 @@ public class FileAdder implements GrandProcessConnector<List<String>, List<List<
      * @param filePaths 文件路径列表
      * @return 获取到的文件信息列表
      */
-    private List<List<String>> getFileInfos(List<String> filePaths) {
+    public List<List<String>> getFileInfos(List<String> filePaths) {
         List<List<String>> allFileInfos = new ArrayList<>();
 
         for (String onePath : filePaths) {
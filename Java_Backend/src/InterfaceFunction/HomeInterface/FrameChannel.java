@@ -0,0 +1,98 @@
+package InterfaceFunction.HomeInterface;
+
+import java.io.*;
+
+/**
+ * 文件运行进程与Python主进程之间的帧协议
+ * <p>
+ * 每一帧由类型（1字节）、负载长度（4字节，大端）和负载组成。进程输出按块原样转发，不再按行缓冲；
+ * 结束进程、退出代码等控制信息使用单独的帧类型，与输出内容互不干扰。
+ */
+public class FrameChannel {
+    public static final byte STDOUT = 1;  //标准输出（UTF-8文本）
+    public static final byte STDERR = 2;  //标准错误（UTF-8文本）
+    public static final byte STDIN = 3;  //写入进程标准输入的内容（主进程 -> 文件运行进程）
+    public static final byte CONTROL = 4;  //控制消息（主进程发送"kill"结束进程，文件运行进程发送提示信息）
+    public static final byte EXIT = 5;  //进程退出代码（4字节有符号整数）
+    public static final byte HEARTBEAT = 6;  //心跳（无负载）
+    public static final byte RESOURCE = 7;  //进程树的资源占用采样（见ResourceSampler）
+
+    public static final int MAX_PAYLOAD = 64 * 1024;  //单帧负载的最大长度
+    public static final int HEARTBEAT_INTERVAL = 1000;  //心跳间隔（毫秒）
+
+    private final DataOutputStream out;
+    private final DataInputStream in;
+
+    /**
+     * @param inputStream  套接字输入流
+     * @param outputStream 套接字输出流
+     */
+    public FrameChannel(InputStream inputStream, OutputStream outputStream) {
+        this.in = new DataInputStream(new BufferedInputStream(inputStream));
+        this.out = new DataOutputStream(new BufferedOutputStream(outputStream, MAX_PAYLOAD + 5));
+    }
+
+    /**
+     * 发送一帧，多个线程可同时调用
+     *
+     * @param type    帧类型
+     * @param payload 负载
+     * @param length  负载长度
+     * @throws IOException 连接已断开
+     */
+    public synchronized void write(byte type, byte[] payload, int length) throws IOException {
+        out.writeByte(type);
+        out.writeInt(length);
+        out.write(payload, 0, length);
+        out.flush();
+    }
+
+    /**
+     * 发送一帧完整的负载
+     */
+    public void write(byte type, byte[] payload) throws IOException {
+        write(type, payload, payload.length);
+    }
+
+    /**
+     * 发送进程退出代码
+     *
+     * @param exitCode 退出代码
+     */
+    public void writeExit(int exitCode) throws IOException {
+        write(EXIT, new byte[]{(byte) (exitCode >>> 24), (byte) (exitCode >>> 16), (byte) (exitCode >>> 8),
+                (byte) exitCode});
+    }
+
+    /**
+     * 读取一帧（只应由一个线程调用）
+     *
+     * @return 帧类型和负载，连接关闭时返回null
+     * @throws IOException 连接异常或帧格式错误
+     */
+    public Frame read() throws IOException {
+        int type = in.read();
+        if (type < 0) {
+            return null;
+        }
+
+        int length = in.readInt();
+        if (length < 0 || length > MAX_PAYLOAD) {
+            throw new IOException("帧长度错误：" + length);
+        }
+        byte[] payload = in.readNBytes(length);
+        if (payload.length < length) {
+            throw new EOFException("帧不完整");
+        }
+        return new Frame((byte) type, payload);
+    }
+
+    /**
+     * 收到的一帧
+     *
+     * @param type    帧类型
+     * @param payload 负载
+     */
+    public record Frame(byte type, byte[] payload) {
+    }
+}
@@ -0,0 +1,143 @@
+package InterfaceFunction.HomeInterface;
+
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.IOException;
+import java.nio.ByteBuffer;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.time.Duration;
+import java.util.ArrayList;
+import java.util.HashMap;
+import java.util.List;
+import java.util.Map;
+
+/**
+ * 采样文件运行进程及其全部子孙进程的资源占用，编码为资源帧的负载（与Python端的ResourceSample一致）
+ * <p>
+ * CPU时间由ProcessHandle获取；内存占用、线程数和读写字节数只能在提供/proc的系统（Linux）上读取，其他系统发送-1。
+ * 已退出的子孙进程最后一次采样到的CPU时间和读写字节数计入累计值，累计值不会因子进程退出而减少。
+ */
+public class ResourceSampler {
+    public static final int MIN_INTERVAL = 100;  //最短采样间隔（毫秒）
+    public static final int SAMPLE_SIZE = 5 * Long.BYTES + 2 * Integer.BYTES;  //资源帧负载的长度
+    private static final boolean HAS_PROC = new File("/proc/self/status").isFile();
+
+    private final ProcessHandle root;
+    private final long startNanos = System.nanoTime();
+    private Map<ProcessHandle, long[]> last = new HashMap<>();  //上一次采样的进程 -> {CPU时间, 读取字节数, 写入字节数}
+    private long exitedCpuMillis = 0;  //已退出进程的CPU时间（毫秒）
+    private long exitedReadBytes = 0;
+    private long exitedWriteBytes = 0;
+    private long cpuMillis = 0;  //已发送的累计CPU时间（毫秒）
+
+    /**
+     * @param root 进程树的根进程
+     */
+    public ResourceSampler(ProcessHandle root) {
+        this.root = root;
+    }
+
+    /**
+     * 采样一次
+     *
+     * @return 资源帧的负载，根进程已退出时返回null
+     */
+    public byte[] sample() {
+        if (!root.isAlive()) {
+            return null;
+        }
+
+        List<ProcessHandle> tree = new ArrayList<>();
+        tree.add(root);
+        root.descendants().forEach(tree::add);
+
+        Map<ProcessHandle, long[]> current = new HashMap<>();
+        boolean cpuKnown = false;
+        boolean ioKnown = false;
+        long liveCpuMillis = 0, readBytes = 0, writeBytes = 0, rss = 0, threads = 0;
+        for (ProcessHandle handle : tree) {
+            long cpu = handle.info().totalCpuDuration().map(Duration::toMillis).orElse(-1L);
+            long[] status = HAS_PROC ? readStatus(handle.pid()) : null;  //{内存占用, 线程数}
+            long[] io = HAS_PROC ? readIo(handle.pid()) : null;  //{读取字节数, 写入字节数}
+            if (cpu >= 0) {
+                cpuKnown = true;
+                liveCpuMillis += cpu;
+            }
+            if (status != null) {
+                rss += status[0];
+                threads += status[1];
+            }
+            if (io != null) {
+                ioKnown = true;
+                readBytes += io[0];
+                writeBytes += io[1];
+            }
+            current.put(handle, new long[]{Math.max(cpu, 0), io == null ? 0 : io[0], io == null ? 0 : io[1]});
+        }
+
+        //已退出的进程计入累计值（ProcessHandle按PID和启动时间判断是否为同一进程）
+        for (Map.Entry<ProcessHandle, long[]> entry : last.entrySet()) {
+            if (!current.containsKey(entry.getKey())) {
+                exitedCpuMillis += entry.getValue()[0];
+                exitedReadBytes += entry.getValue()[1];
+                exitedWriteBytes += entry.getValue()[2];
+            }
+        }
+        last = current;
+        cpuMillis = Math.max(cpuMillis, exitedCpuMillis + liveCpuMillis);
+
+        ByteBuffer buffer = ByteBuffer.allocate(SAMPLE_SIZE);  //默认为大端
+        buffer.putLong((System.nanoTime() - startNanos) / 1_000_000);
+        buffer.putLong(cpuKnown ? cpuMillis : -1);
+        buffer.putLong(HAS_PROC ? rss : -1);
+        buffer.putLong(ioKnown ? exitedReadBytes + readBytes : -1);
+        buffer.putLong(ioKnown ? exitedWriteBytes + writeBytes : -1);
+        buffer.putInt(HAS_PROC ? (int) threads : -1);
+        buffer.putInt(current.size());
+        return buffer.array();
+    }
+
+    /**
+     * 读取/proc/[pid]/status中的内存占用和线程数
+     *
+     * @return {内存占用（字节）, 线程数}，进程已退出时返回null
+     */
+    private static long[] readStatus(long pid) {
+        long[] result = {0, 0};
+        try (BufferedReader reader = Files.newBufferedReader(Path.of("/proc", String.valueOf(pid), "status"))) {
+            String line;
+            while ((line = reader.readLine()) != null) {
+                if (line.startsWith("VmRSS:")) {
+                    result[0] = Long.parseLong(line.substring(6).trim().split("\\s+")[0]) * 1024;  //单位为kB
+                } else if (line.startsWith("Threads:")) {
+                    result[1] = Long.parseLong(line.substring(8).trim());
+                }
+            }
+        } catch (IOException | NumberFormatException _) {
+            return null;
+        }
+        return result;
+    }
+
+    /**
+     * 读取/proc/[pid]/io中的读写字节数
+     *
+     * @return {读取字节数, 写入字节数}，进程已退出或没有权限时返回null
+     */
+    private static long[] readIo(long pid) {
+        long[] result = {0, 0};
+        try {
+            for (String line : Files.readAllLines(Path.of("/proc", String.valueOf(pid), "io"))) {
+                if (line.startsWith("read_bytes:")) {
+                    result[0] = Long.parseLong(line.substring(11).trim());
+                } else if (line.startsWith("write_bytes:")) {
+                    result[1] = Long.parseLong(line.substring(12).trim());
+                }
+            }
+        } catch (IOException | NumberFormatException _) {
+            return null;
+        }
+        return result;
+    }
+}
@@ -0,0 +1,194 @@
+package InterfaceFunction.HomeInterface;
+
+import java.io.File;
+import java.io.IOException;
+import java.io.InputStream;
+import java.nio.charset.Charset;
+import java.nio.charset.StandardCharsets;
+import java.nio.file.Files;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.Locale;
+import java.util.regex.Matcher;
+import java.util.regex.Pattern;
+
+/**
+ * 文件的运行方式
+ * <p>
+ * 按文件类型选择启动文件的命令行程序：.bat/.cmd交给cmd，.ps1交给PowerShell，.sh交给sh（优先使用第一行#!指定的解释器），
+ * 其他文件在Windows上交给cmd，在其他系统上交给sh。同时检测文件运行时输出使用的编码，与Python端的ShellLauncher一致。
+ */
+public enum ShellLauncher {
+    CMD("cmd"),
+    POWERSHELL("PowerShell"),
+    SH("sh");
+
+    public static final boolean IS_WINDOWS = System.getProperty("os.name", "").toLowerCase(Locale.ROOT).startsWith("windows");
+    private static final int DETECT_BYTES = 64 * 1024;  //检测编码时读取的字节数
+    private static final Pattern CHCP_PATTERN = Pattern.compile("^\\s*@?chcp(?:\\.com)?\\s+(\\d+)",
+            Pattern.CASE_INSENSITIVE | Pattern.MULTILINE);
+    private static final Pattern PS_UTF8_PATTERN = Pattern.compile(
+            "\\[Console\\]::OutputEncoding\\s*=\\s*\\[(?:System\\.)?Text\\.Encoding\\]::UTF8", Pattern.CASE_INSENSITIVE);
+
+    private final String displayName;
+
+    ShellLauncher(String displayName) {
+        this.displayName = displayName;
+    }
+
+    /**
+     * 一次运行使用的命令行和输出编码
+     *
+     * @param launcher 运行方式
+     * @param command  完整的命令行
+     * @param charset  检测到的输出编码
+     */
+    public record Launch(ShellLauncher launcher, List<String> command, Charset charset) {
+    }
+
+    /**
+     * @return 显示的名称
+     */
+    public String displayName() {
+        return displayName;
+    }
+
+    /**
+     * 按文件类型选择运行方式
+     *
+     * @param file 待运行的文件
+     * @return 运行方式
+     */
+    public static ShellLauncher forFile(File file) {
+        String name = file.getName().toLowerCase(Locale.ROOT);
+        if (name.endsWith(".bat") || name.endsWith(".cmd")) {
+            return CMD;
+        } else if (name.endsWith(".ps1")) {
+            return POWERSHELL;
+        } else if (name.endsWith(".sh")) {
+            return SH;
+        }
+        return IS_WINDOWS ? CMD : SH;
+    }
+
+    /**
+     * 生成运行文件的命令行并检测输出编码
+     *
+     * @param file 待运行的文件
+     * @return 命令行和输出编码
+     */
+    public static Launch prepare(File file) {
+        File absoluteFile = file.getAbsoluteFile();
+        ShellLauncher launcher = forFile(absoluteFile);
+        String head = readHead(absoluteFile);
+        return new Launch(launcher, launcher.command(absoluteFile, head), launcher.detectCharset(head));
+    }
+
+    /**
+     * 控制台程序默认的输出编码：Windows上为GBK（与cmd的默认代码页一致），其他系统为本机编码（通常为UTF-8）
+     *
+     * @return 默认的输出编码
+     */
+    public static Charset consoleCharset() {
+        if (IS_WINDOWS) {
+            return Charset.forName("GBK");
+        }
+        return charsetOrDefault(System.getProperty("native.encoding"), StandardCharsets.UTF_8);
+    }
+
+    /**
+     * 运行文件的命令行
+     *
+     * @param file 待运行的文件（绝对路径）
+     * @param head 文件开头的内容
+     * @return 命令行
+     */
+    private List<String> command(File file, String head) {
+        List<String> command = new ArrayList<>();
+        switch (this) {
+            case CMD -> command.addAll(List.of("cmd", "/c"));
+            case POWERSHELL -> command.addAll(IS_WINDOWS
+                    ? List.of("powershell", "-NoProfile", "-ExecutionPolicy", "Bypass", "-File")
+                    : List.of("pwsh", "-NoProfile", "-File"));
+            case SH -> {
+                //优先使用第一行指定的解释器（如#!/usr/bin/env bash）
+                if (!IS_WINDOWS && head.startsWith("#!")) {
+                    String line = head.substring(2).split("\n", 2)[0].trim();
+                    if (!line.isEmpty()) {
+                        command.addAll(List.of(line.split("\\s+")));
+                    }
+                }
+                if (command.isEmpty()) {
+                    command.add("sh");
+                }
+            }
+        }
+        command.add(file.getPath());
+        return command;
+    }
+
+    /**
+     * 检测文件运行时输出使用的编码
+     * <ul>
+     *     <li>cmd：文件中最后一次chcp设置的代码页</li>
+     *     <li>PowerShell：文件中将[Console]::OutputEncoding设为UTF8或使用chcp 65001时为UTF-8</li>
+     *     <li>其他情况使用控制台的默认编码</li>
+     * </ul>
+     *
+     * @param head 文件开头的内容
+     * @return 输出编码
+     */
+    private Charset detectCharset(String head) {
+        Charset defaultCharset = consoleCharset();
+        if (this == SH) {
+            return defaultCharset;
+        }
+
+        String codePage = null;
+        Matcher matcher = CHCP_PATTERN.matcher(head);
+        while (matcher.find()) {
+            codePage = matcher.group(1);
+        }
+        if (codePage != null) {
+            int page = Integer.parseInt(codePage);
+            if (page == 65001) {
+                return StandardCharsets.UTF_8;
+            }
+            return charsetOrDefault("cp" + page, charsetOrDefault("windows-" + page, defaultCharset));
+        }
+        if (this == POWERSHELL && PS_UTF8_PATTERN.matcher(head).find()) {
+            return StandardCharsets.UTF_8;
+        }
+        return defaultCharset;
+    }
+
+    /**
+     * 读取文件开头用于检测的部分（按ISO-8859-1解码，每个字节对应一个字符）
+     *
+     * @param file 待运行的文件
+     * @return 文件开头的内容，无法读取时为空字符串
+     */
+    private static String readHead(File file) {
+        try (InputStream stream = Files.newInputStream(file.toPath())) {
+            return new String(stream.readNBytes(DETECT_BYTES), StandardCharsets.ISO_8859_1);
+        } catch (IOException e) {
+            return "";
+        }
+    }
+
+    /**
+     * @param name         编码名称
+     * @param defaultValue 无法识别时使用的编码
+     * @return 对应的编码
+     */
+    private static Charset charsetOrDefault(String name, Charset defaultValue) {
+        if (name == null) {
+            return defaultValue;
+        }
+        try {
+            return Charset.forName(name);
+        } catch (IllegalArgumentException e) {
+            return defaultValue;
+        }
+    }
+}
@@ -0,0 +1,257 @@
+package InterfaceFunction.HomeInterface;
+
+import org.json.JSONObject;
+
+import java.io.File;
+import java.io.IOException;
+import java.io.InputStream;
+import java.io.OutputStream;
+import java.nio.charset.Charset;
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayDeque;
+import java.util.Deque;
+import java.util.concurrent.Executors;
+import java.util.concurrent.ScheduledExecutorService;
+import java.util.concurrent.TimeUnit;
+
+/**
+ * 预热的cmd进程池
+ * <p>
+ * 预先启动若干个空闲的cmd进程（只关闭该进程自身的命令回显），进程输出就绪标记后才放入池中。
+ * 运行文件时取出一个空闲进程，向其标准输入写入“切换目录、以cmd /c运行文件、以文件的退出代码退出”的命令，
+ * 省去启动cmd和加载环境的时间，取出后在后台补充新的进程。
+ * 文件由预热进程中新启动的cmd /c运行，回显、延迟变量扩展等设置与未预热时的cmd /c完全相同，
+ * 同一个文件无论是否取到预热进程，运行结果都一致。长时间没有运行文件时回收全部空闲进程，下一次运行时重新预热。
+ * 池中没有空闲进程或路径含有cmd特殊字符时返回null，由调用者按原方式启动新进程。
+ * 只在Windows上预热，其他系统上池的大小始终为0。
+ */
+public class ShellPool {
+    private static final String READY_MARKER = "BFM-READY";  //进程就绪后输出的标记
+    private static final long REAP_INTERVAL = 10000;  //检查空闲进程的间隔（毫秒）
+    private static final Charset SHELL_CHARSET = Charset.forName("GBK");  //cmd读取命令使用的编码
+    private static final ShellPool instance = new ShellPool();
+
+    private final Deque<Process> idle = new ArrayDeque<>();  //已就绪的空闲进程
+    private final ScheduledExecutorService maintainer = Executors.newSingleThreadScheduledExecutor(runnable -> {
+        Thread thread = new Thread(runnable);
+        thread.setDaemon(true);
+        return thread;
+    });
+    private int size = 0;  //池的大小，为0时不预热
+    private long idleTimeout = 300000;  //超过该时间没有运行文件则回收空闲进程（毫秒）
+    private long lastAcquireTime = System.currentTimeMillis();
+
+    //统计数据
+    private long hits = 0;  //取到预热进程的次数
+    private long misses = 0;  //未取到预热进程的次数
+    private long spawned = 0;  //预热的进程数
+    private long reaped = 0;  //因空闲而回收的进程数
+
+    private ShellPool() {
+        maintainer.scheduleWithFixedDelay(this::reap, REAP_INTERVAL, REAP_INTERVAL, TimeUnit.MILLISECONDS);
+    }
+
+    /**
+     * @return 进程池的唯一实例
+     */
+    public static ShellPool getInstance() {
+        return instance;
+    }
+
+    /**
+     * 修改进程池的设置，并在后台补充进程
+     *
+     * @param size        池的大小，为0时关闭预热
+     * @param idleTimeout 空闲回收时间（毫秒）
+     */
+    public synchronized void configure(int size, long idleTimeout) {
+        this.size = ShellLauncher.IS_WINDOWS ? Math.max(0, size) : 0;  //其他系统上没有cmd
+        this.idleTimeout = Math.max(REAP_INTERVAL, idleTimeout);
+        this.lastAcquireTime = System.currentTimeMillis();
+        while (idle.size() > this.size) {
+            idle.pollLast().destroy();
+        }
+        maintainer.execute(this::refill);
+    }
+
+    /**
+     * 取出一个空闲进程运行文件
+     *
+     * @param file 待运行的文件
+     * @return 已开始运行文件的进程，未能取到时返回null
+     */
+    public Process acquire(File file) {
+        Process process = null;
+        synchronized (this) {
+            if (size == 0) {
+                return null;
+            }
+            lastAcquireTime = System.currentTimeMillis();
+
+            if (canHandOff(file)) {
+                while (process == null && !idle.isEmpty()) {
+                    Process candidate = idle.pollFirst();
+                    if (candidate.isAlive() && handOff(candidate, file)) {
+                        process = candidate;
+                    } else {
+                        candidate.destroyForcibly();
+                    }
+                }
+            }
+
+            if (process == null) {
+                misses++;
+            } else {
+                hits++;
+            }
+        }
+
+        maintainer.execute(this::refill);
+        return process;
+    }
+
+    /**
+     * @return 进程池的设置和统计数据
+     */
+    public synchronized JSONObject stats() {
+        long total = hits + misses;
+        return new JSONObject()
+                .put("size", size)
+                .put("idle", idle.size())
+                .put("hits", hits)
+                .put("misses", misses)
+                .put("spawned", spawned)
+                .put("reaped", reaped)
+                .put("hitRate", total == 0 ? 0.0 : (double) hits / total);
+    }
+
+    /**
+     * 结束所有空闲进程并停止后台维护
+     */
+    public synchronized void shutdown() {
+        maintainer.shutdownNow();
+        idle.forEach(Process::destroy);
+        idle.clear();
+    }
+
+    /**
+     * 路径中不含cmd在命令行中会展开的特殊字符（%）和引号时才能通过标准输入交给预热进程
+     * （预热进程未开启延迟变量扩展，路径中的!不会被展开）
+     *
+     * @param file 待运行的文件
+     * @return 是否可以交给预热进程
+     */
+    private static boolean canHandOff(File file) {
+        String path = file.getAbsolutePath();
+        return path.indexOf('%') < 0 && path.indexOf('"') < 0;
+    }
+
+    /**
+     * 向预热进程写入运行文件的命令，文件结束后cmd以文件的退出代码退出
+     * <p>
+     * 文件与未预热时一样由cmd /c运行。命令只有一行，之后标准输入的内容全部留给文件读取；
+     * 命令行中的%errorlevel%在读入时就会展开，因此写作%^errorlevel%，读入时去掉^，由call在文件结束后再展开，无需延迟变量扩展
+     *
+     * @param process 预热进程
+     * @param file    待运行的文件
+     * @return 是否写入成功
+     */
+    private static boolean handOff(Process process, File file) {
+        File absoluteFile = file.getAbsoluteFile();
+        String command = "cd /d \"" + absoluteFile.getParent() + "\" & cmd /c \"\"" + absoluteFile.getPath()
+                + "\"\" & call exit %^errorlevel%\r\n";
+        try {
+            OutputStream stdin = process.getOutputStream();
+            stdin.write(command.getBytes(SHELL_CHARSET));
+            stdin.flush();
+            return true;
+        } catch (IOException e) {
+            return false;
+        }
+    }
+
+    /**
+     * 补充进程至池的大小（在维护线程中运行）
+     */
+    private void refill() {
+        while (true) {
+            synchronized (this) {
+                if (idle.size() >= size) {
+                    return;
+                }
+            }
+
+            Process process = spawn();
+            if (process == null) {
+                return;
+            }
+
+            synchronized (this) {
+                spawned++;
+                if (idle.size() >= size) {  //等待就绪期间池的大小被调小
+                    process.destroy();
+                    return;
+                }
+                idle.addLast(process);
+            }
+        }
+    }
+
+    /**
+     * 启动一个cmd进程并等待其就绪
+     *
+     * @return 已就绪的进程，启动失败时返回null
+     */
+    private static Process spawn() {
+        ProcessBuilder builder = new ProcessBuilder("cmd", "/d", "/q", "/k", "echo " + READY_MARKER);
+        Process process = null;
+        try {
+            process = builder.start();
+            if (awaitReady(process.getInputStream())) {
+                return process;
+            }
+        } catch (IOException e) {
+            //启动失败，由调用者按原方式启动进程
+        }
+
+        if (process != null) {
+            process.destroyForcibly();
+        }
+        return null;
+    }
+
+    /**
+     * 逐字节读取进程输出直至就绪标记所在行结束，标记之后的输出留给文件运行时转发
+     *
+     * @param stream 进程的标准输出
+     * @return 是否读到了就绪标记
+     * @throws IOException 读取失败
+     */
+    private static boolean awaitReady(InputStream stream) throws IOException {
+        byte[] marker = READY_MARKER.getBytes(StandardCharsets.US_ASCII);
+        int matched = 0;
+        int b;
+        while ((b = stream.read()) != -1) {
+            if (matched == marker.length) {
+                if (b == '\n') {
+                    return true;
+                }
+                continue;
+            }
+            matched = b == marker[matched] ? matched + 1 : (b == marker[0] ? 1 : 0);
+        }
+        return false;
+    }
+
+    /**
+     * 回收已退出的进程，超过空闲回收时间没有运行文件时回收全部空闲进程（在维护线程中运行）
+     */
+    private synchronized void reap() {
+        idle.removeIf(process -> !process.isAlive());
+        if (!idle.isEmpty() && System.currentTimeMillis() - lastAcquireTime >= idleTimeout) {
+            reaped += idle.size();
+            idle.forEach(Process::destroy);
+            idle.clear();
+        }
+    }
+}
@@ -4,14 +4,24 @@ import PythonConnector.GrandProcessConnector;
 import org.json.JSONArray;
 
 import java.io.*;
+import java.net.InetAddress;
 import java.net.ServerSocket;
 import java.net.Socket;
+import java.nio.charset.Charset;
 import java.nio.charset.StandardCharsets;
 import java.util.ArrayList;
 import java.util.List;
+import java.util.concurrent.Executors;
+import java.util.concurrent.ScheduledExecutorService;
+import java.util.concurrent.TimeUnit;
 
 public class fileRunner implements GrandProcessConnector<String, Boolean> {
+    public static final int ACCEPT_TIMEOUT = 10000;  //等待主进程连接的超时时间（毫秒）
+    static final int PUMP_BUFFER_SIZE = 8192;  //每次读取进程输出的最大字符数
+    static final int PUMP_JOIN_TIMEOUT = 1000;  //进程退出后等待剩余输出的时间（毫秒）
     static String fileToRun;
+    static int port = 0;
+    static int sampleInterval = 0;
 
     /**
      * @return 从主进程获取到的文件路径列表
@@ -26,9 +36,11 @@ public class fileRunner implements GrandProcessConnector<String, Boolean> {
             String jsonInput = br.readLine();
             JSONArray ja = new JSONArray(jsonInput);
 
-            for (int i = 0; i < ja.length(); i++) {
-                fileToRun = ja.getString(i);
-            }
+            //第一个元素为文件路径，第二个元素（可选）为监听的端口，缺省时由系统分配空闲端口，
+            //第三个元素（可选）为资源占用的采样间隔（毫秒），缺省或为0时不采样
+            fileToRun = ja.getString(0);
+            port = ja.optInt(1, 0);
+            sampleInterval = ja.optInt(2, 0);
         } catch (IOException e) {
             this.sendData(false);  //Python端消息接收失败异常处理
             fileToRun = "";
@@ -52,6 +64,7 @@ public class fileRunner implements GrandProcessConnector<String, Boolean> {
      * @param process 需要结束的进程
      */
     void killProcess(Process process) {
+        process.descendants().forEach(ProcessHandle::destroyForcibly);  //cmd启动的子进程一并结束
         process.destroy();
         if (process.isAlive()) {
             process.destroyForcibly();
@@ -59,86 +72,191 @@ public class fileRunner implements GrandProcessConnector<String, Boolean> {
     }
 
     /**
-     * 运行文件
+     * 在本机回环地址上开始监听，应在向主进程应答之前调用，主进程收到应答后即可直接连接
      *
-     * @param fileToRun 待运行文件的路径列表
+     * @param port 监听的端口，为0时由系统分配空闲端口
+     * @return 已绑定的服务器套接字，实际端口由getLocalPort()获取
+     * @throws IOException 端口无法绑定
      */
-    void runFile(String fileToRun) {
-        int exitCode = -1;
+    public ServerSocket openServer(int port) throws IOException {
+        ServerSocket serverSocket = new ServerSocket(port, 1, InetAddress.getLoopbackAddress());
+        serverSocket.setSoTimeout(ACCEPT_TIMEOUT);  //主进程未能连接时不会永久阻塞
+        return serverSocket;
+    }
 
+    /**
+     * 按文件类型启动新的cmd、PowerShell或sh进程运行文件
+     *
+     * @param file   待运行的文件
+     * @param launch 由ShellLauncher.prepare()生成的命令行
+     * @return 已启动的进程
+     * @throws IOException 进程启动失败
+     */
+    private Process startProcess(File file, ShellLauncher.Launch launch) throws IOException {
+        ProcessBuilder builder = new ProcessBuilder(launch.command());
+        builder.directory(file.getAbsoluteFile().getParentFile());  //设置工作目录
+        return builder.start();
+    }
+
+    /**
+     * 运行文件
+     *
+     * @param fileToRun      待运行文件的路径
+     * @param serverSocket   由openServer()创建的服务器套接字，运行结束后关闭
+     * @param sampleInterval 资源占用的采样间隔（毫秒），为0时不采样
+     */
+    public void runFile(String fileToRun, ServerSocket serverSocket, int sampleInterval) {
         //创建与主进程（客户端）的连接
-        try (ServerSocket serverSocket = new ServerSocket(1918)) {
-            Socket clientSocket = serverSocket.accept();
-            PrintWriter out = new PrintWriter(clientSocket.getOutputStream(), true);
-            BufferedReader in = new BufferedReader(
-                    new InputStreamReader(clientSocket.getInputStream()));
+        try (serverSocket; Socket clientSocket = serverSocket.accept()) {
+            FrameChannel channel = new FrameChannel(clientSocket.getInputStream(), clientSocket.getOutputStream());
 
-            //创建文件运行进程
+            //按文件类型选择运行方式，cmd运行的文件优先使用预热的进程，没有空闲进程时启动新进程
             File file = new File(fileToRun);
-            ProcessBuilder builder = new ProcessBuilder("cmd", "/c", file.getAbsolutePath());
-
-            builder.directory(file.getParentFile());  //设置工作目录
-            builder.redirectErrorStream(true);  // 合并错误流
-
-            //创建并启动进程
-            Process process = builder.start();
-
-            // 启动读取进程输出并发送到客户端
-            new Thread(() -> {
-                try (InputStream is = process.getInputStream();
-                     InputStreamReader isr = new InputStreamReader(is, "GBK");
-                     BufferedReader br = new BufferedReader(isr)) {
-                    String line;
-                    while ((line = br.readLine()) != null) {
-                        out.println(line);
-                        out.flush();
-                    }
-                } catch (IOException e) {  //读出内容时的异常处理
-                    out.println("[ERROR] " + e.getMessage());
+            ShellLauncher.Launch launch = ShellLauncher.prepare(file);
+            Process warmProcess = launch.launcher() == ShellLauncher.CMD ? ShellPool.getInstance().acquire(file) : null;
+            Process process;
+            try {
+                process = warmProcess != null ? warmProcess : startProcess(file, launch);
+            } catch (IOException e) {
+                channel.write(FrameChannel.CONTROL, ("无法启动" + launch.launcher().displayName() + "：" + e.getMessage())
+                        .getBytes(StandardCharsets.UTF_8));
+                return;
+            }
+
+            //标准输出和标准错误分别转发
+            Thread stdoutPump = startPump(process.getInputStream(), FrameChannel.STDOUT, launch.charset(), channel);
+            Thread stderrPump = startPump(process.getErrorStream(), FrameChannel.STDERR, launch.charset(), channel);
+
+            //定期发送心跳，主进程据此判断文件运行进程是否仍然存活
+            ScheduledExecutorService heartbeat = Executors.newSingleThreadScheduledExecutor(runnable -> {
+                Thread thread = new Thread(runnable);
+                thread.setDaemon(true);
+                return thread;
+            });
+            heartbeat.scheduleAtFixedRate(() -> {
+                try {
+                    channel.write(FrameChannel.HEARTBEAT, new byte[0]);
+                } catch (IOException _) {
+                    //连接已断开，由读取线程处理
                 }
-            }).start();
-
-            // 启动从客户端读取命令并写入进程
-            new Thread(() -> {
-                try (BufferedWriter writer = new BufferedWriter(
-                        new OutputStreamWriter(process.getOutputStream(), StandardCharsets.UTF_8))) {
-                    String command;
-                    while ((command = in.readLine()) != null) {
-                        //判断是否为终止进程命令
-                        if (command.startsWith("#") && command.endsWith("#")) {
-                            killProcess(process);
-                            break;
-                        }
+            }, FrameChannel.HEARTBEAT_INTERVAL, FrameChannel.HEARTBEAT_INTERVAL, TimeUnit.MILLISECONDS);
 
-                        writer.write(command);
-                        writer.newLine();
-                        writer.flush();
+            //按间隔采样进程树的资源占用，与心跳共用一个线程
+            if (sampleInterval > 0) {
+                ResourceSampler sampler = new ResourceSampler(process.toHandle());
+                heartbeat.scheduleAtFixedRate(() -> {
+                    byte[] sample = sampler.sample();
+                    try {
+                        if (sample != null) {
+                            channel.write(FrameChannel.RESOURCE, sample);
+                        }
+                    } catch (IOException _) {
+                        //连接已断开，由读取线程处理
                     }
-                } catch (IOException e) {  //写入命令时的异常处理
-                    out.println("[ERROR] " + e.getMessage());
-                }
-            }).start();
+                }, 0, Math.max(sampleInterval, ResourceSampler.MIN_INTERVAL), TimeUnit.MILLISECONDS);
+            }
+
+            //从客户端读取命令并写入进程
+            Thread commandThread = new Thread(() -> receiveCommands(channel, process, launch.charset()));
+            commandThread.setDaemon(true);
+            commandThread.start();
 
             try {
-                exitCode = process.waitFor();
-                out.println("#进程已退出，代码：" + exitCode);
-                out.flush();
+                int exitCode = process.waitFor();
+                heartbeat.shutdown();  //资源帧不会在退出帧之后发送
+                heartbeat.awaitTermination(PUMP_JOIN_TIMEOUT, TimeUnit.MILLISECONDS);
+                //等待剩余的输出发送完毕（子进程可能仍持有输出管道，因此限制等待时间）
+                stdoutPump.join(PUMP_JOIN_TIMEOUT);
+                stderrPump.join(PUMP_JOIN_TIMEOUT);
+                channel.writeExit(exitCode);
             } catch (InterruptedException e) {  //获取返回值时的异常处理
                 Thread.currentThread().interrupt();
-                out.println("[ERROR] 执行被中断");
-                out.flush();
+                channel.write(FrameChannel.CONTROL, "执行被中断".getBytes(StandardCharsets.UTF_8));
+            } finally {
+                heartbeat.shutdownNow();
             }
-        } catch (IOException _) {  //创建套接字时的异常处理
+        } catch (IOException _) {  //等待连接超时或通信异常
             //Python主进程已处理无法连接至套接字的情况，此处无需异常处理，直接结束进程即可
         }
     }
 
+    /**
+     * 启动转发进程输出的线程
+     * <p>
+     * 每次读取当前可用的全部内容并立即发送，不等待换行，进度条等以\r刷新的输出能够及时显示
+     *
+     * @param stream  进程的输出流
+     * @param type    帧类型（标准输出或标准错误）
+     * @param charset 进程输出使用的编码
+     * @param channel 与主进程通信的帧通道
+     * @return 已启动的线程
+     */
+    private Thread startPump(InputStream stream, byte type, Charset charset, FrameChannel channel) {
+        Thread thread = new Thread(() -> {
+            //按检测到的编码（cmd默认为GBK）转换为UTF-8，多字节字符不会在两帧之间被拆开
+            try (Reader reader = new InputStreamReader(stream, charset)) {
+                char[] chars = new char[PUMP_BUFFER_SIZE];
+                int count;
+                while ((count = reader.read(chars)) != -1) {
+                    byte[] payload = new String(chars, 0, count).getBytes(StandardCharsets.UTF_8);
+                    channel.write(type, payload);
+                }
+            } catch (IOException e) {  //读出内容时的异常处理
+                try {
+                    channel.write(FrameChannel.CONTROL, ("读取输出失败：" + e.getMessage()).getBytes(StandardCharsets.UTF_8));
+                } catch (IOException _) {
+                    //连接已断开
+                }
+            }
+        });
+        thread.setDaemon(true);
+        thread.start();
+        return thread;
+    }
+
+    /**
+     * 读取主进程发送的帧：输入内容（UTF-8）按进程的编码写入进程，控制消息"kill"结束进程
+     *
+     * @param channel 与主进程通信的帧通道
+     * @param process 文件运行进程
+     * @param charset 进程读取输入使用的编码
+     */
+    private void receiveCommands(FrameChannel channel, Process process, Charset charset) {
+        try (OutputStream stdin = process.getOutputStream()) {
+            FrameChannel.Frame frame;
+            while ((frame = channel.read()) != null) {
+                if (frame.type() == FrameChannel.STDIN) {
+                    stdin.write(new String(frame.payload(), StandardCharsets.UTF_8).getBytes(charset));
+                    stdin.flush();
+                } else if (frame.type() == FrameChannel.CONTROL
+                        && "kill".equals(new String(frame.payload(), StandardCharsets.UTF_8))) {
+                    killProcess(process);
+                    break;
+                }
+            }
+        } catch (IOException e) {  //写入命令时的异常处理
+            try {
+                channel.write(FrameChannel.CONTROL, ("写入命令失败：" + e.getMessage()).getBytes(StandardCharsets.UTF_8));
+            } catch (IOException _) {
+                //连接已断开
+            }
+        }
+    }
+
     public static void main(String[] args) {
         fileRunner fileRunner = new fileRunner();
         fileToRun = fileRunner.receiveData();
         if (!fileToRun.isEmpty()) {
-            fileRunner.sendData(true);  //成功接收文件路径则返回1
-            fileRunner.runFile(fileToRun);
+            ServerSocket serverSocket;
+            try {
+                serverSocket = fileRunner.openServer(port);
+            } catch (IOException e) {
+                fileRunner.sendData(false);
+                return;
+            }
+            //成功监听则应答[true, 端口]
+            System.out.println(new JSONArray().put(true).put(serverSocket.getLocalPort()));
+            fileRunner.runFile(fileToRun, serverSocket, sampleInterval);
         }
     }
 }
@@ -0,0 +1,187 @@
+package InterfaceFunction.Total;
+
+import InterfaceFunction.HomeInterface.FileAdder;
+import InterfaceFunction.HomeInterface.FileInfoGetter;
+import InterfaceFunction.HomeInterface.ShellPool;
+import InterfaceFunction.HomeInterface.fileRunner;
+import PythonConnector.GrandProcessConnector;
+import org.json.JSONArray;
+import org.json.JSONException;
+import org.json.JSONObject;
+
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.IOException;
+import java.io.InputStreamReader;
+import java.net.ServerSocket;
+import java.nio.charset.StandardCharsets;
+import java.util.ArrayList;
+import java.util.List;
+import java.util.concurrent.ExecutorService;
+import java.util.concurrent.Executors;
+
+/**
+ * 常驻后台的Java后端进程
+ * <p>
+ * 启动后持续从标准输入逐行读取请求，每个请求形如{"id": 1, "target": "fileAdder", "data": [...]}，
+ * 处理完毕后向标准输出写入{"id": 1, "data": ...}。请求在线程池中并发处理，应答可能乱序，Python端依靠id匹配。
+ */
+public class BackendDaemon implements GrandProcessConnector<JSONObject, JSONObject> {
+    private final BufferedReader reader = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+    private final ExecutorService workers = Executors.newCachedThreadPool(runnable -> {
+        Thread thread = new Thread(runnable);
+        thread.setDaemon(true);
+        return thread;
+    });
+
+    /**
+     * 从标准输入读取一个请求
+     *
+     * @return 请求对象（标准输入关闭时返回null）
+     */
+    @Override
+    public JSONObject receiveData() {
+        while (true) {
+            String line;
+            try {
+                line = reader.readLine();
+            } catch (IOException e) {
+                return null;
+            }
+            if (line == null) {
+                return null;
+            }
+            if (line.isBlank()) {
+                continue;
+            }
+
+            try {
+                return new JSONObject(line);
+            } catch (JSONException e) {
+                //格式错误的请求无法得知id，直接丢弃
+            }
+        }
+    }
+
+    /**
+     * 向标准输出写入一个应答（多个工作线程共用标准输出，故需要同步）
+     *
+     * @param data 需要发送的应答
+     */
+    @Override
+    public synchronized void sendData(JSONObject data) {
+        System.out.println(data);
+        System.out.flush();
+    }
+
+    /**
+     * 将JSON数组转换为字符串列表
+     *
+     * @param jsonArray 待转换的JSON数组
+     * @return 字符串列表
+     */
+    private static List<String> toStringList(JSONArray jsonArray) {
+        List<String> list = new ArrayList<>();
+        for (int i = 0; i < jsonArray.length(); i++) {
+            list.add(String.valueOf(jsonArray.get(i)));
+        }
+        return list;
+    }
+
+    /**
+     * 按照请求的目标调用相应的功能
+     *
+     * @param target 目标功能（与原.jar文件同名）
+     * @param data   请求携带的数据
+     * @return 应答数据
+     */
+    private Object dispatch(String target, JSONArray data) {
+        switch (target) {
+            case "ping" -> {
+                return "pong";
+            }
+            case "fileAdder" -> {
+                return new JSONArray(new FileAdder().getFileInfos(toStringList(data)));
+            }
+            case "fileInfoGetter" -> {
+                return new JSONArray(new FileInfoGetter().getDateAndSize(toStringList(data)));
+            }
+            case "jsonReader" -> {
+                String targetFilePath = data.getString(0);
+                if (!new File(targetFilePath).isFile()) {
+                    return -1;
+                }
+                JSONArray jsonData = new JsonReader().readJsonFile(targetFilePath);
+                return jsonData.isEmpty() ? 0 : jsonData;
+            }
+            case "jsonWriter" -> {
+                try {
+                    new JsonWriter().writeData(data.getString(0), data.getJSONArray(1));
+                } catch (RuntimeException e) {
+                    return 0;
+                }
+                return 1;
+            }
+            case "fileRunner" -> {
+                String fileToRun = data.getString(0);
+                fileRunner runner = new fileRunner();
+                ServerSocket serverSocket;
+                try {
+                    serverSocket = runner.openServer(data.optInt(1, 0));  //应答前完成监听，端口由系统分配
+                } catch (IOException e) {
+                    return new JSONArray().put(false);
+                }
+                //运行文件会一直阻塞至进程结束，放入单独的非守护线程，确保守护进程退出前文件运行完毕
+                int sampleInterval = data.optInt(2, 0);  //资源占用的采样间隔（毫秒），为0时不采样
+                new Thread(() -> runner.runFile(fileToRun, serverSocket, sampleInterval)).start();
+                return new JSONArray().put(true).put(serverSocket.getLocalPort());
+            }
+            case "shellPool" -> {
+                //["configure", 池的大小, 空闲回收时间（秒）]修改设置，["stats"]只获取统计数据
+                if ("configure".equals(data.optString(0))) {
+                    ShellPool.getInstance().configure(data.getInt(1), data.getLong(2) * 1000);
+                }
+                return ShellPool.getInstance().stats();
+            }
+            default -> {
+                return JSONObject.NULL;
+            }
+        }
+    }
+
+    /**
+     * 处理单个请求并发送应答
+     *
+     * @param request 请求对象
+     */
+    private void handle(JSONObject request) {
+        JSONObject response = new JSONObject();
+        response.put("id", request.optLong("id", -1));
+
+        try {
+            JSONArray data = request.optJSONArray("data");
+            response.put("data", dispatch(request.optString("target"), data == null ? new JSONArray() : data));
+        } catch (RuntimeException e) {
+            response.put("data", JSONObject.NULL);
+        }
+
+        sendData(response);
+    }
+
+    public static void main(String[] args) {
+        BackendDaemon daemon = new BackendDaemon();
+        JSONObject request;
+
+        while ((request = daemon.receiveData()) != null) {
+            if ("exit".equals(request.optString("target"))) {
+                break;
+            }
+            JSONObject finalRequest = request;
+            daemon.workers.submit(() -> daemon.handle(finalRequest));
+        }
+
+        //标准输入关闭即说明Python主进程已退出，正在运行的文件将在运行结束后随JVM一同退出
+        daemon.workers.shutdown();
+        ShellPool.getInstance().shutdown();
+    }
+}
@@ -0,0 +1,434 @@
+"""
+运行记录模块
+
+每次运行的输出在接收时即写入一个gzip压缩的日志文件，运行的文件、时间、退出代码、输出的字节数和行数、资源占用等信息
+保存在SQLite数据库中，按文件或时间查询时只需查找索引。本模块不依赖PyQt。
+"""
+import ctypes
+import gzip
+import os
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from Logs.log_recorder import logging, log_dir
+
+history_dir = os.path.join(log_dir, 'runs')  # 运行日志和索引数据库所在的目录
+history_db_path = os.path.join(history_dir, 'history.db')
+
+_schema = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    script TEXT NOT NULL,
+    script_key TEXT NOT NULL,
+    title TEXT,
+    state TEXT NOT NULL,
+    submit_time REAL NOT NULL,
+    start_time REAL,
+    first_output_time REAL,
+    end_time REAL,
+    exit_code INTEGER,
+    bytes INTEGER NOT NULL DEFAULT 0,
+    lines INTEGER NOT NULL DEFAULT 0,
+    log TEXT UNIQUE,
+    cpu_time REAL,
+    peak_cpu REAL,
+    avg_rss INTEGER,
+    peak_rss INTEGER,
+    io_bytes INTEGER,
+    owner_pid INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_script ON runs(script_key, submit_time);
+CREATE INDEX IF NOT EXISTS runs_time ON runs(submit_time);
+CREATE INDEX IF NOT EXISTS runs_failed ON runs(submit_time) WHERE exit_code IS NOT 0;
+"""
+
+_columns = ('id', 'script', 'title', 'state', 'submit_time', 'start_time', 'first_output_time', 'end_time',
+            'exit_code', 'bytes', 'lines', 'log', 'cpu_time', 'peak_cpu', 'avg_rss', 'peak_rss', 'io_bytes')
+
+# 旧版本的数据库中没有的列：列名 -> 类型
+_addedColumns = {
+    'cpu_time': 'REAL',
+    'peak_cpu': 'REAL',
+    'avg_rss': 'INTEGER',
+    'peak_rss': 'INTEGER',
+    'io_bytes': 'INTEGER',
+    'owner_pid': 'INTEGER',
+}
+
+
+def processAlive(pid: int) -> bool:
+    """
+    进程是否仍在运行
+    :param pid: 进程ID
+    :return: 无法判断时视为仍在运行
+    """
+    if os.name == 'nt':
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return kernel32.GetLastError() == 5  # ERROR_ACCESS_DENIED：进程存在但无权访问
+        try:
+            exitCode = ctypes.c_ulong()
+            if not kernel32.GetExitCodeProcess(handle, ctypes.byref(exitCode)):
+                return True
+            return exitCode.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass  # 进程存在但属于其他用户
+    return True
+
+
+def scriptKey(path: str) -> str:
+    """查询运行记录时使用的文件路径键（与FileMonitor.scanner.normalizePath()一致）"""
+    return os.path.normcase(os.path.abspath(path))
+
+
+class RunLogWriter:
+    """
+    一次运行的压缩日志
+
+    * 由产生输出的线程直接调用write()写入，不经过GUI线程，写入的内容与控制台显示的内容相同
+    * 使用最快的压缩级别，避免压缩拖慢接收线程
+    * 每隔flushInterval秒做一次同步刷新，运行期间或程序意外退出后也能读出已刷新的内容
+
+    构造方法参数
+    ------------
+    * path: 日志文件路径
+    """
+
+    flushInterval = 1.0  # 同步刷新的间隔（秒）
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.bytes = 0  # 写入的字节数（未压缩，UTF-8）
+        self.lines = 0  # 写入的行数
+        self.atLineStart = True  # 已写入的内容是否以换行符结尾
+        self.lastFlush = time.monotonic()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self.file = gzip.open(path, 'wb', compresslevel=1)
+        except OSError as e:
+            logging.warning(f'无法创建运行日志"{path}"：{e}')
+            self.file = None
+
+    def write(self, text: str):
+        """
+        追加一段输出（线程安全）
+        :param text: 文本
+        """
+        if not text:
+            return
+
+        data = text.encode('utf-8', errors='replace')
+        with self.lock:
+            if self.file is None:
+                return
+            try:
+                self.file.write(data)
+                now = time.monotonic()
+                if now - self.lastFlush >= self.flushInterval:
+                    self.file.flush(zlib.Z_SYNC_FLUSH)
+                    self.lastFlush = now
+            except OSError as e:
+                logging.warning(f'写入运行日志"{self.path}"失败：{e}')
+                self.file = None
+                return
+
+            self.bytes += len(data)
+            self.lines += text.count('\n')
+            self.atLineStart = text.endswith('\n')
+
+    def close(self):
+        """结束写入，之后的write()将被忽略"""
+        with self.lock:
+            if not self.atLineStart:
+                self.lines += 1  # 最后一行没有换行符
+                self.atLineStart = True
+            if self.file is not None:
+                try:
+                    self.file.close()
+                except OSError as e:
+                    logging.warning(f'关闭运行日志"{self.path}"失败：{e}')
+                self.file = None
+
+
+class RunRecord:
+    """一次正在记录的运行"""
+
+    __slots__ = ('log', 'writer')
+
+    def __init__(self, log: str, writer: RunLogWriter):
+        self.log = log  # 日志文件相对于运行记录目录的路径
+        self.writer = writer
+
+
+class RunHistory:
+    """
+    运行记录
+
+    * 数据库的写入全部在一个后台线程中按提交顺序进行，调用线程不等待磁盘；查询在调用线程中使用单独的只读连接，
+      数据库使用WAL模式，查询与写入互不阻塞
+    * 按文件查询使用(script_key, submit_time)索引，按时间查询使用submit_time索引，
+      查询失败的运行使用只包含未成功运行的部分索引，记录数增长后查询仍只需读取结果所在的索引页
+    * 日志按月份存放在不同的目录中，启动时删除超过保留天数的记录和日志
+    * 每条记录保存写入它的进程ID，打开数据库时只把写入进程已退出的未结束运行标记为中断，
+      图形界面和命令行模式同时运行时不会互相改写对方正在进行的运行
+
+    构造方法参数
+    ------------
+    * directory: 运行记录目录
+    """
+
+    def __init__(self, directory: str = history_dir):
+        self.directory = directory
+        self.dbPath = os.path.join(directory, 'history.db')
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='RunHistory')
+        self.ready = None  # 打开数据库的Future
+        self.connection = None  # 写入连接（只在后台线程中使用）
+        self.local = threading.local()  # 各线程的查询连接
+        self.records = {}  # 由RunManager提交的运行：运行编号 -> RunRecord
+
+    def start(self, retentionDays: int = None):
+        """
+        在后台打开数据库
+        :param retentionDays: 记录保留的天数，为空时不删除旧记录
+        """
+        if self.ready is None:
+            self.ready = self.executor.submit(self.__open, retentionDays)
+
+    def isReady(self) -> bool:
+        """数据库是否已打开（打开失败也视为已结束），未结束前查询会阻塞调用线程"""
+        return self.ready is not None and self.ready.done()
+
+    def attach(self, runManager):
+        """
+        记录运行管理器提交的每一次运行
+        :param runManager: Connector.RunManager.RunManager
+        """
+        runManager.runAdded.connect(self.__onRunAdded)
+        runManager.runFinished.connect(self.__onRunFinished)
+
+    def begin(self, script: str, title: str = None, submitTime: float = None) -> RunRecord:
+        """
+        开始记录一次运行
+        :param script: 运行的文件路径
+        :param title: 显示的标题
+        :param submitTime: 提交时间（time.time()）
+        :return: 运行记录，输出写入其writer，结束时交给finish()
+        """
+        self.start()
+        submitTime = time.time() if submitTime is None else submitTime
+        log = os.path.join(time.strftime('%Y-%m', time.localtime(submitTime)),
+                           f'{time.strftime("%Y%m%d-%H%M%S", time.localtime(submitTime))}-{uuid.uuid4().hex[:8]}.log.gz')
+        record = RunRecord(log, RunLogWriter(os.path.join(self.directory, log)))
+        self.executor.submit(self.__write,
+                             'INSERT INTO runs (script, script_key, title, state, submit_time, log, owner_pid) '
+                             'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                             (script, scriptKey(script), title, 'queued', submitTime, log, os.getpid()))
+        return record
+
+    def finish(self, record: RunRecord, state: str, startTime: float = None, firstOutputTime: float = None,
+               endTime: float = None, exitCode: int = None, resources: dict = None):
+        """
+        结束记录一次运行
+        :param record: begin()返回的运行记录
+        :param state: 运行的最终状态（与RunState一致）
+        :param startTime: 开始运行的时间
+        :param firstOutputTime: 收到第一块输出的时间
+        :param endTime: 结束时间，为空时使用当前时间
+        :param exitCode: 退出代码，进程未正常退出时为None
+        :param resources: 资源占用统计（ResourceSeries.summary()），没有采样时为None
+        """
+        record.writer.close()
+        resources = resources or {}
+        ioBytes = None
+        if resources.get('readBytes') is not None or resources.get('writeBytes') is not None:
+            ioBytes = (resources.get('readBytes') or 0) + (resources.get('writeBytes') or 0)
+        self.executor.submit(self.__write,
+                             'UPDATE runs SET state = ?, start_time = ?, first_output_time = ?, end_time = ?, '
+                             'exit_code = ?, bytes = ?, lines = ?, cpu_time = ?, peak_cpu = ?, avg_rss = ?, '
+                             'peak_rss = ?, io_bytes = ? WHERE log = ?',
+                             (state, startTime, firstOutputTime, time.time() if endTime is None else endTime,
+                              exitCode, record.writer.bytes, record.writer.lines, resources.get('cpuTime'),
+                              resources.get('peakCpu'), resources.get('avgRss'), resources.get('peakRss'), ioBytes,
+                              record.log))
+
+    def query(self, script: str = None, keyword: str = None, failedOnly: bool = False, since: float = None,
+              limit: int = 100) -> list:
+        """
+        查询运行记录（按提交时间从新到旧）
+        :param script: 只查询该文件的运行
+        :param keyword: 只查询路径中包含该文本的运行
+        :param failedOnly: 只查询已结束且未成功（退出代码不为0或未正常退出）的运行
+        :param since: 只查询该时间（time.time()）之后提交的运行
+        :param limit: 最多返回的记录数
+        :return: [{列名: 值}, ...]，数据库无法打开时返回空列表
+        """
+        conditions, params = [], []
+        if script:
+            conditions.append('script_key = ?')
+            params.append(scriptKey(script))
+        if keyword:
+            conditions.append("script LIKE ? ESCAPE '\\'")
+            params.append('%' + keyword.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%')
+        if failedOnly:
+            conditions.append('exit_code IS NOT 0 AND end_time IS NOT NULL')  # 与部分索引的条件一致
+        if since is not None:
+            conditions.append('submit_time >= ?')
+            params.append(since)
+
+        sql = f'SELECT {", ".join(_columns)} FROM runs'
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY submit_time DESC LIMIT ?'
+        params.append(limit)
+
+        connection = self.__readConnection()
+        if connection is None:
+            return []
+        try:
+            return [dict(zip(_columns, row)) for row in connection.execute(sql, params)]
+        except sqlite3.Error as e:
+            logging.error(f'查询运行记录失败：{e}')
+            return []
+
+    def readLog(self, log: str) -> str:
+        """
+        读取一次运行的日志，正在运行或意外中断的日志读出已刷新的部分
+        :param log: 日志文件相对于运行记录目录的路径（查询结果中的log）
+        :return: 日志内容，文件不存在时返回空字符串
+        """
+        # 直接使用解压对象逐块解压，压缩流未结束时保留已解压的内容（GzipFile遇到截断的流会丢弃最后一次读取的内容）
+        chunks = []
+        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+        try:
+            with open(os.path.join(self.directory, log), 'rb') as f:
+                while not decompressor.eof and (data := f.read(1024 * 1024)):
+                    chunks.append(decompressor.decompress(data))
+        except (OSError, zlib.error) as e:
+            logging.warning(f'无法读取运行日志"{log}"：{e}')
+        return b''.join(chunks).decode('utf-8', errors='replace')
+
+    def close(self):
+        """结束仍在记录的运行并关闭数据库（等待尚未完成的写入）"""
+        for record in self.records.values():
+            self.finish(record, 'interrupted')
+        self.records.clear()
+        if self.ready is not None:
+            self.executor.submit(self.__close)
+        self.executor.shutdown(wait=True)
+
+    def __onRunAdded(self, run):
+        """运行管理器提交了新的运行：此后控制台显示的全部内容同时写入日志"""
+        record = self.begin(run.filePath, run.title, run.submitTime)
+        run.client.receiver.sink = record.writer.write
+        self.records[run.runId] = record
+
+    def __onRunFinished(self, run):
+        """运行结束（包括启动失败和取消）"""
+        record = self.records.pop(run.runId, None)
+        if record is not None:
+            self.finish(record, run.state, run.startTime, run.firstOutputTime, run.endTime, run.exitCode,
+                        run.resources)
+
+    def __open(self, retentionDays):
+        """后台线程：打开数据库，标记上次未结束的运行并删除过期的记录"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self.connection = sqlite3.connect(self.dbPath)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute('PRAGMA synchronous=NORMAL')
+            self.connection.executescript(_schema)
+            existing = {row[1] for row in self.connection.execute('PRAGMA table_info(runs)')}
+            for column, columnType in _addedColumns.items():
+                if column not in existing:
+                    self.connection.execute(f'ALTER TABLE runs ADD COLUMN {column} {columnType}')
+            self.__markInterrupted()
+            self.connection.commit()
+        except sqlite3.Error as e:
+            logging.error(f'无法打开运行记录数据库：{e}')
+            self.connection = None
+            return
+
+        if retentionDays:
+            self.__prune(time.time() - retentionDays * 86400)
+
+    def __markInterrupted(self):
+        """后台线程：将写入进程已退出的未结束运行标记为中断"""
+        owners = [row[0] for row in self.connection.execute(
+            "SELECT DISTINCT owner_pid FROM runs WHERE end_time IS NULL AND state != 'interrupted'")]
+        # 本进程尚未写入任何记录，与本进程ID相同的记录来自已退出的旧进程
+        dead = [pid for pid in owners if pid is not None and (pid == os.getpid() or not processAlive(pid))]
+        self.connection.execute("UPDATE runs SET state = 'interrupted' WHERE end_time IS NULL AND owner_pid IS NULL")
+        self.connection.executemany("UPDATE runs SET state = 'interrupted' WHERE end_time IS NULL AND owner_pid = ?",
+                                    [(pid,) for pid in dead])
+
+    def __prune(self, cutoff: float):
+        """后台线程：删除指定时间之前的记录和日志"""
+        try:
+            logs = [row[0] for row in self.connection.execute(
+                'SELECT log FROM runs WHERE submit_time < ?', (cutoff,))]
+            if not logs:
+                return
+            self.connection.execute('DELETE FROM runs WHERE submit_time < ?', (cutoff,))
+            self.connection.commit()
+        except sqlite3.Error as e:
+            logging.error(f'删除过期的运行记录失败：{e}')
+            return
+
+        for log in logs:
+            try:
+                os.remove(os.path.join(self.directory, log))
+            except OSError:
+                pass
+
+        # 删除已清空的月份目录
+        for entry in os.scandir(self.directory):
+            if entry.is_dir() and not os.listdir(entry.path):
+                shutil.rmtree(entry.path, ignore_errors=True)
+        logging.info(f'已删除{len(logs)}条过期的运行记录')
+
+    def __write(self, sql: str, params: tuple):
+        """后台线程：执行一条写入语句"""
+        if self.connection is None:
+            return
+        try:
+            self.connection.execute(sql, params)
+            self.connection.commit()
+        except sqlite3.Error as e:
+            logging.error(f'写入运行记录失败：{e}')
+
+    def __close(self):
+        """后台线程：关闭写入连接"""
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def __readConnection(self):
+        """获取当前线程的查询连接（等待数据库打开）"""
+        self.start()
+        self.ready.result()
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            try:
+                connection = sqlite3.connect(f'file:{os.path.abspath(self.dbPath)}?mode=ro', uri=True)
+            except sqlite3.Error as e:
+                logging.error(f'无法打开运行记录数据库：{e}')
+                return None
+            self.local.connection = connection
+        return connection
+
+
+runHistory = RunHistory()
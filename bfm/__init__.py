@@ -0,0 +1,6 @@
+"""
+批处理文件管理器的命令行模式
+
+不启动图形界面，直接使用保存的文件列表和预设运行文件，供计划任务和自动化脚本调用：
+python -m bfm run <预设标题|文件路径>
+"""
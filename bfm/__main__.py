@@ -0,0 +1,6 @@
+"""命令行入口：python -m bfm"""
+import sys
+
+from bfm.cli import main
+
+sys.exit(main())
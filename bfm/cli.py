@@ -0,0 +1,367 @@
+"""
+命令行模式
+
+* run：运行文件或预设，输出实时写入标准输出和标准错误，以脚本的退出代码退出
+* list：列出保存的预设
+* 使用与图形界面相同的文件列表、预设和运行记录，但不导入PyQt和qfluentwidgets，启动只需数十毫秒
+* 文件由内置文件运行器直接运行（不经过Java后端），标准输入和Ctrl+C直接交给脚本
+
+退出代码
+--------
+* 运行单个文件：文件的退出代码（进程被信号结束时为128+信号值）
+* 运行预设：全部步骤成功时为0，否则为第一个失败步骤的退出代码（未能运行时为1）
+* 找不到文件或预设、参数错误：2
+"""
+import argparse
+import codecs
+import os
+import sys
+import threading
+import time
+
+appDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # 程序目录（Main.py所在目录）
+
+usageErrorCode = 2  # 找不到文件或预设、参数错误
+noExitCode = 1  # 文件未能运行（没有退出代码）时使用的退出代码
+interruptedCode = 130  # 被Ctrl+C中断时使用的退出代码（与shell一致）
+
+
+class StepOutput:
+    """
+    一次运行的输出：逐块解码为文本后写入控制台和运行记录
+
+    * 标准输出和标准错误分别使用增量解码器，多字节字符被拆到两块中也能正确解码
+    * 设置了前缀时（并行运行多个文件），只输出完整的行并在行首加上前缀，避免多个文件的输出混在一行中
+
+    构造方法参数
+    ------------
+    * console: 控制台
+    * prefix: 每行输出的前缀，为空时原样输出
+    * sink: 同时接收全部输出文本的函数（运行记录），可为空
+    """
+
+    def __init__(self, console, prefix: str = '', sink=None):
+        self.console = console
+        self.prefix = prefix
+        self.sink = sink
+        self.decoders = {}  # 帧类型 -> 增量解码器
+        self.pending = {}  # 帧类型 -> 尚未输出的不完整行
+        self.firstOutputTime = None
+
+    def emit(self, frameType: int, data: bytes):
+        """接收一块输出（在转发线程中调用）"""
+        if self.firstOutputTime is None:
+            self.firstOutputTime = time.time()
+        decoder = self.decoders.get(frameType)
+        if decoder is None:
+            decoder = self.decoders[frameType] = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.__write(frameType, decoder.decode(data))
+
+    def close(self):
+        """输出剩余的内容"""
+        for frameType, decoder in self.decoders.items():
+            self.__write(frameType, decoder.decode(b'', final=True))
+        for frameType, text in self.pending.items():
+            if text:
+                self.console.write(frameType, f'{self.prefix}{text}\n')
+        self.pending.clear()
+
+    def __write(self, frameType: int, text: str):
+        if not text:
+            return
+        if self.sink is not None:
+            self.sink(text)
+        if not self.prefix:
+            self.console.write(frameType, text)
+            return
+
+        lines = (self.pending.get(frameType, '') + text).split('\n')
+        self.pending[frameType] = lines.pop()
+        if lines:
+            self.console.write(frameType, ''.join(f'{self.prefix}{line}\n' for line in lines))
+
+
+class Console:
+    """
+    控制台输出：多个线程可同时写入，每次写入后立即刷新
+
+    标准输出和标准错误的编码不能表示的字符以替代字符输出，不会中断运行
+    """
+
+    def __init__(self):
+        from Connector import FrameProtocol as Frame
+
+        self.streams = {Frame.STDOUT: sys.stdout, Frame.STDERR: sys.stderr}
+        for stream in self.streams.values():
+            if hasattr(stream, 'reconfigure'):
+                stream.reconfigure(errors='replace')
+        self.lock = threading.Lock()
+
+    def write(self, frameType: int, text: str):
+        stream = self.streams[frameType]
+        with self.lock:
+            stream.write(text)
+            stream.flush()
+
+    def message(self, text: str):
+        """输出本程序的提示信息（写入标准错误，不与脚本的输出混在一起）"""
+        with self.lock:
+            sys.stderr.write(text + '\n')
+            sys.stderr.flush()
+
+
+class CommandLineRunner:
+    """
+    命令行模式的运行器
+
+    构造方法参数
+    ------------
+    * console: 控制台
+    * history: 是否写入运行记录
+    """
+
+    def __init__(self, console: Console, history: bool = True):
+        from Connector.LocalRunner import localRunner
+
+        self.console = console
+        self.runner = localRunner
+        self.history = None
+        if history:
+            from Logs.run_history import runHistory
+            self.history = runHistory
+
+    def runFile(self, filePath: str, title: str, prefix: str = '') -> int:
+        """
+        运行文件直至结束
+        :param filePath: 文件路径
+        :param title: 运行记录中的标题
+        :param prefix: 每行输出的前缀
+        :return: 退出代码，文件未能运行时为None
+        """
+        from Logs.log_recorder import logging
+
+        submitTime = time.time()
+        record = self.history.begin(filePath, title, submitTime) if self.history is not None else None
+        output = StepOutput(self.console, prefix, record.writer.write if record is not None else None)
+
+        exitCode = None
+        state = 'cancelled'  # 被Ctrl+C中断时的状态
+        try:
+            exitCode = self.runner.run(filePath, output.emit)
+            state = 'finished'
+        except OSError as e:
+            state = 'failed'
+            self.console.message(f'{prefix}无法运行“{filePath}”：{e}')
+            logging.error(f'命令行模式无法运行“{filePath}”：{e}')
+        finally:
+            output.close()
+            if record is not None:
+                self.history.finish(record, state, submitTime, output.firstOutputTime, time.time(), exitCode)
+        return exitCode
+
+    def runQueue(self, title: str, queueData: dict) -> int:
+        """
+        按依赖关系执行队列预设，与图形界面的QueueExecutor规则一致
+        :param title: 队列名称
+        :param queueData: 整理后的队列预设数据（路径已更新为文件的当前路径）
+        :return: 命令行的退出代码
+        :raises ValueError: 前置步骤无效或存在循环依赖
+        """
+        from Connector.QueuePlan import QueueSchedule, stateTexts
+
+        plan = QueueSchedule(queueData)
+        steps = plan.steps
+        exitCodes = [None] * len(steps)
+        condition = threading.Condition()
+
+        def worker(index: int, path: str):
+            name = os.path.basename(path)
+            prefix = f'[#{index + 1} {name}] ' if plan.limit > 1 else ''
+            exitCode = self.runFile(path, f'{title} #{index + 1}：{name}', prefix)
+            with condition:
+                exitCodes[index] = exitCode
+                plan.complete(index, exitCode == 0)
+                condition.notify()
+
+        startTime = time.time()
+        try:
+            with condition:
+                while True:
+                    while (index := plan.nextStep()) is not None:
+                        path = steps[index]['path']
+                        if not os.path.isfile(path):
+                            self.console.message(f'第{index + 1}步的文件不存在：{path}')
+                            plan.complete(index, False)
+                            continue
+                        if plan.limit == 1:
+                            self.console.message(f'==> #{index + 1} {os.path.basename(path)}')
+                        threading.Thread(target=worker, args=(index, path), daemon=True).start()
+
+                    if plan.isFinished():
+                        break
+                    condition.wait(0.5)  # 定时醒来，使Windows上也能及时响应Ctrl+C
+        except KeyboardInterrupt:
+            self.runner.shutdown()
+            raise
+
+        lines = [f'队列“{title}”用时{time.time() - startTime:.2f}s']
+        for i, step in enumerate(steps):
+            line = f'{i + 1}. {os.path.basename(step["path"])}：{stateTexts[plan.states[i]]}'
+            if exitCodes[i] is not None:
+                line += f'（退出代码{exitCodes[i]}）'
+            lines.append(line)
+        self.console.message('\n'.join(lines))
+
+        failed = plan.failedStep()
+        if failed < 0:
+            return 0 if plan.succeeded() else noExitCode
+        return shellExitCode(exitCodes[failed])
+
+    def close(self):
+        """等待运行记录写入完毕"""
+        if self.history is not None:
+            self.history.close()
+
+
+def shellExitCode(exitCode) -> int:
+    """
+    将进程的退出代码转换为命令行的退出代码
+    :param exitCode: 进程的退出代码，被信号结束时为负的信号值，未能运行时为None
+    :return: 命令行的退出代码
+    """
+    if exitCode is None:
+        return noExitCode
+    if exitCode < 0:
+        return 128 - exitCode
+    return exitCode
+
+
+def loadPresets() -> list:
+    """读取保存的预设（图形界面运行期间也可读取）"""
+    from AppConfig.journal import presetJournal
+    return presetJournal.read() or []
+
+
+def findPreset(presets: list, title: str):
+    """
+    按标题查找预设，完全一致的优先，其次为不区分大小写一致的
+    :return: 预设[标题,描述,样式,预设数据]，找不到时为None
+    """
+    for preset in presets:
+        if preset[0] == title:
+            return preset
+    folded = title.casefold()
+    for preset in presets:
+        if preset[0].casefold() == folded:
+            return preset
+    return None
+
+
+def filePaths() -> dict:
+    """文件列表中每一行的当前路径：{行ID: 文件路径}"""
+    from AppConfig.journal import fileTableJournal
+    return {row[3]: row[2] for row in fileTableJournal.read() or [] if len(row) > 3}
+
+
+def resolvePath(paths: dict, path: str, fileId) -> str:
+    """获取预设引用的文件的当前路径，行ID无效时返回预设中保存的路径"""
+    return paths.get(fileId, path) if fileId is not None else path
+
+
+def runPreset(runner: CommandLineRunner, preset: list, off: bool) -> int:
+    """
+    运行预设
+    :param runner: 命令行模式的运行器
+    :param preset: 预设[标题,描述,样式,预设数据]
+    :param off: 开关预设是否运行关闭文件
+    :return: 命令行的退出代码
+    """
+    from Connector.QueuePlan import normalizeQueueData
+
+    title, _, style, data = preset[:4]
+    paths = filePaths()
+
+    if style == 'Switch':
+        data = list(data) + [None] * (5 - len(data))
+        path = resolvePath(paths, data[2], data[4]) if off else resolvePath(paths, data[1], data[3])
+        if not path or not os.path.isfile(path):
+            runner.console.message(f'预设“{title}”的{"关闭" if off else "开启"}文件不存在：{path}')
+            return noExitCode
+        return shellExitCode(runner.runFile(path, f'{title}：{os.path.basename(path)}'))
+
+    queueData = normalizeQueueData(data)
+    steps = [dict(step, path=resolvePath(paths, step['path'], step.get('fileId'))) for step in queueData['steps']]
+    try:
+        return runner.runQueue(title, dict(queueData, steps=steps))
+    except ValueError as e:
+        runner.console.message(f'队列预设“{title}”数据有误：{e}')
+        return usageErrorCode
+
+
+def commandRun(args) -> int:
+    """run命令"""
+    from Logs.log_recorder import logging
+
+    console = Console()
+    runner = CommandLineRunner(console, history=not args.no_history)
+    try:
+        if os.path.isfile(args.path):
+            logging.info(f'命令行模式运行文件：{args.path}')
+            return shellExitCode(runner.runFile(args.path, os.path.basename(args.path)))
+
+        preset = findPreset(loadPresets(), args.target)
+        if preset is None:
+            console.message(f'找不到文件或预设：{args.target}')
+            return usageErrorCode
+        logging.info(f'命令行模式运行预设：{preset[0]}')
+        return runPreset(runner, preset, args.off)
+    except KeyboardInterrupt:
+        logging.info('命令行模式的运行被中断')
+        return interruptedCode
+    finally:
+        runner.close()
+
+
+def commandList(args) -> int:
+    """list命令"""
+    styleTexts = {'Switch': '开关', 'Queue': '队列'}
+    for preset in loadPresets():
+        line = f'{preset[0]}\t{styleTexts.get(preset[2], preset[2])}'
+        if preset[1]:
+            line += f'\t{preset[1]}'
+        print(line)
+    return 0
+
+
+def buildParser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='python -m bfm', description='批处理文件管理器的命令行模式（不启动图形界面）')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    runParser = commands.add_parser('run', help='运行文件或预设', description='运行文件或预设，以脚本的退出代码退出')
+    runParser.add_argument('target', help='文件路径或预设标题（不是已存在的文件时按预设标题查找）')
+    runParser.add_argument('--off', action='store_true', help='开关预设运行关闭文件（默认运行开启文件）')
+    runParser.add_argument('--no-history', action='store_true', help='不写入运行记录')
+    runParser.set_defaults(handler=commandRun)
+
+    listParser = commands.add_parser('list', help='列出保存的预设')
+    listParser.set_defaults(handler=commandList)
+    return parser
+
+
+def main(argv: list = None) -> int:
+    """
+    命令行入口
+    :param argv: 命令行参数（不含程序名），为空时使用sys.argv
+    :return: 退出代码
+    """
+    parser = buildParser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return usageErrorCode if e.code else 0
+
+    # 数据和日志目录均相对于程序目录，因此先将文件路径转换为绝对路径再切换工作目录
+    if args.command == 'run':
+        args.path = os.path.abspath(args.target)
+    os.chdir(appDir)
+    return args.handler(args)
@@ -0,0 +1,36 @@
+"""Connector.FrameProtocol的编解码测试"""
+import io
+import unittest
+
+from Connector import FrameProtocol as Frame
+
+
+class FrameProtocolTest(unittest.TestCase):
+    def testRoundTrip(self):
+        stream = io.BytesIO(Frame.encodeFrame(Frame.STDOUT, '输出\r\n'.encode('utf-8'))
+                            + Frame.encodeFrame(Frame.HEARTBEAT)
+                            + Frame.encodeExit(-1073741510))
+
+        self.assertEqual(Frame.readFrame(stream), (Frame.STDOUT, '输出\r\n'.encode('utf-8')))
+        self.assertEqual(Frame.readFrame(stream), (Frame.HEARTBEAT, b''))
+        frameType, payload = Frame.readFrame(stream)
+        self.assertEqual(frameType, Frame.EXIT)
+        self.assertEqual(Frame.EXIT_CODE.unpack(payload), (-1073741510,))
+        self.assertIsNone(Frame.readFrame(stream))  # 流已结束
+
+    def testHeaderLayout(self):
+        self.assertEqual(Frame.encodeFrame(Frame.CONTROL, Frame.KILL), b'\x04\x00\x00\x00\x04kill')
+
+    def testTruncatedFrame(self):
+        data = Frame.encodeFrame(Frame.STDERR, b'abcdef')
+        self.assertIsNone(Frame.readFrame(io.BytesIO(data[:3])))  # 帧头不完整
+        self.assertIsNone(Frame.readFrame(io.BytesIO(data[:-1])))  # 负载不完整
+
+    def testOversizedPayloadRejected(self):
+        header = Frame.HEADER.pack(Frame.STDOUT, Frame.MAX_PAYLOAD + 1)
+        with self.assertRaises(ValueError):
+            Frame.readFrame(io.BytesIO(header))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""AppConfig.journal的重放与压缩测试"""
+import os
+import tempfile
+import unittest
+
+from AppConfig.journal import JournaledFile, _addFiles, _removeFiles, _setRemark, _redirectFile, _rowPath
+
+fileOperations = {
+    'add': _addFiles,
+    'remove': _removeFiles,
+    'remark': _setRemark,
+    'redirect': _redirectFile,
+}
+
+
+class JournaledFileTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'fileTable.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def newFile(self, **kwargs) -> JournaledFile:
+        return JournaledFile(self.path, fileOperations, key=_rowPath, **kwargs)
+
+    def testReplayAppliesOperationsInOrder(self):
+        journal = self.newFile()
+        journal.load()
+        journal.append('add', [['a.bat', '', '/a.bat', 1], ['b.bat', '', '/b.bat', 2]])
+        journal.append('remark', '/a.bat', '备注')
+        journal.append('redirect', '/b.bat', '/c.bat', 'c.bat')
+        journal.append('remove', ['/a.bat'])
+        journal.append('add', [['d.bat', '', '/d.bat', 3]])
+        journal.append('remark', '/c.bat', '已移动')
+
+        expected = [['c.bat', '已移动', '/c.bat', 2], ['d.bat', '', '/d.bat', 3]]
+        self.assertEqual(journal.data, expected)
+        self.assertEqual(self.newFile().load(), expected)
+        self.assertEqual(JournaledFile(self.path, fileOperations).load(), expected)  # 不使用索引时结果相同
+        self.assertEqual(self.newFile().read(), expected)
+
+    def testIndexFollowsRedirectedPath(self):
+        journal = self.newFile()
+        journal.load()
+        journal.append('add', [['a.bat', '', '/a.bat', 1]])
+        journal.append('redirect', '/a.bat', '/b.bat', 'b.bat')
+        journal.append('remark', '/a.bat', '旧路径')  # 旧路径已不存在，应被忽略
+        journal.append('remark', '/b.bat', '新路径')
+
+        self.assertEqual(self.newFile().load(), [['b.bat', '新路径', '/b.bat', 1]])
+
+    def testTruncatedRecordIsDiscarded(self):
+        journal = self.newFile()
+        journal.load()
+        journal.append('add', [['a.bat', '', '/a.bat', 1]])
+        journal.append('remark', '/a.bat', '完整')
+        journalPath = journal.journalPath(journal.crc)
+        with open(journalPath, 'a', encoding='utf-8') as f:
+            f.write('["remark", "/a.bat", "不完')
+        size = os.path.getsize(journalPath)
+
+        reloaded = self.newFile()
+        self.assertEqual(reloaded.load(), [['a.bat', '完整', '/a.bat', 1]])
+        self.assertEqual(reloaded.opCount, 2)
+        self.assertLess(os.path.getsize(journalPath), size)  # 不完整的记录已被截断
+
+    def testCompactWritesSnapshotAndStartsNewJournal(self):
+        journal = self.newFile()
+        journal.load()
+        journal.append('add', [['a.bat', '', '/a.bat', 1]])
+        oldJournal = journal.journalPath(journal.crc)
+
+        self.assertTrue(journal.compact())
+        self.assertFalse(os.path.exists(oldJournal))
+        self.assertEqual(journal.opCount, 0)
+
+        journal.append('remark', '/a.bat', '压缩后')
+        self.assertEqual(self.newFile().load(), [['a.bat', '压缩后', '/a.bat', 1]])
+
+    def testOperationsDuringCompactAreKept(self):
+        journal = self.newFile()
+        journal.load()
+        journal.append('add', [['a.bat', '', '/a.bat', 1]])
+
+        snapshot = journal.beginCompact()
+        journal.append('add', [['b.bat', '', '/b.bat', 2]])  # 压缩开始后追加的操作
+        self.assertTrue(journal.finishCompact(snapshot))
+
+        self.assertEqual(self.newFile().load(), [['a.bat', '', '/a.bat', 1], ['b.bat', '', '/b.bat', 2]])
+
+    def testStaleJournalIsIgnored(self):
+        journal = self.newFile()
+        journal.load()
+        journal.append('add', [['a.bat', '', '/a.bat', 1]])
+        staleJournal = journal.journalPath(journal.crc)
+        journal.compact()
+
+        # 旧快照的日志与新快照不匹配，即使残留也不应重放
+        with open(staleJournal, 'w', encoding='utf-8') as f:
+            f.write('["add", [["x.bat", "", "/x.bat", 9]]]\n')
+        reloaded = self.newFile()
+        self.assertEqual(reloaded.load(), [['a.bat', '', '/a.bat', 1]])
+        self.assertFalse(os.path.exists(staleJournal))
+
+    def testThresholdCallback(self):
+        calls = []
+        journal = self.newFile(threshold=2)
+        journal.onThreshold = lambda: calls.append(journal.opCount)
+        journal.load()
+        journal.append('add', [['a.bat', '', '/a.bat', 1]])
+        journal.append('remark', '/a.bat', 'x')
+        self.assertEqual(calls, [2])
+
+
+if __name__ == '__main__':
+    unittest.main()
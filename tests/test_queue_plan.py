@@ -0,0 +1,150 @@
+"""Connector.QueuePlan的依赖检查与调度测试"""
+import unittest
+
+from Connector.QueuePlan import QueueMode, StepState, QueueSchedule, normalizeQueueData, dependencyGraph
+
+
+def queueData(mode: QueueMode, after: list, limit: int = 4, stopOnFailure: bool = False) -> dict:
+    """生成整理后的队列预设数据，after为每个步骤的前置步骤下标"""
+    return normalizeQueueData({
+        'mode': mode.value,
+        'limit': limit,
+        'stopOnFailure': stopOnFailure,
+        'steps': [{'path': f'/step{i}.bat', 'after': deps} for i, deps in enumerate(after)],
+    })
+
+
+def drain(schedule: QueueSchedule) -> list:
+    """取出当前全部可以开始的步骤"""
+    started = []
+    while (index := schedule.nextStep()) is not None:
+        started.append(index)
+    return started
+
+
+class NormalizeQueueDataTest(unittest.TestCase):
+    def testLegacyPathList(self):
+        data = normalizeQueueData(['/a.bat', '/b.bat'])
+        self.assertEqual(data['mode'], QueueMode.SEQUENTIAL.value)
+        self.assertTrue(data['stopOnFailure'])
+        self.assertEqual(data['steps'], [{'path': '/a.bat', 'after': []}, {'path': '/b.bat', 'after': []}])
+
+    def testLimitIsAtLeastOne(self):
+        self.assertEqual(normalizeQueueData({'limit': 0})['limit'], 1)
+
+
+class DependencyGraphTest(unittest.TestCase):
+    def testSequentialAndParallel(self):
+        self.assertEqual(dependencyGraph(queueData(QueueMode.SEQUENTIAL, [[], [], []])), [[], [0], [1]])
+        self.assertEqual(dependencyGraph(queueData(QueueMode.PARALLEL, [[], [0], []])), [[], [], []])
+
+    def testDagDeduplicatesAndSorts(self):
+        self.assertEqual(dependencyGraph(queueData(QueueMode.DAG, [[], [], [1, 0, 1]])), [[], [], [0, 1]])
+
+    def testInvalidReference(self):
+        for after in ([[], [5]], [[0]], [[], [-1]]):
+            with self.subTest(after=after), self.assertRaises(ValueError):
+                dependencyGraph(queueData(QueueMode.DAG, after))
+
+    def testCycle(self):
+        with self.assertRaises(ValueError):
+            dependencyGraph(queueData(QueueMode.DAG, [[2], [0], [1]]))
+
+
+class QueueScheduleTest(unittest.TestCase):
+    def testSequentialRunsOneAtATime(self):
+        schedule = QueueSchedule(queueData(QueueMode.SEQUENTIAL, [[], [], []], limit=3))
+        self.assertEqual(drain(schedule), [0])
+        schedule.complete(0, True)
+        self.assertEqual(drain(schedule), [1])
+        schedule.complete(1, True)
+        self.assertEqual(drain(schedule), [2])
+        schedule.complete(2, True)
+        self.assertTrue(schedule.isFinished())
+        self.assertTrue(schedule.succeeded())
+
+    def testParallelLimit(self):
+        schedule = QueueSchedule(queueData(QueueMode.PARALLEL, [[]] * 5, limit=2))
+        self.assertEqual(drain(schedule), [0, 1])
+        schedule.complete(1, True)
+        self.assertEqual(drain(schedule), [2])
+        self.assertFalse(schedule.isFinished())
+
+    def testDagWaitsForAllPrerequisites(self):
+        schedule = QueueSchedule(queueData(QueueMode.DAG, [[], [], [0, 1]]))
+        self.assertEqual(drain(schedule), [0, 1])
+        schedule.complete(0, True)
+        self.assertEqual(drain(schedule), [])
+        schedule.complete(1, True)
+        self.assertEqual(drain(schedule), [2])
+
+    def testFailureSkipsOnlyDependents(self):
+        # 0 -> 1 -> 3，2独立，4依赖1和2；0失败后1、3、4跳过，2照常运行
+        schedule = QueueSchedule(queueData(QueueMode.DAG, [[], [0], [], [1], [1, 2]]))
+        self.assertEqual(drain(schedule), [0, 2])
+        schedule.complete(0, False)
+        self.assertEqual(schedule.states[1], StepState.SKIPPED)
+        self.assertEqual(schedule.states[3], StepState.SKIPPED)
+        self.assertEqual(schedule.states[4], StepState.SKIPPED)
+        self.assertFalse(schedule.isFinished())
+
+        schedule.complete(2, True)
+        self.assertEqual(drain(schedule), [])
+        self.assertTrue(schedule.isFinished())
+        self.assertEqual(schedule.states, [StepState.FAILED, StepState.SKIPPED, StepState.SUCCEEDED,
+                                           StepState.SKIPPED, StepState.SKIPPED])
+        self.assertFalse(schedule.succeeded())
+        self.assertEqual(schedule.failedStep(), 0)
+
+    def testSequentialContinuesAfterFailure(self):
+        # 顺序执行的步骤之间只是先后关系，未开启“失败时停止”时失败后照常运行下一步
+        schedule = QueueSchedule(queueData(QueueMode.SEQUENTIAL, [[], [], []]))
+        self.assertEqual(drain(schedule), [0])
+        schedule.complete(0, False)
+        self.assertEqual(drain(schedule), [1])
+        schedule.complete(1, True)
+        self.assertEqual(drain(schedule), [2])
+        schedule.complete(2, False)
+        self.assertTrue(schedule.isFinished())
+        self.assertEqual(schedule.states, [StepState.FAILED, StepState.SUCCEEDED, StepState.FAILED])
+        self.assertEqual(schedule.failedStep(), 0)
+
+    def testSequentialStopOnFailure(self):
+        schedule = QueueSchedule(queueData(QueueMode.SEQUENTIAL, [[], [], []], stopOnFailure=True))
+        drain(schedule)
+        schedule.complete(0, False)
+        self.assertEqual(drain(schedule), [])
+        self.assertTrue(schedule.isFinished())
+        self.assertEqual(schedule.states, [StepState.FAILED, StepState.SKIPPED, StepState.SKIPPED])
+
+    def testStopOnFailureSkipsEverythingWaiting(self):
+        schedule = QueueSchedule(queueData(QueueMode.DAG, [[], [], [], [1]], limit=2, stopOnFailure=True))
+        self.assertEqual(drain(schedule), [0, 1])
+        schedule.complete(0, False)
+        self.assertEqual(drain(schedule), [])
+        self.assertFalse(schedule.isFinished())  # 已在运行的步骤继续运行至结束
+
+        schedule.complete(1, True)
+        self.assertTrue(schedule.isFinished())
+        self.assertEqual(schedule.states, [StepState.FAILED, StepState.SUCCEEDED, StepState.SKIPPED,
+                                           StepState.SKIPPED])
+
+    def testStepThatCouldNotStart(self):
+        # 文件不存在时步骤在开始前即以失败结束，运行数不应变为负数
+        schedule = QueueSchedule(queueData(QueueMode.PARALLEL, [[], []], limit=1))
+        index = schedule.nextStep()
+        schedule.complete(index, False)
+        self.assertEqual(schedule.runningCount, 0)
+        self.assertEqual(drain(schedule), [1])
+
+    def testStopCancelsWaitingSteps(self):
+        schedule = QueueSchedule(queueData(QueueMode.SEQUENTIAL, [[], [], []]))
+        drain(schedule)
+        schedule.stop()
+        schedule.complete(0, True)
+        self.assertTrue(schedule.isFinished())
+        self.assertEqual(schedule.states, [StepState.SUCCEEDED, StepState.SKIPPED, StepState.SKIPPED])
+
+
+if __name__ == '__main__':
+    unittest.main()
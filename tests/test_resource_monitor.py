@@ -0,0 +1,63 @@
+"""Connector.ResourceMonitor的资源帧编解码与统计测试"""
+import struct
+import unittest
+
+from Connector import FrameProtocol as Frame
+from Connector.ResourceMonitor import ResourceSample, ResourceSeries, formatBytes
+
+
+class ResourceSampleTest(unittest.TestCase):
+    def testRoundTrip(self):
+        sample = ResourceSample(1.5, 0.25, 4096, 10, 20, 3, 2)
+        payload = sample.encode()
+        self.assertEqual(len(payload), Frame.RESOURCE_SAMPLE.size)
+        self.assertEqual(ResourceSample.decode(payload), sample)
+
+    def testUnknownValues(self):
+        sample = ResourceSample(2.0, None, None, None, None, None, 1)
+        self.assertEqual(ResourceSample.decode(sample.encode()), sample)
+
+    def testJavaLayout(self):
+        # 与Java端ResourceSampler的编码一致：毫秒、大端、无法获取的项为-1
+        payload = struct.pack('>qqqqqii', 1500, 250, -1, 7, 8, -1, 4)
+        self.assertEqual(ResourceSample.decode(payload), ResourceSample(1.5, 0.25, None, 7, 8, None, 4))
+
+    def testWrongLength(self):
+        with self.assertRaises(struct.error):
+            ResourceSample.decode(b'\x00' * 8)
+
+
+class ResourceSeriesTest(unittest.TestCase):
+    def testSummary(self):
+        series = ResourceSeries()
+        self.assertIsNone(series.summary())
+
+        series.add(ResourceSample(1.0, 0.5, 100, 0, 0, 2, 1))
+        series.add(ResourceSample(2.0, 1.5, 300, 10, 5, 4, 2))
+        series.add(ResourceSample(4.0, 2.0, 200, 20, 5, 3, 1))
+
+        summary = series.summary()
+        self.assertEqual(summary['samples'], 3)
+        self.assertAlmostEqual(summary['peakCpu'], 100.0)  # 1~2秒内使用了1秒CPU时间
+        self.assertAlmostEqual(summary['avgCpu'], 50.0)
+        self.assertEqual(summary['avgRss'], 200)
+        self.assertEqual(summary['peakRss'], 300)
+        self.assertEqual(summary['peakThreads'], 4)
+        self.assertEqual(summary['peakProcesses'], 2)
+        self.assertEqual([cpu for _, cpu, _ in series.snapshot()], [None, 100.0, 25.0])
+
+    def testKeepsRecentPoints(self):
+        series = ResourceSeries(maxPoints=2)
+        for i in range(5):
+            series.add(ResourceSample(float(i), None, i, None, None, None, None))
+        self.assertEqual([elapsed for elapsed, _, _ in series.snapshot()], [3.0, 4.0])
+        self.assertEqual(series.summary()['peakRss'], 4)  # 峰值按整次运行计算
+
+    def testFormatBytes(self):
+        self.assertEqual(formatBytes(512), '512B')
+        self.assertEqual(formatBytes(1536), '1.5KB')
+        self.assertEqual(formatBytes(3 * 1024 ** 3), '3.0GB')
+
+
+if __name__ == '__main__':
+    unittest.main()
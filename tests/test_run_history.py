@@ -0,0 +1,92 @@
+"""Logs.run_history的记录与查询测试"""
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from Logs.run_history import RunHistory, processAlive
+
+
+class RunHistoryTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.history = RunHistory(self.directory.name)
+        self.history.start()
+
+    def tearDown(self):
+        self.history.close()
+        self.directory.cleanup()
+
+    def record(self, script: str, submitTime: float, exitCode, state: str = 'finished', output: str = ''):
+        """写入一次已结束的运行"""
+        record = self.history.begin(script, os.path.basename(script), submitTime)
+        record.writer.write(output)
+        self.history.finish(record, state, submitTime, submitTime, submitTime + 1, exitCode)
+        return record
+
+    def flush(self):
+        """等待后台线程完成已提交的写入"""
+        self.history.executor.submit(lambda: None).result()
+
+    def testQueryFilters(self):
+        self.record('/scripts/backup.bat', 100, 0)
+        self.record('/scripts/backup.bat', 200, 1)
+        self.record('/scripts/deploy_all.bat', 300, None, 'failed')
+        self.record('/scripts/deploy%.bat', 400, 0)
+        self.flush()
+
+        self.assertEqual([r['submit_time'] for r in self.history.query()], [400, 300, 200, 100])
+        self.assertEqual([r['submit_time'] for r in self.history.query(script='/scripts/backup.bat')], [200, 100])
+        self.assertEqual([r['submit_time'] for r in self.history.query(failedOnly=True)], [300, 200])
+        self.assertEqual([r['submit_time'] for r in self.history.query(since=250)], [400, 300])
+        self.assertEqual([r['submit_time'] for r in self.history.query(limit=1)], [400])
+        # LIKE的通配符按原义匹配
+        self.assertEqual([r['script'] for r in self.history.query(keyword='deploy%')], ['/scripts/deploy%.bat'])
+        self.assertEqual([r['script'] for r in self.history.query(keyword='y_a')], ['/scripts/deploy_all.bat'])
+
+    def testRecordAndLog(self):
+        record = self.record('/scripts/run.bat', 100, 3, output='第一行\n第二行')
+        self.flush()
+
+        row, = self.history.query()
+        self.assertEqual(row['exit_code'], 3)
+        self.assertEqual(row['lines'], 2)
+        self.assertEqual(row['bytes'], len('第一行\n第二行'.encode('utf-8')))
+        self.assertEqual(self.history.readLog(record.log), '第一行\n第二行')
+        self.assertEqual(self.history.readLog('missing.log.gz'), '')
+
+    def testUnfinishedRunsOfExitedOwnersAreInterrupted(self):
+        self.flush()
+        alive = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(30)'])
+        exited = subprocess.Popen([sys.executable, '-c', 'pass'])
+        exited.wait()
+        try:
+            with sqlite3.connect(self.history.dbPath) as connection:
+                connection.executemany(
+                    'INSERT INTO runs (script, script_key, state, submit_time, owner_pid) VALUES (?, ?, ?, ?, ?)',
+                    [('/alive.bat', '/alive.bat', 'running', 1, alive.pid),
+                     ('/exited.bat', '/exited.bat', 'running', 2, exited.pid),
+                     ('/legacy.bat', '/legacy.bat', 'running', 3, None)])
+            connection.close()
+
+            reopened = RunHistory(self.directory.name)
+            reopened.start()
+            states = {row['script']: row['state'] for row in reopened.query()}
+            reopened.close()
+        finally:
+            alive.kill()
+            alive.wait()
+
+        self.assertEqual(states, {'/alive.bat': 'running', '/exited.bat': 'interrupted', '/legacy.bat': 'interrupted'})
+
+    def testProcessAlive(self):
+        self.assertTrue(processAlive(os.getpid()))
+        process = subprocess.Popen([sys.executable, '-c', 'pass'])
+        process.wait()
+        self.assertFalse(processAlive(process.pid))
+
+
+if __name__ == '__main__':
+    unittest.main()
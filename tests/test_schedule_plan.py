@@ -0,0 +1,100 @@
+"""Connector.SchedulePlan的cron解析与计划数据测试"""
+import unittest
+from datetime import datetime
+
+from Connector.SchedulePlan import (TriggerType, CronExpression, normalizeTrigger, normalizeSchedule, nextFireTime,
+                                    chainCreatesCycle)
+
+
+def timestamp(*args) -> float:
+    """本地时间的time.time()值"""
+    return datetime(*args).timestamp()
+
+
+class CronExpressionTest(unittest.TestCase):
+    def testFields(self):
+        expr = CronExpression('*/15 8-18/2 1,15 jan-mar mon-fri')
+        self.assertEqual(expr.minutes, {0, 15, 30, 45})
+        self.assertEqual(expr.hours, {8, 10, 12, 14, 16, 18})
+        self.assertEqual(expr.days, {1, 15})
+        self.assertEqual(expr.months, {1, 2, 3})
+        self.assertEqual(expr.weekdays, {1, 2, 3, 4, 5})
+
+    def testStartWithStep(self):
+        self.assertEqual(CronExpression('5/20 * * * *').minutes, {5, 25, 45})
+
+    def testSundayAsSevenAndMacros(self):
+        self.assertEqual(CronExpression('0 0 * * 7').weekdays, {0})
+        self.assertEqual(CronExpression('@daily').hours, {0})
+        self.assertEqual(CronExpression(' @Weekly ').weekdays, {0})
+
+    def testInvalidExpressions(self):
+        for text in ('', '* * * *', '60 * * * *', '* 24 * * *', '* * 0 * *', '*/0 * * * *', '5-1 * * * *',
+                     '* * * foo *'):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                CronExpression(text)
+
+    def testNext(self):
+        after = timestamp(2025, 3, 14, 10, 7, 30)
+        self.assertEqual(CronExpression('*/15 * * * *').next(after), timestamp(2025, 3, 14, 10, 15))
+        self.assertEqual(CronExpression('0 9 * * *').next(after), timestamp(2025, 3, 15, 9, 0))
+        self.assertEqual(CronExpression('@monthly').next(after), timestamp(2025, 4, 1, 0, 0))
+        self.assertEqual(CronExpression('30 2 29 2 *').next(after), timestamp(2028, 2, 29, 2, 30))
+
+    def testNextIsStrictlyAfter(self):
+        at = timestamp(2025, 3, 14, 10, 15)
+        self.assertEqual(CronExpression('15 10 * * *').next(at), timestamp(2025, 3, 15, 10, 15))
+
+    def testDayOrWeekday(self):
+        # 日和周同时限定时满足其一即可：2025-03-14是星期五，下一个13日或星期一是3月17日
+        expr = CronExpression('0 0 13 * mon')
+        self.assertEqual(expr.next(timestamp(2025, 3, 14)), timestamp(2025, 3, 17))
+        # 只限定周时日字段不起作用
+        self.assertEqual(CronExpression('0 0 * * sat').next(timestamp(2025, 3, 14)), timestamp(2025, 3, 15))
+
+    def testNeverFires(self):
+        with self.assertRaises(ValueError):
+            CronExpression('0 0 30 2 *').next(timestamp(2025, 1, 1))
+
+
+class ScheduleDataTest(unittest.TestCase):
+    def testNormalizeTrigger(self):
+        trigger = normalizeTrigger({'type': TriggerType.CRON, 'expr': ' @hourly '})
+        self.assertEqual(trigger['expr'], '@hourly')
+        self.assertEqual(trigger['action'], 'open')
+        self.assertTrue(trigger['id'])
+
+        for invalid in ({'type': TriggerType.INTERVAL, 'seconds': 0}, {'type': TriggerType.FILE},
+                        {'type': TriggerType.AFTER, 'preset': 'a', 'on': 'never'}, {'type': 'unknown'},
+                        {'type': TriggerType.CRON, 'expr': '* *'}, {'type': TriggerType.CRON, 'action': 'x'}):
+            with self.subTest(trigger=invalid), self.assertRaises(ValueError):
+                normalizeTrigger(invalid)
+
+    def testNormalizeScheduleDropsInvalidTriggers(self):
+        schedule = normalizeSchedule({'id': 'p1', 'triggers': [{'type': TriggerType.INTERVAL, 'seconds': 60},
+                                                                {'type': TriggerType.INTERVAL, 'seconds': -1}]})
+        self.assertEqual(schedule['id'], 'p1')
+        self.assertTrue(schedule['enabled'])
+        self.assertEqual(len(schedule['triggers']), 1)
+        self.assertTrue(normalizeSchedule(None)['id'])  # 旧版本的预设生成新的ID
+
+    def testIntervalSkipsMissedFires(self):
+        trigger = normalizeTrigger({'type': TriggerType.INTERVAL, 'seconds': 60})
+        self.assertEqual(nextFireTime(trigger, 1000), 1060)
+        self.assertEqual(nextFireTime(trigger, 1005, previous=1000), 1060)
+        self.assertEqual(nextFireTime(trigger, 1250, previous=1000), 1300)
+        self.assertIsNone(nextFireTime(normalizeTrigger({'type': TriggerType.FILE, 'path': '/a'}), 1000))
+
+    def testChainCycle(self):
+        schedules = {
+            'a': normalizeSchedule({'id': 'a'}),
+            'b': normalizeSchedule({'id': 'b', 'triggers': [{'type': TriggerType.AFTER, 'preset': 'a'}]}),
+            'c': normalizeSchedule({'id': 'c', 'triggers': [{'type': TriggerType.AFTER, 'preset': 'b'}]}),
+        }
+        self.assertTrue(chainCreatesCycle(schedules, 'a', 'c'))  # a在c之后运行：a -> b -> c -> a
+        self.assertTrue(chainCreatesCycle(schedules, 'a', 'a'))
+        self.assertFalse(chainCreatesCycle(schedules, 'c', 'a'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""FileMonitor.search_index的分词与检索测试"""
+import unittest
+
+from FileMonitor.search_index import InvertedIndex, SearchIndex, tokenize, queryTokens
+
+
+class TokenizeTest(unittest.TestCase):
+    def testSplitsWordsDigitsAndCjk(self):
+        self.assertEqual(tokenize('Backup_2024.bat'), {'backup', '2024', 'bat'})
+        self.assertEqual(tokenize('数据备份'), {'数据', '据备', '备份', '份'})
+
+    def testQueryTokens(self):
+        self.assertEqual(queryTokens('C:\\Tools\\Run'), ['c', 'tools', 'run'])
+        self.assertEqual(queryTokens('备份'), ['备份'])
+        self.assertEqual(queryTokens('数据备'), ['数据', '据备'])
+
+
+class InvertedIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = InvertedIndex()
+        self.index.set(1, {'backup', 'daily'})
+        self.index.set(2, {'backend', 'build'})
+        self.index.set(3, {'deploy'})
+
+    def testExactAndPrefixMatch(self):
+        self.assertEqual(self.index.exactMatch('backup'), {1})
+        self.assertEqual(self.index.exactMatch('back'), set())
+        self.assertEqual(self.index.prefixMatch('back'), {1, 2})
+        self.assertEqual(self.index.prefixMatch('d'), {1, 3})
+        self.assertEqual(self.index.prefixMatch('x'), set())
+
+    def testReplaceAndRemove(self):
+        self.index.set(1, {'weekly'})
+        self.assertEqual(self.index.prefixMatch('back'), {2})
+        self.assertEqual(self.index.exactMatch('weekly'), {1})
+
+        self.index.remove(2)
+        self.assertEqual(self.index.prefixMatch('b'), set())
+        self.assertEqual(len(self.index), 2)
+
+    def testBulkInsertResortsLazily(self):
+        index = InvertedIndex()
+        index.set(1, {f'word{i:04d}' for i in range(index.insertLimit + 1)})
+        self.assertTrue(index.sortedDirty)
+        self.assertEqual(index.prefixMatch('word01'), {1})
+        self.assertFalse(index.sortedDirty)
+
+
+class SearchIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = SearchIndex()
+        self.index.setDocument(1, 'backup.bat', '每日备份', 'D:\\scripts\\backup.bat')
+        self.index.setDocument(2, 'deploy.ps1', '', 'D:\\scripts\\deploy.ps1')
+        self.index.setDocument(3, 'clean.sh', '清理日志', '/home/user/clean.sh')
+
+    def testTermsAreIntersected(self):
+        self.assertEqual(self.index.search('scripts'), {1, 2})
+        self.assertEqual(self.index.search('scripts dep'), {2})
+        self.assertEqual(self.index.search('备份'), {1})
+        self.assertEqual(self.index.search('日'), {1, 3})
+        self.assertEqual(self.index.search('nothing'), set())
+
+    def testEmptyQueryDoesNotFilter(self):
+        self.assertIsNone(self.index.search('  '))
+        self.assertIsNone(self.index.search('...'))
+
+    def testContentIndex(self):
+        self.index.setContent(2, tokenize('robocopy src dst'))
+        self.assertEqual(self.index.search('robocopy'), set())  # 内容索引未开启
+
+        self.index.setContentEnabled(True)
+        self.index.setContent(2, tokenize('robocopy src dst'))
+        self.assertEqual(self.index.search('robo'), {2})
+        self.assertEqual(self.index.search('robo backup'), set())
+
+        self.index.setContentEnabled(False)
+        self.assertEqual(self.index.search('robo'), set())
+
+
+if __name__ == '__main__':
+    unittest.main()